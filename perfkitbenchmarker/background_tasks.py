@@ -68,6 +68,7 @@ from perfkitbenchmarker import context
 from perfkitbenchmarker import errors
 from perfkitbenchmarker import flags
 from perfkitbenchmarker import log_util
+from perfkitbenchmarker import sample
 
 # For situations where an interruptable wait is necessary, a loop of waits with
 # long timeouts is used instead. This is because some of Python's built-in wait
@@ -85,6 +86,9 @@ _THREAD_WAIT_FOR_KEYBOARD_INTERRUPT = 1
 # The default value for max_concurrent_threads.
 MAX_CONCURRENT_THREADS = 200
 
+# Maximum number of idle worker threads kept for reuse by later parallel calls.
+_MAX_IDLE_THREADS = MAX_CONCURRENT_THREADS
+
 # The default value is set in pkb.py. It is the greater of
 # MAX_CONCURRENT_THREADS or the value passed to --num_vms. This is particularly
 # important for the cluster_boot benchmark where we want to launch all of the
@@ -92,6 +96,10 @@ MAX_CONCURRENT_THREADS = 200
 flags.DEFINE_integer(
     'max_concurrent_threads', None, 'Maximum number of concurrent threads to '
     'use when running a benchmark.')
+flags.DEFINE_boolean(
+    'background_task_samples', False, 'Whether to record the wall time and '
+    'queueing time of each task run by RunThreaded, RunParallelThreads and '
+    'RunParallelProcesses on behalf of a benchmark as samples.')
 FLAGS = flags.FLAGS
 
 
@@ -230,6 +238,10 @@ class _BackgroundTask(object):
         otherwise.
     traceback: The traceback string if the call raised an exception, or None
         otherwise.
+    start_time: Time at which the target was invoked, or None if the task has
+        not run.
+    end_time: Time at which the target returned, or None if the task has not
+        completed.
   """
 
   def __init__(self, target, args, kwargs, thread_context):
@@ -239,14 +251,19 @@ class _BackgroundTask(object):
     self.context = thread_context
     self.return_value = None
     self.traceback = None
+    self.start_time = None
+    self.end_time = None
 
   def Run(self):
     """Sets the current thread context and executes the target."""
     self.context.CopyToCurrentThread()
+    self.start_time = time.time()
     try:
       self.return_value = self.target(*self.args, **self.kwargs)
     except Exception:
       self.traceback = traceback.format_exc()
+    finally:
+      self.end_time = time.time()
 
 
 class _BackgroundTaskManager(object):
@@ -306,21 +323,22 @@ class _BackgroundTaskManager(object):
 def _ExecuteBackgroundThreadTasks(worker_id, task_queue, response_queue):
   """Executes tasks received on a task queue.
 
-  Executed in a child Thread by _BackgroundThreadTaskManager.
+  Executed in a child Thread by _BackgroundThreadTaskManager. The thread may
+  outlive the manager that started it and execute tasks for later managers;
+  see _IdleThreadPool.
 
   Args:
-    worker_id: int. Identifier for the child thread relative to other child
-        threads.
+    worker_id: int. Identifier for the child thread relative to the other
+        child threads started by the same manager.
     task_queue: _NonPollingSingleReaderQueue. Queue from which input is read.
         Each value in the queue can be one of three types of values. If it is a
-        (task_id, _BackgroundTask) pair, the task is executed on this thread.
-        If it is _THREAD_STOP_PROCESSING, the thread stops executing. If it is
-        _THREAD_WAIT_FOR_KEYBOARD_INTERRUPT, the thread waits for a
-        KeyboardInterrupt.
-    response_queue: _SingleReaderQueue. Queue to which output is written. It
-        receives worker_id when this thread's bootstrap code has completed and
-        receives a (worker_id, task_id) pair for each task completed on this
-        thread.
+        (worker_id, task_id, _BackgroundTask, response_queue) tuple, the task
+        is executed on this thread and (worker_id, task_id) is written to
+        response_queue. If it is _THREAD_STOP_PROCESSING, the thread stops
+        executing. If it is _THREAD_WAIT_FOR_KEYBOARD_INTERRUPT, the thread
+        waits for a KeyboardInterrupt.
+    response_queue: _SingleReaderQueue. Queue that receives worker_id when
+        this thread's bootstrap code has completed.
   """
   try:
     response_queue.Put(worker_id)
@@ -331,7 +349,7 @@ def _ExecuteBackgroundThreadTasks(worker_id, task_queue, response_queue):
       elif task_tuple == _THREAD_WAIT_FOR_KEYBOARD_INTERRUPT:
         while True:
           time.sleep(_WAIT_MAX_RECHECK_DELAY)
-      task_id, task = task_tuple
+      worker_id, task_id, task, response_queue = task_tuple
       task.Run()
       response_queue.Put((worker_id, task_id))
   except KeyboardInterrupt:
@@ -342,6 +360,59 @@ def _ExecuteBackgroundThreadTasks(worker_id, task_queue, response_queue):
                   'parent.', worker_id, exc_info=True)
 
 
+class _IdleThreadPool(object):
+  """Worker threads kept alive between parallel calls for later reuse.
+
+  Starting a thread and waiting for its bootstrap code is the main fixed cost
+  of RunThreaded, and PKB makes many short parallel calls over the same VMs.
+  A _BackgroundThreadTaskManager takes idle workers from this pool before
+  starting new threads and returns its idle workers when it exits. A worker is
+  owned by one manager at a time, so nested parallel calls never wait on each
+  other's workers.
+
+  Workers are shared between threads only with deque appends and pops, which
+  are atomic, rather than with a Lock.
+  """
+
+  def __init__(self, max_idle_threads):
+    self._max_idle_threads = max_idle_threads
+    self._idle_workers = deque()
+
+  def Acquire(self, count):
+    """Removes up to 'count' live idle workers from the pool.
+
+    Returns:
+      list of (threading.Thread, _NonPollingSingleReaderQueue) tuples.
+    """
+    workers = []
+    while len(workers) < count:
+      try:
+        worker = self._idle_workers.pop()
+      except IndexError:
+        break
+      if worker[0].is_alive():
+        workers.append(worker)
+    return workers
+
+  def Release(self, workers):
+    """Returns idle workers to the pool.
+
+    Returns:
+      list of the workers that did not fit in the pool. The caller must stop
+      them.
+    """
+    excess_workers = []
+    for worker in workers:
+      if len(self._idle_workers) < self._max_idle_threads:
+        self._idle_workers.append(worker)
+      else:
+        excess_workers.append(worker)
+    return excess_workers
+
+
+_idle_thread_pool = _IdleThreadPool(_MAX_IDLE_THREADS)
+
+
 class _BackgroundThreadTaskManager(_BackgroundTaskManager):
   """Manages state for background tasks started in child threads."""
 
@@ -350,9 +421,13 @@ class _BackgroundThreadTaskManager(_BackgroundTaskManager):
     self._response_queue = _SingleReaderQueue()
     self._task_queues = []
     self._threads = []
+    for thread, task_queue in _idle_thread_pool.Acquire(self._max_concurrency):
+      self._threads.append(thread)
+      self._task_queues.append(task_queue)
     self._available_worker_ids = range(self._max_concurrency)
-    uninitialized_worker_ids = set(self._available_worker_ids)
-    for worker_id in self._available_worker_ids:
+    uninitialized_worker_ids = set(
+        self._available_worker_ids[len(self._threads):])
+    for worker_id in self._available_worker_ids[len(self._threads):]:
       task_queue = _NonPollingSingleReaderQueue()
       self._task_queues.append(task_queue)
       thread = threading.Thread(
@@ -361,19 +436,28 @@ class _BackgroundThreadTaskManager(_BackgroundTaskManager):
       thread.daemon = True
       self._threads.append(thread)
       thread.start()
-    # Wait for each Thread to finish its bootstrap code. Starting all the
+    # Wait for each new Thread to finish its bootstrap code. Starting all the
     # threads upfront like this and reusing them for later calls minimizes the
     # risk of a KeyboardInterrupt interfering with any of the Lock interactions.
-    for _ in self._threads:
+    while uninitialized_worker_ids:
       worker_id = self._response_queue.Get()
       uninitialized_worker_ids.remove(worker_id)
-    assert not uninitialized_worker_ids, uninitialized_worker_ids
 
   def __exit__(self, *unused_args, **unused_kwargs):
-    # Shut down worker threads.
-    for task_queue in self._task_queues:
+    # Return idle worker threads to the pool and shut down the rest, including
+    # any that are unexpectedly still busy.
+    available_worker_ids = set(self._available_worker_ids)
+    idle_workers = []
+    stopping_workers = []
+    for worker_id, worker in enumerate(zip(self._threads, self._task_queues)):
+      if worker_id in available_worker_ids:
+        idle_workers.append(worker)
+      else:
+        stopping_workers.append(worker)
+    stopping_workers.extend(_idle_thread_pool.Release(idle_workers))
+    for _, task_queue in stopping_workers:
       task_queue.Put(_THREAD_STOP_PROCESSING)
-    for thread in self._threads:
+    for thread, _ in stopping_workers:
       _WaitForCondition(lambda: not thread.is_alive())
 
   def StartTask(self, target, args, kwargs, thread_context):
@@ -383,7 +467,8 @@ class _BackgroundThreadTaskManager(_BackgroundTaskManager):
     task_id = len(self.tasks)
     self.tasks.append(task)
     worker_id = self._available_worker_ids.pop()
-    self._task_queues[worker_id].Put((task_id, task))
+    self._task_queues[worker_id].Put(
+        (worker_id, task_id, task, self._response_queue))
 
   def AwaitAnyTask(self):
     worker_id, task_id = self._response_queue.Get()
@@ -401,6 +486,8 @@ class _BackgroundThreadTaskManager(_BackgroundTaskManager):
       task_queue.Put(_THREAD_WAIT_FOR_KEYBOARD_INTERRUPT)
     for thread in self._threads:
       _WaitForCondition(lambda: not thread.is_alive())
+    # None of the threads can be reused.
+    self._available_worker_ids = []
 
 
 def _ExecuteProcessTask(task):
@@ -417,10 +504,11 @@ def _ExecuteProcessTask(task):
     task: _BackgroundTask to execute.
 
   Returns:
-    (result, traceback) tuple. The first element is the return value from the
-    task function, or None if the function raised an exception. The second
-    element is the exception traceback string, or None if the function
-    succeeded.
+    (result, traceback, start_time, end_time) tuple. The first element is the
+    return value from the task function, or None if the function raised an
+    exception. The second element is the exception traceback string, or None
+    if the function succeeded. The last two are the times at which the
+    function was invoked and returned.
   """
   def handle_sigint(signum, frame):
     # Ignore any new SIGINTs since we are already tearing down.
@@ -430,7 +518,7 @@ def _ExecuteProcessTask(task):
     signal.default_int_handler(signum, frame)
   signal.signal(signal.SIGINT, handle_sigint)
   task.Run()
-  return task.return_value, task.traceback
+  return task.return_value, task.traceback, task.start_time, task.end_time
 
 
 class _BackgroundProcessTaskManager(_BackgroundTaskManager):
@@ -472,7 +560,8 @@ class _BackgroundProcessTaskManager(_BackgroundTaskManager):
     future = completed_tasks.pop()
     task_id = self._active_futures.pop(future)
     task = self.tasks[task_id]
-    task.return_value, task.traceback = future.result()
+    (task.return_value, task.traceback, task.start_time,
+     task.end_time) = future.result()
     return task_id
 
   def HandleKeyboardInterrupt(self):
@@ -483,8 +572,42 @@ class _BackgroundProcessTaskManager(_BackgroundTaskManager):
     self._executor.shutdown(wait=True)
 
 
+def _GetTaskTimingSamples(target_arg_tuples, tasks, submit_time,
+                          max_concurrency):
+  """Creates samples describing how long each task waited and ran.
+
+  Args:
+    target_arg_tuples: list of (target, args, kwargs) tuples.
+    tasks: list of _BackgroundTask instances, in the same order as
+        target_arg_tuples.
+    submit_time: Time at which all of the tasks were submitted.
+    max_concurrency: int. The maximum number of concurrent tasks.
+
+  Returns:
+    list of sample.Sample objects. Each task that ran has a
+    'Background Task Queue Time' sample, the time from submission until it
+    started, and a 'Background Task Wall Time' sample.
+  """
+  samples = []
+  for target_arg_tuple, task in zip(target_arg_tuples, tasks):
+    if task is None or task.start_time is None:
+      continue
+    metadata = {'task': _GetCallString(target_arg_tuple),
+                'parallel_tasks': len(target_arg_tuples),
+                'max_concurrency': max_concurrency,
+                'succeeded': task.traceback is None}
+    samples.append(sample.Sample('Background Task Queue Time',
+                                 task.start_time - submit_time, 'seconds',
+                                 metadata))
+    samples.append(sample.Sample('Background Task Wall Time',
+                                 task.end_time - task.start_time, 'seconds',
+                                 metadata))
+  return samples
+
+
 def _RunParallelTasks(target_arg_tuples, max_concurrency, get_task_manager,
-                      parallel_exception_class, post_task_delay=0):
+                      parallel_exception_class, post_task_delay=0,
+                      priorities=None, stop_on_failure=False):
   """Executes function calls concurrently in separate threads or processes.
 
   Args:
@@ -497,6 +620,12 @@ def _RunParallelTasks(target_arg_tuples, max_concurrency, get_task_manager,
     parallel_exception_class: Type of exception to raise upon an exception in
         one of the called functions.
     post_task_delay: Delay in seconds between parallel task invocations.
+    priorities: Optional list of numbers, one per target_arg_tuple. Tasks with
+        higher priorities are started first; tasks with equal priorities are
+        started in order.
+    stop_on_failure: bool. If True, tasks that have not started when any task
+        raises an exception are never started. Tasks already running are
+        allowed to finish.
 
   Returns:
     list of function return values in the order corresponding to the order of
@@ -505,20 +634,35 @@ def _RunParallelTasks(target_arg_tuples, max_concurrency, get_task_manager,
   Raises:
     parallel_exception_class: When an exception occurred in any of the called
         functions.
+    ValueError: If priorities does not have one entry per target_arg_tuple.
   """
   thread_context = _BackgroundTaskThreadContext()
   max_concurrency = min(max_concurrency, len(target_arg_tuples))
+  if priorities is None:
+    start_order = range(len(target_arg_tuples))
+  elif len(priorities) != len(target_arg_tuples):
+    raise ValueError('Expected one priority per task, got {0} priorities for '
+                     '{1} tasks.'.format(len(priorities),
+                                         len(target_arg_tuples)))
+  else:
+    # sorted is stable, so equal priorities keep their order.
+    start_order = sorted(range(len(target_arg_tuples)),
+                         key=lambda i: priorities[i], reverse=True)
+  tasks = [None] * len(target_arg_tuples)
   error_strings = []
   started_task_count = 0
   active_task_count = 0
+  submit_time = time.time()
   with get_task_manager(max_concurrency) as task_manager:
     try:
-      while started_task_count < len(target_arg_tuples) or active_task_count:
-        if (started_task_count < len(target_arg_tuples) and
+      while started_task_count < len(start_order) or active_task_count:
+        if (started_task_count < len(start_order) and
             active_task_count < max_concurrency):
           # Start a new task.
-          target, args, kwargs = target_arg_tuples[started_task_count]
+          index = start_order[started_task_count]
+          target, args, kwargs = target_arg_tuples[index]
           task_manager.StartTask(target, args, kwargs, thread_context)
+          tasks[index] = task_manager.tasks[-1]
           started_task_count += 1
           active_task_count += 1
           if post_task_delay:
@@ -534,10 +678,14 @@ def _RunParallelTasks(target_arg_tuples, max_concurrency, get_task_manager,
         stacktrace = task_manager.tasks[task_id].traceback
         if stacktrace:
           msg = ('Exception occurred while calling {0}:{1}{2}'.format(
-              _GetCallString(target_arg_tuples[task_id]), os.linesep,
-              stacktrace))
+              _GetCallString(target_arg_tuples[start_order[task_id]]),
+              os.linesep, stacktrace))
           logging.error(msg)
           error_strings.append(msg)
+          if stop_on_failure and started_task_count < len(start_order):
+            logging.error('Not starting the remaining %s tasks.',
+                          len(start_order) - started_task_count)
+            start_order = start_order[:started_task_count]
 
     except KeyboardInterrupt:
       logging.error(
@@ -546,6 +694,11 @@ def _RunParallelTasks(target_arg_tuples, max_concurrency, get_task_manager,
       task_manager.HandleKeyboardInterrupt()
       raise
 
+  if thread_context.benchmark_spec and FLAGS.background_task_samples:
+    thread_context.benchmark_spec.background_task_samples.extend(
+        _GetTaskTimingSamples(target_arg_tuples, tasks, submit_time,
+                              max_concurrency))
+
   if error_strings:
     # TODO(skschneider): Combine errors.VmUtil.ThreadException and
     # errors.VmUtil.CalledProcessException so this can be a single exception
@@ -553,20 +706,27 @@ def _RunParallelTasks(target_arg_tuples, max_concurrency, get_task_manager,
     raise parallel_exception_class(
         'The following exceptions occurred during parallel execution:'
         '{0}{1}'.format(os.linesep, os.linesep.join(error_strings)))
-  results = [task.return_value for task in task_manager.tasks]
+  results = [task.return_value for task in tasks]
   assert len(target_arg_tuples) == len(results), (target_arg_tuples, results)
   return results
 
 
-def RunParallelThreads(target_arg_tuples, max_concurrency, post_task_delay=0):
+def RunParallelThreads(target_arg_tuples, max_concurrency, post_task_delay=0,
+                       priorities=None, stop_on_failure=False):
   """Executes function calls concurrently in separate threads.
 
+  Idle threads are reused by later calls rather than shut down.
+
   Args:
     target_arg_tuples: list of (target, args, kwargs) tuples. Each tuple
         contains the function to call and the arguments to pass it.
     max_concurrency: int or None. The maximum number of concurrent new
         threads.
     post_task_delay: Delay in seconds between parallel task invocations.
+    priorities: Optional list of numbers, one per target_arg_tuple. Tasks with
+        higher priorities are started first.
+    stop_on_failure: bool. Whether to stop starting new tasks once any task
+        has raised an exception.
 
   Returns:
     list of function return values in the order corresponding to the order of
@@ -578,7 +738,8 @@ def RunParallelThreads(target_arg_tuples, max_concurrency, post_task_delay=0):
   """
   return _RunParallelTasks(
       target_arg_tuples, max_concurrency, _BackgroundThreadTaskManager,
-      errors.VmUtil.ThreadException, post_task_delay)
+      errors.VmUtil.ThreadException, post_task_delay, priorities=priorities,
+      stop_on_failure=stop_on_failure)
 
 
 def RunThreaded(target, thread_params, max_concurrent_threads=None):
@@ -642,7 +803,8 @@ def RunThreaded(target, thread_params, max_concurrent_threads=None):
 
 
 def RunParallelProcesses(target_arg_tuples, max_concurrency,
-                         post_process_delay=0):
+                         post_process_delay=0, priorities=None,
+                         stop_on_failure=False):
   """Executes function calls concurrently in separate processes.
 
   Args:
@@ -652,6 +814,10 @@ def RunParallelProcesses(target_arg_tuples, max_concurrency,
         processes. If None, it will default to the number of processors on the
         machine.
     post_process_delay: Delay in seconds between parallel process invocations.
+    priorities: Optional list of numbers, one per target_arg_tuple. Tasks with
+        higher priorities are started first.
+    stop_on_failure: bool. Whether to stop starting new tasks once any task
+        has raised an exception.
 
   Returns:
     list of function return values in the order corresponding to the order of
@@ -672,7 +838,8 @@ def RunParallelProcesses(target_arg_tuples, max_concurrency,
     ret_val = _RunParallelTasks(
         target_arg_tuples, max_concurrency, _BackgroundProcessTaskManager,
         errors.VmUtil.CalledProcessException,
-        post_task_delay=post_process_delay)
+        post_task_delay=post_process_delay, priorities=priorities,
+        stop_on_failure=stop_on_failure)
   finally:
     if old_handler:
       signal.signal(signal.SIGINT, old_handler)
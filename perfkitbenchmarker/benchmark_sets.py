@@ -16,12 +16,16 @@
 
 import collections
 import copy
+import importlib
 import itertools
+import re
 
 from perfkitbenchmarker import configs
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import import_util
 from perfkitbenchmarker import linux_benchmarks
 from perfkitbenchmarker import linux_packages
+from perfkitbenchmarker import module_index
 from perfkitbenchmarker import os_types
 from perfkitbenchmarker import windows_benchmarks
 from perfkitbenchmarker import windows_packages
@@ -33,6 +37,12 @@ flags.DEFINE_string('flag_matrix', None,
 flags.DEFINE_string('flag_zip', None,
                     'The name of the flag zip to run.')
 
+# Flags whose presence means any benchmark or package flag may be set, or that
+# help for all of them is needed.
+_IMPORT_ALL_ARGS = frozenset(['?', 'benchmark_config_file', 'config_override',
+                              'flagfile', 'h', 'help', 'helpfull',
+                              'helpshort', 'helpxml'])
+
 MESSAGE = 'message'
 BENCHMARK_LIST = 'benchmark_list'
 STANDARD_SET = 'standard_set'
@@ -275,6 +285,107 @@ def _GetValidPackages():
   return linux_packages.PACKAGES
 
 
+def _ParseArgs(argv):
+  """Returns a dict mapping the flag names in argv to their raw values.
+
+  This is a rough parse, done before most flags are defined, that only needs
+  to find which flags are present and the values of a few of them.
+  """
+  args = {}
+  argv = argv[1:]
+  for i, arg in enumerate(argv):
+    if arg == '--':
+      break
+    if not arg.startswith('-'):
+      continue
+    name, sep, value = arg.lstrip('-').partition('=')
+    if not sep:
+      next_arg = argv[i + 1] if i + 1 < len(argv) else '-'
+      value = None if next_arg.startswith('-') else next_arg
+    args[name] = value
+  return args
+
+
+def GetModulesForArgs(argv):
+  """Returns the benchmark and package modules needed to parse argv.
+
+  These are the selected benchmarks, the modules defining flags that appear
+  in argv, and for --helpmatch, the modules matching its regex.
+
+  Args:
+    argv: list of strings. The command line.
+
+  Returns:
+    A set of module names, or None if every module is needed, e.g. for
+    --help or when flags may come from a file or config.
+  """
+  args = _ParseArgs(argv)
+  if _IMPORT_ALL_ARGS.intersection(args):
+    return None
+  benchmark_modules = {}
+  benchmark_modules.update(module_index.LINUX_BENCHMARKS)
+  benchmark_modules.update(module_index.WINDOWS_BENCHMARKS)
+  module_names = set()
+
+  benchmark_queue = collections.deque(
+      (args.get('benchmarks') or STANDARD_SET).split(','))
+  benchmark_set = set()
+  while benchmark_queue:
+    benchmark = benchmark_queue.popleft()
+    if benchmark in benchmark_set:
+      continue
+    benchmark_set.add(benchmark)
+    if benchmark in BENCHMARK_SETS:
+      benchmark_queue.extendleft(BENCHMARK_SETS[benchmark][BENCHMARK_LIST])
+    for benchmarks in (module_index.LINUX_BENCHMARKS,
+                       module_index.WINDOWS_BENCHMARKS):
+      if benchmark in benchmarks:
+        module_names.add(benchmarks[benchmark])
+
+  for name in args:
+    if name.startswith('no') and name not in module_index.FLAG_MODULES:
+      name = name[2:]
+    if name in module_index.FLAG_MODULES:
+      module_names.add(module_index.FLAG_MODULES[name])
+
+  if args.get('helpmatch'):
+    try:
+      regex = re.compile(args['helpmatch'])
+    except re.error:
+      return None
+    module_names.update(
+        module_name for module_name in
+        set(benchmark_modules.itervalues()).union(
+            module_index.FLAG_MODULES.itervalues())
+        if regex.search(module_name))
+  return module_names
+
+
+def ImportModulesForArgs(argv):
+  """Imports the benchmark and package modules needed to parse argv.
+
+  Benchmark and package modules define their flags when imported, so this must
+  be called before parsing flags. Other modules are imported when first used.
+
+  Args:
+    argv: list of strings. The command line.
+
+  Returns:
+    True if every benchmark and package module was imported.
+  """
+  module_names = GetModulesForArgs(argv)
+  if module_names is None:
+    for package in (linux_benchmarks, linux_packages, windows_benchmarks,
+                    windows_packages):
+      for _ in import_util.LoadModulesForPath(package.__path__,
+                                              package.__name__):
+        pass
+    return True
+  for module_name in sorted(module_names):
+    importlib.import_module(module_name)
+  return False
+
+
 def BenchmarkModule(benchmark_name):
   """Finds the module for a benchmark by name.
 
@@ -141,6 +141,8 @@ class BenchmarkSpec(object):
     self.app_groups = {}
     self._zone_index = 0
     self.capacity_reservations = []
+    self.background_task_samples = []
+    self.package_cache_samples = []
 
     # Modules can't be pickled, but functions can, so we store the functions
     # necessary to run the benchmark.
@@ -601,6 +603,10 @@ class BenchmarkSpec(object):
       samples.extend(self.container_cluster.GetSamples())
     if self.container_registry:
       samples.extend(self.container_registry.GetSamples())
+    for vm in self.vms:
+      samples.extend(vm.GetRemoteConnectionSamples())
+    samples.extend(self.background_task_samples)
+    samples.extend(self.package_cache_samples)
     return samples
 
   def StartBackgroundWorkload(self):
@@ -730,6 +736,7 @@ class BenchmarkSpec(object):
     if vm.is_static and vm.install_packages:
       vm.PackageCleanup()
     vm.Delete()
+    vm.CloseRemoteConnections()
     vm.DeleteScratchDisks()
 
   @staticmethod
@@ -148,6 +148,9 @@ class VmUtil(object):
   class CalledProcessException(Error):
     pass
 
+  class FileDistributionError(Error):
+    pass
+
 
 class Benchmarks(object):
   """Errors raised by individual benchmark."""
@@ -0,0 +1,367 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A mergeable, array-backed HDR histogram of non-negative integer values.
+
+Values are counted in the bucket layout of HdrHistogram
+(https://github.com/HdrHistogram/HdrHistogram): values below
+2 * 10^significant_figures are counted exactly, and larger values in
+logarithmically sized buckets that keep 'significant_figures' decimal digits
+of precision. Histograms with the same layout are merged by adding their count
+arrays, and can be read from and written to the compressed, base64 encoded
+format of HdrHistogram interval logs, e.g. those written by YCSB with
+hdrhistogram.fileoutput=true.
+"""
+
+import base64
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from perfkitbenchmarker import stats_util
+
+# Cookies identifying the V2 encoding, the only one written by current
+# versions of HdrHistogram. The 0x10 bit marks the LEB128 count encoding.
+_ENCODING_COOKIE = 0x1c849303 | 0x10
+_COMPRESSED_ENCODING_COOKIE = 0x1c849304 | 0x10
+_COOKIE_BASE_MASK = ~0xf0
+# cookie, payload length, normalizing index offset, significant figures,
+# lowest discernible value, highest trackable value, integer to double ratio.
+_HEADER = struct.Struct('>iiiiqqd')
+_COMPRESSED_HEADER = struct.Struct('>ii')
+# Values are converted to floats to find their buckets, which is exact below
+# 2^53.
+_MAX_VALUE = 2 ** 53 - 1
+_DEFAULT_HIGHEST_TRACKABLE_VALUE = 3600 * 1000 * 1000
+
+
+class HdrHistogram(object):
+  """A histogram of non-negative integers with HdrHistogram's bucket layout.
+
+  The count array grows as needed, so highest_trackable_value only bounds
+  the values that other HdrHistogram implementations decoding this one must
+  accept.
+
+  Attributes:
+    lowest_discernible_value: int. The smallest value distinguished from 0.
+    highest_trackable_value: int. The largest value expected to be recorded.
+    significant_figures: int. Decimal digits of precision kept for each
+      value, from 1 to 5.
+    counts: numpy int64 array. The count of each bucket.
+  """
+
+  def __init__(self, lowest_discernible_value=1,
+               highest_trackable_value=_DEFAULT_HIGHEST_TRACKABLE_VALUE,
+               significant_figures=3):
+    if lowest_discernible_value < 1:
+      raise ValueError('lowest_discernible_value must be at least 1.')
+    if highest_trackable_value < 2 * lowest_discernible_value:
+      raise ValueError('highest_trackable_value must be at least twice '
+                       'lowest_discernible_value.')
+    if not 1 <= significant_figures <= 5:
+      raise ValueError('significant_figures must be from 1 to 5.')
+    self.lowest_discernible_value = lowest_discernible_value
+    self.highest_trackable_value = highest_trackable_value
+    self.significant_figures = significant_figures
+    self._unit_magnitude = int(math.floor(math.log(lowest_discernible_value,
+                                                   2)))
+    sub_bucket_count_magnitude = int(math.ceil(
+        math.log(2 * 10 ** significant_figures, 2)))
+    self._sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude,
+                                                1) - 1
+    self._sub_bucket_half_count = 1 << self._sub_bucket_half_count_magnitude
+    self._sub_bucket_mask = ((2 * self._sub_bucket_half_count - 1) <<
+                             self._unit_magnitude)
+    self.counts = np.zeros(
+        self._GetCountsLength(highest_trackable_value), dtype=np.int64)
+
+  def _GetCountsLength(self, value):
+    """Returns the number of buckets needed to count 'value'."""
+    smallest_untrackable_value = (2 * self._sub_bucket_half_count <<
+                                  self._unit_magnitude)
+    buckets_needed = 1
+    while smallest_untrackable_value <= value:
+      smallest_untrackable_value <<= 1
+      buckets_needed += 1
+    return (buckets_needed + 1) * self._sub_bucket_half_count
+
+  def _GetLayout(self):
+    return (self._unit_magnitude, self._sub_bucket_half_count_magnitude)
+
+  def _GetIndices(self, values):
+    """Returns the bucket index of each of an int64 array of values."""
+    # The bucket is the position of the highest set bit above the sub-bucket
+    # range, found with frexp, which returns each value's bit length.
+    _, bit_lengths = np.frexp((values | self._sub_bucket_mask).astype(
+        np.float64))
+    bucket_indices = (bit_lengths.astype(np.int64) - 1 - self._unit_magnitude -
+                      self._sub_bucket_half_count_magnitude)
+    sub_bucket_indices = values >> (bucket_indices + self._unit_magnitude)
+    return (((bucket_indices + 1) << self._sub_bucket_half_count_magnitude) +
+            sub_bucket_indices - self._sub_bucket_half_count)
+
+  def _GetBucketRanges(self, indices):
+    """Returns the lowest value and size of each bucket in 'indices'."""
+    indices = np.asarray(indices, dtype=np.int64)
+    bucket_indices = (indices >> self._sub_bucket_half_count_magnitude) - 1
+    sub_bucket_indices = ((indices & (self._sub_bucket_half_count - 1)) +
+                          self._sub_bucket_half_count)
+    first_bucket = bucket_indices < 0
+    sub_bucket_indices[first_bucket] -= self._sub_bucket_half_count
+    bucket_indices[first_bucket] = 0
+    shifts = bucket_indices + self._unit_magnitude
+    return sub_bucket_indices << shifts, np.left_shift(1, shifts)
+
+  def RecordValues(self, values, counts=1):
+    """Counts values.
+
+    Args:
+      values: A number, sequence or numpy array of non-negative numbers.
+        Fractional values are truncated.
+      counts: A number, sequence or numpy array of the number of times each
+        value occurred.
+
+    Raises:
+      ValueError, if a value or count is negative or a value is too large.
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    counts = np.broadcast_to(np.asarray(counts, dtype=np.int64),
+                             values.shape)
+    if not values.size:
+      return
+    if values.min() < 0 or values.max() > _MAX_VALUE:
+      raise ValueError('Values must be from 0 to %d.' % _MAX_VALUE)
+    if counts.min() < 0:
+      raise ValueError('Counts must be non-negative.')
+    indices = self._GetIndices(values.astype(np.int64))
+    max_index = indices.max()
+    if max_index >= self.counts.size:
+      self.counts = np.concatenate((self.counts, np.zeros(
+          max_index + 1 - self.counts.size, dtype=np.int64)))
+      self.highest_trackable_value = max(self.highest_trackable_value,
+                                         int(values.max()))
+    # bincount sums the counts of values in the same bucket.
+    self.counts[:max_index + 1] += np.bincount(
+        indices, weights=counts, minlength=max_index + 1).astype(np.int64)
+
+  @property
+  def total_count(self):
+    return int(self.counts.sum())
+
+  def GetValueCounts(self):
+    """Returns the lowest value and count of each non-empty bucket.
+
+    Returns:
+      A tuple of two int64 numpy arrays, values and counts, ordered by value.
+    """
+    indices = np.flatnonzero(self.counts)
+    values, _ = self._GetBucketRanges(indices)
+    return values, self.counts[indices]
+
+  def Merge(self, other):
+    """Adds the counts of another HdrHistogram to this one."""
+    if other._GetLayout() != self._GetLayout():
+      values, counts = other.GetValueCounts()
+      self.RecordValues(values, counts)
+      return
+    if other.counts.size > self.counts.size:
+      self.counts = np.concatenate((self.counts, np.zeros(
+          other.counts.size - self.counts.size, dtype=np.int64)))
+    self.counts[:other.counts.size] += other.counts
+    self.highest_trackable_value = max(self.highest_trackable_value,
+                                       other.highest_trackable_value)
+
+  def GetPercentiles(self, percentiles=stats_util.PERCENTILES_LIST):
+    """Computes percentiles, stddev and mean of the counted values.
+
+    Percentiles use the same definition as stats_util.PercentileCalculator.
+    Each value is taken to be the lowest value of its bucket, which is the
+    value itself below 2 * 10^significant_figures.
+
+    Args:
+      percentiles: A list of percentiles to compute.
+
+    Returns:
+      A dictionary of percentiles, keyed like 'p99', plus 'average' and
+      'stddev' (the sample standard deviation).
+
+    Raises:
+      ValueError, if the histogram is empty or if a percentile is invalid.
+    """
+    values, counts = self.GetValueCounts()
+    if not counts.size:
+      raise ValueError("Can't compute percentiles of empty histogram.")
+    result = stats_util.WeightedPercentiles(values, counts, percentiles)
+    total = float(counts.sum())
+    average = float(np.dot(values, counts)) / total
+    result['average'] = average
+    if total > 1:
+      squares = float(np.dot(np.square(values - average), counts))
+      result['stddev'] = math.sqrt(squares / (total - 1))
+    else:
+      result['stddev'] = 0
+    return result
+
+  def GetPercentileDistribution(self, ticks_per_half_distance=5):
+    """Lists values at exponentially closer percentiles up to 100.
+
+    This matches the percentile distribution that HdrHistogram's
+    HistogramLogProcessor writes, with each value taken to be the highest
+    value of its bucket.
+
+    Args:
+      ticks_per_half_distance: int. The number of percentiles reported
+        between 0 and 50, between 50 and 75, and so on.
+
+    Returns:
+      A list of (value, percentile, total count) tuples, where the total
+      count is the number of values up to and including 'value', and
+      'percentile' is the reported percentile level, from 0 to 100.
+    """
+    indices = np.flatnonzero(self.counts)
+    if not indices.size:
+      return []
+    lowest_values, sizes = self._GetBucketRanges(indices)
+    values = lowest_values + sizes - 1
+    cumulative_counts = np.cumsum(self.counts[indices])
+    total = cumulative_counts[-1]
+    cumulative_percentiles = 100.0 * cumulative_counts / total
+    distribution = []
+    level = 0.0
+    position = 0
+    # Each step reports the first value whose cumulative percentile reaches
+    # the level, then halves the distance to 100.
+    while cumulative_counts[position] < total or not distribution:
+      position = np.searchsorted(cumulative_percentiles, level, side='left')
+      distribution.append((int(values[position]), level,
+                           int(cumulative_counts[position])))
+      ticks = ticks_per_half_distance * 2 ** (
+          int(math.log(100.0 / (100.0 - level), 2)) + 1)
+      level += 100.0 / ticks
+    distribution.append((int(values[-1]), 100.0, int(total)))
+    return distribution
+
+  def Encode(self):
+    """Returns the histogram in HdrHistogram's compressed base64 format."""
+    nonzero = np.flatnonzero(self.counts)
+    counts = self.counts[:nonzero[-1] + 1] if nonzero.size else []
+    payload = bytearray()
+    index = 0
+    while index < len(counts):
+      count = int(counts[index])
+      index += 1
+      if not count:
+        zeros = 1
+        while index < len(counts) and not counts[index]:
+          zeros += 1
+          index += 1
+        if zeros > 1:
+          count = -zeros
+      _PutZigZagLong(payload, count)
+    encoded = _HEADER.pack(
+        _ENCODING_COOKIE, len(payload), 0, self.significant_figures,
+        self.lowest_discernible_value, self.highest_trackable_value,
+        1.0) + bytes(payload)
+    compressed = zlib.compress(encoded)
+    return base64.b64encode(_COMPRESSED_HEADER.pack(
+        _COMPRESSED_ENCODING_COOKIE, len(compressed)) + compressed)
+
+  @classmethod
+  def Decode(cls, encoded):
+    """Creates a histogram from HdrHistogram's compressed base64 format.
+
+    Raises:
+      ValueError, if 'encoded' isn't a V2 compressed histogram.
+    """
+    try:
+      data = base64.b64decode(encoded)
+      cookie, length = _COMPRESSED_HEADER.unpack_from(data)
+      if (cookie & _COOKIE_BASE_MASK !=
+          _COMPRESSED_ENCODING_COOKIE & _COOKIE_BASE_MASK):
+        raise ValueError('Unsupported histogram encoding cookie %x.' % cookie)
+      data = zlib.decompress(data[_COMPRESSED_HEADER.size:
+                                  _COMPRESSED_HEADER.size + length])
+      (cookie, payload_length, normalizing_index_offset, significant_figures,
+       lowest_discernible_value, highest_trackable_value,
+       _) = _HEADER.unpack_from(data)
+    except (TypeError, struct.error, zlib.error) as e:
+      raise ValueError('Invalid encoded histogram: %s' % e)
+    if cookie & _COOKIE_BASE_MASK != _ENCODING_COOKIE & _COOKIE_BASE_MASK:
+      raise ValueError('Unsupported histogram encoding cookie %x.' % cookie)
+    if normalizing_index_offset:
+      raise ValueError('Shifted histograms are not supported.')
+    histogram = cls(lowest_discernible_value, highest_trackable_value,
+                    significant_figures)
+    counts = []
+    payload = bytearray(data[_HEADER.size:_HEADER.size + payload_length])
+    position = 0
+    while position < len(payload):
+      count, position = _GetZigZagLong(payload, position)
+      if count < 0:
+        counts.extend([0] * -count)
+      else:
+        counts.append(count)
+    if len(counts) > histogram.counts.size:
+      histogram.counts = np.zeros(len(counts), dtype=np.int64)
+    histogram.counts[:len(counts)] = counts
+    return histogram
+
+
+def _PutZigZagLong(buf, value):
+  """Appends a ZigZag LEB128 encoded 64-bit integer to a bytearray."""
+  value = ((value << 1) ^ (value >> 63)) & 0xffffffffffffffff
+  for _ in range(8):
+    if value < 0x80:
+      buf.append(value)
+      return
+    buf.append((value & 0x7f) | 0x80)
+    value >>= 7
+  buf.append(value)
+
+
+def _GetZigZagLong(buf, position):
+  """Reads a ZigZag LEB128 encoded 64-bit integer from a bytearray.
+
+  Returns:
+    A tuple of the integer and the position after it.
+  """
+  value = 0
+  shift = 0
+  while shift < 56:
+    byte = buf[position]
+    position += 1
+    value |= (byte & 0x7f) << shift
+    if not byte & 0x80:
+      break
+    shift += 7
+  else:
+    value |= buf[position] << 56
+    position += 1
+  return (value >> 1) ^ -(value & 1), position
+
+
+def DecodeLogLine(line):
+  """Decodes the histogram in a line of an HdrHistogram interval log.
+
+  Interval lines look like
+  '[Tag=<tag>,]<start time>,<interval length>,<max>,<encoded histogram>'.
+
+  Returns:
+    An HdrHistogram, or None if 'line' is a comment or header line.
+  """
+  line = line.strip()
+  if not line or line.startswith('#') or line.startswith('"'):
+    return None
+  return HdrHistogram.Decode(line.rsplit(',', 1)[-1])
@@ -14,10 +14,32 @@
 
 """Utilities for dynamically importing python files."""
 
+import collections
 import importlib
 import pkgutil
 
 
+def GetModuleNamesForPath(path, package_prefix=None):
+  """Returns the names of the modules on 'path' without importing them.
+
+  Args:
+    path: Path containing python modules.
+    package_prefix: prefix (e.g., package name) to prefix all modules.
+      'path' and 'package_prefix' will be joined with a '.'.
+  Returns:
+    List of full module names.
+  """
+  prefix = package_prefix + '.' if package_prefix else ''
+  # If iter_modules is invoked within a zip file, the zipimporter adds the
+  # prefix to the names of archived modules, but not archived packages. Because
+  # the prefix is necessary to correctly import a package, this behavior is
+  # undesirable, so do not pass the prefix to iter_modules. Instead, apply it
+  # explicitly afterward.
+  # Skip recursively listed modules (e.g. 'subpackage.module').
+  return [prefix + modname for _, modname, _ in pkgutil.iter_modules(path)
+          if '.' not in modname]
+
+
 def LoadModulesForPath(path, package_prefix=None):
   """Load all modules on 'path', with prefix 'package_prefix'.
 
@@ -31,13 +53,39 @@ def LoadModulesForPath(path, package_prefix=None):
   Yields:
     Imported modules.
   """
-  prefix = package_prefix + '.' if package_prefix else ''
-  # If iter_modules is invoked within a zip file, the zipimporter adds the
-  # prefix to the names of archived modules, but not archived packages. Because
-  # the prefix is necessary to correctly import a package, this behavior is
-  # undesirable, so do not pass the prefix to iter_modules. Instead, apply it
-  # explicitly afterward.
-  for _, modname, _ in pkgutil.iter_modules(path):
-    # Skip recursively listed modules (e.g. 'subpackage.module').
-    if '.' not in modname:
-      yield importlib.import_module(prefix + modname)
+  for module_name in GetModuleNamesForPath(path, package_prefix):
+    yield importlib.import_module(module_name)
+
+
+class LazyModuleDict(collections.Mapping):
+  """A read-only dict whose values are modules imported on first access.
+
+  Listing or testing the keys doesn't import anything, so a package can
+  offer all of its modules by name while only paying for the ones used.
+  Iterating over values() or items() imports every module.
+  """
+
+  def __init__(self, module_names, values=None):
+    """Initializes the dict.
+
+    Args:
+      module_names: dict mapping keys to the full names of the modules to
+          import for them.
+      values: dict mapping keys to already loaded values.
+    """
+    self._module_names = dict(module_names)
+    self._values = dict(values or {})
+
+  def __getitem__(self, key):
+    if key not in self._values:
+      self._values[key] = importlib.import_module(self._module_names[key])
+    return self._values[key]
+
+  def __contains__(self, key):
+    return key in self._values or key in self._module_names
+
+  def __iter__(self):
+    return iter(set(self._module_names).union(self._values))
+
+  def __len__(self):
+    return len(set(self._module_names).union(self._values))
@@ -16,13 +16,20 @@
 
 Man: http://manpages.ubuntu.com/manpages/natty/man1/fio.1.html
 Quick howto: http://www.bluestop.org/fio/HOWTO.txt
+
+With --num_vms greater than 1, fio runs on every VM at once in client/server
+mode, which reports each VM and all VMs together.
 """
 
+import collections
+import glob
 import json
 import logging
+import pipes
 import posixpath
 import re
 import time
+import uuid
 
 import jinja2
 
@@ -39,6 +46,7 @@ PKB_FIO_LOG_FILE_NAME = 'pkb_fio_avg'
 LOCAL_JOB_FILE_SUFFIX = '_fio.job'  # used with vm_util.PrependTempDir()
 REMOTE_JOB_FILE_PATH = posixpath.join(vm_util.VM_TMP_DIR, 'fio.job')
 DEFAULT_TEMP_FILE_NAME = 'fio-temp-file'
+FIO_SERVER_PID_FILE = posixpath.join(vm_util.VM_TMP_DIR, 'fio_server.pid')
 MOUNT_POINT = '/scratch'
 
 
@@ -168,6 +176,41 @@ flags.DEFINE_integer('fio_log_hist_msec', 1000,
                      'Same as fio_log_avg_msec, but logs entries for '
                      'completion latency histograms. If set to 0, histogram '
                      'logging is disabled.')
+flags.DEFINE_integer('fio_hist_log_window_sec', 60,
+                     'If positive, also report latency percentiles computed '
+                     'from the clat histogram log for each window of this '
+                     'many seconds, e.g. the p99 of every minute. Only used '
+                     'with --fio_hist_log.', lower_bound=0)
+flags.DEFINE_boolean('fio_steady_state', False,
+                     'Whether to run each fio job separately and stop it as '
+                     'soon as its IOPS, bandwidth and latency are steady, '
+                     'rather than after --fio_runtime. Each job still runs '
+                     'for at most --fio_runtime. Reports the time each job '
+                     'took to become steady, and when it stopped bursting '
+                     'if it was faster before.')
+flags.DEFINE_integer('fio_status_interval', 10,
+                     'How often, in seconds, fio reports the progress of a '
+                     'job with --fio_steady_state.', lower_bound=1)
+flags.DEFINE_integer('fio_steady_state_rounds', 5,
+                     'The number of consecutive --fio_status_interval '
+                     'rounds that must be steady with --fio_steady_state.',
+                     lower_bound=2)
+flags.DEFINE_float('fio_steady_state_max_range', 0.2,
+                   'The largest range of IOPS, bandwidth and latency within '
+                   'the steady rounds, as a fraction of their mean.',
+                   lower_bound=0)
+flags.DEFINE_float('fio_steady_state_max_slope', 0.1,
+                   'The largest change of the least squares fit of IOPS, '
+                   'bandwidth and latency across the steady rounds, as a '
+                   'fraction of their mean.', lower_bound=0)
+flags.DEFINE_integer('fio_steady_state_ramp_time', 0,
+                     'The number of seconds at the start of each job that '
+                     'are never considered steady, e.g. to let a burstable '
+                     'disk use up its credits.', lower_bound=0)
+flags.DEFINE_float('fio_burst_threshold', 0.5,
+                   'With --fio_steady_state, a job bursts while its IOPS '
+                   'exceed its steady state IOPS by more than this '
+                   'fraction.', lower_bound=0)
 
 
 FLAGS_IGNORED_FOR_CUSTOM_JOBFILE = {
@@ -335,7 +378,8 @@ def ProcessedJobFileString(fio_jobfile_contents, remove_filename):
 def GetOrGenerateJobFileString(job_file_path, scenario_strings,
                                against_device, disk, io_depths,
                                num_jobs, working_set_size, block_size,
-                               runtime, parameters, job_file_contents):
+                               runtime, parameters, job_file_contents,
+                               temp_file_name=DEFAULT_TEMP_FILE_NAME):
   """Get the contents of the fio job file we're working with.
 
   This will either read the user's job file, if given, or generate a
@@ -357,6 +401,8 @@ def GetOrGenerateJobFileString(job_file_path, scenario_strings,
     runtime: int. The number of seconds to run each job.
     parameters: list. Other fio parameters to apply to all jobs.
     job_file_contents: string contents of fio job.
+    temp_file_name: string. The name of the file to test against if testing
+      against a filesystem.
 
   Returns:
     A string containing a fio job file.
@@ -376,7 +422,7 @@ def GetOrGenerateJobFileString(job_file_path, scenario_strings,
     else:
       # Since we pass --directory to fio, we must use relative file
       # paths or get an error.
-      filename = DEFAULT_TEMP_FILE_NAME
+      filename = temp_file_name
 
     return GenerateJobFileString(filename, scenario_strings, io_depths,
                                  num_jobs, working_set_size, block_size,
@@ -409,6 +455,8 @@ def WarnOnBadFlags():
 
 def GetConfig(user_config):
   config = configs.LoadConfig(BENCHMARK_CONFIG, user_config, BENCHMARK_NAME)
+  if FLAGS['num_vms'].present:
+    config['vm_groups']['default']['vm_count'] = FLAGS.num_vms
   if FLAGS.fio_target_mode != AGAINST_FILE_WITHOUT_FILL_MODE:
     disk_spec = config['vm_groups']['default']['disk_spec']
     for cloud in disk_spec:
@@ -438,6 +486,16 @@ def CheckPrerequisites(benchmark_config):
   """Perform flag checks."""
   del benchmark_config  # unused
   WarnOnBadFlags()
+  if FLAGS.fio_steady_state and any([FLAGS.fio_lat_log, FLAGS.fio_bw_log,
+                                     FLAGS.fio_iops_log, FLAGS.fio_hist_log]):
+    raise errors.Config.InvalidValue(
+        '--fio_steady_state can not be used with fio logs.')
+  if FLAGS.num_vms > 1 and (FLAGS.fio_steady_state or any([
+      FLAGS.fio_lat_log, FLAGS.fio_bw_log, FLAGS.fio_iops_log,
+      FLAGS.fio_hist_log])):
+    raise errors.Config.InvalidValue(
+        '--fio_steady_state and fio logs can not be used with more than one '
+        'VM.')
 
 
 def Prepare(benchmark_spec):
@@ -453,11 +511,12 @@ def GetFileAsString(file_path):
 
 
 def PrepareWithExec(benchmark_spec, exec_path):
-  """Prepare the virtual machine to run FIO.
+  """Prepare the virtual machines to run FIO.
 
      This includes installing fio, bc, and libaio1 and pre-filling the
-     attached disk. We also make sure the job file is always located
-     at the same path on the local machine.
+     attached disk of every VM. We also make sure the job file is always
+     located at the same path on the local machine. With several VMs, each
+     of them also runs a fio server.
 
   Args:
     benchmark_spec: The benchmark specification. Contains all data that is
@@ -465,7 +524,19 @@ def PrepareWithExec(benchmark_spec, exec_path):
     exec_path: string path to the fio executable
 
   """
-  vm = benchmark_spec.vms[0]
+  vms = benchmark_spec.vms
+  vm_util.RunThreaded(lambda vm: _PrepareVm(vm, exec_path), vms)
+  if len(vms) > 1:
+    vm_util.RunThreaded(lambda vm: _StartServer(vm, exec_path), vms)
+
+
+def _PrepareVm(vm, exec_path):
+  """Prepare a virtual machine to run FIO.
+
+  Args:
+    vm: The VirtualMachine to prepare.
+    exec_path: string path to the fio executable
+  """
   logging.info('FIO prepare on %s', vm)
   vm.Install('fio')
 
@@ -488,6 +559,31 @@ def PrepareWithExec(benchmark_spec, exec_path):
                  disk_spec.disk_type, disk.mount_options, disk.fstab_options)
 
 
+def _StartServer(vm, exec_path):
+  """Starts a fio server on the VM.
+
+  Args:
+    vm: The VirtualMachine to run the server on.
+    exec_path: string path to the fio executable
+  """
+  vm.AllowPort(fio.FIO_SERVER_PORT)
+  vm.RemoteCommand('%s --server --daemonize=%s' % (exec_path,
+                                                   FIO_SERVER_PID_FILE))
+
+
+def _GetTempFileName(vm, num_vms):
+  """Returns the name of the file to test against on a filesystem.
+
+  Args:
+    vm: The VirtualMachine that tests against the file.
+    num_vms: int. The number of VMs running fio, whose filesystems may be
+      shared, e.g. over NFS.
+  """
+  if num_vms > 1:
+    return '%s-%s' % (DEFAULT_TEMP_FILE_NAME, vm.name)
+  return DEFAULT_TEMP_FILE_NAME
+
+
 def Run(benchmark_spec):
   fio_exe = fio.GetFioExec()
   default_job_file_contents = GetFileAsString(data.ResourcePath('fio.job'))
@@ -509,6 +605,10 @@ def RunWithExec(benchmark_spec, exec_path, remote_job_file_path,
   Returns:
     A list of sample.Sample objects.
   """
+  if len(benchmark_spec.vms) > 1:
+    return _RunClientServer(benchmark_spec.vms, exec_path,
+                            remote_job_file_path, job_file_contents)
+
   vm = benchmark_spec.vms[0]
   logging.info('FIO running on %s', vm)
 
@@ -555,22 +655,174 @@ def RunWithExec(benchmark_spec, exec_path, remote_job_file_path,
   #      This is a pretty lousy experience.
   logging.info('FIO Results:')
 
+  if FLAGS.fio_steady_state:
+    fio_json_result, samples = _RunJobsUntilSteady(vm, fio_command,
+                                                   job_file_string)
+    return fio.ParseResults(job_file_string, fio_json_result) + samples
+
   stdout, _ = vm.RobustRemoteCommand(fio_command, should_log=True)
   bin_vals = []
   if collect_logs:
     vm.PullFile(vm_util.GetTempDir(), '%s*.log' % log_file_base)
     if FLAGS.fio_hist_log:
-      num_logs = int(vm.RemoteCommand(
-          'ls %s_clat_hist.*.log | wc -l' % log_file_base)[0])
-      bin_vals += [fio.ComputeHistogramBinVals(
-          vm, '%s_clat_hist.%s.log' % (
-              log_file_base, idx + 1)) for idx in range(num_logs)]
+      num_logs = len(glob.glob(vm_util.PrependTempDir(
+          '%s_clat_hist.*.log' % log_file_base)))
+      bin_vals += [fio.ComputeHistogramBinVals(vm_util.PrependTempDir(
+          '%s_clat_hist.%s.log' % (
+              log_file_base, idx + 1))) for idx in range(num_logs)]
   samples = fio.ParseResults(job_file_string, json.loads(stdout),
-                             log_file_base=log_file_base, bin_vals=bin_vals)
+                             log_file_base=log_file_base, bin_vals=bin_vals,
+                             hist_window_sec=FLAGS.fio_hist_log_window_sec)
 
   return samples
 
 
+def _AddGlobalParameter(job_file, parameter):
+  """Adds a parameter to the global section of a fio job file.
+
+  Args:
+    job_file: The contents of the fio job file.
+    parameter: string. The parameter, of the form "param=value".
+
+  Returns:
+    A string representing the fio job file with the parameter.
+  """
+  global_section = re.compile(r'^\[%s\][ \t]*$' % fio.GLOBAL, re.MULTILINE)
+  if global_section.search(job_file):
+    return global_section.sub(
+        lambda match: '%s\n%s' % (match.group(0), parameter), job_file, 1)
+  return '[%s]\n%s\n%s' % (fio.GLOBAL, parameter, job_file)
+
+
+def _RunClientServer(vms, exec_path, remote_job_file_path, job_file_contents):
+  """Runs fio on every VM at once in client/server mode.
+
+  The fio client on the first VM sends the job file of each VM to the fio
+  server on it, starts the jobs of all servers together and gathers their
+  results.
+
+  Args:
+    vms: list of VirtualMachines running fio servers.
+    exec_path: string path to the fio executable.
+    remote_job_file_path: path, on the first vm, of the job files.
+    job_file_contents: string contents of the fio job file.
+
+  Returns:
+    A list of sample.Sample objects.
+  """
+  client_vm = vms[0]
+  logging.info('FIO running on %s from %s', vms, client_vm)
+  job_files = collections.OrderedDict()
+  client_args = []
+  for index, vm in enumerate(vms):
+    disk = vm.scratch_disks[0]
+    job_file_string = GetOrGenerateJobFileString(
+        FLAGS.fio_jobfile,
+        FLAGS.fio_generate_scenarios,
+        AgainstDevice(),
+        disk,
+        FLAGS.fio_io_depths,
+        FLAGS.fio_num_jobs,
+        FLAGS.fio_working_set_size,
+        FLAGS.fio_blocksize,
+        FLAGS.fio_runtime,
+        FLAGS.fio_parameters,
+        job_file_contents,
+        temp_file_name=_GetTempFileName(vm, len(vms)))
+    if AgainstDevice():
+      target = 'filename=%s' % disk.GetDevicePath()
+    else:
+      target = 'directory=%s' % disk.mount_point
+    job_file_string = _AddGlobalParameter(job_file_string, target)
+    job_file_path = vm_util.PrependTempDir(vm.name + LOCAL_JOB_FILE_SUFFIX)
+    with open(job_file_path, 'w') as job_file:
+      job_file.write(job_file_string)
+      logging.info('Wrote fio job file at %s', job_file_path)
+      logging.info(job_file_string)
+    # The fio client reads the job files and sends them to the servers.
+    client_job_file_path = '%s.%d' % (remote_job_file_path, index)
+    client_vm.PushFile(job_file_path, client_job_file_path)
+    job_files[vm.internal_ip] = job_file_string
+    client_args.append('--client=%s %s' % (vm.internal_ip,
+                                           client_job_file_path))
+
+  # json+ includes the latency histograms of the jobs, which are merged
+  # across VMs.
+  fio_command = '%s --output-format=json+ %s' % (exec_path,
+                                                 ' '.join(client_args))
+  logging.info('FIO Results:')
+  stdout, _ = client_vm.RobustRemoteCommand(fio_command, should_log=True)
+  reports, _ = fio.ParseStatusOutput(stdout)
+  if not reports:
+    raise errors.Benchmarks.RunError('fio did not report any results.')
+  return fio.ParseClientServerResults(job_files, reports[-1])
+
+
+def _RunJobsUntilSteady(vm, fio_command, job_file_string):
+  """Runs each job of a fio job file until it is steady.
+
+  Each job runs in the background and writes a JSON report every
+  --fio_status_interval seconds, which is read as it is written. Once the
+  job is steady, fio is interrupted and writes its final report.
+
+  Args:
+    vm: The VirtualMachine to run fio on.
+    fio_command: string. The fio command to run, without job selection.
+    job_file_string: string. The contents of the fio job file.
+
+  Returns:
+    A tuple of the fio JSON result with the final report of every job, and a
+    list of sample.Sample objects about reaching steady state.
+  """
+  jobs = []
+  samples = []
+  for job_name, parameters in fio.ParseJobFile(job_file_string).iteritems():
+    output_file = posixpath.join(vm_util.VM_TMP_DIR,
+                                 'fio_status_%s.json' % uuid.uuid4())
+    vm.RemoteCommand(
+        'nohup %s --section=%s --status-interval=%d --output=%s '
+        '> /dev/null 2>&1 &' % (fio_command, pipes.quote(job_name),
+                                FLAGS.fio_status_interval, output_file))
+    reports = []
+    unparsed = ''
+    offset = 0
+    steady_index = None
+    intervals = []
+    running = True
+    while running:
+      time.sleep(FLAGS.fio_status_interval)
+      running = bool(vm.RemoteCommand('pgrep -x fio',
+                                      ignore_failure=True)[0].strip())
+      output, _ = vm.RemoteCommand(
+          'tail -c +%d %s' % (offset + 1, output_file), ignore_failure=True)
+      offset += len(output)
+      new_reports, unparsed = fio.ParseStatusOutput(unparsed + output)
+      reports += new_reports
+      if not running or steady_index is not None:
+        continue
+      intervals = fio.ComputeIntervalStats(reports, job_name)
+      steady_index = fio.FindSteadyState(
+          intervals, FLAGS.fio_steady_state_rounds,
+          FLAGS.fio_steady_state_max_range, FLAGS.fio_steady_state_max_slope,
+          FLAGS.fio_steady_state_ramp_time)
+      if steady_index is not None:
+        logging.info('fio job %s is steady after %s seconds.', job_name,
+                     intervals[steady_index]['time'])
+        vm.RemoteCommand('sudo pkill -INT -x fio', ignore_failure=True)
+    vm.RemoteCommand('rm -f %s' % output_file, ignore_failure=True)
+    if not reports:
+      raise errors.Benchmarks.RunError(
+          'fio job %s did not write any report.' % job_name)
+    if steady_index is None:
+      intervals = fio.ComputeIntervalStats(reports, job_name)
+    jobs += [job for job in reports[-1]['jobs']
+             if job['jobname'] == job_name]
+    samples += fio.BuildSteadyStateSamples(
+        job_name, intervals, steady_index, FLAGS.fio_steady_state_rounds,
+        FLAGS.fio_burst_threshold, dict(parameters, fio_job=job_name))
+  return {'jobs': jobs}, samples
+
+
 def Cleanup(benchmark_spec):
   """Uninstall packages required for fio and remove benchmark files.
 
@@ -578,10 +830,18 @@ def Cleanup(benchmark_spec):
     benchmark_spec: The benchmark specification. Contains all data that is
         required to run the benchmark.
   """
-  vm = benchmark_spec.vms[0]
-  logging.info('FIO Cleanup up on %s', vm)
-  vm.RemoveFile(REMOTE_JOB_FILE_PATH)
-  if not AgainstDevice() and not FLAGS.fio_jobfile:
-    # If the user supplies their own job file, then they have to clean
-    # up after themselves, because we don't know their temp file name.
-    vm.RemoveFile(posixpath.join(vm.GetScratchDir(), DEFAULT_TEMP_FILE_NAME))
+  vms = benchmark_spec.vms
+  logging.info('FIO Cleanup up on %s', vms[0])
+  vms[0].RemoveFile(REMOTE_JOB_FILE_PATH)
+  if len(vms) > 1:
+    # Job files of the fio client, see _RunClientServer.
+    vms[0].RemoveFile(REMOTE_JOB_FILE_PATH + '.*')
+  for vm in vms:
+    if len(vms) > 1:
+      vm.RemoteCommand('sudo kill $(cat %s)' % FIO_SERVER_PID_FILE,
+                       ignore_failure=True)
+    if not AgainstDevice() and not FLAGS.fio_jobfile:
+      # If the user supplies their own job file, then they have to clean
+      # up after themselves, because we don't know their temp file name.
+      vm.RemoveFile(posixpath.join(vm.GetScratchDir(),
+                                   _GetTempFileName(vm, len(vms))))
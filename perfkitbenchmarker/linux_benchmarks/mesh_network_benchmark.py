@@ -16,13 +16,23 @@
 
 Runs TCP_RR, TCP_STREAM benchmarks from netperf and compute total throughput
 and average latency inside mesh network.
+
+By default every VM runs netperf against every other VM at once. With
+--mesh_network_schedule=round_robin, VM pairs are instead scheduled like a
+round-robin tournament, so that each VM takes part in at most one pair per
+round, and the per-pair results are reported as an N x N matrix.
 """
 
 
+import csv
+import json
 import logging
+import os
 import re
 import threading
 
+import numpy as np
+
 from perfkitbenchmarker import configs
 from perfkitbenchmarker import errors
 from perfkitbenchmarker import flags
@@ -37,6 +47,16 @@ flags.DEFINE_integer('num_connections', 1,
 flags.DEFINE_integer('num_iterations', 1,
                      'Number of iterations for each run.')
 
+ALL_SCHEDULE = 'all'
+ROUND_ROBIN_SCHEDULE = 'round_robin'
+flags.DEFINE_enum('mesh_network_schedule', ALL_SCHEDULE,
+                  [ALL_SCHEDULE, ROUND_ROBIN_SCHEDULE],
+                  'How to schedule the VM pairs. "all" runs netperf from '
+                  'every VM to every other VM at the same time. '
+                  '"round_robin" runs 2 * (N - 1) rounds (2 * N for odd N) '
+                  'in which each VM is in at most one pair, and reports '
+                  'an N x N latency and throughput matrix.')
+
 
 FLAGS = flags.FLAGS
 
@@ -55,6 +75,7 @@ mesh_network:
 NETPERF_BENCHMARKSS = ['TCP_RR', 'TCP_STREAM']
 VALUE_INDEX = 1
 RESULT_LOCK = threading.Lock()
+MATRIX_FILE = 'mesh_network_%s_matrix.csv'
 
 
 def GetConfig(user_config):
@@ -99,20 +120,46 @@ def RunNetperf(vm, benchmark_name, servers, result):
     servers: VMs running netserver.
     result: The result variable shared by all threads.
   """
+  value = 0
+  for res in _RunNetperfCommands(vm, benchmark_name,
+                                 [server for server in servers
+                                  if server != vm]):
+    if benchmark_name == 'TCP_RR':
+      value += 1.0 / res * 1000.0
+    else:
+      value += res
+  with RESULT_LOCK:
+    result[VALUE_INDEX] += value
+
+
+def _RunNetperfCommands(vm, benchmark_name, servers):
+  """Runs FLAGS.num_connections netperf processes from vm to each server.
+
+  Args:
+    vm: The VM running netperf.
+    benchmark_name: The netperf benchmark to run.
+    servers: VMs running netserver, excluding vm.
+
+  Returns:
+    A list of the throughput (Mbits/sec) or transaction rate (per second)
+    reported by each netperf process.
+
+  Raises:
+    errors.Benchmarks.RunError: if a netperf process did not report a result.
+  """
   cmd = ''
   if FLAGS.duration_in_seconds:
     cmd_duration_suffix = '-l %s' % FLAGS.duration_in_seconds
   else:
     cmd_duration_suffix = ''
   for server in servers:
-    if vm != server:
-      cmd += ('./netperf -t '
-              '{benchmark_name} -H {server_ip} -i {iterations} '
-              '{cmd_suffix} & ').format(
-                  benchmark_name=benchmark_name,
-                  server_ip=server.internal_ip,
-                  iterations=FLAGS.num_iterations,
-                  cmd_suffix=cmd_duration_suffix)
+    cmd += ('./netperf -t '
+            '{benchmark_name} -H {server_ip} -i {iterations} '
+            '{cmd_suffix} & ').format(
+                benchmark_name=benchmark_name,
+                server_ip=server.internal_ip,
+                iterations=FLAGS.num_iterations,
+                cmd_suffix=cmd_duration_suffix)
   netperf_cmd = ''
   for _ in range(FLAGS.num_connections):
     netperf_cmd += cmd
@@ -121,19 +168,127 @@ def RunNetperf(vm, benchmark_name, servers, result):
   logging.info(output)
 
   match = re.findall(r'(\d+\.\d+)\s+\n', output)
-  value = 0
-  expected_num_match = (len(servers) - 1) * FLAGS.num_connections
+  expected_num_match = len(servers) * FLAGS.num_connections
   if len(match) != expected_num_match:
     raise errors.Benchmarks.RunError(
         'Netserver not reachable. Expecting %s results, got %s.' %
         (expected_num_match, len(match)))
-  for res in match:
-    if benchmark_name == 'TCP_RR':
-      value += 1.0 / float(res) * 1000.0
-    else:
-      value += float(res)
-  with RESULT_LOCK:
-    result[VALUE_INDEX] += value
+  return [float(res) for res in match]
+
+
+def GetRoundRobinRounds(num_vms):
+  """Pairs up VMs like the rounds of a round-robin tournament.
+
+  Uses the circle method: VM 0 stays put while the others rotate, so every
+  pair of VMs meets exactly once in num_vms - 1 rounds (num_vms rounds if
+  num_vms is odd, where one VM sits out each round).
+
+  Args:
+    num_vms: int. The number of VMs.
+
+  Returns:
+    A list of rounds, each a list of (index, index) pairs of VMs. No VM
+    appears twice in a round.
+  """
+  indices = range(num_vms)
+  if num_vms % 2:
+    indices.append(None)
+  num_slots = len(indices)
+  rounds = []
+  for _ in xrange(num_slots - 1):
+    rounds.append([(indices[i], indices[num_slots - 1 - i])
+                   for i in xrange(num_slots // 2)
+                   if indices[i] is not None and
+                   indices[num_slots - 1 - i] is not None])
+    indices = [indices[0], indices[-1]] + indices[1:-1]
+  return rounds
+
+
+def _RunPair(client, server, benchmark_name):
+  """Runs netperf from client to server.
+
+  Returns:
+    The average latency in ms for TCP_RR, or the total throughput in
+    Mbits/sec for TCP_STREAM.
+  """
+  results = _RunNetperfCommands(client, benchmark_name, [server])
+  if benchmark_name == 'TCP_RR':
+    return sum(1.0 / res * 1000.0 for res in results) / len(results)
+  return sum(results)
+
+
+def RunRoundRobin(vms, benchmark_name):
+  """Measures every ordered pair of VMs, one round of pairs at a time.
+
+  Each round of GetRoundRobinRounds is run twice, once in each direction, so
+  that a VM is never sending or receiving more than one pair's traffic.
+
+  Args:
+    vms: The VMs in the mesh.
+    benchmark_name: The netperf benchmark to run.
+
+  Returns:
+    An N x N numpy array whose [i, j] entry is the result from vms[i] to
+    vms[j]. The diagonal is NaN.
+  """
+  matrix = np.full((len(vms), len(vms)), np.nan)
+  for pairs in GetRoundRobinRounds(len(vms)):
+    for directed_pairs in (pairs, [(j, i) for i, j in pairs]):
+      args = [((vms[i], vms[j], benchmark_name), {})
+              for i, j in directed_pairs]
+      values = vm_util.RunThreaded(_RunPair, args, len(args))
+      for (i, j), value in zip(directed_pairs, values):
+        matrix[i, j] = value
+  return matrix
+
+
+def _WriteMatrixFile(path, vms, matrix):
+  """Writes a matrix of pair results to a CSV file with VM name headers."""
+  with open(path, 'w') as matrix_file:
+    writer = csv.writer(matrix_file)
+    writer.writerow([''] + [vm.name for vm in vms])
+    for vm, row in zip(vms, matrix):
+      writer.writerow([vm.name] + ['' if np.isnan(value) else value
+                                   for value in row])
+
+
+def _MakeMatrixSamples(vms, benchmark_name, matrix, metadata):
+  """Creates the samples of a round-robin run and exports its matrix.
+
+  Args:
+    vms: The VMs in the mesh.
+    benchmark_name: The netperf benchmark that was run.
+    matrix: The N x N array returned by RunRoundRobin.
+    metadata: dict. Metadata to attach to the samples.
+
+  Returns:
+    A list of sample.Sample objects.
+  """
+  if benchmark_name == 'TCP_STREAM':
+    metric, unit = 'TCP_STREAM_Total_Throughput', 'Mbits/sec'
+    value = np.nansum(matrix)
+    pair_metric = 'TCP_STREAM_Throughput'
+  else:
+    metric, unit = 'TCP_RR_Average_Latency', 'ms'
+    value = np.nanmean(matrix)
+    pair_metric = 'TCP_RR_Latency'
+  path = os.path.join(vm_util.GetTempDir(), MATRIX_FILE % benchmark_name)
+  _WriteMatrixFile(path, vms, matrix)
+  logging.info('Wrote %s matrix to %s', benchmark_name, path)
+  matrix_metadata = {
+      'vm_names': json.dumps([vm.name for vm in vms]),
+      'matrix': json.dumps([[None if np.isnan(v) else v for v in row]
+                            for row in matrix.tolist()]),
+  }
+  matrix_metadata.update(metadata)
+  return [
+      sample.Sample(metric, float(value), unit, metadata),
+      sample.Sample(pair_metric + '_Matrix', 0, unit, matrix_metadata),
+      sample.Sample(pair_metric + '_Pair_min', float(np.nanmin(matrix)), unit,
+                    metadata),
+      sample.Sample(pair_metric + '_Pair_max', float(np.nanmax(matrix)), unit,
+                    metadata),
+  ]
 
 
 def Run(benchmark_spec):
@@ -154,8 +309,14 @@ def Run(benchmark_spec):
     args = []
     metadata = {
         'number_machines': num_vms,
-        'number_connections': FLAGS.num_connections
+        'number_connections': FLAGS.num_connections,
+        'mesh_network_schedule': FLAGS.mesh_network_schedule
     }
+    if FLAGS.mesh_network_schedule == ROUND_ROBIN_SCHEDULE:
+      results.extend(_MakeMatrixSamples(
+          vms, netperf_benchmark, RunRoundRobin(vms, netperf_benchmark),
+          metadata))
+      continue
 
     if netperf_benchmark == 'TCP_STREAM':
       metric = 'TCP_STREAM_Total_Throughput'
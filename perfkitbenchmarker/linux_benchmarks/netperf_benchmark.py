@@ -19,20 +19,25 @@ http://www.netperf.org/svn/netperf2/tags/netperf-2.4.5/doc/netperf.html#TCP_005f
 manpage: http://manpages.ubuntu.com/manpages/maverick/man1/netperf.1.html
 
 Runs TCP_RR, TCP_CRR, and TCP_STREAM benchmarks from netperf across two
-machines.
+machines. With --netperf_num_client_vms and --netperf_num_server_vms, the
+streams are spread round-robin over several client and server VMs, start at a
+common time and are aggregated into one set of samples.
 """
 
-import collections
 import csv
 import io
 import json
 import logging
 import os
 import re
+import time
+
+import numpy as np
 from perfkitbenchmarker import configs
 from perfkitbenchmarker import data
 from perfkitbenchmarker import flag_util
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import hdr_histogram
 from perfkitbenchmarker import sample
 from perfkitbenchmarker import vm_util
 from perfkitbenchmarker.linux_packages import netperf
@@ -53,6 +58,19 @@ flag_util.DEFINE_integerlist('netperf_num_streams', flag_util.IntegerList([1]),
                              'Number of netperf processes to run. Netperf '
                              'will run once for each value in the list.',
                              module_name=__name__)
+flags.DEFINE_integer('netperf_num_client_vms', 1,
+                     'Number of VMs in the vm_1 group, which run netperf. '
+                     'Streams are assigned to the client VMs round-robin.',
+                     lower_bound=1)
+flags.DEFINE_integer('netperf_num_server_vms', 1,
+                     'Number of VMs in the vm_2 group, which run netserver. '
+                     'Streams are assigned to the server VMs round-robin.',
+                     lower_bound=1)
+flags.DEFINE_float('netperf_start_delay', 10,
+                   'When streams run on several client VMs, the number of '
+                   'seconds after the run is launched at which all of them '
+                   'start, so that their measurement windows line up.',
+                   lower_bound=0)
 flags.DEFINE_integer('netperf_thinktime', 0,
                      'Time in nanoseconds to do work for each request.')
 flags.DEFINE_integer('netperf_thinktime_array_size', 0,
@@ -92,6 +110,13 @@ REMOTE_SCRIPT = 'netperf_test.py'
 
 PERCENTILES = [50, 90, 99]
 
+# netperf histogram latencies are fractions of a microsecond (0.1 us steps with
+# the default --netperf_histogram_buckets), but HdrHistogram counts integers,
+# so latencies are recorded in hundredths of a microsecond. Four significant
+# figures keep them exact up to 327 us.
+_HIST_UNITS_PER_USEC = 100
+_HIST_SIGNIFICANT_FIGURES = 4
+
 # By default, Container-Optimized OS (COS) host firewall allows only
 # outgoing connections and incoming SSH connections. To allow incoming
 # connections from VMs running netperf, we need to add iptables rules
@@ -100,7 +125,39 @@ _COS_RE = re.compile(r'\b(cos|gci)-')
 
 
 def GetConfig(user_config):
-  return configs.LoadConfig(BENCHMARK_CONFIG, user_config, BENCHMARK_NAME)
+  config = configs.LoadConfig(BENCHMARK_CONFIG, user_config, BENCHMARK_NAME)
+  vm_groups = config['vm_groups']
+  if FLAGS['netperf_num_client_vms'].present and 'vm_1' in vm_groups:
+    vm_groups['vm_1']['vm_count'] = FLAGS.netperf_num_client_vms
+  if FLAGS['netperf_num_server_vms'].present and 'vm_2' in vm_groups:
+    vm_groups['vm_2']['vm_count'] = FLAGS.netperf_num_server_vms
+  return config
+
+
+def _GetClientAndServerVms(benchmark_spec):
+  """Returns the netperf client VMs (vm_1) and netserver VMs (vm_2)."""
+  return benchmark_spec.vm_groups['vm_1'], benchmark_spec.vm_groups['vm_2']
+
+
+def _AssignStreams(num_streams, num_clients, num_servers):
+  """Spreads netperf streams over the client and server VMs.
+
+  Stream i runs on client i % num_clients against server i % num_servers and
+  uses the command port PORT_START + 2 * i.
+
+  Args:
+    num_streams: int. The total number of netperf streams.
+    num_clients: int. The number of client VMs.
+    num_servers: int. The number of server VMs.
+
+  Returns:
+    A list with one entry per client VM, each a list of
+    (command_port, server index) tuples.
+  """
+  assignments = [[] for _ in range(num_clients)]
+  for i in range(num_streams):
+    assignments[i % num_clients].append((PORT_START + 2 * i, i % num_servers))
+  return assignments
 
 
 def PrepareNetperf(vm):
@@ -115,50 +172,50 @@ def Prepare(benchmark_spec):
     benchmark_spec: The benchmark specification. Contains all data that is
         required to run the benchmark.
   """
-  vms = benchmark_spec.vms
-  vms = vms[:2]
-  vm_util.RunThreaded(PrepareNetperf, vms)
+  client_vms, server_vms = _GetClientAndServerVms(benchmark_spec)
+  vm_util.RunThreaded(PrepareNetperf, client_vms + server_vms)
 
   num_streams = max(FLAGS.netperf_num_streams)
-
-  # See comments where _COS_RE is defined.
-  if vms[1].image and re.search(_COS_RE, vms[1].image):
-    _SetupHostFirewall(benchmark_spec)
-
-  # Start the netserver processes
-  if vm_util.ShouldRunOnExternalIpAddress():
-    # Open all of the command and data ports
-    vms[1].AllowPort(PORT_START, PORT_START + num_streams * 2 - 1)
-  netserver_cmd = ('for i in $(seq {port_start} 2 {port_end}); do '
-                   '{netserver_path} -p $i & done').format(
-                       port_start=PORT_START,
-                       port_end=PORT_START + num_streams * 2 - 1,
-                       netserver_path=netperf.NETSERVER_PATH)
-  vms[1].RemoteCommand(netserver_cmd)
-
-  # Copy remote test script to client
+  port_end = PORT_START + num_streams * 2 - 1
+
+  for server_index, server_vm in enumerate(server_vms):
+    # See comments where _COS_RE is defined.
+    if server_vm.image and re.search(_COS_RE, server_vm.image):
+      _SetupHostFirewall(client_vms, server_vm)
+
+    # Start the netserver processes. Each server only listens on the command
+    # ports of the streams that _AssignStreams sends to it.
+    if vm_util.ShouldRunOnExternalIpAddress():
+      # Open all of the command and data ports
+      server_vm.AllowPort(PORT_START, port_end)
+    netserver_cmd = ('for i in $(seq {port_start} {step} {port_end}); do '
+                     '{netserver_path} -p $i & done').format(
+                         port_start=PORT_START + server_index * 2,
+                         step=len(server_vms) * 2,
+                         port_end=port_end,
+                         netserver_path=netperf.NETSERVER_PATH)
+    server_vm.RemoteCommand(netserver_cmd)
+
+  # Copy remote test script to the clients
   path = data.ResourcePath(os.path.join(REMOTE_SCRIPTS_DIR, REMOTE_SCRIPT))
-  logging.info('Uploading %s to %s', path, vms[0])
-  vms[0].PushFile(path, REMOTE_SCRIPT)
-  vms[0].RemoteCommand('sudo chmod 777 %s' % REMOTE_SCRIPT)
+  for client_vm in client_vms:
+    logging.info('Uploading %s to %s', path, client_vm)
+    client_vm.PushFile(path, REMOTE_SCRIPT)
+    client_vm.RemoteCommand('sudo chmod 777 %s' % REMOTE_SCRIPT)
 
 
-def _SetupHostFirewall(benchmark_spec):
+def _SetupHostFirewall(client_vms, server_vm):
   """Set up host firewall to allow incoming traffic.
 
   Args:
-    benchmark_spec: The benchmark specification. Contains all data that is
-        required to run the benchmark.
+    client_vms: The VMs running netperf.
+    server_vm: The VM running netserver.
   """
-
-  client_vm = benchmark_spec.vms[0]
-  server_vm = benchmark_spec.vms[1]
-
-  ip_addrs = [client_vm.internal_ip]
+  ip_addrs = [client_vm.internal_ip for client_vm in client_vms]
   if vm_util.ShouldRunOnExternalIpAddress():
-    ip_addrs.append(client_vm.ip_address)
+    ip_addrs.extend(client_vm.ip_address for client_vm in client_vms)
 
-  logging.info('setting up host firewall on %s running %s for client at %s',
+  logging.info('setting up host firewall on %s running %s for clients at %s',
                server_vm.name, server_vm.image, ip_addrs)
   cmd = 'sudo iptables -A INPUT -p %s -s %s -j ACCEPT'
   for protocol in 'tcp', 'udp':
@@ -166,46 +223,107 @@ def _SetupHostFirewall(benchmark_spec):
       server_vm.RemoteHostCommand(cmd % (protocol, ip_addr))
 
 
+def _ToHdrHistogram(histogram):
+  """Converts a dict mapping latencies to sample counts into an HdrHistogram.
+
+  Args:
+    histogram: A dict mapping latencies in microseconds to sample counts.
+
+  Returns:
+    An hdr_histogram.HdrHistogram of the latencies in hundredths of a
+    microsecond.
+  """
+  hdr = hdr_histogram.HdrHistogram(
+      significant_figures=_HIST_SIGNIFICANT_FIGURES)
+  latencies = np.fromiter(histogram.iterkeys(), np.float64, len(histogram))
+  counts = np.fromiter(histogram.itervalues(), np.int64, len(histogram))
+  hdr.RecordValues(np.rint(latencies * _HIST_UNITS_PER_USEC), counts)
+  return hdr
+
+
+def _MergeHistograms(histograms):
+  """Merges dicts mapping latency to sample count.
+
+  Args:
+    histograms: A list of dicts mapping latency to sample count.
+
+  Returns:
+    A (latencies, counts) tuple of numpy arrays, sorted by latency, with the
+    total count of each distinct latency.
+  """
+  latencies = np.concatenate(
+      [np.fromiter(histogram.keys(), np.float64, len(histogram))
+       for histogram in histograms])
+  counts = np.concatenate(
+      [np.fromiter(histogram.values(), np.int64, len(histogram))
+       for histogram in histograms])
+  latencies, inverse = np.unique(latencies, return_inverse=True)
+  counts = np.bincount(inverse, weights=counts,
+                       minlength=latencies.size).astype(np.int64)
+  return latencies, counts
+
+
+def _JainFairnessIndex(throughputs):
+  """Computes Jain's fairness index of per-stream throughputs.
+
+  The index is 1 when every stream gets the same throughput and 1/n when a
+  single one of n streams gets all of it.
+
+  Args:
+    throughputs: A sequence of per-stream throughputs.
+
+  Returns:
+    A float between 1/len(throughputs) and 1.
+  """
+  throughputs = np.asarray(throughputs, dtype=np.float64)
+  sum_of_squares = np.square(throughputs).sum()
+  if not sum_of_squares:
+    return 1.0
+  return float(throughputs.sum() ** 2 / (throughputs.size * sum_of_squares))
+
+
+def _GetStreamWindowMetadata(start_times, end_times):
+  """Describes how well the streams' measurement windows line up.
+
+  Args:
+    start_times: A sequence of the times, in seconds since the epoch, at which
+      each netperf process started.
+    end_times: A sequence of the times at which each netperf process exited.
+
+  Returns:
+    A dict of metadata for the aggregate samples.
+  """
+  start_times = np.asarray(start_times, dtype=np.float64)
+  end_times = np.asarray(end_times, dtype=np.float64)
+  return {
+      'stream_start_skew_sec': float(start_times.max() - start_times.min()),
+      'stream_end_skew_sec': float(end_times.max() - end_times.min()),
+      'stream_overlap_sec': max(0.0,
+                                float(end_times.min() - start_times.max())),
+  }
+
+
 def _HistogramStatsCalculator(histogram, percentiles=PERCENTILES):
   """Computes values at percentiles in a distribution as well as stddev.
 
+  Values are exact to a hundredth of a microsecond below 327 us, and within
+  0.01% above that.
+
   Args:
-    histogram: A dict mapping values to the number of samples with that value.
+    histogram: A dict mapping values in microseconds to the number of samples
+      with that value, or an hdr_histogram.HdrHistogram of the samples as
+      returned by _ToHdrHistogram.
     percentiles: An array of percentiles to calculate.
 
   Returns:
-    A dict mapping stat names to their values.
+    A dict mapping stat names to their values in microseconds.
   """
-  stats = {}
-
-  # Histogram data in list form sorted by key
-  by_value = sorted([(value, count) for value, count in histogram.items()],
-                    key=lambda x: x[0])
-  total_count = sum(histogram.values())
-
-  cur_value_index = 0  # Current index in by_value
-  cur_index = 0  # Number of values we've passed so far
-  for p in percentiles:
-    index = int(float(total_count) * float(p) / 100.0)
-    index = min(index, total_count - 1)  # Handle 100th percentile
-    for value, count in by_value[cur_value_index:]:
-      if cur_index + count > index:
-        stats['p%s' % str(p)] = by_value[cur_value_index][0]
-        break
-      else:
-        cur_index += count
-        cur_value_index += 1
-
-  # Compute stddev
-  value_sum = float(sum([value * count for value, count in histogram.items()]))
-  average = value_sum / float(total_count)
-  if total_count > 1:
-    total_of_squares = sum([(value - average) ** 2 * count
-                            for value, count in histogram.items()])
-    stats['stddev'] = (total_of_squares / (total_count - 1)) ** 0.5
-  else:
-    stats['stddev'] = 0
-  return stats
+  if not isinstance(histogram, hdr_histogram.HdrHistogram):
+    histogram = _ToHdrHistogram(histogram)
+  stats = histogram.GetPercentiles(percentiles)
+  del stats['average']
+  return {stat: value / float(_HIST_UNITS_PER_USEC)
+          for stat, value in stats.iteritems()}
 
 
 def ParseNetperfOutput(stdout, metadata, benchmark_name,
@@ -302,6 +420,28 @@ def ParseNetperfOutput(stdout, metadata, benchmark_name,
   return (throughput_sample, latency_samples, latency_hist)
 
 
+def _RunNetperfScript(vm, remote_cmd, timeout):
+  """Runs the netperf script on a client VM and decodes its output.
+
+  Args:
+    vm: The client VM.
+    remote_cmd: string. The command that runs the script.
+    timeout: int. The number of seconds to wait for the script.
+
+  Returns:
+    A (stdouts, start_times, end_times) tuple with one entry per netperf
+    process. The times are None if the script did not record them.
+  """
+  remote_stdout, _ = vm.RobustRemoteCommand(remote_cmd, should_log=True,
+                                            timeout=timeout)
+  # Decode stdouts, stderrs, return codes and, in newer versions of the
+  # script, process start and end times from the remote command's stdout.
+  json_out = json.loads(remote_stdout)
+  if len(json_out) > 6:
+    return json_out[0], json_out[5], json_out[6]
+  return json_out[0], None, None
+
+
 def RunNetperf(vm, benchmark_name, server_ip, num_streams):
   """Spawns netperf on a remote VM, parses results.
 
@@ -314,6 +454,24 @@ def RunNetperf(vm, benchmark_name, server_ip, num_streams):
   Returns:
     A sample.Sample object with the result.
   """
+  return RunNetperfStreams([vm], benchmark_name, [server_ip], num_streams)
+
+
+def RunNetperfStreams(client_vms, benchmark_name, server_ips, num_streams):
+  """Spawns netperf streams on several client VMs, parses results.
+
+  Streams are spread over the clients and servers by _AssignStreams. When more
+  than one client runs streams, all of them start at the same time.
+
+  Args:
+    client_vms: The VMs that netperf will be run upon.
+    benchmark_name: The netperf benchmark to run, see the documentation.
+    server_ips: The IP addresses of the machines running netserver.
+    num_streams: The total number of netperf client threads to run.
+
+  Returns:
+    A list of sample.Sample objects with the results.
+  """
   enable_latency_histograms = FLAGS.netperf_enable_histograms or num_streams > 1
   # Throughput benchmarks don't have latency histograms
   enable_latency_histograms = enable_latency_histograms and \
@@ -328,6 +486,8 @@ def RunNetperf(vm, benchmark_name, server_ip, num_streams):
   confidence = ('-I 99,5 -i {0},3'.format(FLAGS.netperf_max_iter)
                 if FLAGS.netperf_max_iter else '')
   verbosity = '-v2 ' if enable_latency_histograms else ''
+  # With several servers the script fills in each stream's server.
+  server_ip = server_ips[0] if len(server_ips) == 1 else '{server_ip}'
   netperf_cmd = ('{netperf_path} -p {{command_port}} -j {verbosity} '
                  '-t {benchmark_name} -H {server_ip} -l {length} {confidence}'
                  ' -- '
@@ -349,26 +509,48 @@ def RunNetperf(vm, benchmark_name, server_ip, num_streams):
                         thinktime_array_size=FLAGS.netperf_thinktime_array_size,
                         thinktime_run_length=FLAGS.netperf_thinktime_run_length)
 
-  # Run all of the netperf processes and collect their stdout
-  # TODO: Record process start delta of netperf processes on the remote machine
+  assignments = [(vm, streams) for vm, streams in zip(
+      client_vms, _AssignStreams(num_streams, len(client_vms),
+                                 len(server_ips))) if streams]
 
   # Give the remote script the max possible test length plus 5 minutes to
   # complete
   remote_cmd_timeout = \
       FLAGS.netperf_test_length * (FLAGS.netperf_max_iter or 1) + 300
-  remote_cmd = ('./%s --netperf_cmd="%s" --num_streams=%s --port_start=%s' %
-                (REMOTE_SCRIPT, netperf_cmd, num_streams, PORT_START))
-  remote_stdout, _ = vm.RobustRemoteCommand(remote_cmd, should_log=True,
-                                            timeout=remote_cmd_timeout)
+  start_time = None
+  if len(assignments) > 1:
+    start_time = time.time() + FLAGS.netperf_start_delay
+    remote_cmd_timeout += int(FLAGS.netperf_start_delay)
 
-  # Decode stdouts, stderrs, and return codes from remote command's stdout
-  json_out = json.loads(remote_stdout)
-  stdouts = json_out[0]
+  # Run all of the netperf processes and collect their stdout
+  script_args = []
+  for vm, streams in assignments:
+    if len(client_vms) == 1 and len(server_ips) == 1:
+      remote_cmd = ('./%s --netperf_cmd="%s" --num_streams=%s --port_start=%s' %
+                    (REMOTE_SCRIPT, netperf_cmd, num_streams, PORT_START))
+    else:
+      remote_cmd = ('./%s --netperf_cmd="%s" --command_ports=%s '
+                    '--server_ips=%s' % (
+                        REMOTE_SCRIPT, netperf_cmd,
+                        ','.join(str(port) for port, _ in streams),
+                        ','.join(server_ips[server] for _, server in streams)))
+    if start_time:
+      remote_cmd += ' --start_time=%.3f' % start_time
+    script_args.append(((vm, remote_cmd, remote_cmd_timeout), {}))
+  if len(script_args) == 1:
+    args, kwargs = script_args[0]
+    script_outputs = [_RunNetperfScript(*args, **kwargs)]
+  else:
+    script_outputs = vm_util.RunThreaded(_RunNetperfScript, script_args)
+  stdouts = [stdout for output in script_outputs for stdout in output[0]]
 
   # Metadata to attach to samples
   metadata = {'netperf_test_length': FLAGS.netperf_test_length,
               'max_iter': FLAGS.netperf_max_iter or 1,
               'sending_thread_count': num_streams}
+  if len(client_vms) > 1 or len(server_ips) > 1:
+    metadata.update({'netperf_num_client_vms': len(client_vms),
+                     'netperf_num_server_vms': len(server_ips)})
 
   parsed_output = [ParseNetperfOutput(stdout, metadata, benchmark_name,
                                       enable_latency_histograms)
@@ -382,6 +564,11 @@ def RunNetperf(vm, benchmark_name, server_ip, num_streams):
     # Multiple netperf threads
 
     samples = []
+    if all(output[1] is not None for output in script_outputs):
+      metadata = metadata.copy()
+      metadata.update(_GetStreamWindowMetadata(
+          [t for output in script_outputs for t in output[1]],
+          [t for output in script_outputs for t in output[2]]))
 
     # Unzip parsed output
     # Note that latency_samples are invalid with multiple threads because stats
@@ -391,31 +578,35 @@ def RunNetperf(vm, benchmark_name, server_ip, num_streams):
     # They should all have the same units
     throughput_unit = throughput_samples[0].unit
     # Extract the throughput values from the samples
-    throughputs = [s.value for s in throughput_samples]
+    throughputs = np.array([s.value for s in throughput_samples])
     # Compute some stats on the throughput values
     throughput_stats = sample.PercentileCalculator(throughputs, [50, 90, 99])
-    throughput_stats['min'] = min(throughputs)
-    throughput_stats['max'] = max(throughputs)
+    throughput_stats['min'] = throughputs.min()
+    throughput_stats['max'] = throughputs.max()
     # Calculate aggregate throughput
-    throughput_stats['total'] = throughput_stats['average'] * len(throughputs)
+    throughput_stats['total'] = throughputs.sum()
     # Create samples for throughput stats
     for stat, value in throughput_stats.items():
       samples.append(
           sample.Sample('%s_Throughput_%s' % (benchmark_name, stat),
                         float(value),
                         throughput_unit, metadata))
+    samples.append(
+        sample.Sample('%s_Jain_Fairness_Index' % benchmark_name,
+                      _JainFairnessIndex(throughputs), '', metadata))
     if enable_latency_histograms:
       # Combine all of the latency histogram dictionaries
-      latency_histogram = collections.Counter()
-      for histogram in latency_histograms:
-        latency_histogram.update(histogram)
+      latencies, counts = _MergeHistograms(latency_histograms)
+      merged_histogram = dict(zip(latencies.tolist(), counts.tolist()))
+      latency_hdr_histogram = _ToHdrHistogram(merged_histogram)
       # Create a sample for the aggregate latency histogram
-      hist_metadata = {'histogram': json.dumps(latency_histogram)}
+      hist_metadata = {'histogram': json.dumps(merged_histogram)}
       hist_metadata.update(metadata)
       samples.append(sample.Sample(
           '%s_Latency_Histogram' % benchmark_name, 0, 'us', hist_metadata))
       # Calculate stats on aggregate latency histogram
-      latency_stats = _HistogramStatsCalculator(latency_histogram, [50, 90, 99])
+      latency_stats = _HistogramStatsCalculator(latency_hdr_histogram,
+                                                [50, 90, 99])
       # Create samples for the latency stats
       for stat, value in latency_stats.items():
         samples.append(
@@ -435,10 +626,10 @@ def Run(benchmark_spec):
   Returns:
     A list of sample.Sample objects.
   """
-  vms = benchmark_spec.vms
-  client_vm = vms[0]  # Client aka "sending vm"
-  server_vm = vms[1]  # Server aka "receiving vm"
-  logging.info('netperf running on %s', client_vm)
+  client_vms, server_vms = _GetClientAndServerVms(benchmark_spec)
+  client_vm = client_vms[0]  # Client aka "sending vm"
+  server_vm = server_vms[0]  # Server aka "receiving vm"
+  logging.info('netperf running on %s', client_vms)
   results = []
   metadata = {
       'sending_zone': client_vm.zone,
@@ -452,16 +643,18 @@ def Run(benchmark_spec):
 
     for netperf_benchmark in FLAGS.netperf_benchmarks:
       if vm_util.ShouldRunOnExternalIpAddress():
-        external_ip_results = RunNetperf(client_vm, netperf_benchmark,
-                                         server_vm.ip_address, num_streams)
+        external_ip_results = RunNetperfStreams(
+            client_vms, netperf_benchmark,
+            [vm.ip_address for vm in server_vms], num_streams)
         for external_ip_result in external_ip_results:
           external_ip_result.metadata['ip_type'] = 'external'
           external_ip_result.metadata.update(metadata)
         results.extend(external_ip_results)
 
       if vm_util.ShouldRunOnInternalIpAddress(client_vm, server_vm):
-        internal_ip_results = RunNetperf(client_vm, netperf_benchmark,
-                                         server_vm.internal_ip, num_streams)
+        internal_ip_results = RunNetperfStreams(
+            client_vms, netperf_benchmark,
+            [vm.internal_ip for vm in server_vms], num_streams)
         for internal_ip_result in internal_ip_results:
           internal_ip_result.metadata.update(metadata)
           internal_ip_result.metadata['ip_type'] = 'internal'
@@ -477,6 +670,8 @@ def Cleanup(benchmark_spec):
     benchmark_spec: The benchmark specification. Contains all data that is
         required to run the benchmark.
   """
-  vms = benchmark_spec.vms
-  vms[1].RemoteCommand('sudo killall netserver')
-  vms[0].RemoteCommand('sudo rm -rf %s' % REMOTE_SCRIPT)
+  client_vms, server_vms = _GetClientAndServerVms(benchmark_spec)
+  for server_vm in server_vms:
+    server_vm.RemoteCommand('sudo killall netserver')
+  for client_vm in client_vms:
+    client_vm.RemoteCommand('sudo rm -rf %s' % REMOTE_SCRIPT)
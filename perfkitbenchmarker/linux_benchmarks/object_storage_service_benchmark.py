@@ -39,6 +39,7 @@ import re
 import threading
 import time
 import uuid
+import zlib
 
 import numpy as np
 
@@ -47,6 +48,7 @@ from perfkitbenchmarker import data
 from perfkitbenchmarker import errors
 from perfkitbenchmarker import flag_util
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import local_object_storage
 from perfkitbenchmarker import object_storage_service
 from perfkitbenchmarker import providers
 from perfkitbenchmarker import sample
@@ -57,8 +59,10 @@ from perfkitbenchmarker.sample import PercentileCalculator  # noqa
 
 flags.DEFINE_enum('storage', providers.GCP,
                   [providers.GCP, providers.AWS,
-                   providers.AZURE, providers.OPENSTACK],
-                  'storage provider (GCP/AZURE/AWS/OPENSTACK) to use.')
+                   providers.AZURE, providers.OPENSTACK,
+                   local_object_storage.LOCAL],
+                  'storage provider (GCP/AZURE/AWS/OPENSTACK/local) to use. '
+                  '"local" keeps objects on the VMs themselves.')
 
 flags.DEFINE_string('object_storage_region', None,
                     'Storage region for object storage benchmark.')
@@ -106,6 +110,27 @@ flags.DEFINE_integer('object_storage_streams_per_vm', 10,
                      'Number of independent streams per VM. Only applies to '
                      'the api_multistream scenario.',
                      lower_bound=1)
+flags.DEFINE_integer('object_storage_streams_per_process', 1,
+                     'Number of streams that each worker process runs as '
+                     'threads. Each VM runs object_storage_streams_per_vm / '
+                     'object_storage_streams_per_process processes. Raise '
+                     'this to run more streams per VM than it has memory for '
+                     'processes. Only applies to the api_multistream '
+                     'scenario.', lower_bound=1)
+flags.DEFINE_float('object_storage_request_rate', None,
+                   'If set, each api_multistream stream paces its requests '
+                   'at this many requests per second. Each stream still has '
+                   'at most one request in flight, so a request that falls '
+                   'due while the previous one is running is sent as soon '
+                   'as it finishes. Latency is measured from when each '
+                   'request was due, so it includes time spent queued '
+                   'behind slow requests. The net throughput and gap time '
+                   'samples, which assume latencies add up to the time a '
+                   'stream was busy, are not reported.', lower_bound=0.001)
+flags.DEFINE_enum('object_storage_arrival_distribution', 'constant',
+                  ['constant', 'poisson'],
+                  'How the requests of --object_storage_request_rate are '
+                  'spaced: evenly, or as a Poisson process.')
 
 flags.DEFINE_integer('object_storage_list_consistency_iterations', 200,
                      'Number of iterations to perform for the api_namespace '
@@ -158,6 +183,15 @@ flags.DEFINE_boolean('object_storage_dont_delete_bucket', False,
 flags.DEFINE_string('object_storage_worker_output', None,
                     'If set, the worker threads\' output will be written to the'
                     'path provided.')
+flags.DEFINE_enum('object_storage_worker_output_format', 'binary',
+                  ['binary', 'json'],
+                  'How the api_multistream workers send their results back. '
+                  'binary: each VM writes binary columns to a file that is '
+                  'copied back and memory-mapped. json: each VM prints JSON '
+                  'to stdout.')
+flags.DEFINE_boolean('object_storage_compress_worker_output', False,
+                     'If set, the binary worker output is compressed with '
+                     'zlib before it is copied back.')
 flags.DEFINE_float('object_storage_latency_histogram_interval', None,
                    'If set, a latency histogram sample will be created with '
                    'buckets of the specified interval in seconds. Individual '
@@ -165,6 +199,12 @@ flags.DEFINE_float('object_storage_latency_histogram_interval', None,
                    'size in the distribution, because it is easy to aggregate '
                    'the histograms during post-processing, but impossible to '
                    'go in the opposite direction.')
+flags.DEFINE_float('object_storage_timeline_interval', None,
+                   'If set, the api_multistream operations are binned by '
+                   'completion time into windows of this many seconds, and '
+                   'throughput, QPS and latency percentile samples are '
+                   'reported for every window. Useful to spot warmup and '
+                   'throttling over the course of a run.', lower_bound=0.0)
 
 FLAGS = flags.FLAGS
 
@@ -205,12 +245,16 @@ API_TEST_SCRIPTS_DIR = 'object_storage_api_test_scripts'
 API_TEST_SCRIPT_FILES = ['object_storage_api_tests.py',
                          'object_storage_interface.py',
                          'azure_flags.py',
+                         'local_flags.py',
                          's3_flags.py']
 
 # Various constants to name the result metrics.
 THROUGHPUT_UNIT = 'Mbps'
 LATENCY_UNIT = 'seconds'
 NA_UNIT = 'na'
+# Latency percentiles reported for each window of the timeline samples.
+TIMELINE_PERCENTILES = [50, 90, 99]
+
 PERCENTILES_LIST = ['p0.1', 'p1', 'p5', 'p10', 'p50', 'p90', 'p95', 'p99',
                     'p99.9', 'average', 'stddev']
 
@@ -266,6 +310,10 @@ MULTISTREAM_DELAY_CONSTANT = 10.0 * units.second
 # benchmark. This is the filename.
 OBJECTS_WRITTEN_FILE = 'pkb-objects-written'
 
+# With --object_storage_worker_output_format=binary, the multistream
+# benchmarks write their results to this file in the VM's /tmp.
+WORKER_OUTPUT_FILE = 'pkb-worker-output'
+
 # If the gap between different stream starts and ends is above a
 # certain proportion of the total time, we log a warning because we
 # are throwing out a lot of information. We also put the warning in
@@ -277,7 +325,8 @@ MULTISTREAM_STREAM_GAP_THRESHOLD = 0.2
 STORAGE_TO_API_SCRIPT_DICT = {
     providers.GCP: 'GCS',
     providers.AWS: 'S3',
-    providers.AZURE: 'AZURE'}
+    providers.AZURE: 'AZURE',
+    local_object_storage.LOCAL: 'LOCAL'}
 
 _SECONDS_PER_HOUR = 60 * 60
 
@@ -389,6 +438,11 @@ def _ProcessMultiStreamResults(start_times, latencies, sizes, operation,
   metadata['objects_per_stream'] = (
       FLAGS.object_storage_multistream_objects_per_stream)
   metadata['object_naming'] = FLAGS.object_storage_object_naming_scheme
+  metadata['streams_per_process'] = FLAGS.object_storage_streams_per_process
+  if FLAGS.object_storage_request_rate:
+    metadata['request_rate_per_stream'] = FLAGS.object_storage_request_rate
+    metadata['arrival_distribution'] = (
+        FLAGS.object_storage_arrival_distribution)
 
   num_records = sum((len(start_time) for start_time in start_times))
   logging.info('Processing %s total operation records', num_records)
@@ -505,18 +559,24 @@ def _ProcessMultiStreamResults(start_times, latencies, sizes, operation,
                       start_times[i][active_start_indexes[i]]
                       for i in xrange(num_streams)]
   total_active_sizes = [np.sum(size) for size in active_sizes]
+  # With --object_storage_request_rate, latencies are measured from when each
+  # request was due, so once the service falls behind, they overlap and add
+  # up to more than the time the stream was busy. Samples derived from the
+  # sum of latencies would be wrong and are skipped.
+  latencies_are_service_times = not FLAGS.object_storage_request_rate
   # 'net throughput (with gap)' is computed by taking the throughput
   # for each stream (total # of bytes transmitted / (stop_time -
   # start_time)) and then adding the per-stream throughputs. 'net
   # throughput' is the same, but replacing (stop_time - start_time)
   # with the sum of all of the operation latencies for that thread, so
   # we only divide by the time that stream was actually transmitting.
-  results.append(sample.Sample(
-      'Multi-stream ' + operation + ' net throughput',
-      np.sum((size / active_time * 8
-              for size, active_time
-              in zip(total_active_sizes, total_active_times))),
-      'bit / second', metadata=distribution_metadata))
+  if latencies_are_service_times:
+    results.append(sample.Sample(
+        'Multi-stream ' + operation + ' net throughput',
+        np.sum((size / active_time * 8
+                for size, active_time
+                in zip(total_active_sizes, total_active_times))),
+        'bit / second', metadata=distribution_metadata))
   results.append(sample.Sample(
       'Multi-stream ' + operation + ' net throughput (with gap)',
       np.sum((size / duration * 8
@@ -537,18 +597,134 @@ def _ProcessMultiStreamResults(start_times, latencies, sizes, operation,
       'Multi-stream ' + operation + ' QPS (all streams active)',
       len(all_active_latencies) / (first_stop_time - last_start_time),
       'operation / second', metadata=distribution_metadata))
+  if FLAGS.object_storage_request_rate:
+    # Compare with the QPS above to see whether the service kept up.
+    results.append(sample.Sample(
+        'Multi-stream ' + operation + ' offered QPS',
+        FLAGS.object_storage_request_rate * num_streams,
+        'operation / second', metadata=distribution_metadata))
 
   # Statistics about benchmarking overhead
-  gap_time = sum((active_duration - active_time
-                  for active_duration, active_time
-                  in zip(active_durations, total_active_times)))
-  results.append(sample.Sample(
-      'Multi-stream ' + operation + ' total gap time',
-      gap_time, 'second', metadata=distribution_metadata))
-  results.append(sample.Sample(
-      'Multi-stream ' + operation + ' gap time proportion',
-      gap_time / (first_stop_time - last_start_time) * 100.0,
-      'percent', metadata=distribution_metadata))
+  if latencies_are_service_times:
+    gap_time = sum((active_duration - active_time
+                    for active_duration, active_time
+                    in zip(active_durations, total_active_times)))
+    results.append(sample.Sample(
+        'Multi-stream ' + operation + ' total gap time',
+        gap_time, 'second', metadata=distribution_metadata))
+    results.append(sample.Sample(
+        'Multi-stream ' + operation + ' gap time proportion',
+        gap_time / (first_stop_time - last_start_time) * 100.0,
+        'percent', metadata=distribution_metadata))
+
+  if FLAGS.object_storage_timeline_interval:
+    _AppendTimelineSamples(results, start_times, latencies, sizes, operation,
+                           FLAGS.object_storage_timeline_interval,
+                           distribution_metadata)
+
+
+def _ComputeTimeline(start_times, latencies, sizes, interval):
+  """Bins operations into fixed windows by their completion time.
+
+  Args:
+    start_times: a list of numpy arrays. Operation start times, as
+      POSIX timestamps.
+    latencies: a list of numpy arrays. Operation durations, in seconds.
+    sizes: a list of numpy arrays. Object sizes used in each
+      operation, in bytes.
+    interval: float. The length of each window, in seconds.
+
+  Returns:
+    A tuple of (window_starts, durations, counts, total_sizes,
+    latency_percentiles). The first four are numpy arrays with one entry per
+    window: its start as a POSIX timestamp, its length in seconds (the last
+    window ends with the last operation), the number of operations that
+    completed in it and the bytes they transferred. latency_percentiles maps
+    each of TIMELINE_PERCENTILES to an array of that latency percentile per
+    window, which is NaN for windows without operations.
+  """
+  all_start_times = np.concatenate(start_times)
+  all_latencies = np.concatenate(latencies)
+  all_sizes = np.concatenate(sizes)
+  stop_times = all_start_times + all_latencies
+
+  first_start_time = all_start_times.min()
+  last_stop_time = stop_times.max()
+  num_windows = max(
+      1, int(np.ceil((last_stop_time - first_start_time) / interval)))
+  # The last operation would start a window of its own if the run happens to
+  # end exactly on a window boundary, so it is folded into the previous one.
+  windows = np.minimum(
+      ((stop_times - first_start_time) // interval).astype(np.int64),
+      num_windows - 1)
+  window_starts = first_start_time + interval * np.arange(num_windows)
+  durations = np.minimum(interval, last_stop_time - window_starts)
+  counts = np.bincount(windows, minlength=num_windows)
+  total_sizes = np.bincount(windows, weights=all_sizes, minlength=num_windows)
+
+  # Sort the latencies by window and then by value, so each window's
+  # latencies are a sorted slice and every percentile of every window can be
+  # looked up at once, interpolating linearly like np.percentile.
+  sorted_latencies = all_latencies[np.lexsort((all_latencies, windows))]
+  offsets = np.cumsum(counts) - counts
+  nonempty = counts > 0
+  latency_percentiles = {}
+  for percentile in TIMELINE_PERCENTILES:
+    ranks = (counts[nonempty] - 1) * (percentile / 100.0)
+    lower = np.floor(ranks).astype(np.int64)
+    upper = np.ceil(ranks).astype(np.int64)
+    lower_values = sorted_latencies[offsets[nonempty] + lower]
+    upper_values = sorted_latencies[offsets[nonempty] + upper]
+    values = np.full(num_windows, np.nan)
+    values[nonempty] = (lower_values +
+                        (upper_values - lower_values) * (ranks - lower))
+    latency_percentiles[percentile] = values
+
+  return window_starts, durations, counts, total_sizes, latency_percentiles
+
+
+def _AppendTimelineSamples(results, start_times, latencies, sizes, operation,
+                           interval, metadata):
+  """Appends throughput, QPS and latency samples for each time window.
+
+  Unlike the other multi-stream samples, these cover the whole run rather
+  than only the period when all streams were active, so that warmup and
+  ramp-down show up too. Every sample's timestamp is the start of its
+  window.
+
+  Args:
+    results: a list to append Sample objects to.
+    start_times: a list of numpy arrays. Operation start times, as
+      POSIX timestamps.
+    latencies: a list of numpy arrays. Operation durations, in seconds.
+    sizes: a list of numpy arrays. Object sizes used in each
+      operation, in bytes.
+    operation: 'upload' or 'download'. The operation the results are from.
+    interval: float. The length of each window, in seconds.
+    metadata: dict. Base sample metadata.
+  """
+  window_starts, durations, counts, total_sizes, latency_percentiles = (
+      _ComputeTimeline(start_times, latencies, sizes, interval))
+  logging.info('Reporting multi-stream %s results in %s windows of %s '
+               'seconds.', operation, len(window_starts), interval)
+  metric_prefix = 'Multi-stream %s timeline ' % operation
+  for i, window_start in enumerate(window_starts):
+    window_metadata = metadata.copy()
+    window_metadata['timeline_interval'] = interval
+    window_metadata['timeline_window'] = i
+    window_metadata['timeline_window_start_sec'] = i * interval
+    results.append(sample.Sample(
+        metric_prefix + 'throughput', total_sizes[i] / durations[i] * 8,
+        'bit / second', window_metadata, timestamp=window_start))
+    results.append(sample.Sample(
+        metric_prefix + 'QPS', counts[i] / durations[i],
+        'operation / second', window_metadata, timestamp=window_start))
+    if counts[i]:
+      for percentile in TIMELINE_PERCENTILES:
+        results.append(sample.Sample(
+            metric_prefix + 'latency p%s' % percentile,
+            latency_percentiles[percentile][i], LATENCY_UNIT,
+            window_metadata, timestamp=window_start))
 
 
 def _DistributionToBackendFormat(dist):
@@ -842,6 +1018,47 @@ def LoadWorkerOutput(output):
   return start_times, latencies, sizes
 
 
+def LoadWorkerOutputFiles(paths):
+  """Loads binary output files of worker processes to our internal format.
+
+  The files are written by the API test script's WriteWorkerOutput: a line of
+  JSON describing the streams and columns, followed by the columns as raw
+  float64 arrays. Uncompressed columns are memory-mapped rather than read.
+
+  Args:
+    paths: list of strings. The local paths of the worker output files.
+
+  Returns:
+    A tuple of start_time, latency, size in the same format as
+    LoadWorkerOutput.
+  """
+  start_times = []
+  latencies = []
+  sizes = []
+
+  for path in paths:
+    with open(path, 'rb') as worker_file:
+      header = json.loads(worker_file.readline())
+      offset = worker_file.tell()
+      counts = [stream['count'] for stream in header['streams']]
+      shape = (len(header['columns']), sum(counts))
+      if header['compression'] == 'zlib':
+        columns = np.frombuffer(zlib.decompress(worker_file.read()),
+                                dtype=header['dtype']).reshape(shape)
+      elif shape[1]:
+        columns = np.memmap(path, dtype=header['dtype'], mode='r',
+                            offset=offset, shape=shape)
+      else:
+        columns = np.empty(shape)
+    columns = dict(zip(header['columns'], columns))
+    boundaries = np.cumsum(counts)[:-1]
+    start_times.extend(np.split(columns['start_times'], boundaries))
+    latencies.extend(np.split(columns['latencies'], boundaries))
+    sizes.extend(np.split(columns['sizes'].astype(np.int64), boundaries))
+
+  return start_times, latencies, sizes
+
+
 def _RunMultiStreamProcesses(vms, command_builder, cmd_args, streams_per_vm):
   """Runs all of the multistream read or write processes and doesn't return
      until they complete.
@@ -959,6 +1176,14 @@ def _MultiStreamOneWay(results, metadata, vms, command_builder,
       '--num_streams=%s' % streams_per_vm,
       '--start_time=%s' % start_time,
       '--objects_written_file=%s' % objects_written_file]
+  if FLAGS.object_storage_streams_per_process > 1:
+    cmd_args += ['--streams_per_process=%s' %
+                 FLAGS.object_storage_streams_per_process]
+  if FLAGS.object_storage_request_rate:
+    cmd_args += [
+        '--request_rate=%s' % FLAGS.object_storage_request_rate,
+        '--arrival_distribution=%s' %
+        FLAGS.object_storage_arrival_distribution]
 
   if operation == 'upload':
     cmd_args += [
@@ -971,10 +1196,35 @@ def _MultiStreamOneWay(results, metadata, vms, command_builder,
     raise Exception('Value of operation must be \'upload\' or \'download\'.'
                     'Value is: \'' + operation + '\'')
 
+  binary_output = FLAGS.object_storage_worker_output_format == 'binary'
+  if binary_output:
+    worker_output_file = posixpath.join(vm_util.VM_TMP_DIR,
+                                        WORKER_OUTPUT_FILE)
+    cmd_args += ['--worker_output_file=%s' % worker_output_file]
+    if FLAGS.object_storage_compress_worker_output:
+      cmd_args += ['--compress_worker_output']
+
   output = _RunMultiStreamProcesses(vms, command_builder, cmd_args,
                                     streams_per_vm)
-  start_times, latencies, sizes = LoadWorkerOutput(output)
+  if binary_output:
+    local_paths = [
+        os.path.join(vm_util.GetTempDir(),
+                     '%s-%s-%s' % (WORKER_OUTPUT_FILE, operation, vm_idx))
+        for vm_idx in xrange(len(vms))]
+    vm_util.RunThreaded(
+        lambda vm, local_path: vm.PullFile(local_path, worker_output_file),
+        [((vm, local_path), {}) for vm, local_path in zip(vms, local_paths)])
+    start_times, latencies, sizes = LoadWorkerOutputFiles(local_paths)
+  else:
+    start_times, latencies, sizes = LoadWorkerOutput(output)
   if FLAGS.object_storage_worker_output:
+    if binary_output:
+      # Keep the JSON format of this file; there is one list of streams.
+      output = [json.dumps([
+          {'start_times': start_time.tolist(),
+           'latencies': latency.tolist(),
+           'sizes': size.tolist()}
+          for start_time, latency, size in zip(start_times, latencies, sizes)])]
     with open(FLAGS.object_storage_worker_output, 'w') as out_file:
       out_file.write(json.dumps(output))
   _ProcessMultiStreamResults(start_times, latencies, sizes, operation,
@@ -1336,8 +1586,10 @@ def Prepare(benchmark_spec):
         'Failed to read the file specified by '
         '--object_storage_read_objects_prefix')
 
-  # Load the provider and its object storage service
-  providers.LoadProvider(FLAGS.storage)
+  # Load the provider and its object storage service. The local service is
+  # not part of any provider.
+  if FLAGS.storage != local_object_storage.LOCAL:
+    providers.LoadProvider(FLAGS.storage)
 
   service = object_storage_service.GetObjectStorageClass(FLAGS.storage)()
   if (FLAGS.storage == 'Azure' and
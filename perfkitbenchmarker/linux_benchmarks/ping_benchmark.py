@@ -16,17 +16,44 @@
 
 This benchmark runs ping using the internal, and optionally external, ips of
 vms in the same zone.
+
+With --ping_histogram, every round trip time is collected and reported as
+percentiles and as a time series of jitter and tail latency, rather than only
+ping's min/avg/max/mdev summary.
 """
 
+import itertools
 import logging
+import re
+
+import numpy as np
 from perfkitbenchmarker import configs
 from perfkitbenchmarker import flags
 from perfkitbenchmarker import sample
-import re
+from perfkitbenchmarker import vm_util
 
 flags.DEFINE_boolean('ping_also_run_using_external_ip', False,
                      'If set to True, the ping command will also be executed '
                      'using the external ips of the vms.')
+flags.DEFINE_integer('ping_count', 100,
+                     'Number of echo requests that each ping sends.',
+                     lower_bound=1)
+flags.DEFINE_float('ping_interval', None,
+                   'Seconds between echo requests. If unset, ping waits one '
+                   'second. 0 sends the next request as soon as the reply '
+                   'arrives, like a flood ping. Intervals below 0.2 seconds '
+                   'run ping as root.', lower_bound=0)
+flags.DEFINE_boolean('ping_histogram', False,
+                     'If set, collect the round trip time of every echo '
+                     'request and report latency percentiles, jitter, and '
+                     'a time series of both.')
+flags.DEFINE_float('ping_window_sec', 10,
+                   'Length in seconds of the windows of the --ping_histogram '
+                   'time series.', lower_bound=0.001)
+flags.DEFINE_boolean('ping_all_pairs', False,
+                     'If set, ping between every ordered pair of VMs at the '
+                     'same time. Allows more than two VMs, e.g. by setting '
+                     'vm_count of the vm_1 group.')
 
 FLAGS = flags.FLAGS
 
@@ -43,6 +70,12 @@ ping:
 """
 
 METRICS = ('Min Latency', 'Average Latency', 'Max Latency', 'Latency Std Dev')
+PERCENTILES = (50, 90, 99, 99.9, 99.99)
+WINDOW_PERCENTILE = 99
+
+# ping -D prints a timestamp before each reply, e.g.
+# [1539871872.309419] 64 bytes from 10.0.0.3: icmp_seq=1 ttl=64 time=0.280 ms
+_REPLY_RE = re.compile(r'^\[(\d+\.\d+)\].*time=(\d+(?:\.\d+)?) ms', re.M)
 
 
 def GetConfig(user_config):
@@ -56,7 +89,12 @@ def Prepare(benchmark_spec):  # pylint: disable=unused-argument
     benchmark_spec: The benchmark specification. Contains all data that is
         required to run the benchmark.
   """
-  if len(benchmark_spec.vms) != 2:
+  if FLAGS.ping_all_pairs:
+    if len(benchmark_spec.vms) < 2:
+      raise ValueError(
+          'Ping benchmark requires at least two machines, found {0}'
+          .format(len(benchmark_spec.vms)))
+  elif len(benchmark_spec.vms) != 2:
     raise ValueError(
         'Ping benchmark requires exactly two machines, found {0}'
         .format(len(benchmark_spec.vms)))
@@ -77,6 +115,8 @@ def Run(benchmark_spec):
     A list of sample.Sample objects.
   """
   vms = benchmark_spec.vms
+  if FLAGS.ping_all_pairs:
+    return _RunAllPairs(vms)
   results = []
   for sending_vm, receiving_vm in vms, reversed(vms):
     results = results + _RunPing(sending_vm,
@@ -92,6 +132,102 @@ def Run(benchmark_spec):
   return results
 
 
+def _RunAllPairs(vms):
+  """Runs ping between every ordered pair of VMs concurrently.
+
+  Args:
+    vms: The VMs to ping between.
+
+  Returns:
+    A list of sample.Sample objects.
+  """
+  ip_types = [('internal', lambda vm: vm.internal_ip)]
+  if FLAGS.ping_also_run_using_external_ip:
+    ip_types.append(('external', lambda vm: vm.ip_address))
+  args = [((sending_vm, receiving_vm, get_ip(receiving_vm), ip_type), {})
+          for ip_type, get_ip in ip_types
+          for sending_vm, receiving_vm in itertools.permutations(vms, 2)]
+  results = vm_util.RunThreaded(_RunPing, args, len(args))
+  return [result for pair_results in results for result in pair_results]
+
+
+def _GetPingCommand(receiving_ip):
+  """Returns the ping command line for the ping flags."""
+  options = ['-c %d' % FLAGS.ping_count]
+  if FLAGS.ping_interval is not None:
+    options.append('-i %s' % FLAGS.ping_interval)
+  if FLAGS.ping_histogram:
+    options.append('-D')
+  sudo = ('sudo ' if FLAGS.ping_interval is not None and
+          FLAGS.ping_interval < 0.2 else '')
+  return '%sping %s %s' % (sudo, ' '.join(options), receiving_ip)
+
+
+def ParseRoundTripTimes(stdout):
+  """Parses the reply lines of ping -D.
+
+  Args:
+    stdout: string. The output of ping -D.
+
+  Returns:
+    A (timestamps, rtts) tuple of numpy arrays with the time in seconds since
+    the epoch at which each reply arrived and its round trip time in ms.
+  """
+  replies = np.array(_REPLY_RE.findall(stdout), dtype=np.float64)
+  if not replies.size:
+    return np.array([]), np.array([])
+  return replies[:, 0], replies[:, 1]
+
+
+def _MakeHistogramSamples(timestamps, rtts, metadata):
+  """Creates latency percentile, jitter and time series samples.
+
+  Jitter is the mean absolute difference between consecutive round trip
+  times.
+
+  Args:
+    timestamps: A numpy array of the time in seconds at which each reply
+      arrived.
+    rtts: A numpy array of the round trip time of each reply in ms.
+    metadata: dict. Metadata to attach to the samples.
+
+  Returns:
+    A list of sample.Sample objects.
+  """
+  if not rtts.size:
+    return []
+  results = [
+      sample.Sample('Latency p%s' % percentile, float(value), 'ms', metadata)
+      for percentile, value in zip(PERCENTILES,
+                                   np.percentile(rtts, PERCENTILES))]
+  deltas = np.abs(np.diff(rtts))
+  if deltas.size:
+    results.append(sample.Sample('Jitter', float(deltas.mean()), 'ms',
+                                 metadata))
+
+  # Replies are in arrival order, so each window is a contiguous slice.
+  windows = ((timestamps - timestamps[0]) //
+             FLAGS.ping_window_sec).astype(np.int64)
+  boundaries = np.flatnonzero(np.diff(windows)) + 1
+  for start, end in zip(np.concatenate(([0], boundaries)),
+                        np.concatenate((boundaries, [rtts.size]))):
+    window_metadata = {
+        'window_start_sec': float(windows[start] * FLAGS.ping_window_sec),
+        'window_sec': FLAGS.ping_window_sec,
+        'window_count': int(end - start),
+    }
+    window_metadata.update(metadata)
+    results.append(sample.Sample(
+        'Windowed Latency p%s' % WINDOW_PERCENTILE,
+        float(np.percentile(rtts[start:end], WINDOW_PERCENTILE)), 'ms',
+        window_metadata))
+    if end - start > 1:
+      results.append(sample.Sample(
+          'Windowed Jitter', float(deltas[start:end - 1].mean()), 'ms',
+          window_metadata))
+  return results
+
+
 def _RunPing(sending_vm, receiving_vm, receiving_ip, ip_type):
   """Run ping using 'sending_vm' to connect to 'receiving_ip'.
 
@@ -108,16 +244,28 @@ def _RunPing(sending_vm, receiving_vm, receiving_ip, ip_type):
     return []
 
   logging.info('Ping results (ip_type = %s):', ip_type)
-  ping_cmd = 'ping -c 100 %s' % receiving_ip
-  stdout, _ = sending_vm.RemoteCommand(ping_cmd, should_log=True)
+  ping_cmd = _GetPingCommand(receiving_ip)
+  # Don't log every reply of a high resolution run.
+  stdout, _ = sending_vm.RemoteCommand(
+      ping_cmd, should_log=not FLAGS.ping_histogram)
   stats = re.findall('([0-9]*\\.[0-9]*)', stdout.splitlines()[-1])
   assert len(stats) == len(METRICS), stats
   results = []
   metadata = {'ip_type': ip_type,
               'receiving_zone': receiving_vm.zone,
               'sending_zone': sending_vm.zone}
+  if FLAGS.ping_all_pairs:
+    metadata.update({'sending_vm': sending_vm.name,
+                     'receiving_vm': receiving_vm.name})
+  if FLAGS.ping_histogram:
+    metadata.update({'ping_count': FLAGS.ping_count,
+                     'ping_interval': FLAGS.ping_interval})
   for i, metric in enumerate(METRICS):
     results.append(sample.Sample(metric, float(stats[i]), 'ms', metadata))
+  if FLAGS.ping_histogram:
+    logging.info(stdout.splitlines()[-1])
+    results.extend(_MakeHistogramSamples(
+        *ParseRoundTripTimes(stdout), metadata=metadata))
   return results
 
 
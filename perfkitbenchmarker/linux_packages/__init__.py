@@ -14,7 +14,7 @@
 """Contains package imports and a dictionary of package names and modules.
 
 All modules within this package are considered packages, and are loaded
-dynamically. Add non-package code to other packages.
+dynamically when first used. Add non-package code to other packages.
 
 Packages should, at a minimum, define install functions for each type of
 package manager (e.g. YumInstall(vm) and AptInstall(vm)).
@@ -43,14 +43,16 @@ from perfkitbenchmarker import import_util
 INSTALL_DIR = '/opt/pkb'
 
 
-def _LoadPackages():
-  packages = dict([(module.__name__.split('.')[-1], module) for module in
-                   import_util.LoadModulesForPath(__path__, __name__)])
-  packages.update(packages['docker'].CreateImagePackages())
-  return packages
+def _GetPackages():
+  """Returns a dictionary of packages, which are imported when first used."""
+  from perfkitbenchmarker.linux_packages import docker
+  return import_util.LazyModuleDict(
+      {module_name.split('.')[-1]: module_name for module_name in
+       import_util.GetModuleNamesForPath(__path__, __name__)},
+      docker.CreateImagePackages())
 
 
-PACKAGES = _LoadPackages()
+PACKAGES = _GetPackages()
 
 
 def GetPipPackageVersion(vm, package_name):
@@ -13,17 +13,20 @@
 # limitations under the License.
 
 """Module containing fio installation, cleanup, parsing functions."""
-import collections
 
+import collections
 import ConfigParser
-import csv
 import io
 import json
 import logging
+import mmap
+import os
 import time
 
-from perfkitbenchmarker import errors
-from perfkitbenchmarker import flags
+import numpy as np
+
+from perfkitbenchmarker import hdr_histogram
+from perfkitbenchmarker import package_cache
 from perfkitbenchmarker import regex_util
 from perfkitbenchmarker import sample
 from perfkitbenchmarker import vm_util
@@ -34,6 +37,8 @@ GIT_REPO = 'http://git.kernel.dk/fio.git'
 GIT_TAG = 'fio-2.17'
 FIO_PATH = FIO_DIR + '/fio'
 FIO_CMD_PREFIX = '%s --output-format=json' % FIO_PATH
+# The port that fio --server listens on by default.
+FIO_SERVER_PORT = 8765
 SECTION_REGEX = r'\[(\w+)\]\n([\w\d\n=*$/]+)'
 PARAMETER_REGEX = r'(\w+)=([/\w\d$*]+)\n'
 GLOBAL = 'global'
@@ -46,11 +51,20 @@ JOB_STONEWALL_PARAMETER = 'stonewall'
 # Defined in fio
 DATA_DIRECTION = {0: 'read', 1: 'write', 2: 'trim'}
 HIST_BUCKET_START_IDX = 3
-
-# Patch fiologparser to return mean bucket.
-FIO_HIST_LOG_PARSER_PATCH = 'fiologparser_hist.patch'
-FIO_HIST_LOG_PARSER_PATH = '%s/tools/hist' % FIO_DIR
-FIO_HIST_LOG_PARSER = 'fiologparser_hist.py'
+# Histogram latencies are counted in half microseconds.
+_HIST_UNITS_PER_USEC = 2
+# Layout of fio's latency histogram bins (FIO_IO_U_PLAT_* in stat.h). Each
+# group of 64 bins covers twice the range of the previous one, and
+# --log_hist_coarseness merges 2^coarseness adjacent bins.
+_HIST_PLAT_BITS = 6
+_HIST_PLAT_VAL = 1 << _HIST_PLAT_BITS
+_HIST_PLAT_NR = 19 * _HIST_PLAT_VAL
+_HIST_MAX_COARSENESS = 8
+# Latency percentiles reported across the servers of a client/server run.
+_LATENCY_PERCENTILES = [1, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 99,
+                        99.5, 99.9, 99.95, 99.99]
+# Percentiles reported for each window of a histogram log.
+_HIST_WINDOW_PERCENTILES = [50, 90, 99, 99.9]
 
 
 def GetFioExec():
@@ -59,20 +73,15 @@ def GetFioExec():
 
 def _Install(vm):
   """Installs the fio package on the VM."""
-  for p in ['build_tools', 'python', 'pip', 'python_dev']:
-    vm.Install(p)
-  vm.RemoteCommand('sudo pip install pandas numpy')
+  package_cache.InstallFromCache(vm, 'fio', [FIO_DIR], _Build)
+
+
+def _Build(vm):
+  """Builds fio from source on the VM."""
+  vm.Install('build_tools')
   vm.RemoteCommand('git clone {0} {1}'.format(GIT_REPO, FIO_DIR))
   vm.RemoteCommand('cd {0} && git checkout {1}'.format(FIO_DIR, GIT_TAG))
   vm.RemoteCommand('cd {0} && ./configure && make'.format(FIO_DIR))
-  if flags.FLAGS.fio_hist_log:
-    vm.PushDataFile(FIO_HIST_LOG_PARSER_PATCH)
-    vm.RemoteCommand(
-        ('cp {log_parser_path}/{log_parser} ./; '
-         'patch {log_parser} {patch}').format(
-             log_parser_path=FIO_HIST_LOG_PARSER_PATH,
-             log_parser=FIO_HIST_LOG_PARSER,
-             patch=FIO_HIST_LOG_PARSER_PATCH))
 
 
 def YumInstall(vm):
@@ -94,15 +103,15 @@ def ParseJobFile(job_file):
     job_file: The contents of fio job file.
 
   Returns:
-    A dictionary of dictionaries of sample metadata, using test name as keys,
-        dictionaries of sample metadata as value.
+    An ordered dictionary of dictionaries of sample metadata, using test name
+        as keys in job file order, dictionaries of sample metadata as value.
   """
   config = ConfigParser.RawConfigParser(allow_no_value=True)
   config.readfp(io.BytesIO(job_file))
   global_metadata = {}
   if GLOBAL in config.sections():
     global_metadata = dict(config.items(GLOBAL))
-  section_metadata = {}
+  section_metadata = collections.OrderedDict()
   for section in config.sections():
     if section != GLOBAL:
       metadata = {}
@@ -146,7 +155,7 @@ def FioParametersToJob(fio_parameters):
 
 
 def ParseResults(job_file, fio_json_result, base_metadata=None,
-                 log_file_base='', bin_vals=None):
+                 log_file_base='', bin_vals=None, hist_window_sec=0):
   """Parse fio json output into samples.
 
   Args:
@@ -155,8 +164,9 @@ def ParseResults(job_file, fio_json_result, base_metadata=None,
     base_metadata: Extra metadata to annotate the samples with.
     log_file_base: String. Base name for fio log files.
     bin_vals: A 2-D list of int. Each list represents a list of
-      bin values in histgram log. Calculated from remote VM using
-      fio/tools/hist/fiologparser_hist.py
+      bin values in histgram log. Calculated with ComputeHistogramBinVals.
+    hist_window_sec: int. If positive, latency percentiles are also reported
+      for each window of this many seconds of the histogram logs.
 
   Returns:
     A list of sample.Sample objects.
@@ -251,36 +261,91 @@ def ParseResults(job_file, fio_json_result, base_metadata=None,
                           job[mode]['iops'], '', parameters, timestamp))
     if log_file_base and bin_vals:
       # Parse histograms
-      aggregates = collections.defaultdict(collections.Counter)
+      windows = {}
       for _ in xrange(int(parameters.get('numjobs', 1))):
         clat_hist_idx += 1
         hist_file_path = vm_util.PrependTempDir(
             '%s_clat_hist.%s.log' % (log_file_base, str(clat_hist_idx)))
-        hists = _ParseHistogram(hist_file_path, bin_vals[clat_hist_idx - 1])
+        hists = _ParseHistogram(hist_file_path, bin_vals[clat_hist_idx - 1],
+                                hist_window_sec * 1000)
 
-        for key in hists:
-          aggregates[key].update(hists[key])
+        for key, histogram in hists.iteritems():
+          if key in windows:
+            windows[key].Merge(histogram)
+          else:
+            windows[key] = histogram
+      aggregates = {}
+      for (rw, bs, _), histogram in sorted(windows.iteritems()):
+        if (rw, bs) not in aggregates:
+          aggregates[(rw, bs)] = hdr_histogram.HdrHistogram()
+        aggregates[(rw, bs)].Merge(histogram)
       samples += _BuildHistogramSamples(aggregates, job_name, parameters)
+      if hist_window_sec > 0:
+        samples += _BuildWindowedLatencySamples(
+            windows, hist_window_sec, job_name, parameters)
 
   return samples
 
 
-def ComputeHistogramBinVals(vm, log_file):
+def _PlatIdxToVal(idx, edge):
+  """Computes latencies within fio's histogram bins.
+
+  This is a vectorized port of plat_idx_to_val() in fio's stat.c.
+
+  Args:
+    idx: numpy array of int. Indices of bins at the finest coarseness.
+    edge: float in [0, 1]. How far into each bin the latency is taken.
+
+  Returns:
+    A numpy array of latencies in microseconds.
+  """
+  error_bits = np.maximum((idx >> _HIST_PLAT_BITS) - 1, 0)
+  base = np.left_shift(1, error_bits + _HIST_PLAT_BITS)
+  values = base + (idx % _HIST_PLAT_VAL + edge) * np.left_shift(1, error_bits)
+  # Bins in the first two groups hold a single latency each.
+  return np.where(idx < 2 * _HIST_PLAT_VAL, idx, values)
+
+
+def _GetMeanBinVals(idx, stride=1):
+  """Computes the mean latencies of fio's histogram bins.
+
+  Args:
+    idx: numpy array of int. Indices of bins at the finest coarseness.
+    stride: int. The number of finest bins merged into each bin.
+
+  Returns:
+    A numpy array of latencies in microseconds.
+  """
+  lower = _PlatIdxToVal(idx, 0.0)
+  upper = _PlatIdxToVal(idx + stride, 1.0)
+  return lower + (upper - lower) * 0.5
+
+
+def ComputeHistogramBinVals(log_file):
   """Calculate bin values for histogram.
 
+  This computes the same mean bin values as fio's
+  tools/hist/fiologparser_hist.py, without running it on the VM.
+
   Args:
-    vm: VirtualMachine object.
-    log_file: String. Name of the log file.
+    log_file: String. Path of a local copy of the histogram log.
 
   Returns:
-    A list of float. Representing the mean value of the bin.
+    A list of float. Representing the mean value of the bin, or an empty list
+    if the log doesn't match fio's histogram layout.
   """
-  try:
-    return [float(v) for v in vm.RemoteCommand(
-        './%s %s' % (FIO_HIST_LOG_PARSER, log_file))[0].split()]
-  except errors.VirtualMachine.RemoteCommandError:
-    logging.exception('Calculate bin values for %s failed.', log_file)
+  with open(log_file) as f:
+    num_bins = f.readline().count(',') + 1 - HIST_BUCKET_START_IDX
+  for coarseness in xrange(_HIST_MAX_COARSENESS + 1):
+    stride = 1 << coarseness
+    if num_bins * stride == _HIST_PLAT_NR:
+      break
+  else:
+    logging.warning('Calculate bin values for %s failed: unexpected number of '
+                    'histogram bins %d.', log_file, num_bins)
     return []
+  idx = np.arange(num_bins, dtype=np.int64) * stride
+  return _GetMeanBinVals(idx, stride).tolist()
 
 
 def DeleteParameterFromJobFile(job_file, parameter):
@@ -299,7 +364,63 @@ def DeleteParameterFromJobFile(job_file, parameter):
     return job_file
 
 
-def _ParseHistogram(hist_log_file, mean_bin_vals):
+def _ParseIntegers(buf):
+  """Parses the non-negative integers in a buffer without copying it.
+
+  Args:
+    buf: A buffer, such as an mmap.mmap, of ASCII text.
+
+  Returns:
+    A tuple of a numpy int64 array of the integers in the buffer and the
+    offset of the end of each of them.
+  """
+  digits = np.frombuffer(buf, dtype=np.uint8) - ord('0')
+  digit_offsets = np.flatnonzero(digits < 10)
+  if not digit_offsets.size:
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+  # A new integer starts at each digit that doesn't follow another digit.
+  is_start = np.ones(digit_offsets.size, dtype=bool)
+  is_start[1:] = np.diff(digit_offsets) != 1
+  start_indices = np.flatnonzero(is_start)
+  lengths = np.diff(np.append(start_indices, digit_offsets.size))
+  starts = digit_offsets[start_indices]
+  values = np.zeros(starts.size, dtype=np.int64)
+  for position in xrange(lengths.max()):
+    more = lengths > position
+    values[more] = values[more] * 10 + digits[starts[more] + position]
+  return values, starts + lengths
+
+
+def _LoadHistogramLog(hist_log_file):
+  """Loads a histogram log file reported by fio.
+
+  Args:
+    hist_log_file: String. File name of fio histogram log.
+
+  Returns:
+    A 2-D numpy int64 array with a row per line of the log. A truncated last
+    line is ignored.
+  """
+  with open(hist_log_file) as f:
+    if not os.fstat(f.fileno()).st_size:
+      return np.zeros((0, HIST_BUCKET_START_IDX), dtype=np.int64)
+    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+      values, ends = _ParseIntegers(buf)
+      first_line_end = buf.find('\n')
+    finally:
+      buf.close()
+  if first_line_end < 0:
+    num_columns = values.size
+  else:
+    num_columns = np.count_nonzero(ends <= first_line_end)
+  num_rows = values.size // num_columns
+  if num_rows * num_columns != values.size:
+    logging.warning('Ignoring truncated last line of %s.', hist_log_file)
+  return values[:num_rows * num_columns].reshape(num_rows, num_columns)
+
+
+def _ParseHistogram(hist_log_file, mean_bin_vals, window_msec=0):
   """Parses histogram log file reported by fio.
 
   Args:
@@ -307,37 +428,67 @@ def _ParseHistogram(hist_log_file, mean_bin_vals):
       time (msec), data direction (0: read, 1: write, 2: trim), block size,
       bin 0, .., etc
     mean_bin_vals: List of float. Representing the mean value of each bucket.
+    window_msec: int. If positive, lines are also grouped into windows of
+      this many milliseconds by their time.
 
   Returns:
-    A dict of the histograms, keyed by (data direction, block size).
+    A dict of hdr_histogram.HdrHistogram of latencies in half microseconds,
+    keyed by (data direction, block size, window index).
   """
   if not mean_bin_vals:
     logging.warning('Skipping log file %s.', hist_log_file)
     return {}
+  # fio's log-linear bins are coarser than, and aligned with, the buckets
+  # of an HdrHistogram, so each bin mean is counted exactly in half
+  # microseconds.
+  bin_vals = np.rint(np.asarray(mean_bin_vals) * _HIST_UNITS_PER_USEC)
+  rows = _LoadHistogramLog(hist_log_file)
+  keys = rows[:, :HIST_BUCKET_START_IDX].copy()
+  if window_msec > 0:
+    keys[:, 0] //= window_msec
+  else:
+    keys[:, 0] = 0
+  # Sum the counts of all lines with the same key.
+  order = np.lexsort(keys.T[::-1])
+  keys = keys[order]
+  is_first = np.ones(len(keys), dtype=bool)
+  is_first[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+  first_indices = np.flatnonzero(is_first)
+  if not first_indices.size:
+    return {}
+  counts = np.add.reduceat(rows[order, HIST_BUCKET_START_IDX:],
+                           first_indices, axis=0)
   aggregates = dict()
-  with open(hist_log_file) as f:
-    reader = csv.reader(f, delimiter=',')
-    for r in reader:
-      # Use (data direction, block size) as key
-      key = (DATA_DIRECTION[int(r[1])], int(r[2]))
-
-      hist_list = []
-      for idx, v in enumerate(r[HIST_BUCKET_START_IDX:]):
-        if int(v):
-          hist_list.append((mean_bin_vals[idx], int(v)))
-      todict = dict(hist_list)
-      if key not in aggregates:
-        aggregates[key] = collections.Counter()
-      aggregates[key].update(todict)
+  for (window, direction, bs), bin_counts in zip(
+      keys[first_indices].tolist(), counts):
+    histogram = hdr_histogram.HdrHistogram()
+    histogram.RecordValues(bin_vals[:len(bin_counts)], bin_counts)
+    aggregates[(DATA_DIRECTION[direction], bs, window)] = histogram
 
   return aggregates
 
 
+def _GetHistogramJson(histogram):
+  """Serializes a histogram of latencies in half microseconds.
+
+  Args:
+    histogram: hdr_histogram.HdrHistogram. Latencies in half microseconds.
+
+  Returns:
+    A JSON object mapping latencies in microseconds to counts.
+  """
+  values, counts = histogram.GetValueCounts()
+  return json.dumps({value / float(_HIST_UNITS_PER_USEC): count
+                     for value, count in zip(values.tolist(), counts.tolist())})
+
+
 def _BuildHistogramSamples(aggregates, metric_prefix='',
                            additional_metadata=None):
   """Builds a sample for a histogram aggregated from several files.
 
     Args:
+      aggregates: dict of hdr_histogram.HdrHistogram of latencies in half
+        microseconds, keyed by (data direction, block size).
       metric_prefix: String. Prefix of the metric name to use.
       additional_metadata: dict. Additional metadata attaching to Sample.
 
@@ -345,8 +496,8 @@ def _BuildHistogramSamples(aggregates, metric_prefix='',
       samples.Sample object that reports the fio histogram.
   """
   samples = []
-  for (rw, bs) in aggregates.keys():
-    metadata = {'histogram': json.dumps(aggregates[(rw, bs)])}
+  for (rw, bs), histogram in aggregates.iteritems():
+    metadata = {'histogram': _GetHistogramJson(histogram)}
     if additional_metadata:
       metadata.update(additional_metadata)
     samples.append(
@@ -354,3 +505,337 @@ def _BuildHistogramSamples(aggregates, metric_prefix='',
             ':'.join([metric_prefix, str(bs), rw, 'histogram']),
             0, 'us', metadata))
   return samples
+
+
+def _BuildWindowedLatencySamples(windows, window_sec, metric_prefix='',
+                                 additional_metadata=None):
+  """Builds latency percentile samples for each window of histogram logs.
+
+    Args:
+      windows: dict of hdr_histogram.HdrHistogram of latencies in half
+        microseconds, keyed by (data direction, block size, window index).
+      window_sec: int. The length of each window in seconds.
+      metric_prefix: String. Prefix of the metric name to use.
+      additional_metadata: dict. Additional metadata attaching to Sample.
+
+    Returns:
+      A list of samples.Sample objects, one per window and percentile.
+  """
+  samples = []
+  for (rw, bs, window), histogram in sorted(windows.iteritems()):
+    if not histogram.total_count:
+      continue
+    percentiles = histogram.GetPercentiles(_HIST_WINDOW_PERCENTILES)
+    metadata = {'window_start_sec': window * window_sec,
+                'window_sec': window_sec,
+                'window_count': histogram.total_count}
+    if additional_metadata:
+      metadata.update(additional_metadata)
+    for percentile in _HIST_WINDOW_PERCENTILES:
+      stat_name = 'p%s' % percentile
+      samples.append(sample.Sample(
+          ':'.join([metric_prefix, str(bs), rw, 'windowed_latency',
+                    stat_name]),
+          percentiles[stat_name] / float(_HIST_UNITS_PER_USEC), 'usec',
+          metadata))
+  return samples
+
+
+def ParseStatusOutput(output):
+  """Parses the JSON reports that fio writes every --status-interval.
+
+  Args:
+    output: string. Output of fio with --output-format=json, which may end in
+      an incomplete report.
+
+  Returns:
+    A tuple of the list of parsed reports and the unparsed end of 'output'.
+  """
+  decoder = json.JSONDecoder()
+  reports = []
+  position = 0
+  while True:
+    # Skip anything between reports, such as "fio: terminating on signal 2".
+    start = output.find('{', position)
+    if start < 0:
+      return reports, ''
+    try:
+      report, position = decoder.raw_decode(output, start)
+    except ValueError:
+      return reports, output[start:]
+    reports.append(report)
+
+
+def _GetMeanClat(stats):
+  """Returns the mean completion latency in usec of fio job statistics."""
+  if 'clat' in stats:
+    return stats['clat']['mean']
+  return stats['clat_ns']['mean'] / 1000.0
+
+
+def _GetJobTotals(report, job_name):
+  """Gets the cumulative progress of a job from a fio JSON report.
+
+  Args:
+    report: dict. A fio JSON report.
+    job_name: string. The name of the job.
+
+  Returns:
+    A tuple of the job's runtime in seconds, number of IOs, KB transferred and
+    sum of completion latencies in usec, or None if the report doesn't
+    include the job.
+  """
+  totals = None
+  for job in report['jobs']:
+    if job['jobname'] != job_name:
+      continue
+    runtime, ios, kilobytes, latency = totals or (0.0, 0.0, 0.0, 0.0)
+    for mode in DATA_DIRECTION.values():
+      stats = job.get(mode)
+      if not stats or not stats['runtime']:
+        continue
+      mode_runtime = stats['runtime'] / 1000.0
+      mode_ios = stats.get('total_ios', stats['iops'] * mode_runtime)
+      mean_latency = _GetMeanClat(stats)
+      runtime = max(runtime, mode_runtime)
+      ios += mode_ios
+      kilobytes += stats['bw'] * mode_runtime
+      latency += mean_latency * mode_ios
+    totals = (runtime, ios, kilobytes, latency)
+  return totals
+
+
+def ComputeIntervalStats(reports, job_name):
+  """Computes the performance of a job between successive fio reports.
+
+  fio reports cumulative statistics, so each interval is the difference of
+  two reports. Intervals without any completed IO are skipped.
+
+  Args:
+    reports: list of dict. fio JSON reports in the order they were written.
+    job_name: string. The name of the job.
+
+  Returns:
+    A list of dicts with the end of the interval in seconds since the job
+    started ('time'), and the 'iops', bandwidth in KB/s ('bw') and mean
+    completion latency in usec ('lat') during the interval.
+  """
+  intervals = []
+  previous = (0, 0, 0, 0)
+  for report in reports:
+    totals = _GetJobTotals(report, job_name)
+    if totals is None:
+      continue
+    duration, ios, kilobytes, latency = [
+        total - previous_total
+        for total, previous_total in zip(totals, previous)]
+    if duration <= 0:
+      continue
+    previous = totals
+    if ios <= 0:
+      continue
+    intervals.append({'time': totals[0],
+                      'iops': ios / duration,
+                      'bw': kilobytes / duration,
+                      'lat': latency / ios})
+  return intervals
+
+
+def FindSteadyState(intervals, num_rounds, max_range, max_slope,
+                    ramp_time=0):
+  """Finds when a job reaches steady state.
+
+  Like the SNIA Performance Test Specification, a job is steady once the
+  IOPS, bandwidth and latency of 'num_rounds' consecutive intervals each stay
+  within 'max_range' of their mean, and their least squares fit changes by
+  at most 'max_slope' of their mean across the intervals.
+
+  Args:
+    intervals: list of dicts. The result of ComputeIntervalStats.
+    num_rounds: int. The number of intervals in the measurement window.
+    max_range: float. The largest allowed range as a fraction of the mean.
+    max_slope: float. The largest allowed change of the fit as a fraction of
+      the mean.
+    ramp_time: float. Intervals ending before this many seconds are ignored.
+
+  Returns:
+    The index of the last interval of the first steady window, or None if
+    the job never became steady.
+  """
+  first = next((i for i, interval in enumerate(intervals)
+                if interval['time'] >= ramp_time), len(intervals))
+  times = np.array([interval['time'] for interval in intervals])
+  for end in xrange(first + num_rounds, len(intervals) + 1):
+    window_times = times[end - num_rounds:end]
+    for metric in ('iops', 'bw', 'lat'):
+      values = np.array([interval[metric]
+                         for interval in intervals[end - num_rounds:end]])
+      mean = values.mean()
+      slope = np.polyfit(window_times, values, 1)[0]
+      excursion = abs(slope * (window_times[-1] - window_times[0]))
+      if (values.max() - values.min() > max_range * mean or
+          excursion > max_slope * mean):
+        break
+    else:
+      return end - 1
+  return None
+
+
+def BuildSteadyStateSamples(job_name, intervals, steady_index, num_rounds,
+                            burst_threshold, metadata=None):
+  """Builds samples about how long a job took to become steady.
+
+  A job that ran faster before reaching steady state, such as on a disk
+  with burst credits, bursts until the last interval whose IOPS exceed the
+  steady state IOPS by more than 'burst_threshold'.
+
+  Args:
+    job_name: string. The name of the job.
+    intervals: list of dicts. The result of ComputeIntervalStats.
+    steady_index: int or None. The result of FindSteadyState.
+    num_rounds: int. The number of intervals in the measurement window.
+    burst_threshold: float. The fraction by which IOPS must exceed the steady
+      state IOPS to count as a burst.
+    metadata: dict. Additional metadata attaching to Sample.
+
+  Returns:
+    A list of sample.Sample objects.
+  """
+  metadata = dict(metadata or {})
+  if steady_index is None:
+    elapsed = intervals[-1]['time'] if intervals else 0
+    metadata['steady_state_reached'] = False
+    return [sample.Sample('%s:time_to_steady_state' % job_name, elapsed,
+                          'seconds', metadata)]
+  window_start = steady_index - num_rounds + 1
+  window = intervals[window_start:steady_index + 1]
+  steady_iops = np.mean([interval['iops'] for interval in window])
+  metadata.update({
+      'steady_state_reached': True,
+      'steady_state_iops': steady_iops,
+      'steady_state_bw': np.mean([interval['bw'] for interval in window]),
+      'steady_state_lat': np.mean([interval['lat'] for interval in window])})
+  # The job is steady from the start of the window.
+  steady_time = intervals[window_start - 1]['time'] if window_start else 0
+  samples = [sample.Sample('%s:time_to_steady_state' % job_name,
+                           steady_time, 'seconds', metadata)]
+  burst = [interval for interval in intervals[:window_start]
+           if interval['iops'] > steady_iops * (1 + burst_threshold)]
+  if burst:
+    burst_metadata = metadata.copy()
+    burst_metadata['burst_iops'] = max(
+        interval['iops'] for interval in burst)
+    samples.append(sample.Sample('%s:burst_credit_exhaustion' % job_name,
+                                 burst[-1]['time'], 'seconds',
+                                 burst_metadata))
+  return samples
+
+
+def _GetClatHistogram(stats):
+  """Builds a histogram of the completion latencies in fio json+ output.
+
+  Args:
+    stats: dict. The statistics of one data direction of a job.
+
+  Returns:
+    A hdr_histogram.HdrHistogram of latencies in half microseconds, or None
+    if the output doesn't include latency bins.
+  """
+  clat_key = 'clat' if 'clat' in stats else 'clat_ns'
+  bins = stats[clat_key].get('bins')
+  if not bins:
+    return None
+  counts = [(key, count) for key, count in bins.iteritems()
+            if not key.startswith('FIO_')]
+  keys = np.array([float(key) for key, _ in counts])
+  if 'FIO_IO_U_PLAT_BITS' in bins:
+    # Older versions of fio key each bin by its index.
+    values = _GetMeanBinVals(keys.astype(np.int64))
+  elif clat_key == 'clat_ns':
+    values = keys / 1000.0
+  else:
+    values = keys
+  histogram = hdr_histogram.HdrHistogram()
+  histogram.RecordValues(np.rint(values * _HIST_UNITS_PER_USEC),
+                         [count for _, count in counts])
+  return histogram
+
+
+def ParseClientServerResults(job_files, fio_json_result, base_metadata=None):
+  """Parse the results of fio in client/server mode into samples.
+
+  Args:
+    job_files: OrderedDict mapping the hostname of each fio server to the
+      contents of its job file.
+    fio_json_result: Fio results of all servers in json or json+ format.
+    base_metadata: Extra metadata to annotate the samples with.
+
+  Returns:
+    A list of sample.Sample objects. These are the samples of ParseResults
+    for each server, with the server in the 'fio_client' metadata, followed
+    by the bandwidth, IOPS and latency of each job across all servers.
+    Latency percentiles across servers require json+ output, which includes
+    the latency histograms that are merged for them.
+  """
+  jobs_by_host = collections.OrderedDict(
+      (hostname, []) for hostname in job_files)
+  for job in fio_json_result['client_stats']:
+    if job.get('hostname') in jobs_by_host:
+      jobs_by_host[job['hostname']].append(job)
+  samples = []
+  for hostname, jobs in jobs_by_host.iteritems():
+    metadata = dict(base_metadata or {}, fio_client=hostname)
+    samples += ParseResults(job_files[hostname], {'jobs': jobs}, metadata)
+
+  timestamp = time.time()
+  parameter_metadata = ParseJobFile(job_files.values()[0])
+  for job_name, parameters in parameter_metadata.iteritems():
+    parameters = dict(parameters, fio_job=job_name,
+                      fio_clients=len(jobs_by_host))
+    if base_metadata:
+      parameters.update(base_metadata)
+    for mode in DATA_DIRECTION.values():
+      stats = [job[mode] for jobs in jobs_by_host.itervalues()
+               for job in jobs
+               if job['jobname'] == job_name and job[mode]['io_bytes']]
+      if not stats:
+        continue
+      metric_name = '%s:%s' % (job_name, mode)
+      iops = sum(s['iops'] for s in stats)
+      samples.append(sample.Sample('%s:bandwidth' % metric_name,
+                                   sum(s['bw'] for s in stats), 'KB/s',
+                                   parameters, timestamp))
+      samples.append(sample.Sample('%s:iops' % metric_name, iops, '',
+                                   parameters, timestamp))
+
+      histograms = [_GetClatHistogram(s) for s in stats]
+      if None in histograms:
+        # Without histograms, only the mean latency can be combined.
+        mean_latency = sum(_GetMeanClat(s) * s['iops'] for s in stats) / iops
+        samples.append(sample.Sample('%s:latency' % metric_name,
+                                     mean_latency, 'usec', parameters,
+                                     timestamp))
+        continue
+      merged = hdr_histogram.HdrHistogram()
+      for histogram in histograms:
+        merged.Merge(histogram)
+      percentiles = merged.GetPercentiles([0] + _LATENCY_PERCENTILES + [100])
+      lat_statistics = [('min', percentiles['p0']),
+                        ('max', percentiles['p100']),
+                        ('mean', percentiles['average']),
+                        ('stddev', percentiles['stddev'])]
+      lat_statistics += [('p%s' % p, percentiles['p%s' % p])
+                         for p in _LATENCY_PERCENTILES]
+      lat_statistics = [(name, value / float(_HIST_UNITS_PER_USEC))
+                        for name, value in lat_statistics]
+      lat_metadata = parameters.copy()
+      lat_metadata.update(lat_statistics)
+      lat_metadata['histogram'] = _GetHistogramJson(merged)
+      samples.append(sample.Sample('%s:latency' % metric_name,
+                                   lat_metadata['mean'], 'usec',
+                                   lat_metadata, timestamp))
+      for stat_name, stat_val in lat_statistics:
+        samples.append(sample.Sample(
+            '%s:latency:%s' % (metric_name, stat_name), stat_val, 'usec',
+            parameters, timestamp))
+  return samples
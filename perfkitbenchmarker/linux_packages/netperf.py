@@ -18,6 +18,7 @@
 import re
 
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import package_cache
 from perfkitbenchmarker import regex_util
 from perfkitbenchmarker.data import ResourceNotFound
 from perfkitbenchmarker.linux_packages import INSTALL_DIR
@@ -46,6 +47,13 @@ def _Install(vm):
   """Installs the netperf package on the VM."""
   vm.Install('pip')
   vm.RemoteCommand('sudo pip install absl-py')
+  package_cache.InstallFromCache(
+      vm, 'netperf', [NETPERF_DIR], _Build,
+      key_parts=[FLAGS.netperf_histogram_buckets])
+
+
+def _Build(vm):
+  """Builds netperf from source on the VM."""
   vm.Install('build_tools')
   _CopyTar(vm)
   vm.RemoteCommand('cd %s && tar xvzf %s' % (INSTALL_DIR, NETPERF_TAR))
@@ -21,7 +21,8 @@ https://github.com/brianfrankcooper/YCSB
 For PerfKitBenchmarker, we wrap YCSB to:
 
   * Pre-load a database with a fixed number of records.
-  * Execute a collection of workloads under a staircase load.
+  * Execute a collection of workloads under a staircase load, or search for
+    the highest -target throughput that meets a latency SLO.
   * Parse the results into PerfKitBenchmarker samples.
 
 The 'YCSBExecutor' class handles executing YCSB on a collection of client VMs.
@@ -39,6 +40,7 @@ import bisect
 import collections
 import copy
 import csv
+import heapq
 import io
 import itertools
 import json
@@ -47,13 +49,18 @@ import math
 import operator
 import os
 import posixpath
+import Queue
 import re
+import threading
 import time
+import uuid
 
 from perfkitbenchmarker import data
 from perfkitbenchmarker import errors
 from perfkitbenchmarker import events
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import hdr_histogram
+from perfkitbenchmarker import package_cache
 from perfkitbenchmarker import sample
 from perfkitbenchmarker import vm_util
 from perfkitbenchmarker.linux_packages import INSTALL_DIR
@@ -62,9 +69,8 @@ FLAGS = flags.FLAGS
 
 YCSB_DIR = posixpath.join(INSTALL_DIR, 'ycsb')
 YCSB_EXE = posixpath.join(YCSB_DIR, 'bin', 'ycsb')
+# Directory on the client VMs where YCSB writes hdrhistogram interval logs.
 HDRHISTOGRAM_DIR = posixpath.join(INSTALL_DIR, 'hdrhistogram')
-HDRHISTOGRAM_TAR_URL = ('https://github.com/HdrHistogram/HdrHistogram/archive/'
-                        'HdrHistogram-2.1.10.tar.gz')
 HDRHISTOGRAM_GROUPS = ['READ', 'UPDATE']
 
 _DEFAULT_PERCENTILES = 50, 75, 90, 95, 99, 99.9
@@ -74,6 +80,16 @@ HDRHISTOGRAM = 'hdrhistogram'
 TIMESERIES = 'timeseries'
 YCSB_MEASUREMENT_TYPES = [HISTOGRAM, HDRHISTOGRAM, TIMESERIES]
 
+# File in the run's temp directory that records loaded shards.
+_LOAD_CHECKPOINT_FILE = 'ycsb_load_checkpoint.json'
+
+# Lines of a failed YCSB command's output included in the raised error.
+_FAILED_OUTPUT_LINES = 100
+
+# Fraction of the target throughput that clients must achieve for a target
+# search run to meet the SLO.
+_TARGET_SEARCH_MIN_THROUGHPUT_FRACTION = 0.9
+
 # Binary operators to aggregate reported statistics.
 # Statistics with operator 'None' will be dropped.
 AGGREGATE_OPERATORS = {
@@ -161,6 +177,39 @@ flags.DEFINE_float('ycsb_scanproportion',
                    'The scan proportion, '
                    'Default is 0 in workloada and 0 in YCSB.')
 
+flags.DEFINE_float('ycsb_target_search_slo_ms', None,
+                   'If set, instead of running each workload for each entry '
+                   'in --ycsb_threads_per_client once, search for the highest '
+                   'YCSB -target throughput at which the '
+                   '--ycsb_target_search_percentile latency of every '
+                   'operation is at most this many milliseconds.')
+flags.DEFINE_float('ycsb_target_search_percentile', 99,
+                   'Latency percentile that the target search SLO applies '
+                   'to, e.g. 99 or 99.9.', lower_bound=0, upper_bound=100)
+flags.DEFINE_integer('ycsb_target_search_initial_target', 1000,
+                     'Target throughput per client VM, in ops/sec, of the '
+                     'first run of the target search.', lower_bound=1)
+flags.DEFINE_integer('ycsb_target_search_max_runs', 10,
+                     'Maximum number of runs of each target search.',
+                     lower_bound=1)
+flags.DEFINE_float('ycsb_target_search_precision', 0.05,
+                   'The target search stops once the lowest target that '
+                   'missed the SLO is within this fraction of the highest '
+                   'target that met it.', lower_bound=0)
+
+flags.DEFINE_integer('ycsb_load_shards', None,
+                     'Number of ranges to split the keyspace into during the '
+                     'load stage. Defaults to one per load process, i.e. '
+                     '--ycsb_load_processes_per_vm per client VM. More shards '
+                     'than load processes are loaded as processes become '
+                     'free, and report their own throughput.', lower_bound=1)
+flags.DEFINE_integer('ycsb_load_processes_per_vm', 1,
+                     'Number of YCSB processes to run on each client VM '
+                     'during the load stage.', lower_bound=1)
+flags.DEFINE_boolean('ycsb_load_resume', True,
+                     'Skip load shards that an earlier, interrupted prepare '
+                     'stage of this run already loaded.')
+
 # Default loading thread count for non-batching backends.
 DEFAULT_PRELOAD_THREADS = 32
 
@@ -202,12 +251,23 @@ def CheckPrerequisites():
     if _GetVersionIndex(FLAGS.ycsb_version) < 11:
       raise errors.Config.InvalidValue('hdrhistogram not supported on earlier '
                                        'ycsb versions.')
+  if (FLAGS.ycsb_target_search_slo_ms and
+      FLAGS.ycsb_measurement_type == TIMESERIES):
+    raise errors.Config.InvalidValue(
+        '--ycsb_target_search_slo_ms requires latency histograms, but '
+        '--ycsb_measurement_type is timeseries.')
 
 
 def _Install(vm):
-  """Installs the YCSB and, if needed, hdrhistogram package on the VM."""
+  """Installs the YCSB package on the VM."""
   vm.Install('openjdk')
   vm.Install('curl')
+  package_cache.InstallFromCache(vm, 'ycsb', [YCSB_DIR], _Build,
+                                 key_parts=[FLAGS.ycsb_version])
+
+
+def _Build(vm):
+  """Downloads YCSB on the VM."""
   ycsb_url = ('https://github.com/flint-dominic/python_scripts/releases/'
               'download/0.01/ycsb-0.16.0.tar.gz')
   # ycsb_url = ('https://github.com/brianfrankcooper/YCSB/releases/'
@@ -215,15 +275,6 @@ def _Install(vm):
   install_cmd = ('mkdir -p {0} && curl -L {1} | '
                  'tar -C {0} --strip-components=1 -xzf -')
   vm.RemoteCommand(install_cmd.format(YCSB_DIR, ycsb_url))
-  if _GetVersionIndex(FLAGS.ycsb_version) >= 11:
-    vm.RemoteCommand(install_cmd.format(HDRHISTOGRAM_DIR, HDRHISTOGRAM_TAR_URL))
-    vm.RemoteCommand('sudo apt-get --assume-yes install maven > /dev/null 2>&1')
-    # _JAVA_OPTIONS needed to work around this issue:
-    # https://stackoverflow.com/questions/53010200/maven-surefire-could-not-find-forkedbooter-class
-    vm.RemoteCommand('cd {0}; _JAVA_OPTIONS=-Djdk.net.URLClassPath.'
-                     'disableClassPathURLCheck=true  '
-                     'mvn install > /dev/null 2>&1'.format(
-        HDRHISTOGRAM_DIR))
 
 
 def YumInstall(vm):
@@ -331,12 +382,27 @@ def ParseResults(ycsb_result_string, data_type='histogram'):
   Raises:
     IOError: If the results contained unexpected lines.
   """
+  return ParseResultLines(io.BytesIO(ycsb_result_string), data_type)
+
+
+def ParseResultLines(result_lines, data_type='histogram'):
+  """Parses YCSB output one line at a time, e.g. from an open file.
+
+  Args:
+    result_lines: Iterable of lines of text output from YCSB.
+    data_type: Either 'histogram' or 'timeseries' or 'hdrhistogram'.
+
+  Returns:
+    A dictionary, as returned by ParseResults.
+  Raises:
+    IOError: If the results contained unexpected lines.
+  """
   # TODO: YCSB 0.9.0 output client and command line string to stderr, so
   # we need to support it in the future.
   lines = []
   client_string = 'YCSB'
   command_line = 'unknown'
-  fp = io.BytesIO(ycsb_result_string)
+  fp = iter(result_lines)
   result_string = next(fp).strip()
 
   def IsHeadOfResults(line):
@@ -435,40 +501,71 @@ def ParseHdrLogFile(logfile):
   Returns:
     List of (percent, value, count) tuples
   """
-  result = []
-  last_percent_value = -1
-  prev_total_count = 0
+  rows = []
   for row in logfile.split('\n'):
     if re.match(r'( *)(\d|\.)( *)', row):
       row_vals = row.split()
-      # convert percentile to 100 based and round up to 3 decimal places
-      percentile = math.floor(float(row_vals[1]) * 100000) / 1000.0
-      current_total_count = int(row_vals[2])
-      if (percentile > last_percent_value and
-          current_total_count > prev_total_count):
-        # convert latency to millisec based and percentile to 100 based.
-        latency = float(row_vals[0]) / 1000
-        count = current_total_count - prev_total_count
-        result.append((percentile, latency, count))
-        last_percent_value = percentile
-        prev_total_count = current_total_count
+      rows.append((float(row_vals[0]), float(row_vals[1]), int(row_vals[2])))
+  return _ParseHdrPercentileRows(rows)
+
+
+def ParseHdrHistogram(histogram):
+  """Parse an HdrHistogram into a list of (percentile, latency, count).
+
+  The percentiles are those HistogramLogProcessor would print for the
+  histogram, so the result matches ParseHdrLogFile of its output.
+
+  Args:
+    histogram: hdr_histogram.HdrHistogram of latencies in microseconds.
+
+  Returns:
+    List of (percent, value, count) tuples
+  """
+  return _ParseHdrPercentileRows(
+      (value, round(percentile / 100, 12), total_count)
+      for value, percentile, total_count
+      in histogram.GetPercentileDistribution())
+
+
+def _ParseHdrPercentileRows(rows):
+  """Converts cumulative percentile rows into (percentile, latency, count).
+
+  Args:
+    rows: Iterable of (latency in microseconds, percentile from 0 to 1,
+      total count) tuples, in increasing order.
+
+  Returns:
+    List of (percent, value, count) tuples
+  """
+  result = []
+  last_percent_value = -1
+  prev_total_count = 0
+  for value, percentile, current_total_count in rows:
+    # convert percentile to 100 based and round up to 3 decimal places
+    percentile = math.floor(percentile * 100000) / 1000.0
+    if (percentile > last_percent_value and
+        current_total_count > prev_total_count):
+      # convert latency to millisec based.
+      latency = float(value) / 1000
+      count = current_total_count - prev_total_count
+      result.append((percentile, latency, count))
+      last_percent_value = percentile
+      prev_total_count = current_total_count
   return result
 
 
-def ParseHdrLogs(hdrlogs):
-  """Parse a dict of group to hdr logs into a dict of group to histogram tuples.
+def ParseHdrHistograms(histograms):
+  """Parse a dict of group to HdrHistogram into a dict of histogram tuples.
 
   Args:
-    hdrlogs: Dict of group (read or update) to hdr logs for that group.
+    histograms: Dict of group (read or update) to the HdrHistogram for that
+      group.
 
   Returns:
     Dict of group to histogram tuples of reportable percentile values.
   """
-  parsed_hdr_histograms = {}
-  for group, logfile in hdrlogs.iteritems():
-    values = ParseHdrLogFile(logfile)
-    parsed_hdr_histograms[group] = values
-  return parsed_hdr_histograms
+  return {group: ParseHdrHistogram(histogram)
+          for group, histogram in histograms.iteritems()}
 
 
 def _CumulativeSum(xs):
@@ -539,12 +636,90 @@ def _PercentilesFromHistogram(ycsb_histogram, percentiles=_DEFAULT_PERCENTILES):
   return result
 
 
+def _ReadLoadCheckpoint(path, key):
+  """Returns the shards recorded as loaded in a load checkpoint file.
+
+  Args:
+    path: str. Path of the checkpoint file.
+    key: dict. Only entries with these items, which describe the load, are
+      read.
+
+  Returns:
+    A set of shard indices.
+  """
+  if not os.path.exists(path):
+    return set()
+  shards = set()
+  with open(path) as fp:
+    for line in fp:
+      try:
+        entry = json.loads(line)
+      except ValueError:
+        # A line may be truncated if PKB was killed while writing it.
+        continue
+      if all(entry.get(k) == v for k, v in key.iteritems()):
+        shards.add(entry['shard'])
+  return shards
+
+
+def _AppendLoadCheckpoint(path, entry):
+  """Records a loaded shard in a load checkpoint file."""
+  with open(path, 'a') as fp:
+    fp.write(json.dumps(entry) + '\n')
+    fp.flush()
+    os.fsync(fp.fileno())
+
+
+def _GetLatencyPercentile(ycsb_result, percentile):
+  """Returns the highest latency percentile of any operation in a result.
+
+  Args:
+    ycsb_result: dict. Result of ParseResults or _CombineResults.
+    percentile: float. Percentile in the interval [0, 100].
+
+  Returns:
+    The latency in ms, or None if the result has no latency histograms.
+  """
+  latencies = []
+  for group in ycsb_result['groups'].itervalues():
+    if group.get(HISTOGRAM):
+      histogram = group[HISTOGRAM]
+    elif group.get(HDRHISTOGRAM):
+      histogram = [value_count[-2:] for value_count in group[HDRHISTOGRAM]]
+    else:
+      continue
+    latencies.extend(
+        _PercentilesFromHistogram(histogram, [percentile]).values())
+  return max(latencies) if latencies else None
+
+
+def _NextSearchTarget(highest_passing, lowest_failing):
+  """Returns the next target throughput of a target search.
+
+  Args:
+    highest_passing: int. Highest target that met the SLO, or None.
+    lowest_failing: int. Lowest target that did not meet the SLO, or None.
+
+  Returns:
+    The next target, or None if there is no untried target between
+    'highest_passing' and 'lowest_failing'.
+  """
+  if lowest_failing is None:
+    return highest_passing * 2
+  target = ((highest_passing or 0) + lowest_failing) // 2
+  if target < 1 or target in (highest_passing, lowest_failing):
+    return None
+  return target
+
+
 def _CombineResults(result_list, measurement_type, combined_hdr):
   """Combine results from multiple YCSB clients.
 
   Reduces a list of YCSB results (the output of ParseResults)
   into a single result. Histogram bin counts, operation counts, and throughput
   are summed; RunTime is replaced by the maximum runtime of any result.
+  Histograms and timeseries of all results are combined in a single k-way
+  merge, and the input results are not modified.
 
   Args:
     result_list: List of ParseResults outputs.
@@ -555,118 +730,105 @@ def _CombineResults(result_list, measurement_type, combined_hdr):
   Returns:
     A dictionary, as returned by ParseResults.
   """
-  def DropUnaggregated(result):
-    """Remove statistics which 'operators' specify should not be combined."""
-    drop_keys = {k for k, v in AGGREGATE_OPERATORS.iteritems() if v is None}
-    for group in result['groups'].itervalues():
-      for k in drop_keys:
-        group['statistics'].pop(k, None)
-
-  def CombineHistograms(hist1, hist2):
-    h1 = dict(hist1)
-    h2 = dict(hist2)
-    keys = sorted(frozenset(h1) | frozenset(h2))
-    result = []
-    for k in keys:
-      result.append((k, h1.get(k, 0) + h2.get(k, 0)))
+  def CombineStatistics(group_name, statistics_list):
+    """Combines the statistics of one group from each result.
+
+    Statistics are combined with AGGREGATE_OPERATORS. If no combining operator
+    is defined, the statistic is skipped, and if the operator is None, it is
+    dropped.
+    """
+    result = {k: copy.deepcopy(v)
+              for k, v in statistics_list[0].iteritems()
+              if k not in AGGREGATE_OPERATORS or
+              AGGREGATE_OPERATORS[k] is not None}
+    for statistics in statistics_list[1:]:
+      for k, v in statistics.iteritems():
+        if k not in AGGREGATE_OPERATORS:
+          logging.warn('No operator for "%s". Skipping aggregation.', k)
+          continue
+        elif AGGREGATE_OPERATORS[k] is None:  # Drop
+          continue
+        elif k not in result:
+          logging.warn('Found statistic "%s.%s" in individual YCSB result, '
+                       'but not in accumulator.', group_name, k)
+          result[k] = copy.deepcopy(v)
+          continue
+        result[k] = AGGREGATE_OPERATORS[k](result[k], v)
     return result
 
-  def CombineTimeseries(combined_series, individual_series, combined_weight):
-    """Combines two timeseries of average latencies.
+  def CombineHistograms(histograms):
+    """Sums bucket counts with a k-way merge of the sorted histograms."""
+    merged = heapq.merge(*[sorted(histogram) for histogram in histograms])
+    return [(k, sum(count for _, count in buckets))
+            for k, buckets in itertools.groupby(merged, operator.itemgetter(0))]
+
+  def CombineTimeseries(series_list):
+    """Combines timeseries of average latencies.
 
     Args:
-      combined_series: A list representing the timeseries with which the
-          individual series is being merged.
-      individual_series: A list representing the timeseries being merged with
-          the combined series.
-      combined_weight: The number of individual series that the combined series
-          represents. This is needed to correctly weight the average latencies.
+      series_list: A list of timeseries, each a list of (timestamp, average
+          latency) tuples.
 
     Returns:
-      A list representing the new combined series.
+      A list representing the combined series.
 
     Note that this assumes that each individual timeseries spent an equal
     amount of time executing requests for each timeslice. This should hold for
     runs without -target where each client has an equal number of threads, but
     may not hold otherwise.
     """
-    combined_series = dict(combined_series)
-    individual_series = dict(individual_series)
-
+    if len(series_list) == 1:
+      return list(series_list[0])
+    merged = heapq.merge(*[sorted(series) for series in series_list])
     result = []
-    for timestamp in sorted(combined_series):
-      if timestamp not in individual_series:
+    for timestamp, points in itertools.groupby(merged,
+                                               operator.itemgetter(0)):
+      latencies = [latency for _, latency in points]
+      if len(latencies) < len(series_list):
         # The combined timeseries will not contain a timestamp unless all
         # individual series also contain that timestamp. This should only
         # happen if the clients run for different amounts of time such as
         # during loading and should be limited to timestamps at the end of the
         # run.
         continue
-      # This computes a new combined average latency by dividing the sum of
+      # This computes a combined average latency by dividing the sum of
       # request latencies by the sum of request counts for the time period.
-      # The sum of latencies for an individual series is assumed to be "1",
-      # so the sum of latencies for the combined series is the total number of
-      # series i.e. "combined_weight".
-      # The request count for an individual series is 1 / average latency.
-      # This means the request count for the combined series is
-      # combined_weight * 1 / average latency.
-      average_latency = (combined_weight + 1.0) / (
-          (combined_weight / combined_series[timestamp]) +
-          (1.0 / individual_series[timestamp]))
+      # The sum of latencies for each series is assumed to be "1", so the
+      # request count for a series is 1 / average latency.
+      average_latency = len(latencies) / sum(1.0 / latency
+                                             for latency in latencies)
       result.append((timestamp, average_latency))
     return result
 
-  result = copy.deepcopy(result_list[0])
-  DropUnaggregated(result)
-
-  # Used for aggregating timeseries. See CombineTimeseries().
-  series_weight = 0.0
-  for indiv in result_list[1:]:
-    series_weight += 1.0
+  groups_by_name = collections.OrderedDict()
+  for indiv in result_list:
     for group_name, group in indiv['groups'].iteritems():
-      if group_name not in result['groups']:
+      if group_name not in groups_by_name and indiv is not result_list[0]:
         logging.warn('Found result group "%s" in individual YCSB result, '
                      'but not in accumulator.', group_name)
-        result['groups'][group_name] = copy.deepcopy(group)
-        continue
-
-      # Combine reported statistics.
-      # If no combining operator is defined, the statistic is skipped.
-      # Otherwise, the aggregated value is either:
-      # * The value in 'indiv', if the statistic is not present in 'result' or
-      # * AGGREGATE_OPERATORS[statistic](result_value, indiv_value)
-      for k, v in group['statistics'].iteritems():
-        if k not in AGGREGATE_OPERATORS:
-          logging.warn('No operator for "%s". Skipping aggregation.', k)
-          continue
-        elif AGGREGATE_OPERATORS[k] is None:  # Drop
-          result['groups'][group_name]['statistics'].pop(k, None)
-          continue
-        elif k not in result['groups'][group_name]['statistics']:
-          logging.warn('Found statistic "%s.%s" in individual YCSB result, '
-                       'but not in accumulator.', group_name, k)
-          result['groups'][group_name]['statistics'][k] = copy.deepcopy(v)
-          continue
-
-        op = AGGREGATE_OPERATORS[k]
-        result['groups'][group_name]['statistics'][k] = (
-            op(result['groups'][group_name]['statistics'][k], v))
-
-      if measurement_type == HISTOGRAM:
-        result['groups'][group_name][HISTOGRAM] = CombineHistograms(
-            result['groups'][group_name][HISTOGRAM],
-            group[HISTOGRAM])
-      elif measurement_type == TIMESERIES:
-        result['groups'][group_name][TIMESERIES] = CombineTimeseries(
-            result['groups'][group_name][TIMESERIES],
-            group[TIMESERIES], series_weight)
-      else:
-        result['groups'][group_name].pop(HISTOGRAM, None)
-    result['client'] = ' '.join((result['client'], indiv['client']))
-    result['command_line'] = ';'.join((result['command_line'],
-                                       indiv['command_line']))
-    if 'target' in result and 'target' in indiv:
-      result['target'] += indiv['target']
+      groups_by_name.setdefault(group_name, []).append(group)
+
+  result = copy.copy(result_list[0])
+  result['groups'] = collections.OrderedDict()
+  for group_name, groups in groups_by_name.iteritems():
+    combined_group = dict(groups[0])
+    combined_group['statistics'] = CombineStatistics(
+        group_name, [group['statistics'] for group in groups])
+    if measurement_type == HISTOGRAM:
+      combined_group[HISTOGRAM] = CombineHistograms(
+          [group.get(HISTOGRAM, []) for group in groups])
+    elif measurement_type == TIMESERIES:
+      combined_group[TIMESERIES] = CombineTimeseries(
+          [group.get(TIMESERIES, []) for group in groups])
+    elif len(result_list) > 1:
+      combined_group.pop(HISTOGRAM, None)
+    result['groups'][group_name] = combined_group
+  result['client'] = ' '.join(indiv['client'] for indiv in result_list)
+  result['command_line'] = ';'.join(indiv['command_line']
+                                    for indiv in result_list)
+  if 'target' in result:
+    result['target'] = sum(indiv['target'] for indiv in result_list
+                           if 'target' in indiv)
 
   if measurement_type == HDRHISTOGRAM:
     for group_name in combined_hdr:
@@ -858,12 +1020,59 @@ class YCSBExecutor(object):
       param, value = pv.split('=', 1)
       kwargs[param] = value
     command = self._BuildCommand('load', **kwargs)
-    stdout, stderr = vm.RobustRemoteCommand(command)
-    return ParseResults(str(stderr + stdout), self.measurement_type)
+    return self._RunCommandAndParseResults(vm, command)
+
+  def _RunCommandAndParseResults(self, vm, command):
+    """Runs a YCSB command on 'vm' and parses its output.
+
+    The output is written to files on the VM and copied to the local temp
+    directory, so it is parsed as a stream rather than held in memory.
+
+    Args:
+      vm: VirtualMachine to run the command on.
+      command: str. The YCSB command, as returned by _BuildCommand.
+
+    Returns:
+      A dictionary, as returned by ParseResults.
+
+    Raises:
+      RemoteCommandError: If the command fails. The error includes the end of
+          the command's stdout and stderr.
+    """
+    output_base = 'ycsb_output_%s' % uuid.uuid4().hex
+    remote_base = posixpath.join(vm_util.VM_TMP_DIR, output_base)
+    try:
+      vm.RobustRemoteCommand('{0} > {1}.stdout 2> {1}.stderr'.format(
+          command, remote_base))
+    except errors.VirtualMachine.RemoteCommandError as e:
+      tail_command = ('tail -n {0} {1}.stdout {1}.stderr; '
+                      'rm -f {1}.stdout {1}.stderr').format(
+                          _FAILED_OUTPUT_LINES, remote_base)
+      output, _ = vm.RemoteCommand(tail_command, ignore_failure=True)
+      raise errors.VirtualMachine.RemoteCommandError(
+          '%s\nYCSB output:\n%s' % (e, output))
+    local_paths = []
+    for suffix in ('.stderr', '.stdout'):
+      vm.PullFile(vm_util.GetTempDir(), remote_base + suffix)
+      local_paths.append(vm_util.PrependTempDir(output_base + suffix))
+    vm.RemoteCommand('rm -f {0}.stdout {0}.stderr'.format(remote_base))
+    # YCSB version greater than 0.7.0 output some of the
+    # info we need to stderr. So we have to combine these 2
+    # output to get expected results.
+    with open(local_paths[0]) as stderr, open(local_paths[1]) as stdout:
+      return ParseResultLines(itertools.chain(stderr, stdout),
+                              self.measurement_type)
 
   def _LoadThreaded(self, vms, workload_file, **kwargs):
     """Runs "Load" in parallel for each VM in VMs.
 
+    The keyspace is split into --ycsb_load_shards ranges, by default one per
+    load process. Each VM runs --ycsb_load_processes_per_vm YCSB processes,
+    which take shards from a shared queue until all are loaded. Completed
+    shards are recorded in a checkpoint file in the run's temp directory, so
+    that an interrupted load resumes with the remaining shards when the
+    prepare stage is rerun.
+
     Args:
       vms: List of virtual machine instances. client nodes.
       workload_file: YCSB Workload file to use.
@@ -872,7 +1081,7 @@ class YCSBExecutor(object):
     Returns:
       List of sample.Sample objects.
     Raises:
-      IOError: If number of results is not equal to the number of VMs.
+      IOError: If number of results is not equal to the number of shards.
     """
     results = []
 
@@ -886,19 +1095,26 @@ class YCSBExecutor(object):
     if FLAGS.ycsb_field_length:
       kwargs.setdefault('fieldlength', FLAGS.ycsb_field_length)
 
+    num_workers = len(vms) * FLAGS.ycsb_load_processes_per_vm
+    num_shards = FLAGS.ycsb_load_shards or num_workers
+    # Workers beyond the number of shards have nothing to load.
+    num_active_workers = min(num_workers, num_shards)
+
     with open(workload_file) as fp:
       workload_meta = _ParseWorkload(fp.read())
       workload_meta.update(kwargs)
+      threads_per_client_vm = (kwargs['threads'] *
+                               -(-num_active_workers // len(vms)))
       workload_meta.update(stage='load',
-                           clients=len(vms) * kwargs['threads'],
-                           threads_per_client_vm=kwargs['threads'],
+                           clients=num_active_workers * kwargs['threads'],
+                           threads_per_client_vm=threads_per_client_vm,
                            workload_name=os.path.basename(workload_file))
       self.workload_meta = workload_meta
     record_count = int(workload_meta.get('recordcount', '1000'))
-    n_per_client = long(record_count) // len(vms)
-    loader_counts = [n_per_client +
-                     (1 if i < (record_count % len(vms)) else 0)
-                     for i in xrange(len(vms))]
+    n_per_shard = long(record_count) // num_shards
+    shard_counts = [n_per_shard +
+                    (1 if i < (record_count % num_shards) else 0)
+                    for i in xrange(num_shards)]
 
     def PushWorkload(vm):
       vm.PushFile(workload_file, remote_path)
@@ -906,25 +1122,81 @@ class YCSBExecutor(object):
 
     kwargs['parameter_files'] = [remote_path]
 
-    def _Load(loader_index):
-      start = sum(loader_counts[:loader_index])
+    checkpoint_key = {'workload_name': workload_meta['workload_name'],
+                      'recordcount': record_count,
+                      'shards': num_shards}
+    checkpoint_path = vm_util.PrependTempDir(_LOAD_CHECKPOINT_FILE)
+    completed_shards = set()
+    if FLAGS.ycsb_load_resume:
+      completed_shards = _ReadLoadCheckpoint(checkpoint_path, checkpoint_key)
+      if completed_shards:
+        logging.info('Resuming YCSB load: %d of %d shards already loaded.',
+                     len(completed_shards), num_shards)
+    checkpoint_lock = threading.Lock()
+
+    # Worker i runs on VM i % len(vms). Each worker first loads the shard with
+    # its own index, so that without extra shards or processes, shard i is
+    # loaded by VM i, then takes shards from the queue.
+    shard_queue = Queue.Queue()
+    for shard_index in xrange(num_workers, num_shards):
+      if shard_index not in completed_shards:
+        shard_queue.put(shard_index)
+    shard_samples = []
+
+    def _LoadShard(worker_index, shard_index):
+      loader_index = worker_index % len(vms)
+      start = sum(shard_counts[:shard_index])
       kw = copy.deepcopy(kwargs)
       kw.update(insertstart=start,
-                insertcount=loader_counts[loader_index])
+                insertcount=shard_counts[shard_index])
       if self.perclientparam is not None:
         kw.update(self.perclientparam[loader_index])
-      results.append(self._Load(vms[loader_index], **kw))
-      logging.info('VM %d (%s) finished', loader_index, vms[loader_index])
+      result = self._Load(vms[loader_index], **kw)
+      results.append(result)
+      throughput = result['groups']['overall']['statistics'].get(
+          'Throughput(ops/sec)')
+      with checkpoint_lock:
+        entry = dict(checkpoint_key, shard=shard_index)
+        _AppendLoadCheckpoint(checkpoint_path, entry)
+      if FLAGS.ycsb_load_shards and throughput is not None:
+        shard_meta = workload_meta.copy()
+        shard_meta.update(shard=shard_index, insertstart=start,
+                          insertcount=shard_counts[shard_index],
+                          loader_index=loader_index)
+        shard_samples.append(sample.Sample(
+            'Load shard throughput', throughput, 'ops/sec', shard_meta))
+      logging.info('VM %d (%s) finished shard %d', loader_index,
+                   vms[loader_index], shard_index)
+
+    def _Load(worker_index):
+      if (worker_index < num_shards and
+          worker_index not in completed_shards):
+        _LoadShard(worker_index, worker_index)
+      while True:
+        try:
+          shard_index = shard_queue.get_nowait()
+        except Queue.Empty:
+          return
+        _LoadShard(worker_index, shard_index)
 
     start = time.time()
-    vm_util.RunThreaded(_Load, range(len(vms)))
+    vm_util.RunThreaded(_Load, range(num_workers))
+    elapsed = time.time() - start
     events.record_event.send(
         type(self).__name__, event='load', start_timestamp=start,
         end_timestamp=time.time(), metadata=copy.deepcopy(kwargs))
 
-    if len(results) != len(vms):
+    num_loaded = num_shards - len(completed_shards)
+    if len(results) != num_loaded:
       raise IOError('Missing results: only {0}/{1} reported\n{2}'.format(
-          len(results), len(vms), results))
+          len(results), num_loaded, results))
+    if os.path.exists(checkpoint_path):
+      os.remove(checkpoint_path)
+    if not results:
+      logging.info('All YCSB load shards were already loaded.')
+      return []
+    if completed_shards:
+      workload_meta['resumed_shards'] = len(completed_shards)
 
     samples = []
     if FLAGS.ycsb_include_individual_results and len(results) > 1:
@@ -936,10 +1208,20 @@ class YCSBExecutor(object):
 
     # hdr histograms not collected upon load, only upon run
     combined = _CombineResults(results, self.measurement_type, {})
+    if num_shards > num_workers or completed_shards:
+      # Shards loaded one after another by the same process don't add to
+      # the throughput, so report the throughput of the whole load.
+      overall = combined['groups']['overall']['statistics']
+      operations = sum(group['statistics'].get('Operations', 0)
+                       for name, group in combined['groups'].iteritems()
+                       if name != 'overall')
+      overall['RunTime(ms)'] = elapsed * 1000
+      overall['Throughput(ops/sec)'] = operations / elapsed
     samples.extend(_CreateSamples(
         combined, result_type='combined',
         include_histogram=FLAGS.ycsb_histogram,
         **workload_meta))
+    samples.extend(shard_samples)
 
     return samples
 
@@ -949,14 +1231,10 @@ class YCSBExecutor(object):
       param, value = pv.split('=', 1)
       kwargs[param] = value
     command = self._BuildCommand('run', **kwargs)
-    # YCSB version greater than 0.7.0 output some of the
-    # info we need to stderr. So we have to combine these 2
-    # output to get expected results.
     hdr_files_dir = kwargs.get('hdrhistogram.output.path', None)
     if hdr_files_dir:
       vm.RemoteCommand('mkdir -p {0}'.format(hdr_files_dir))
-    stdout, stderr = vm.RobustRemoteCommand(command)
-    return ParseResults(str(stderr + stdout), self.measurement_type)
+    return self._RunCommandAndParseResults(vm, command)
 
   def _RunThreaded(self, vms, **kwargs):
     """Run a single workload using `vms`."""
@@ -1000,6 +1278,108 @@ class YCSBExecutor(object):
 
     return results
 
+  def _PrepareWorkload(self, vms, workload_index, workload_file, **kwargs):
+    """Pushes a workload file to 'vms' and builds the parameters to run it.
+
+    Args:
+      vms: List of VirtualMachine objects to generate load from.
+      workload_index: int. Index of the workload in the list of workloads.
+      workload_file: Workload file name.
+      **kwargs: Additional parameters to pass to each run.
+
+    Returns:
+      A tuple of the dict of parameters for _RunThreaded and the dict of
+      workload metadata.
+    """
+    parameters = {}
+    if FLAGS.ycsb_operation_count:
+      parameters = {'operationcount': FLAGS.ycsb_operation_count}
+    if FLAGS.ycsb_record_count:
+      parameters['recordcount'] = FLAGS.ycsb_record_count
+    if FLAGS.ycsb_field_count:
+      parameters['fieldcount'] = FLAGS.ycsb_field_count
+    if FLAGS.ycsb_field_length:
+      parameters['fieldlength'] = FLAGS.ycsb_field_length
+    if FLAGS.ycsb_timelimit:
+      parameters['maxexecutiontime'] = FLAGS.ycsb_timelimit
+    hdr_files_dir = posixpath.join(self.hdr_dir, str(workload_index))
+    if FLAGS.ycsb_measurement_type == HDRHISTOGRAM:
+      parameters['hdrhistogram.fileoutput'] = True
+      parameters['hdrhistogram.output.path'] = hdr_files_dir
+    if FLAGS.ycsb_requestdistribution:
+      parameters['requestdistribution'] = FLAGS.ycsb_requestdistribution
+    if FLAGS.ycsb_readproportion:
+      parameters['readproportion'] = FLAGS.ycsb_readproportion
+    if FLAGS.ycsb_updateproportion:
+      parameters['updateproportion'] = FLAGS.ycsb_updateproportion
+    if FLAGS.ycsb_scanproportion:
+      parameters['scanproportion'] = FLAGS.ycsb_scanproportion
+    parameters.update(kwargs)
+    remote_path = posixpath.join(INSTALL_DIR,
+                                 os.path.basename(workload_file))
+
+    with open(workload_file) as fp:
+      workload_meta = _ParseWorkload(fp.read())
+      workload_meta.update(kwargs)
+      workload_meta.update(workload_name=os.path.basename(workload_file),
+                           workload_index=workload_index,
+                           stage='run')
+
+    def PushWorkload(vm, workload_file, remote_path):
+      vm.RemoteCommand('sudo rm -f ' + remote_path)
+      vm.PushFile(workload_file, remote_path)
+    vm_util.RunThreaded(PushWorkload, [((vm, workload_file, remote_path), {})
+                                       for vm in vms])
+
+    parameters['parameter_files'] = [remote_path]
+    return parameters, workload_meta
+
+  def _RunWorkload(self, vms, parameters, workload_meta):
+    """Runs a prepared workload once on 'vms'.
+
+    Args:
+      vms: List of VirtualMachine objects to generate load from.
+      parameters: dict. Parameters for _RunThreaded, including 'threads'.
+      workload_meta: dict. Workload metadata, as returned by _PrepareWorkload.
+
+    Returns:
+      A tuple of the list of sample.Sample objects and the combined result of
+      all clients, as returned by _CombineResults.
+    """
+    samples = []
+    client_count = parameters['threads']
+    start = time.time()
+    results = self._RunThreaded(vms, **parameters)
+    events.record_event.send(
+        type(self).__name__, event='run', start_timestamp=start,
+        end_timestamp=time.time(), metadata=copy.deepcopy(parameters))
+    client_meta = workload_meta.copy()
+    client_meta.update(parameters)
+    client_meta.update(clients=len(vms) * client_count,
+                       threads_per_client_vm=client_count)
+
+    if FLAGS.ycsb_include_individual_results and len(results) > 1:
+      for i, result in enumerate(results):
+        samples.extend(_CreateSamples(
+            result,
+            result_type='individual',
+            result_index=i,
+            include_histogram=FLAGS.ycsb_histogram,
+            **client_meta))
+
+    if self.measurement_type == HDRHISTOGRAM:
+      combined_hdr = self.CombineHdrHistogramLogFiles(
+          parameters['hdrhistogram.output.path'], vms)
+      parsed_hdr = ParseHdrHistograms(combined_hdr)
+      combined = _CombineResults(results, self.measurement_type, parsed_hdr)
+    else:
+      combined = _CombineResults(results, self.measurement_type, {})
+    samples.extend(_CreateSamples(
+        combined, result_type='combined',
+        include_histogram=FLAGS.ycsb_histogram,
+        **client_meta))
+    return samples, combined
+
   def RunStaircaseLoads(self, vms, workloads, **kwargs):
     """Run each workload in 'workloads' in succession.
 
@@ -1016,114 +1396,128 @@ class YCSBExecutor(object):
       List of sample.Sample objects.
     """
     all_results = []
-    parameters = {}
     for workload_index, workload_file in enumerate(workloads):
-      if FLAGS.ycsb_operation_count:
-        parameters = {'operationcount': FLAGS.ycsb_operation_count}
-      if FLAGS.ycsb_record_count:
-        parameters['recordcount'] = FLAGS.ycsb_record_count
-      if FLAGS.ycsb_field_count:
-        parameters['fieldcount'] = FLAGS.ycsb_field_count
-      if FLAGS.ycsb_field_length:
-        parameters['fieldlength'] = FLAGS.ycsb_field_length
-      if FLAGS.ycsb_timelimit:
-        parameters['maxexecutiontime'] = FLAGS.ycsb_timelimit
-      hdr_files_dir = posixpath.join(self.hdr_dir, str(workload_index))
-      if FLAGS.ycsb_measurement_type == HDRHISTOGRAM:
-        parameters['hdrhistogram.fileoutput'] = True
-        parameters['hdrhistogram.output.path'] = hdr_files_dir
-      if FLAGS.ycsb_requestdistribution:
-        parameters['requestdistribution'] = FLAGS.ycsb_requestdistribution
-      if FLAGS.ycsb_readproportion:
-        parameters['readproportion'] = FLAGS.ycsb_readproportion
-      if FLAGS.ycsb_updateproportion:
-        parameters['updateproportion'] = FLAGS.ycsb_updateproportion
-      if FLAGS.ycsb_scanproportion:
-        parameters['scanproportion'] = FLAGS.ycsb_scanproportion
-      parameters.update(kwargs)
-      remote_path = posixpath.join(INSTALL_DIR,
-                                   os.path.basename(workload_file))
-
-      with open(workload_file) as fp:
-        workload_meta = _ParseWorkload(fp.read())
-        workload_meta.update(kwargs)
-        workload_meta.update(workload_name=os.path.basename(workload_file),
-                             workload_index=workload_index,
-                             stage='run')
-
-      def PushWorkload(vm, workload_file, remote_path):
-        vm.RemoteCommand('sudo rm -f ' + remote_path)
-        vm.PushFile(workload_file, remote_path)
-      vm_util.RunThreaded(PushWorkload, [((vm, workload_file, remote_path), {})
-                                         for vm in vms])
-
-      parameters['parameter_files'] = [remote_path]
+      parameters, workload_meta = self._PrepareWorkload(
+          vms, workload_index, workload_file, **kwargs)
+      for client_count in _GetThreadsPerLoaderList():
+        parameters['threads'] = client_count
+        samples, _ = self._RunWorkload(vms, parameters, workload_meta)
+        all_results.extend(samples)
+
+    return all_results
+
+  def RunTargetSearch(self, vms, workloads, **kwargs):
+    """Searches for the highest throughput each workload sustains in an SLO.
+
+    For each workload file and each entry in ycsb_threads_per_client, YCSB is
+    run with a -target throughput per client VM that starts at
+    --ycsb_target_search_initial_target and doubles while the SLO is met, and
+    is then bisected between the highest passing and lowest failing targets.
+    A run meets the SLO if the --ycsb_target_search_percentile latency of
+    every operation is at most --ycsb_target_search_slo_ms and the clients
+    achieve most of the target throughput.
+
+    Args:
+      vms: List of VirtualMachine objects to generate load from.
+      workloads: List of workload file names.
+      **kwargs: Additional parameters to pass to each run.  See constructor for
+      options.
+
+    Returns:
+      List of sample.Sample objects. These are the samples of each run, a
+      'Target search latency' sample per run, which together form a
+      throughput-vs-latency curve, and a 'Max sustainable throughput' sample
+      per workload and thread count.
+    """
+    percentile = FLAGS.ycsb_target_search_percentile
+    slo_ms = FLAGS.ycsb_target_search_slo_ms
+    all_results = []
+    for workload_index, workload_file in enumerate(workloads):
+      parameters, workload_meta = self._PrepareWorkload(
+          vms, workload_index, workload_file, **kwargs)
       for client_count in _GetThreadsPerLoaderList():
         parameters['threads'] = client_count
-        start = time.time()
-        results = self._RunThreaded(vms, **parameters)
-        events.record_event.send(
-            type(self).__name__, event='run', start_timestamp=start,
-            end_timestamp=time.time(), metadata=copy.deepcopy(parameters))
-        client_meta = workload_meta.copy()
-        client_meta.update(parameters)
-        client_meta.update(clients=len(vms) * client_count,
-                           threads_per_client_vm=client_count)
-
-        if FLAGS.ycsb_include_individual_results and len(results) > 1:
-          for i, result in enumerate(results):
-            all_results.extend(_CreateSamples(
-                result,
-                result_type='individual',
-                result_index=i,
-                include_histogram=FLAGS.ycsb_histogram,
-                **client_meta))
-
-        if self.measurement_type == HDRHISTOGRAM:
-          combined_log = self.CombineHdrHistogramLogFiles(hdr_files_dir, vms)
-          parsed_hdr = ParseHdrLogs(combined_log)
-          combined = _CombineResults(results, self.measurement_type, parsed_hdr)
+        search_meta = workload_meta.copy()
+        search_meta.update(clients=len(vms) * client_count,
+                           threads_per_client_vm=client_count,
+                           slo_ms=slo_ms, slo_percentile=percentile)
+        highest_passing = None
+        lowest_failing = None
+        best = None
+        target = FLAGS.ycsb_target_search_initial_target
+        for run_index in xrange(FLAGS.ycsb_target_search_max_runs):
+          parameters['target'] = target * len(vms)
+          samples, combined = self._RunWorkload(vms, parameters, workload_meta)
+          all_results.extend(samples)
+          latency = _GetLatencyPercentile(combined, percentile)
+          throughput = combined['groups']['overall']['statistics'].get(
+              'Throughput(ops/sec)', 0)
+          passed = (latency is not None and latency <= slo_ms and
+                    throughput >= (_TARGET_SEARCH_MIN_THROUGHPUT_FRACTION *
+                                   parameters['target']))
+          logging.info('YCSB target search run %d: target %d ops/sec per VM, '
+                       'throughput %s ops/sec, p%s latency %s ms: %s.',
+                       run_index, target, throughput, percentile, latency,
+                       'passed' if passed else 'failed')
+          run_meta = search_meta.copy()
+          run_meta.update(target_per_client_vm=target,
+                          target=parameters['target'], throughput=throughput,
+                          slo_met=passed, search_run=run_index)
+          if latency is not None:
+            all_results.append(sample.Sample(
+                'Target search latency', latency, 'ms', run_meta))
+          if passed:
+            highest_passing = target
+            best = (throughput, latency, target)
+          else:
+            lowest_failing = target
+          target = _NextSearchTarget(highest_passing, lowest_failing)
+          if (target is None or
+              (highest_passing and lowest_failing and
+               lowest_failing - highest_passing <=
+               FLAGS.ycsb_target_search_precision * highest_passing)):
+            break
+        max_meta = search_meta.copy()
+        max_meta['search_runs'] = run_index + 1
+        if best:
+          max_meta.update(latency=best[1], target_per_client_vm=best[2])
         else:
-          combined = _CombineResults(results, self.measurement_type, {})
-        all_results.extend(_CreateSamples(
-            combined, result_type='combined',
-            include_histogram=FLAGS.ycsb_histogram,
-            **client_meta))
+          logging.warning('No YCSB target throughput met the SLO of %s ms.',
+                          slo_ms)
+        all_results.append(sample.Sample(
+            'Max sustainable throughput', best[0] if best else 0.0,
+            'ops/sec', max_meta))
 
     return all_results
 
   def CombineHdrHistogramLogFiles(self, hdr_files_dir, vms):
     """Combine multiple hdr histograms by group type.
 
-    Combine multiple hdr histograms in hdr log files format into 1 human
-    readable hdr histogram log file.
-    This is done by
-    1) copying hdrhistogram log files to a single file on a worker vm;
-    2) aggregating file containing multiple %-tile histogram into
-       a single %-tile histogram using HistogramLogProcessor from the
-       hdrhistogram package that is installed on the vms. Refer to https://
-       github.com/HdrHistogram/HdrHistogram/blob/master/HistogramLogProcessor
+    The last interval of each VM's hdr log file, which YCSB writes at the
+    end of the run, is fetched in parallel and merged locally.
 
     Args:
       hdr_files_dir: directory on the remote vms where hdr files are stored.
       vms: remote vms
 
     Returns:
-      dict of hdrhistograms keyed by group type
+      dict of hdr_histogram.HdrHistogram keyed by group type
     """
-    hdrhistograms = {}
-    for grouptype in HDRHISTOGRAM_GROUPS:
-      worker_vm = vms[0]
-      for vm in vms[1:]:
-        hdr, _ = vm.RemoteCommand(
+    def _GetLastIntervals(vm):
+      lines = []
+      for grouptype in HDRHISTOGRAM_GROUPS:
+        stdout, _ = vm.RemoteCommand(
             'tail -1 {0}{1}.hdr'.format(hdr_files_dir, grouptype))
-        worker_vm.RemoteCommand(
-            'sudo chmod 777 {1}{2}.hdr && echo "{0}" >> {1}{2}.hdr'.format(
-                hdr[:-1], hdr_files_dir, grouptype))
-      hdrhistogram, _ = worker_vm.RemoteCommand(
-          'cd {0}; ./HistogramLogProcessor -i {1}{2}.hdr -outputValueUnitRatio '
-          '1'.format(self.hdr_dir, hdr_files_dir, grouptype))
-      hdrhistograms[grouptype.lower()] = hdrhistogram
+        lines.append(stdout)
+      return lines
+
+    hdrhistograms = {grouptype.lower(): hdr_histogram.HdrHistogram()
+                     for grouptype in HDRHISTOGRAM_GROUPS}
+    for lines in vm_util.RunThreaded(_GetLastIntervals, vms):
+      for grouptype, line in zip(HDRHISTOGRAM_GROUPS, lines):
+        histogram = hdr_histogram.DecodeLogLine(line)
+        if histogram:
+          hdrhistograms[grouptype.lower()].Merge(histogram)
     return hdrhistograms
 
   def Load(self, vms, workloads=None, load_kwargs=None):
@@ -1144,6 +1538,8 @@ class YCSBExecutor(object):
     """Runs each workload/client count combination."""
     workloads = workloads or _GetWorkloadFileList()
     assert workloads, 'no workloads'
+    if FLAGS.ycsb_target_search_slo_ms:
+      return list(self.RunTargetSearch(vms, workloads, **(run_kwargs or {})))
     return list(self.RunStaircaseLoads(vms, workloads,
                                        **(run_kwargs or {})))
 
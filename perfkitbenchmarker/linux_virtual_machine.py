@@ -26,6 +26,7 @@ file name minus .py). The framework will take care of all cleanup
 for you.
 """
 
+import hashlib
 import logging
 import os
 import pipes
@@ -42,6 +43,8 @@ from perfkitbenchmarker import flags
 from perfkitbenchmarker import linux_packages
 from perfkitbenchmarker import os_types
 from perfkitbenchmarker import regex_util
+from perfkitbenchmarker import sample
+from perfkitbenchmarker import temp_dir
 from perfkitbenchmarker import virtual_machine
 from perfkitbenchmarker import vm_util
 
@@ -122,6 +125,164 @@ flags.DEFINE_bool(
     'is unchanged from the default in the OS.')
 
 
+def _IssueSshCommands(vms, cmds, **kwargs):
+  """Runs ssh or scp commands concurrently, recording connection reuse.
+
+  Args:
+    vms: A list of BaseLinuxMixin VMs, one per command.
+    cmds: A list of ssh or scp commands to run.
+    **kwargs: Keyword arguments passed to vm_util.IssueCommands.
+
+  Returns:
+    A list of (stdout, stderr, retcode) tuples in the same order as cmds.
+  """
+  if not FLAGS.ssh_reuse_connections:
+    return vm_util.IssueCommands(cmds, **kwargs)
+  reused = [os.path.exists(vm.ssh_control_path) for vm in vms]
+  results = vm_util.IssueCommands(cmds, return_times=True, **kwargs)
+  for vm, vm_reused, (_, _, _, elapsed) in zip(vms, reused, results):
+    vm._RecordSshConnection(vm_reused, elapsed)
+  return [result[:3] for result in results]
+
+
+def _OverridesMethod(vm, method_name):
+  """Returns whether vm's class replaces BaseLinuxMixin's SSH method_name.
+
+  Some VMs (e.g. Kubernetes pods) run commands and copy files without SSH,
+  so the batched SSH helpers below have to go through their own methods.
+  """
+  return (getattr(type(vm), method_name).__func__ is not
+          getattr(BaseLinuxMixin, method_name).__func__)
+
+
+def RemoteHostCommands(vm_commands, should_log=False, retries=SSH_RETRIES,
+                       ignore_failure=False, suppress_warning=False,
+                       timeout=None, max_concurrency=None):
+  """Runs commands on many VMs at once without a thread per command.
+
+  This is the concurrent equivalent of calling RemoteHostCommandWithReturnCode
+  for each command in RunThreaded. Commands that fail with an SSH error are
+  retried together. Commands for VMs that override
+  RemoteHostCommandWithReturnCode are run with it in RunThreaded instead.
+
+  Args:
+    vm_commands: A list of (vm, command) tuples, where vm is a
+        BaseLinuxMixin and command is a valid bash command. A VM may appear
+        more than once.
+    should_log: As in RemoteHostCommandWithReturnCode.
+    retries: As in RemoteHostCommandWithReturnCode.
+    ignore_failure: As in RemoteHostCommandWithReturnCode.
+    suppress_warning: As in RemoteHostCommandWithReturnCode.
+    timeout: The timeout for each command.
+    max_concurrency: The maximum number of commands to run at once. Defaults
+        to --max_concurrent_commands.
+
+  Returns:
+    A list of (stdout, stderr, return_code) tuples in the same order as
+    vm_commands.
+
+  Raises:
+    RemoteCommandError: If any command failed and ignore_failure is False.
+  """
+  results = [None] * len(vm_commands)
+  full_cmds = [None] * len(vm_commands)
+  ssh_indices = []
+  other_indices = []
+  for i, (vm, _) in enumerate(vm_commands):
+    if _OverridesMethod(vm, 'RemoteHostCommandWithReturnCode'):
+      other_indices.append(i)
+    else:
+      ssh_indices.append(i)
+
+  if other_indices:
+    def _RunCommand(vm, command):
+      return vm.RemoteHostCommandWithReturnCode(
+          command, should_log=should_log, retries=retries,
+          ignore_failure=True, suppress_warning=suppress_warning,
+          timeout=timeout)
+    outputs = vm_util.RunThreaded(
+        _RunCommand, [(vm_commands[i], {}) for i in other_indices],
+        max_concurrent_threads=max_concurrency)
+    for i, output in zip(other_indices, outputs):
+      results[i] = output
+      full_cmds[i] = vm_commands[i][1]
+
+  vms = [vm_commands[i][0] for i in ssh_indices]
+  ssh_cmds = [vms[j]._GetSshCommand(vm_commands[i][1])
+              for j, i in enumerate(ssh_indices)]
+  for i, ssh_cmd in zip(ssh_indices, ssh_cmds):
+    full_cmds[i] = ' '.join(ssh_cmd)
+  remaining = range(len(ssh_indices))
+  for _ in range(retries):
+    if not remaining:
+      break
+    outputs = _IssueSshCommands(
+        [vms[j] for j in remaining], [ssh_cmds[j] for j in remaining],
+        force_info_log=should_log, suppress_warning=suppress_warning,
+        timeout=timeout, max_concurrency=max_concurrency)
+    for j, output in zip(remaining, outputs):
+      results[ssh_indices[j]] = output
+    # Retry on 255 because this indicates an SSH failure.
+    remaining = [j for j in remaining if results[ssh_indices[j]][2] == 255]
+
+  error_texts = []
+  for (_, command), full_cmd, (stdout, stderr, retcode) in zip(
+      vm_commands, full_cmds, results):
+    if retcode:
+      error_texts.append('Got non-zero return code (%s) executing %s\n'
+                         'Full command: %s\nSTDOUT: %sSTDERR: %s' %
+                         (retcode, command, full_cmd, stdout, stderr))
+  if error_texts and not ignore_failure:
+    raise errors.VirtualMachine.RemoteCommandError('\n'.join(error_texts))
+  return results
+
+
+def RemoteHostCopies(vm_copies, copy_to=True, max_concurrency=None):
+  """Copies files to or from many VMs at once without a thread per copy.
+
+  Copies for VMs that override RemoteHostCopy are made with it in RunThreaded
+  instead.
+
+  Args:
+    vm_copies: A list of (vm, file_path, remote_path) tuples, as passed to
+        vm.RemoteHostCopy.
+    copy_to: True to copy to the VMs, False to copy from them.
+    max_concurrency: The maximum number of copies to run at once. Defaults to
+        --max_concurrent_commands.
+
+  Raises:
+    RemoteCommandError: If there was a problem copying any file.
+  """
+  other_copies = [(vm, file_path, remote_path)
+                  for vm, file_path, remote_path in vm_copies
+                  if _OverridesMethod(vm, 'RemoteHostCopy')]
+  scp_copies = [(vm, file_path, remote_path)
+                for vm, file_path, remote_path in vm_copies
+                if not _OverridesMethod(vm, 'RemoteHostCopy')]
+  if other_copies:
+    vm_util.RunThreaded(
+        lambda vm, file_path, remote_path: vm.RemoteHostCopy(
+            file_path, remote_path, copy_to),
+        [(copy, {}) for copy in other_copies],
+        max_concurrent_threads=max_concurrency)
+  if not scp_copies:
+    return
+
+  vms = [vm for vm, _, _ in scp_copies]
+  scp_cmds = [vm._GetScpCommand(file_path, remote_path, copy_to)
+              for vm, file_path, remote_path in scp_copies]
+  results = _IssueSshCommands(vms, scp_cmds, timeout=None,
+                              max_concurrency=max_concurrency)
+  error_texts = ['Got non-zero return code (%s) executing %s\n'
+                 'STDOUT: %sSTDERR: %s' %
+                 (retcode, ' '.join(scp_cmd), stdout, stderr)
+                 for scp_cmd, (stdout, stderr, retcode) in zip(scp_cmds,
+                                                               results)
+                 if retcode]
+  if error_texts:
+    raise errors.VirtualMachine.RemoteCommandError('\n'.join(error_texts))
+
+
 class BaseLinuxMixin(virtual_machine.BaseOsMixin):
   """Class that holds Linux related VM methods and attributes."""
 
@@ -140,6 +301,14 @@ class BaseLinuxMixin(virtual_machine.BaseOsMixin):
     self._has_remote_command_script = False
     self._needs_reboot = False
 
+    # Counters describing how SSH connections to the VM were established.
+    self._ssh_stats_lock = threading.Lock()
+    self.ssh_connections_opened = 0
+    self.ssh_connections_reused = 0
+    # Wall time of the commands that opened master connections, including
+    # both the SSH handshake and the remote command itself.
+    self.ssh_first_command_time = 0.0
+
   def _CreateVmTmpDir(self):
     self.RemoteCommand('mkdir -p %s' % vm_util.VM_TMP_DIR)
 
@@ -552,6 +721,18 @@ class BaseLinuxMixin(virtual_machine.BaseOsMixin):
     Raises:
       RemoteCommandError: If there was a problem copying the file.
     """
+    scp_cmd = self._GetScpCommand(file_path, remote_path, copy_to)
+    stdout, stderr, retcode = self._IssueSshCommand(scp_cmd, timeout=None)
+
+    if retcode:
+      full_cmd = ' '.join(scp_cmd)
+      error_text = ('Got non-zero return code (%s) executing %s\n'
+                    'STDOUT: %sSTDERR: %s' %
+                    (retcode, full_cmd, stdout, stderr))
+      raise errors.VirtualMachine.RemoteCommandError(error_text)
+
+  def _GetScpCommand(self, file_path, remote_path, copy_to):
+    """Returns the scp command used by RemoteHostCopy."""
     if vm_util.RunningOnWindows():
       if ':' in file_path:
         # scp doesn't like colons in paths.
@@ -563,21 +744,87 @@ class BaseLinuxMixin(virtual_machine.BaseOsMixin):
         self.user_name, remote_ip, remote_path)
     scp_cmd = ['scp', '-P', str(self.ssh_port), '-pr']
     # An scp is not retried, so increase the connection timeout.
-    scp_cmd.extend(vm_util.GetSshOptions(self.ssh_private_key,
-                                         connect_timeout=30))
+    scp_cmd.extend(vm_util.GetSshOptions(
+        self.ssh_private_key, connect_timeout=30,
+        control_path=self.ssh_control_path))
     if copy_to:
       scp_cmd.extend([file_path, remote_location])
     else:
       scp_cmd.extend([remote_location, file_path])
+    return scp_cmd
 
-    stdout, stderr, retcode = vm_util.IssueCommand(scp_cmd, timeout=None)
+  @property
+  def ssh_control_path(self):
+    """Path of the ControlMaster socket used to multiplex SSH to the VM."""
+    # Unix socket paths are short, so use a digest of the connection
+    # parameters (as ssh does for %C) rather than the parameters themselves.
+    connection = '%s@%s:%s' % (self.user_name, self.ip_address, self.ssh_port)
+    return os.path.join(temp_dir.GetSshConnectionsDir(),
+                        hashlib.sha1(connection).hexdigest()[:16])
 
-    if retcode:
-      full_cmd = ' '.join(scp_cmd)
-      error_text = ('Got non-zero return code (%s) executing %s\n'
-                    'STDOUT: %sSTDERR: %s' %
-                    (retcode, full_cmd, stdout, stderr))
-      raise errors.VirtualMachine.RemoteCommandError(error_text)
+  def _IssueSshCommand(self, cmd, **kwargs):
+    """Issues an ssh or scp command, recording connection reuse statistics.
+
+    When --ssh_reuse_connections is set, the command either reuses the master
+    connection listening on ssh_control_path or establishes a new master
+    connection, which subsequent commands will reuse.
+
+    Args:
+      cmd: A list of strings, as given to vm_util.IssueCommand.
+      **kwargs: Keyword arguments passed to vm_util.IssueCommand.
+
+    Returns:
+      A tuple of stdout, stderr, and retcode from running the command.
+    """
+    if not FLAGS.ssh_reuse_connections:
+      return vm_util.IssueCommand(cmd, **kwargs)
+    reused = os.path.exists(self.ssh_control_path)
+    start_time = time.time()
+    stdout, stderr, retcode = vm_util.IssueCommand(cmd, **kwargs)
+    self._RecordSshConnection(reused, time.time() - start_time)
+    return stdout, stderr, retcode
+
+  def _RecordSshConnection(self, reused, elapsed):
+    """Counts an ssh or scp command towards the connection reuse statistics.
+
+    Args:
+      reused: boolean. Whether the master connection existed before the
+          command ran.
+      elapsed: float. Wall time of the command in seconds. It is added to
+          ssh_first_command_time if the command opened the master connection.
+    """
+    with self._ssh_stats_lock:
+      if reused:
+        self.ssh_connections_reused += 1
+      elif os.path.exists(self.ssh_control_path):
+        self.ssh_connections_opened += 1
+        self.ssh_first_command_time += elapsed
+
+  def CloseRemoteConnections(self):
+    """Closes the SSH master connection to the VM, if there is one."""
+    if not (FLAGS.ssh_reuse_connections and
+            os.path.exists(self.ssh_control_path)):
+      return
+    user_host = '%s@%s' % (self.user_name, self.ip_address)
+    exit_cmd = ['ssh', '-O', 'exit', '-p', str(self.ssh_port), user_host]
+    exit_cmd.extend(vm_util.GetSshOptions(self.ssh_private_key,
+                                          control_path=self.ssh_control_path))
+    vm_util.IssueCommand(exit_cmd, suppress_warning=True)
+
+  def GetRemoteConnectionSamples(self):
+    """Returns samples describing SSH connection reuse for the VM."""
+    if not (FLAGS.ssh_reuse_connections and
+            (self.ssh_connections_opened or self.ssh_connections_reused)):
+      return []
+    metadata = {'vm_name': self.name,
+                'ssh_control_persist': FLAGS.ssh_control_persist}
+    return [
+        sample.Sample('SSH Connections Opened', self.ssh_connections_opened,
+                      'connections', metadata),
+        sample.Sample('SSH Connections Reused', self.ssh_connections_reused,
+                      'connections', metadata),
+        sample.Sample('SSH First Command Time', self.ssh_first_command_time,
+                      'seconds', metadata)]
 
   def RemoteCommandWithReturnCode(self, command, should_log=False,
                                   retries=SSH_RETRIES, ignore_failure=False,
@@ -626,23 +873,13 @@ class BaseLinuxMixin(virtual_machine.BaseOsMixin):
     Raises:
       RemoteCommandError: If there was a problem establishing the connection.
     """
-    if vm_util.RunningOnWindows():
-      # Multi-line commands passed to ssh won't work on Windows unless the
-      # newlines are escaped.
-      command = command.replace('\n', '\\n')
-
-    user_host = '%s@%s' % (self.user_name, self.ip_address)
-    ssh_cmd = ['ssh', '-A', '-p', str(self.ssh_port), user_host]
-    ssh_cmd.extend(vm_util.GetSshOptions(self.ssh_private_key))
+    ssh_cmd = self._GetSshCommand(command, login_shell)
     try:
       if login_shell:
-        ssh_cmd.extend(['-t', '-t', 'bash -l -c "%s"' % command])
         self._pseudo_tty_lock.acquire()
-      else:
-        ssh_cmd.append(command)
 
       for _ in range(retries):
-        stdout, stderr, retcode = vm_util.IssueCommand(
+        stdout, stderr, retcode = self._IssueSshCommand(
             ssh_cmd, force_info_log=should_log,
             suppress_warning=suppress_warning,
             timeout=timeout)
@@ -662,6 +899,23 @@ class BaseLinuxMixin(virtual_machine.BaseOsMixin):
 
     return (stdout, stderr, retcode)
 
+  def _GetSshCommand(self, command, login_shell=False):
+    """Returns the ssh command used to run 'command' on the VM."""
+    if vm_util.RunningOnWindows():
+      # Multi-line commands passed to ssh won't work on Windows unless the
+      # newlines are escaped.
+      command = command.replace('\n', '\\n')
+
+    user_host = '%s@%s' % (self.user_name, self.ip_address)
+    ssh_cmd = ['ssh', '-A', '-p', str(self.ssh_port), user_host]
+    ssh_cmd.extend(vm_util.GetSshOptions(self.ssh_private_key,
+                                         control_path=self.ssh_control_path))
+    if login_shell:
+      ssh_cmd.extend(['-t', '-t', 'bash -l -c "%s"' % command])
+    else:
+      ssh_cmd.append(command)
+    return ssh_cmd
+
   def RemoteHostCommand(self, command, should_log=False, retries=SSH_RETRIES,
                         ignore_failure=False, login_shell=False,
                         suppress_warning=False, timeout=None):
@@ -0,0 +1,115 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An object storage service that keeps its buckets on the worker VMs.
+
+The local service needs no cloud account, so the object storage benchmark
+can be run against it to measure the overhead of the benchmark itself, or to
+approximate a remote service through injected latency and bandwidth. Every
+VM has its own store, which works because the benchmark's VMs only read back
+the objects they wrote themselves.
+"""
+
+import posixpath
+
+from perfkitbenchmarker import flags
+from perfkitbenchmarker import object_storage_service
+from perfkitbenchmarker import vm_util
+
+LOCAL = 'local'
+MEMORY_BACKEND = 'memory'
+DISK_BACKEND = 'disk'
+
+flags.DEFINE_enum('object_storage_local_backend', MEMORY_BACKEND,
+                  [MEMORY_BACKEND, DISK_BACKEND],
+                  'Where --storage=local keeps objects. "memory" stores them '
+                  'on a tmpfs, "disk" in a directory on the VM\'s disk.')
+flags.DEFINE_float('object_storage_local_latency', 0.0,
+                   'Latency in seconds added to every request made to the '
+                   'local object store.', lower_bound=0.0)
+flags.DEFINE_float('object_storage_local_bandwidth_mbps', None,
+                   'If set, object reads and writes against the local object '
+                   'store are slowed down to this bandwidth, in Mbps.',
+                   lower_bound=0.0)
+
+FLAGS = flags.FLAGS
+
+# tmpfs is used rather than memory in the worker processes because the
+# multistream scenarios read and write objects from several processes.
+_BACKEND_DIRS = {
+    MEMORY_BACKEND: '/dev/shm/pkb-local-storage',
+    DISK_BACKEND: posixpath.join(vm_util.VM_TMP_DIR, 'local-storage'),
+}
+
+
+class LocalStorageService(object_storage_service.ObjectStorageService):
+  """Interface to an object store kept in a directory on each VM."""
+
+  STORAGE_NAME = LOCAL
+
+  def __init__(self):
+    self.storage_dir = _BACKEND_DIRS[FLAGS.object_storage_local_backend]
+    self.vms = []
+
+  def _RunOnVms(self, command):
+    vm_util.RunThreaded(lambda vm: vm.RemoteCommand(command), self.vms)
+
+  def MakeBucket(self, bucket):
+    self._RunOnVms('mkdir -p %s' % posixpath.join(self.storage_dir, bucket))
+
+  def DeleteBucket(self, bucket):
+    self._RunOnVms('rm -rf %s' % posixpath.join(self.storage_dir, bucket))
+
+  def EmptyBucket(self, bucket):
+    self._RunOnVms('rm -rf %s/*' % posixpath.join(self.storage_dir, bucket))
+
+  def PrepareVM(self, vm):
+    vm.RemoteCommand('mkdir -p %s' % self.storage_dir)
+    self.vms.append(vm)
+
+  def CleanupVM(self, vm):
+    vm.RemoteCommand('rm -rf %s' % self.storage_dir)
+
+  def CLIUploadDirectory(self, vm, directory, file_names, bucket):
+    return vm.RemoteCommand(
+        'time cp {files} {bucket_dir}/'.format(
+            files=' '.join(posixpath.join(directory, file_name)
+                           for file_name in file_names),
+            bucket_dir=posixpath.join(self.storage_dir, bucket)))
+
+  def CLIDownloadBucket(self, vm, bucket, objects, dest):
+    return vm.RemoteCommand(
+        'time cp {objects} {dest}/'.format(
+            objects=' '.join(posixpath.join(self.storage_dir, bucket, obj)
+                             for obj in objects),
+            dest=dest))
+
+  def Metadata(self, vm):
+    return {'local_storage_backend': FLAGS.object_storage_local_backend,
+            'local_storage_latency': FLAGS.object_storage_local_latency,
+            'local_storage_bandwidth_mbps':
+            FLAGS.object_storage_local_bandwidth_mbps}
+
+  def APIScriptArgs(self):
+    args = ['--local_storage_dir=%s' % self.storage_dir,
+            '--local_storage_latency=%s' %
+            FLAGS.object_storage_local_latency]
+    if FLAGS.object_storage_local_bandwidth_mbps:
+      args.append('--local_storage_bandwidth_mbps=%s' %
+                  FLAGS.object_storage_local_bandwidth_mbps)
+    return args
+
+  @classmethod
+  def APIScriptFiles(cls):
+    return ['local_service.py']
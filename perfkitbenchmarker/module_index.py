@@ -0,0 +1,1235 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""An index of benchmark and package modules.
+
+Generated by tools/generate_module_index.py. Do not edit.
+"""
+
+
+LINUX_BENCHMARKS = {
+    'aerospike':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_benchmark',
+    'aerospike_certification_tool':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_certification_tool_benchmark',
+    'aerospike_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_ycsb_benchmark',
+    'aws_dynamodb_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.aws_dynamodb_ycsb_benchmark',
+    'beam_integration_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.beam_integration_benchmark',
+    'bidirectional_network':
+        'perfkitbenchmarker.linux_benchmarks.bidirectional_network_benchmark',
+    'blazemark':
+        'perfkitbenchmarker.linux_benchmarks.blazemark_benchmark',
+    'block_storage_workload':
+        'perfkitbenchmarker.linux_benchmarks.block_storage_workloads_benchmark',
+    'bonnieplusplus':
+        'perfkitbenchmarker.linux_benchmarks.bonnie_benchmark',
+    'cassandra_stress':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_ycsb_benchmark',
+    'ch_block_storage':
+        'perfkitbenchmarker.linux_benchmarks.ch_block_storage_benchmark',
+    'cloud_bigtable_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.cloud_bigtable_ycsb_benchmark',
+    'cloud_datastore_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.cloud_datastore_ycsb_benchmark',
+    'cloud_firestore_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.cloud_firestore_ycsb_benchmark',
+    'cloud_redis_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.cloud_redis_ycsb_benchmark',
+    'cloud_spanner_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.cloud_spanner_ycsb_benchmark',
+    'cloudsuite_data_analytics':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_data_analytics_benchmark',
+    'cloudsuite_data_caching':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_data_caching_benchmark',
+    'cloudsuite_data_serving':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_data_serving_benchmark',
+    'cloudsuite_graph_analytics':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_graph_analytics_benchmark',
+    'cloudsuite_in_memory_analytics':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_in_memory_analytics_benchmark',
+    'cloudsuite_media_streaming':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_media_streaming_benchmark',
+    'cloudsuite_web_search':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_search_benchmark',
+    'cloudsuite_web_serving':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_serving_benchmark',
+    'cluster_boot':
+        'perfkitbenchmarker.linux_benchmarks.cluster_boot_benchmark',
+    'container_netperf':
+        'perfkitbenchmarker.linux_benchmarks.container_netperf_benchmark',
+    'copy_throughput':
+        'perfkitbenchmarker.linux_benchmarks.copy_throughput_benchmark',
+    'coremark':
+        'perfkitbenchmarker.linux_benchmarks.coremark_benchmark',
+    'dacapo':
+        'perfkitbenchmarker.linux_benchmarks.dacapo_benchmark',
+    'dpb_cluster_boot_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.dpb_cluster_boot_benchmark',
+    'dpb_distcp_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.dpb_distcp_benchmark',
+    'dpb_terasort_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.dpb_terasort_benchmark',
+    'dpb_testdfsio_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.dpb_testdfsio_benchmark',
+    'dpb_wordcount_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.dpb_wordcount_benchmark',
+    'edw_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.edw_benchmark',
+    'fio':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'glibc':
+        'perfkitbenchmarker.linux_benchmarks.glibc_benchmark',
+    'gpu_pcie_bandwidth':
+        'perfkitbenchmarker.linux_benchmarks.gpu_pcie_bandwidth_benchmark',
+    'hadoop_terasort':
+        'perfkitbenchmarker.linux_benchmarks.hadoop_terasort_benchmark',
+    'hbase_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.hbase_ycsb_benchmark',
+    'horovod':
+        'perfkitbenchmarker.linux_benchmarks.horovod_benchmark',
+    'hpcc':
+        'perfkitbenchmarker.linux_benchmarks.hpcc_benchmark',
+    'hpcg':
+        'perfkitbenchmarker.linux_benchmarks.hpcg_benchmark',
+    'inception3':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'ior':
+        'perfkitbenchmarker.linux_benchmarks.ior_benchmark',
+    'iperf':
+        'perfkitbenchmarker.linux_benchmarks.iperf_benchmark',
+    'jdbc_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'kernel_compile':
+        'perfkitbenchmarker.linux_benchmarks.kernel_compile_benchmark',
+    'lmbench':
+        'perfkitbenchmarker.linux_benchmarks.lmbench_benchmark',
+    'memcached_memtier':
+        'perfkitbenchmarker.linux_benchmarks.memcached_memtier_benchmark',
+    'memcached_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.memcached_ycsb_benchmark',
+    'mesh_network':
+        'perfkitbenchmarker.linux_benchmarks.mesh_network_benchmark',
+    'mnist':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'mongodb_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.mongodb_ycsb_benchmark',
+    'multichase':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'mxnet':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'netperf':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'object_storage_service':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'oldisim':
+        'perfkitbenchmarker.linux_benchmarks.oldisim_benchmark',
+    'pgbench':
+        'perfkitbenchmarker.linux_benchmarks.pgbench_benchmark',
+    'ping':
+        'perfkitbenchmarker.linux_benchmarks.ping_benchmark',
+    'redis':
+        'perfkitbenchmarker.linux_benchmarks.redis_benchmark',
+    'redis_ycsb':
+        'perfkitbenchmarker.linux_benchmarks.redis_ycsb_benchmark',
+    'resnet':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'sample':
+        'perfkitbenchmarker.linux_benchmarks.sample_benchmark',
+    'scimark2':
+        'perfkitbenchmarker.linux_benchmarks.scimark2_benchmark',
+    'silo':
+        'perfkitbenchmarker.linux_benchmarks.silo_benchmark',
+    'spark':
+        'perfkitbenchmarker.linux_benchmarks.spark_benchmark',
+    'speccpu2006':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2006_benchmark',
+    'speccpu2017':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2017_benchmark',
+    'specsfs2014':
+        'perfkitbenchmarker.linux_benchmarks.specsfs2014_benchmark',
+    'stencil2d':
+        'perfkitbenchmarker.linux_benchmarks.stencil2d_benchmark',
+    'sysbench':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'tensor2tensor':
+        'perfkitbenchmarker.linux_benchmarks.t2t_benchmark',
+    'tensorflow':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tensorflow_serving':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_serving_benchmark',
+    'tomcat_wrk':
+        'perfkitbenchmarker.linux_benchmarks.tomcat_wrk_benchmark',
+    'unixbench':
+        'perfkitbenchmarker.linux_benchmarks.unixbench_benchmark',
+}
+
+WINDOWS_BENCHMARKS = {
+    'cluster_boot':
+        'perfkitbenchmarker.windows_benchmarks.cluster_boot_benchmark',
+    'diskspd':
+        'perfkitbenchmarker.windows_benchmarks.diskspd_benchmark',
+    'fio':
+        'perfkitbenchmarker.windows_benchmarks.fio_benchmark',
+    'hammerdb':
+        'perfkitbenchmarker.windows_benchmarks.hammerdb_benchmark',
+    'iperf3':
+        'perfkitbenchmarker.windows_benchmarks.iperf3_benchmark',
+    'ntttcp':
+        'perfkitbenchmarker.windows_benchmarks.ntttcp_benchmark',
+    'nuttcp':
+        'perfkitbenchmarker.windows_benchmarks.nuttcp_benchmark',
+    'psping':
+        'perfkitbenchmarker.windows_benchmarks.psping_benchmark',
+}
+
+FLAG_MODULES = {
+    'act_duration':
+        'perfkitbenchmarker.linux_packages.act',
+    'act_load':
+        'perfkitbenchmarker.linux_packages.act',
+    'act_num_queues':
+        'perfkitbenchmarker.linux_packages.act',
+    'act_parallel':
+        'perfkitbenchmarker.linux_packages.act',
+    'act_reserved_partitions':
+        'perfkitbenchmarker.linux_packages.act',
+    'act_threads_per_queue':
+        'perfkitbenchmarker.linux_packages.act',
+    'aerospike_client_threads_step_size':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_benchmark',
+    'aerospike_max_client_threads':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_benchmark',
+    'aerospike_min_client_threads':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_benchmark',
+    'aerospike_num_keys':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_benchmark',
+    'aerospike_read_percent':
+        'perfkitbenchmarker.linux_benchmarks.aerospike_benchmark',
+    'aerospike_replication_factor':
+        'perfkitbenchmarker.linux_packages.aerospike_server',
+    'aerospike_storage_type':
+        'perfkitbenchmarker.linux_packages.aerospike_server',
+    'aerospike_transaction_threads_per_queue':
+        'perfkitbenchmarker.linux_packages.aerospike_server',
+    'aws_credentials_local_path':
+        'perfkitbenchmarker.linux_packages.aws_credentials',
+    'aws_credentials_overwrite':
+        'perfkitbenchmarker.linux_packages.aws_credentials',
+    'aws_credentials_remote_path':
+        'perfkitbenchmarker.linux_packages.aws_credentials',
+    'aws_dynamodb_attributetype':
+        'perfkitbenchmarker.providers.aws.aws_dynamodb',
+    'aws_dynamodb_capacity':
+        'perfkitbenchmarker.providers.aws.aws_dynamodb',
+    'aws_dynamodb_gsi_count':
+        'perfkitbenchmarker.providers.aws.aws_dynamodb',
+    'aws_dynamodb_lsi_count':
+        'perfkitbenchmarker.providers.aws.aws_dynamodb',
+    'aws_dynamodb_primarykey':
+        'perfkitbenchmarker.providers.aws.aws_dynamodb',
+    'aws_dynamodb_sortkey':
+        'perfkitbenchmarker.providers.aws.aws_dynamodb',
+    'aws_dynamodb_use_sort':
+        'perfkitbenchmarker.providers.aws.aws_dynamodb',
+    'aws_dynamodb_ycsb_awscredentials_properties':
+        'perfkitbenchmarker.linux_benchmarks.aws_dynamodb_ycsb_benchmark',
+    'aws_dynamodb_ycsb_consistentReads':
+        'perfkitbenchmarker.linux_benchmarks.aws_dynamodb_ycsb_benchmark',
+    'aws_s3_region':
+        'perfkitbenchmarker.linux_packages.aws_credentials',
+    'azure_lib_version':
+        'perfkitbenchmarker.linux_packages.azure_sdk',
+    'bandwidth_step_mb':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'beam_extra_properties':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_filesystem':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_it_args':
+        'perfkitbenchmarker.linux_benchmarks.beam_integration_benchmark',
+    'beam_it_class':
+        'perfkitbenchmarker.linux_benchmarks.beam_integration_benchmark',
+    'beam_it_module':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_it_options':
+        'perfkitbenchmarker.linux_benchmarks.beam_integration_benchmark',
+    'beam_it_timeout':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_kubernetes_scripts':
+        'perfkitbenchmarker.linux_benchmarks.beam_integration_benchmark',
+    'beam_location':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_options_config_file':
+        'perfkitbenchmarker.linux_benchmarks.beam_integration_benchmark',
+    'beam_prebuilt':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_python_attr':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_python_sdk_location':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_runner':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_runner_option':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_sdk':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'beam_version':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'benchmark_subset':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2006_benchmark',
+    'bidirectional_network_test_length':
+        'perfkitbenchmarker.linux_benchmarks.bidirectional_network_benchmark',
+    'bidirectional_network_tests':
+        'perfkitbenchmarker.linux_benchmarks.bidirectional_network_benchmark',
+    'bidirectional_stream_num_streams':
+        'perfkitbenchmarker.linux_benchmarks.bidirectional_network_benchmark',
+    'blazemark_kernels':
+        'perfkitbenchmarker.linux_benchmarks.blazemark_benchmark',
+    'blazemark_set':
+        'perfkitbenchmarker.linux_benchmarks.blazemark_benchmark',
+    'boto_file_location':
+        'perfkitbenchmarker.object_storage_service',
+    'cassandra_concurrent_reads':
+        'perfkitbenchmarker.linux_packages.cassandra',
+    'cassandra_replication_factor':
+        'perfkitbenchmarker.linux_packages.cassandra',
+    'cassandra_stress_command':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_consistency_level':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_mixed_ratio':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_operations':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_population_distribution':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_population_parameters':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_population_size':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_preload_num_keys':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_profile':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_replication_factor':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'cassandra_stress_retries':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'ch_block_tests':
+        'perfkitbenchmarker.linux_benchmarks.ch_block_storage_benchmark',
+    'ch_params':
+        'perfkitbenchmarker.linux_packages.ch_block_storage',
+    'cli_test_size':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'cloud_firestore_ycsb_debug':
+        'perfkitbenchmarker.linux_benchmarks.cloud_firestore_ycsb_benchmark',
+    'cloud_firestore_ycsb_keyfile':
+        'perfkitbenchmarker.linux_benchmarks.cloud_firestore_ycsb_benchmark',
+    'cloud_spanner_config':
+        'perfkitbenchmarker.providers.gcp.gcp_spanner',
+    'cloud_spanner_nodes':
+        'perfkitbenchmarker.providers.gcp.gcp_spanner',
+    'cloud_spanner_project':
+        'perfkitbenchmarker.providers.gcp.gcp_spanner',
+    'cloud_spanner_ycsb_batchinserts':
+        'perfkitbenchmarker.linux_benchmarks.cloud_spanner_ycsb_benchmark',
+    'cloud_spanner_ycsb_boundedstaleness':
+        'perfkitbenchmarker.linux_benchmarks.cloud_spanner_ycsb_benchmark',
+    'cloud_spanner_ycsb_custom_release':
+        'perfkitbenchmarker.linux_benchmarks.cloud_spanner_ycsb_benchmark',
+    'cloud_spanner_ycsb_custom_vm_install_commands':
+        'perfkitbenchmarker.linux_benchmarks.cloud_spanner_ycsb_benchmark',
+    'cloud_spanner_ycsb_readmode':
+        'perfkitbenchmarker.linux_benchmarks.cloud_spanner_ycsb_benchmark',
+    'cloud_tpu_commit_hash':
+        'perfkitbenchmarker.linux_packages.cloud_tpu_models',
+    'cloudsuite_data_caching_memcached_flags':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_data_caching_benchmark',
+    'cloudsuite_data_caching_rps':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_data_caching_benchmark',
+    'cloudsuite_data_serving_op_count':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_data_serving_benchmark',
+    'cloudsuite_data_serving_rec_count':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_data_serving_benchmark',
+    'cloudsuite_graph_analytics_worker_mem':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_graph_analytics_benchmark',
+    'cloudsuite_in_memory_analytics_dataset':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_in_memory_analytics_benchmark',
+    'cloudsuite_in_memory_analytics_ratings_file':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_in_memory_analytics_benchmark',
+    'cloudsuite_web_search_ramp_down':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_search_benchmark',
+    'cloudsuite_web_search_ramp_up':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_search_benchmark',
+    'cloudsuite_web_search_scale':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_search_benchmark',
+    'cloudsuite_web_search_server_heap_size':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_search_benchmark',
+    'cloudsuite_web_search_steady_state':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_search_benchmark',
+    'cloudsuite_web_serving_load_scale':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_serving_benchmark',
+    'cloudsuite_web_serving_pm_max_children':
+        'perfkitbenchmarker.linux_benchmarks.cloudsuite_web_serving_benchmark',
+    'copy_benchmark_mode':
+        'perfkitbenchmarker.linux_benchmarks.copy_throughput_benchmark',
+    'copy_benchmark_single_file_mb':
+        'perfkitbenchmarker.linux_benchmarks.copy_throughput_benchmark',
+    'cuda_toolkit_installation_dir':
+        'perfkitbenchmarker.linux_packages.cuda_toolkit',
+    'cuda_toolkit_version':
+        'perfkitbenchmarker.linux_packages.cuda_toolkit',
+    'cudnn':
+        'perfkitbenchmarker.linux_packages.cudnn',
+    'dacapo_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.dacapo_benchmark',
+    'dacapo_jar_filename':
+        'perfkitbenchmarker.linux_benchmarks.dacapo_benchmark',
+    'dacapo_num_iters':
+        'perfkitbenchmarker.linux_benchmarks.dacapo_benchmark',
+    'dfsio_file_sizes_list':
+        'perfkitbenchmarker.linux_benchmarks.dpb_testdfsio_benchmark',
+    'dfsio_fs':
+        'perfkitbenchmarker.linux_benchmarks.dpb_testdfsio_benchmark',
+    'dfsio_num_files_list':
+        'perfkitbenchmarker.linux_benchmarks.dpb_testdfsio_benchmark',
+    'diskspd_block_size':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_block_unit':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_cooldown':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_disable_affinity':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_duration':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_file_size':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_large_page':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_latency_stats':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_outstanding_io':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_software_cache':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_stride_or_alignment':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_stride_or_alignment_unit':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_thread_number_per_file':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_throughput_per_ms':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_warmup':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'diskspd_write_through':
+        'perfkitbenchmarker.windows_packages.diskspd',
+    'distcp_dest_fs':
+        'perfkitbenchmarker.linux_benchmarks.dpb_distcp_benchmark',
+    'distcp_file_size_mbs':
+        'perfkitbenchmarker.linux_benchmarks.dpb_distcp_benchmark',
+    'distcp_num_files':
+        'perfkitbenchmarker.linux_benchmarks.dpb_distcp_benchmark',
+    'distcp_source_fs':
+        'perfkitbenchmarker.linux_benchmarks.dpb_distcp_benchmark',
+    'dpb_cluster_boot_fs':
+        'perfkitbenchmarker.linux_benchmarks.dpb_cluster_boot_benchmark',
+    'dpb_cluster_boot_fs_type':
+        'perfkitbenchmarker.linux_benchmarks.dpb_cluster_boot_benchmark',
+    'dpb_dataflow_runner':
+        'perfkitbenchmarker.providers.gcp.gcp_dpb_dataflow',
+    'dpb_dataflow_sdk':
+        'perfkitbenchmarker.providers.gcp.gcp_dpb_dataflow',
+    'dpb_dataflow_staging_location':
+        'perfkitbenchmarker.providers.gcp.gcp_dpb_dataflow',
+    'dpb_dataproc_distcp_num_maps':
+        'perfkitbenchmarker.providers.gcp.gcp_dpb_dataproc',
+    'dpb_dataproc_image_version':
+        'perfkitbenchmarker.providers.gcp.gcp_dpb_dataproc',
+    'dpb_emr_release_label':
+        'perfkitbenchmarker.providers.aws.aws_dpb_emr',
+    'dpb_terasort_fs':
+        'perfkitbenchmarker.linux_benchmarks.dpb_terasort_benchmark',
+    'dpb_terasort_fs_type':
+        'perfkitbenchmarker.linux_benchmarks.dpb_terasort_benchmark',
+    'dpb_terasort_num_records':
+        'perfkitbenchmarker.linux_benchmarks.dpb_terasort_benchmark',
+    'dpb_terasort_pre_cleanup':
+        'perfkitbenchmarker.linux_benchmarks.dpb_terasort_benchmark',
+    'dpb_wordcount_fs':
+        'perfkitbenchmarker.linux_benchmarks.dpb_wordcount_benchmark',
+    'dpb_wordcount_input':
+        'perfkitbenchmarker.linux_benchmarks.dpb_wordcount_benchmark',
+    'dpb_wordcount_out_base':
+        'perfkitbenchmarker.linux_benchmarks.dpb_wordcount_benchmark',
+    'edw_benchmark_script':
+        'perfkitbenchmarker.linux_benchmarks.edw_benchmark',
+    'fio_blocksize':
+        'perfkitbenchmarker.flag_util',
+    'fio_burst_threshold':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_bw_log':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_file_size':
+        'perfkitbenchmarker.windows_benchmarks.fio_benchmark',
+    'fio_fill_size':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_generate_scenarios':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_hist_log':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_hist_log_window_sec':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_io_depths':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_iops_log':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_jobfile':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_lat_log':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_log_avg_msec':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_log_hist_msec':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_num_jobs':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_parameters':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_random_read_parallel_size':
+        'perfkitbenchmarker.windows_benchmarks.fio_benchmark',
+    'fio_random_read_size':
+        'perfkitbenchmarker.windows_benchmarks.fio_benchmark',
+    'fio_random_write_size':
+        'perfkitbenchmarker.windows_benchmarks.fio_benchmark',
+    'fio_runtime':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_sequential_read_size':
+        'perfkitbenchmarker.windows_benchmarks.fio_benchmark',
+    'fio_sequential_write_size':
+        'perfkitbenchmarker.windows_benchmarks.fio_benchmark',
+    'fio_status_interval':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_steady_state':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_steady_state_max_range':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_steady_state_max_slope':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_steady_state_ramp_time':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_steady_state_rounds':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_target_mode':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'fio_working_set_size':
+        'perfkitbenchmarker.linux_benchmarks.fio_benchmark',
+    'gcp_firestore_firebasecli_path':
+        'perfkitbenchmarker.providers.gcp.gcp_firestore',
+    'gcp_firestore_projectid':
+        'perfkitbenchmarker.providers.gcp.gcp_firestore',
+    'git_binary':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'glibc_benchset':
+        'perfkitbenchmarker.linux_benchmarks.glibc_benchmark',
+    'gluster_replicas':
+        'perfkitbenchmarker.linux_packages.gluster',
+    'gluster_stripes':
+        'perfkitbenchmarker.linux_packages.gluster',
+    'google_bigtable_admin_endpoint':
+        'perfkitbenchmarker.linux_benchmarks.cloud_bigtable_ycsb_benchmark',
+    'google_bigtable_endpoint':
+        'perfkitbenchmarker.linux_benchmarks.cloud_bigtable_ycsb_benchmark',
+    'google_bigtable_hbase_jar_url':
+        'perfkitbenchmarker.linux_benchmarks.cloud_bigtable_ycsb_benchmark',
+    'google_bigtable_instance_name':
+        'perfkitbenchmarker.linux_benchmarks.cloud_bigtable_ycsb_benchmark',
+    'google_bigtable_zone_name':
+        'perfkitbenchmarker.linux_benchmarks.cloud_bigtable_ycsb_benchmark',
+    'google_cloud_sdk_version':
+        'perfkitbenchmarker.providers.gcp.gcs',
+    'google_datastore_datasetId':
+        'perfkitbenchmarker.linux_benchmarks.cloud_datastore_ycsb_benchmark',
+    'google_datastore_debug':
+        'perfkitbenchmarker.linux_benchmarks.cloud_datastore_ycsb_benchmark',
+    'google_datastore_keyfile':
+        'perfkitbenchmarker.linux_benchmarks.cloud_datastore_ycsb_benchmark',
+    'google_datastore_serviceAccount':
+        'perfkitbenchmarker.linux_benchmarks.cloud_datastore_ycsb_benchmark',
+    'gpu_autoboost_enabled':
+        'perfkitbenchmarker.linux_packages.cuda_toolkit',
+    'gpu_clock_speeds':
+        'perfkitbenchmarker.flag_util',
+    'gpu_pcie_bandwidth_iterations':
+        'perfkitbenchmarker.linux_benchmarks.gpu_pcie_bandwidth_benchmark',
+    'gpu_pcie_bandwidth_mode':
+        'perfkitbenchmarker.linux_benchmarks.gpu_pcie_bandwidth_benchmark',
+    'gpu_pcie_bandwidth_transfer_sizes':
+        'perfkitbenchmarker.linux_benchmarks.gpu_pcie_bandwidth_benchmark',
+    'gradle_binary':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'hammerdb_run_tpcc':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hammerdb_run_tpch':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hammerdb_tpcc_runtime':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hammerdb_tpcc_schema_virtual_user':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hammerdb_tpcc_virtual_user_list':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hammerdb_tpcc_warehouse':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hammerdb_tpch_scale_fact':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hammerdb_tpch_virtual_user':
+        'perfkitbenchmarker.windows_packages.hammerdb',
+    'hbase_bin_url':
+        'perfkitbenchmarker.linux_packages.hbase',
+    'hbase_use_snappy':
+        'perfkitbenchmarker.linux_benchmarks.hbase_ycsb_benchmark',
+    'hbase_use_stable':
+        'perfkitbenchmarker.linux_packages.hbase',
+    'hbase_version':
+        'perfkitbenchmarker.linux_packages.hbase',
+    'hbase_zookeeper_nodes':
+        'perfkitbenchmarker.linux_benchmarks.hbase_ycsb_benchmark',
+    'horovod_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.horovod_benchmark',
+    'horovod_deep_learning_examples_commit':
+        'perfkitbenchmarker.linux_benchmarks.horovod_benchmark',
+    'horovod_model':
+        'perfkitbenchmarker.linux_benchmarks.horovod_benchmark',
+    'hpcc_benchmarks':
+        'perfkitbenchmarker.linux_packages.hpcc',
+    'hpcc_binary':
+        'perfkitbenchmarker.linux_benchmarks.hpcc_benchmark',
+    'hpcc_math_library':
+        'perfkitbenchmarker.linux_packages.hpcc',
+    'hpcc_mpi_env':
+        'perfkitbenchmarker.linux_benchmarks.hpcc_benchmark',
+    'hpcc_timeout_hours':
+        'perfkitbenchmarker.linux_benchmarks.hpcc_benchmark',
+    'hpcg_gpus_per_node':
+        'perfkitbenchmarker.linux_benchmarks.hpcg_benchmark',
+    'hpcg_problem_size':
+        'perfkitbenchmarker.linux_benchmarks.hpcg_benchmark',
+    'hpcg_runtime':
+        'perfkitbenchmarker.linux_benchmarks.hpcg_benchmark',
+    'imagenet_data_dir':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'imagenet_num_eval_images':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'imagenet_num_train_images':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'inception3_epochs_per_eval':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'inception3_eval_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'inception3_learning_rate':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'inception3_mode':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'inception3_save_checkpoints_secs':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'inception3_train_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'inception3_train_epochs':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'inception3_use_data':
+        'perfkitbenchmarker.linux_benchmarks.inception3_benchmark',
+    'iodepth_list':
+        'perfkitbenchmarker.linux_benchmarks.block_storage_workloads_benchmark',
+    'ior_num_procs':
+        'perfkitbenchmarker.linux_benchmarks.ior_benchmark',
+    'ior_script':
+        'perfkitbenchmarker.linux_benchmarks.ior_benchmark',
+    'iperf_runtime_in_seconds':
+        'perfkitbenchmarker.linux_benchmarks.iperf_benchmark',
+    'iperf_sending_thread_count':
+        'perfkitbenchmarker.linux_benchmarks.iperf_benchmark',
+    'iperf_timeout':
+        'perfkitbenchmarker.linux_benchmarks.iperf_benchmark',
+    'jdbc_ycsb_db_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'jdbc_ycsb_db_driver':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'jdbc_ycsb_db_driver_path':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'jdbc_ycsb_db_passwd':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'jdbc_ycsb_db_url':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'jdbc_ycsb_db_user':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'jdbc_ycsb_fetch_size':
+        'perfkitbenchmarker.linux_benchmarks.jdbc_ycsb_benchmark',
+    'lmbench_hardware':
+        'perfkitbenchmarker.linux_benchmarks.lmbench_benchmark',
+    'lmbench_mem_size':
+        'perfkitbenchmarker.linux_benchmarks.lmbench_benchmark',
+    'max_bandwidth_mb':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'maxjobs':
+        'perfkitbenchmarker.linux_benchmarks.block_storage_workloads_benchmark',
+    'mdtest_args':
+        'perfkitbenchmarker.linux_benchmarks.ior_benchmark',
+    'mdtest_drop_caches':
+        'perfkitbenchmarker.linux_benchmarks.ior_benchmark',
+    'mdtest_num_procs':
+        'perfkitbenchmarker.linux_benchmarks.ior_benchmark',
+    'memcached_elasticache_node_type':
+        'perfkitbenchmarker.linux_benchmarks.memcached_ycsb_benchmark',
+    'memcached_elasticache_num_servers':
+        'perfkitbenchmarker.linux_benchmarks.memcached_ycsb_benchmark',
+    'memcached_elasticache_region':
+        'perfkitbenchmarker.linux_benchmarks.memcached_ycsb_benchmark',
+    'memcached_managed':
+        'perfkitbenchmarker.linux_benchmarks.memcached_ycsb_benchmark',
+    'memcached_memtier_client_machine_type':
+        'perfkitbenchmarker.linux_benchmarks.memcached_memtier_benchmark',
+    'memcached_memtier_server_machine_type':
+        'perfkitbenchmarker.linux_benchmarks.memcached_memtier_benchmark',
+    'memcached_num_threads':
+        'perfkitbenchmarker.linux_packages.memcached_server',
+    'memcached_scenario':
+        'perfkitbenchmarker.linux_benchmarks.memcached_ycsb_benchmark',
+    'memcached_size_mb':
+        'perfkitbenchmarker.linux_packages.memcached_server',
+    'memory_size_mb':
+        'perfkitbenchmarker.linux_benchmarks.hpcc_benchmark',
+    'memtier_clients':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'memtier_data_size':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'memtier_key_pattern':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'memtier_protocol':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'memtier_ratio':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'memtier_requests':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'memtier_run_count':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'memtier_threads':
+        'perfkitbenchmarker.linux_packages.memtier',
+    'mesh_network_schedule':
+        'perfkitbenchmarker.linux_benchmarks.mesh_network_benchmark',
+    'min_bandwidth_mb':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'mnist_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'mnist_data_dir':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'mnist_eval_epochs':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'mnist_num_eval_images':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'mnist_num_train_images':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'mnist_train_epochs':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'mongodb_readahead_kb':
+        'perfkitbenchmarker.linux_benchmarks.mongodb_ycsb_benchmark',
+    'mongodb_writeconcern':
+        'perfkitbenchmarker.linux_benchmarks.mongodb_ycsb_benchmark',
+    'mpirun_allow_run_as_root':
+        'perfkitbenchmarker.hpc_util',
+    'multichase_additional_flags':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_chase_arg':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_chase_type':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_memory_size_max':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_memory_size_min':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_stride_size_max':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_stride_size_min':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_taskset_options':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'multichase_thread_count':
+        'perfkitbenchmarker.linux_benchmarks.multichase_benchmark',
+    'mx_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mx_device':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mx_image_shape':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mx_key_value_store':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mx_models':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mx_num_epochs':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mx_num_layers':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mx_precision':
+        'perfkitbenchmarker.linux_benchmarks.mxnet_benchmark',
+    'mxnet_commit_hash':
+        'perfkitbenchmarker.linux_packages.mxnet_cnn',
+    'netperf_benchmarks':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_enable_histograms':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_histogram_buckets':
+        'perfkitbenchmarker.linux_packages.netperf',
+    'netperf_max_iter':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_num_client_vms':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_num_server_vms':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_num_streams':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_start_delay':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_test_length':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_thinktime':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_thinktime_array_size':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'netperf_thinktime_run_length':
+        'perfkitbenchmarker.linux_benchmarks.netperf_benchmark',
+    'ntttcp_config_list':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_cooldown_time':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_packet_size':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_receiver_rb':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_receiver_sb':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_sender_rb':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_sender_sb':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_threads':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_time':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'ntttcp_udp':
+        'perfkitbenchmarker.windows_packages.ntttcp',
+    'num_cassandra_stress_threads':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'num_connections':
+        'perfkitbenchmarker.linux_benchmarks.mesh_network_benchmark',
+    'num_iterations':
+        'perfkitbenchmarker.linux_benchmarks.mesh_network_benchmark',
+    'num_keys':
+        'perfkitbenchmarker.linux_benchmarks.cassandra_stress_benchmark',
+    'nuttcp_bandwidth_step_mb':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_cpu_sample_time':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_max_bandwidth_mb':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_min_bandwidth_mb':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_udp_iterations':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_udp_packet_size':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_udp_run_both_directions':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_udp_stream_seconds':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'nuttcp_udp_unlimited_bandwidth':
+        'perfkitbenchmarker.windows_packages.nuttcp',
+    'object_storage_arrival_distribution':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_bucket_name':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_compress_worker_output':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_credential_file':
+        'perfkitbenchmarker.object_storage_service',
+    'object_storage_dont_delete_bucket':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_gcs_multiregion':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_latency_histogram_interval':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_list_consistency_iterations':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_local_backend':
+        'perfkitbenchmarker.local_object_storage',
+    'object_storage_local_bandwidth_mbps':
+        'perfkitbenchmarker.local_object_storage',
+    'object_storage_local_latency':
+        'perfkitbenchmarker.local_object_storage',
+    'object_storage_multistream_objects_per_stream':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_object_naming_scheme':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_object_sizes':
+        'perfkitbenchmarker.flag_util',
+    'object_storage_objects_written_file_prefix':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_read_objects_min_hours':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_read_objects_prefix':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_region':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_request_rate':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_scenario':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_storage_class':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_streams_per_process':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_streams_per_vm':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_timeline_interval':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_worker_output':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'object_storage_worker_output_format':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'oldisim_fanout':
+        'perfkitbenchmarker.linux_benchmarks.oldisim_benchmark',
+    'oldisim_latency_metric':
+        'perfkitbenchmarker.linux_benchmarks.oldisim_benchmark',
+    'oldisim_latency_target':
+        'perfkitbenchmarker.linux_benchmarks.oldisim_benchmark',
+    'oldisim_num_leaves':
+        'perfkitbenchmarker.linux_benchmarks.oldisim_benchmark',
+    'openjdk_version':
+        'perfkitbenchmarker.linux_packages.openjdk',
+    'openmpi_enable_shared':
+        'perfkitbenchmarker.linux_packages.openmpi',
+    'package_cache':
+        'perfkitbenchmarker.package_cache',
+    'package_cache_dir':
+        'perfkitbenchmarker.package_cache',
+    'package_cache_rebuild':
+        'perfkitbenchmarker.package_cache',
+    'pgbench_client_counts':
+        'perfkitbenchmarker.linux_benchmarks.pgbench_benchmark',
+    'pgbench_scale_factor':
+        'perfkitbenchmarker.linux_benchmarks.pgbench_benchmark',
+    'pgbench_seconds_per_test':
+        'perfkitbenchmarker.linux_benchmarks.pgbench_benchmark',
+    'pgbench_seconds_to_pause_before_steps':
+        'perfkitbenchmarker.linux_benchmarks.pgbench_benchmark',
+    'ping_all_pairs':
+        'perfkitbenchmarker.linux_benchmarks.ping_benchmark',
+    'ping_also_run_using_external_ip':
+        'perfkitbenchmarker.linux_benchmarks.ping_benchmark',
+    'ping_count':
+        'perfkitbenchmarker.linux_benchmarks.ping_benchmark',
+    'ping_histogram':
+        'perfkitbenchmarker.linux_benchmarks.ping_benchmark',
+    'ping_interval':
+        'perfkitbenchmarker.linux_benchmarks.ping_benchmark',
+    'ping_window_sec':
+        'perfkitbenchmarker.linux_benchmarks.ping_benchmark',
+    'psping_bucket_count':
+        'perfkitbenchmarker.windows_packages.psping',
+    'psping_packet_size':
+        'perfkitbenchmarker.windows_packages.psping',
+    'psping_rr_count':
+        'perfkitbenchmarker.windows_packages.psping',
+    'psping_timeout':
+        'perfkitbenchmarker.windows_packages.psping',
+    'python_binary':
+        'perfkitbenchmarker.beam_benchmark_helper',
+    'redis_clients':
+        'perfkitbenchmarker.linux_benchmarks.redis_benchmark',
+    'redis_enable_aof':
+        'perfkitbenchmarker.linux_packages.redis_server',
+    'redis_numprocesses':
+        'perfkitbenchmarker.linux_benchmarks.redis_benchmark',
+    'redis_region':
+        'perfkitbenchmarker.linux_benchmarks.cloud_redis_ycsb_benchmark',
+    'redis_server_version':
+        'perfkitbenchmarker.linux_packages.redis_server',
+    'redis_setgetratio':
+        'perfkitbenchmarker.linux_benchmarks.redis_benchmark',
+    'redis_total_num_processes':
+        'perfkitbenchmarker.linux_packages.redis_server',
+    'redis_ycsb_processes':
+        'perfkitbenchmarker.linux_benchmarks.redis_ycsb_benchmark',
+    'resnet_data_format':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'resnet_depth':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'resnet_epochs_per_eval':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'resnet_eval_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'resnet_mode':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'resnet_skip_host_call':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'resnet_train_batch_size':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'resnet_train_epochs':
+        'perfkitbenchmarker.linux_benchmarks.resnet_benchmark',
+    'run_tcp':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'run_udp':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'runspec_build_tool_version':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'runspec_config':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'runspec_define':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'runspec_enable_32bit':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'runspec_estimate_spec':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'runspec_iterations':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'runspec_keep_partial_results':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'runspec_metric':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2006_benchmark',
+    'silo_benchmark':
+        'perfkitbenchmarker.linux_benchmarks.silo_benchmark',
+    'socket_buffer_size':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'spark_classname':
+        'perfkitbenchmarker.linux_benchmarks.spark_benchmark',
+    'spark_jarfile':
+        'perfkitbenchmarker.linux_benchmarks.spark_benchmark',
+    'spark_job_arguments':
+        'perfkitbenchmarker.linux_benchmarks.spark_benchmark',
+    'spark_job_type':
+        'perfkitbenchmarker.linux_benchmarks.spark_benchmark',
+    'spark_print_stdout':
+        'perfkitbenchmarker.linux_benchmarks.spark_benchmark',
+    'spec17_copies':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2017_benchmark',
+    'spec17_fdo':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2017_benchmark',
+    'spec17_subset':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2017_benchmark',
+    'spec17_threads':
+        'perfkitbenchmarker.linux_benchmarks.speccpu2017_benchmark',
+    'spec_runmode':
+        'perfkitbenchmarker.linux_packages.speccpu',
+    'specsfs2014_auto_mode':
+        'perfkitbenchmarker.linux_benchmarks.specsfs2014_benchmark',
+    'specsfs2014_benchmarks':
+        'perfkitbenchmarker.linux_benchmarks.specsfs2014_benchmark',
+    'specsfs2014_config':
+        'perfkitbenchmarker.linux_benchmarks.specsfs2014_benchmark',
+    'specsfs2014_incr_load':
+        'perfkitbenchmarker.linux_benchmarks.specsfs2014_benchmark',
+    'specsfs2014_load':
+        'perfkitbenchmarker.linux_benchmarks.specsfs2014_benchmark',
+    'specsfs2014_num_runs':
+        'perfkitbenchmarker.linux_benchmarks.specsfs2014_benchmark',
+    'stencil2d_iterations':
+        'perfkitbenchmarker.linux_benchmarks.stencil2d_benchmark',
+    'stencil2d_problem_sizes':
+        'perfkitbenchmarker.linux_benchmarks.stencil2d_benchmark',
+    'storage':
+        'perfkitbenchmarker.linux_benchmarks.object_storage_service_benchmark',
+    'sysbench_latency_percentile':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_post_failover_seconds':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_pre_failover_seconds':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_report_interval':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_run_seconds':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_scale':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_table_size':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_tables':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_testname':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_thread_counts':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    'sysbench_warmup_seconds':
+        'perfkitbenchmarker.linux_benchmarks.sysbench_benchmark',
+    't2t_data_dir':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    't2t_eval_steps':
+        'perfkitbenchmarker.linux_benchmarks.t2t_benchmark',
+    't2t_hparams_set':
+        'perfkitbenchmarker.linux_benchmarks.t2t_benchmark',
+    't2t_model':
+        'perfkitbenchmarker.linux_benchmarks.t2t_benchmark',
+    't2t_pip_package':
+        'perfkitbenchmarker.linux_packages.tensorflow',
+    't2t_problem':
+        'perfkitbenchmarker.linux_benchmarks.t2t_benchmark',
+    't2t_train_steps':
+        'perfkitbenchmarker.linux_benchmarks.t2t_benchmark',
+    'tcp_number_of_streams':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'tcp_stream_seconds':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'tensorflow_models_commit_hash':
+        'perfkitbenchmarker.linux_packages.tensorflow_models',
+    'terasort_append_timestamp':
+        'perfkitbenchmarker.linux_benchmarks.hadoop_terasort_benchmark',
+    'terasort_data_base':
+        'perfkitbenchmarker.linux_benchmarks.hadoop_terasort_benchmark',
+    'terasort_num_rows':
+        'perfkitbenchmarker.linux_benchmarks.hadoop_terasort_benchmark',
+    'terasort_unsorted_dir':
+        'perfkitbenchmarker.linux_benchmarks.hadoop_terasort_benchmark',
+    'tf_batch_sizes':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_benchmark_args':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_cnn_benchmarks_branch':
+        'perfkitbenchmarker.linux_packages.tensorflow',
+    'tf_cpu_pip_package':
+        'perfkitbenchmarker.linux_packages.tensorflow',
+    'tf_data_dir':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_data_format':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_data_module':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_data_name':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_device':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_distortions':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_distributed':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_distributed_port':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_forward_only':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_gpu_pip_package':
+        'perfkitbenchmarker.linux_packages.tensorflow',
+    'tf_local_parameter_device':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_models':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_num_files_train':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_num_files_val':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_precision':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_serving_branch':
+        'perfkitbenchmarker.linux_packages.tensorflow_serving',
+    'tf_serving_client_thread_counts':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_serving_benchmark',
+    'tf_serving_runtime':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_serving_benchmark',
+    'tf_use_local_data':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tf_variable_update':
+        'perfkitbenchmarker.linux_benchmarks.tensorflow_benchmark',
+    'tomcat_url':
+        'perfkitbenchmarker.linux_packages.tomcat',
+    'tomcat_wrk_max_connections':
+        'perfkitbenchmarker.linux_benchmarks.tomcat_wrk_benchmark',
+    'tomcat_wrk_report_all_samples':
+        'perfkitbenchmarker.linux_benchmarks.tomcat_wrk_benchmark',
+    'tomcat_wrk_test_length':
+        'perfkitbenchmarker.linux_benchmarks.tomcat_wrk_benchmark',
+    'tpu_iterations':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'tpu_precision':
+        'perfkitbenchmarker.linux_benchmarks.mnist_benchmark',
+    'udp_buffer_len':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'udp_client_threads':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'udp_stream_seconds':
+        'perfkitbenchmarker.windows_packages.iperf3',
+    'unixbench_all_cores':
+        'perfkitbenchmarker.linux_benchmarks.unixbench_benchmark',
+    'workload_mode':
+        'perfkitbenchmarker.linux_benchmarks.block_storage_workloads_benchmark',
+    'ycsb_client_vms':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_field_count':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_field_length':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_histogram':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_include_individual_results':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_load_parameters':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_load_processes_per_vm':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_load_resume':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_load_samples':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_load_shards':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_measurement_interval':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_measurement_type':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_operation_count':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_preload_threads':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_readproportion':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_record_count':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_reload_database':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_requestdistribution':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_run_parameters':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_scanproportion':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_target_search_initial_target':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_target_search_max_runs':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_target_search_percentile':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_target_search_precision':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_target_search_slo_ms':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_threads_per_client':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_timelimit':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_updateproportion':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_version':
+        'perfkitbenchmarker.linux_packages.ycsb',
+    'ycsb_workload_files':
+        'perfkitbenchmarker.linux_packages.ycsb',
+}
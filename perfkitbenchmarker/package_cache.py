@@ -0,0 +1,191 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Caches the build artifacts of linux_packages on the machine running PKB.
+
+Packages that build from source can wrap their build step in
+InstallFromCache. With --package_cache, the first VM to install a given build
+of a package builds it and the resulting directories are archived into the
+cache directory on the PKB host. Every other VM, in the same run or a later
+one, extracts the archive instead of building.
+
+A build is identified by a digest of the package name, the VM's OS type, the
+source of the module that builds the package and any extra key parts the
+package passes, such as flag values that change the build.
+"""
+
+import hashlib
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+
+from perfkitbenchmarker import context
+from perfkitbenchmarker import flags
+from perfkitbenchmarker import sample
+from perfkitbenchmarker import temp_dir
+
+flags.DEFINE_boolean('package_cache', False,
+                     'Whether to build packages that support caching once and '
+                     'copy the build to other VMs rather than building on '
+                     'every VM.')
+flags.DEFINE_string('package_cache_dir', None,
+                    'Directory on the machine running PKB that holds cached '
+                    'package builds. Defaults to a directory under '
+                    '--temp_dir, so that builds are reused by later runs.')
+flags.DEFINE_boolean('package_cache_rebuild', False,
+                     'Whether to rebuild cached packages once per run and '
+                     'replace their cache entries, e.g. after changing the '
+                     'package outside of PKB.')
+
+FLAGS = flags.FLAGS
+
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+# Keys built during this run, which --package_cache_rebuild doesn't rebuild.
+_built_keys = set()
+
+
+def _GetKeyLock(key):
+  """Returns the lock that serializes building the cache entry 'key'."""
+  with _key_locks_lock:
+    return _key_locks.setdefault(key, threading.Lock())
+
+
+def _GetCacheDir():
+  return FLAGS.package_cache_dir or temp_dir.GetPackageCacheDirPath()
+
+
+def GetCacheKey(vm, package_name, build_func, key_parts=()):
+  """Returns the digest identifying a build of a package.
+
+  Args:
+    vm: The BaseLinuxMixin VM that the package is installed on.
+    package_name: string. Name of the package.
+    build_func: The function that builds the package. The source of its
+        module is part of the key, so changing how a package is built
+        invalidates its cache entries.
+    key_parts: Sequence of values, such as flag values, that the build also
+        depends on.
+
+  Returns:
+    A hex digest string.
+  """
+  digest = hashlib.sha256()
+  module_source = inspect.getsource(sys.modules[build_func.__module__])
+  for part in [package_name, vm.OS_TYPE, module_source] + list(key_parts):
+    digest.update(str(part))
+    digest.update('\0')
+  return digest.hexdigest()
+
+
+def _CheckPaths(paths):
+  for path in paths:
+    if not path.startswith('/') or path.rstrip('/') == '':
+      raise ValueError('Cached paths must be absolute directories, got %s.' %
+                       path)
+
+
+def _Upload(vm, paths, archive_name, local_path):
+  """Archives 'paths' on the VM and copies the archive to local_path."""
+  # The archive is kept in the remote home directory.
+  remote_path = archive_name
+  relative_paths = ' '.join(path.lstrip('/') for path in paths)
+  vm.RemoteCommand('tar -czf %s -C / %s' % (remote_path, relative_paths))
+  # Copy to a temporary file and rename it, so that other PKB processes never
+  # see a partial archive.
+  partial_path = '%s.%s.partial' % (local_path, os.getpid())
+  vm.PullFile(partial_path, remote_path)
+  os.rename(partial_path, local_path)
+  vm.RemoteCommand('rm %s' % remote_path)
+
+
+def _Restore(vm, archive_name, local_path):
+  """Copies the archive at local_path to the VM and extracts it."""
+  remote_path = archive_name
+  vm.PushFile(local_path, remote_path)
+  vm.RemoteCommand('tar -xzf %s -C / && rm %s' % (remote_path, remote_path))
+
+
+def InstallFromCache(vm, package_name, paths, build_func, key_parts=()):
+  """Installs a build of a package, from the cache if possible.
+
+  Without --package_cache this just calls build_func(vm). Otherwise, if the
+  cache holds the build, it is extracted on the VM. If it doesn't, the build
+  runs on this VM and is added to the cache. VMs installing the same build
+  concurrently wait for the first one to finish building rather than
+  building too.
+
+  Args:
+    vm: The BaseLinuxMixin VM to install the package on.
+    package_name: string. Name of the package.
+    paths: list of strings. Absolute remote directories that build_func
+        creates and that contain the whole build, such as directories under
+        linux_packages.INSTALL_DIR. They are extracted as the VM's user, so
+        their parents must be writable by it.
+    build_func: function that accepts the VM and builds the package into
+        'paths'. Anything it installs outside of 'paths', such as packages
+        needed at runtime, must be installed outside of build_func.
+    key_parts: Sequence of values, such as flag values, that the build also
+        depends on.
+
+  Raises:
+    ValueError: If a path is not an absolute directory.
+  """
+  if not FLAGS.package_cache:
+    build_func(vm)
+    return
+  _CheckPaths(paths)
+  key = GetCacheKey(vm, package_name, build_func, key_parts)
+  archive_name = '%s-%s.tar.gz' % (package_name, key[:16])
+  cache_dir = _GetCacheDir()
+  local_path = os.path.join(cache_dir, archive_name)
+  start_time = time.time()
+  with _GetKeyLock(key):
+    cache_hit = (key in _built_keys or
+                 (not FLAGS.package_cache_rebuild and
+                  os.path.exists(local_path)))
+    if not cache_hit:
+      logging.info('Building %s on %s and adding it to the package cache.',
+                   package_name, vm.name)
+      build_func(vm)
+      try:
+        os.makedirs(cache_dir)
+      except OSError:
+        if not os.path.isdir(cache_dir):
+          raise
+      _Upload(vm, paths, archive_name, local_path)
+      _built_keys.add(key)
+  if cache_hit:
+    logging.info('Installing %s on %s from the package cache.', package_name,
+                 vm.name)
+    _Restore(vm, archive_name, local_path)
+  _AddSample(vm, package_name, key, cache_hit, time.time() - start_time,
+             os.path.getsize(local_path))
+
+
+def _AddSample(vm, package_name, key, cache_hit, install_time, archive_size):
+  """Records a cached install on the current benchmark, if there is one."""
+  benchmark_spec = context.GetThreadBenchmarkSpec()
+  if benchmark_spec is None:
+    return
+  metadata = {'package': package_name,
+              'package_cache_key': key,
+              'package_cache_hit': cache_hit,
+              'package_archive_bytes': archive_size,
+              'vm_name': vm.name}
+  benchmark_spec.package_cache_samples.append(
+      sample.Sample('Package Install Time', install_time, 'seconds',
+                    metadata))
@@ -783,7 +783,7 @@ def RunBenchmark(spec, collector):
         # don't prevent teardown.
         if stages.TEARDOWN in FLAGS.run_stage:
           spec.Delete()
-        if FLAGS.publish_after_run:
+        if FLAGS.publish_after_run or FLAGS.publish_streaming:
           collector.PublishSamples()
         events.benchmark_end.send(benchmark_spec=spec)
         # Pickle spec to save final resource state.
@@ -1045,8 +1045,12 @@ def RunBenchmarks():
 def _GenerateBenchmarkDocumentation():
   """Generates benchmark documentation to show in --help."""
   benchmark_docs = []
-  for benchmark_module in (linux_benchmarks.BENCHMARKS +
-                           windows_benchmarks.BENCHMARKS):
+  benchmark_modules = (
+      [(linux_benchmarks.VALID_BENCHMARKS[name], False)
+       for name in sorted(linux_benchmarks.VALID_BENCHMARKS)] +
+      [(windows_benchmarks.VALID_BENCHMARKS[name], True)
+       for name in sorted(windows_benchmarks.VALID_BENCHMARKS)])
+  for benchmark_module, is_windows in benchmark_modules:
     benchmark_config = configs.LoadMinimalConfig(
         benchmark_module.BENCHMARK_CONFIG, benchmark_module.BENCHMARK_NAME)
     vm_groups = benchmark_config.get('vm_groups', {})
@@ -1063,7 +1067,7 @@ def _GenerateBenchmarkDocumentation():
         scratch_disk_str = ' with scratch volume(s)'
 
     name = benchmark_module.BENCHMARK_NAME
-    if benchmark_module in windows_benchmarks.BENCHMARKS:
+    if is_windows:
       name += ' (Windows)'
     benchmark_docs.append('%s: %s (%s VMs%s)' %
                           (name,
@@ -1075,7 +1079,10 @@ def _GenerateBenchmarkDocumentation():
 
 def Main():
   log_util.ConfigureBasicLogging()
-  _InjectBenchmarkInfoIntoDocumentation()
+  # Listing the benchmarks in --help requires importing all of them, so it's
+  # only done when they were all needed anyway.
+  if benchmark_sets.ImportModulesForArgs(sys.argv):
+    _InjectBenchmarkInfoIntoDocumentation()
   _ParseFlags()
   if FLAGS.helpmatch:
     _PrintHelp(FLAGS.helpmatch)
@@ -17,6 +17,7 @@
 """Classes to collect and publish performance samples to various sinks."""
 
 import abc
+import atexit
 import collections
 import copy
 import csv
@@ -28,8 +29,11 @@ import json
 import logging
 import math
 import operator
+import os
 import pprint
+import Queue
 import sys
+import threading
 import time
 import urllib
 import uuid
@@ -38,6 +42,7 @@ from perfkitbenchmarker import events
 from perfkitbenchmarker import flags
 from perfkitbenchmarker import flag_util
 from perfkitbenchmarker import log_util
+from perfkitbenchmarker import result_store
 from perfkitbenchmarker import version
 from perfkitbenchmarker import vm_util
 
@@ -80,6 +85,13 @@ flags.DEFINE_string(
     None,
     'A path to write CSV-format results')
 
+flags.DEFINE_string(
+    'results_db_path',
+    None,
+    'A path to an SQLite database to add results to. The database is created '
+    'if it does not exist, and can be shared by many runs. See '
+    'perfkitbenchmarker/result_store.py for how to query it.')
+
 flags.DEFINE_string(
     'bigquery_table',
     None,
@@ -127,10 +139,33 @@ flags.DEFINE_string(
     'influx_db_name', 'perfkit',
     'Name of Influx DB database that you wish to publish to or create')
 
+flags.DEFINE_boolean(
+    'publish_streaming', False,
+    'If true, samples are published as soon as they are added to the '
+    'collector. Each annotated sample is appended to a spool file in the run '
+    'directory and handed to background workers for the publishers that '
+    'support incremental publishing (newline-delimited JSON, CSV, the result '
+    'store, Elasticsearch and InfluxDB). The remaining publishers are fed '
+    'from the spool file when samples would otherwise have been published.')
+flags.DEFINE_integer(
+    'publish_streaming_batch_size', 100,
+    'Maximum number of samples a streaming publisher worker sends to its '
+    'publisher at once.', lower_bound=1)
+flags.DEFINE_integer(
+    'publish_streaming_queue_size', 1000,
+    'Maximum number of samples waiting for each streaming publisher worker. '
+    'Adding samples blocks while a queue is full.', lower_bound=1)
+
 DEFAULT_JSON_OUTPUT_NAME = 'perfkitbenchmarker_results.json'
+SPOOL_FILE_PREFIX = 'perfkitbenchmarker_samples_spool'
 DEFAULT_CREDENTIALS_JSON = 'credentials.json'
 GCS_OBJECT_NAME_LENGTH = 20
 
+# Absolute paths of the JSON and CSV files that streaming publishers in this
+# process have already opened with their initial mode (see _OpenStreamedFile).
+_streamed_file_paths = set()
+_streamed_file_paths_lock = threading.Lock()
+
 # A list of SamplePublishers that can be extended to add support for publishing
 # types beyond those in this module. The classes should not require any
 # arguments to their __init__ methods. The SampleCollector will unconditionally
@@ -195,12 +230,32 @@ class MetadataProvider(object):
     """
     raise NotImplementedError()
 
+  def GetRunMetadata(self, benchmark_spec):
+    """Gets the metadata this provider adds to every sample of a run.
+
+    Providers whose metadata doesn't depend on the sample should override
+    this, so that SampleCollector computes it once for many samples instead
+    of calling AddMetadata for each of them.
+
+    Args:
+      benchmark_spec: BenchmarkSpec. The benchmark specification.
+
+    Returns:
+      dict of metadata, or None if the metadata depends on the sample.
+    """
+    return None
+
 
 class DefaultMetadataProvider(MetadataProvider):
   """Adds default metadata to samples."""
 
   def AddMetadata(self, metadata, benchmark_spec):
     metadata = metadata.copy()
+    metadata.update(self.GetRunMetadata(benchmark_spec))
+    return metadata
+
+  def GetRunMetadata(self, benchmark_spec):
+    metadata = {}
     metadata['perfkitbenchmarker_version'] = version.VERSION
     if FLAGS.simulate_maintenance:
       metadata['simulate_maintenance'] = True
@@ -256,18 +311,71 @@ class DefaultMetadataProvider(MetadataProvider):
 DEFAULT_METADATA_PROVIDERS = [DefaultMetadataProvider()]
 
 
+class _SharedMetadata(collections.Mapping):
+  """A sample's metadata, layered under metadata shared by many samples.
+
+  Keys in the shared metadata take precedence over the sample's own, as if the
+  shared metadata had been added to the sample's by a MetadataProvider. The
+  shared dict must not be modified.
+  """
+
+  def __init__(self, shared, own):
+    self._shared = shared
+    self._own = own
+
+  def __getitem__(self, key):
+    if key in self._shared:
+      return self._shared[key]
+    return self._own[key]
+
+  def __contains__(self, key):
+    return key in self._shared or key in self._own
+
+  def __iter__(self):
+    return itertools.chain(
+        self._shared, (k for k in self._own if k not in self._shared))
+
+  def __len__(self):
+    return len(self._shared) + sum(1 for k in self._own
+                                   if k not in self._shared)
+
+  def Materialize(self):
+    """Returns the metadata as a new dict."""
+    metadata = dict(self._own)
+    metadata.update(self._shared)
+    return metadata
+
+
+def _MaterializeSamples(samples):
+  """Returns annotated samples with plain dict metadata, for publishers."""
+  materialized = []
+  for sample in samples:
+    if isinstance(sample['metadata'], _SharedMetadata):
+      sample = dict(sample, metadata=sample['metadata'].Materialize())
+    materialized.append(sample)
+  return materialized
+
+
 class SamplePublisher(object):
-  """An object that can publish performance samples."""
+  """An object that can publish performance samples.
+
+  Attributes:
+    SUPPORTS_INCREMENTAL_PUBLISHING: boolean. True if PublishSamples may be
+        called repeatedly with successive batches of samples, each call adding
+        to rather than replacing the output of earlier calls.
+  """
 
   __metaclass__ = abc.ABCMeta
 
+  SUPPORTS_INCREMENTAL_PUBLISHING = False
+
   @abc.abstractmethod
   def PublishSamples(self, samples):
     """Publishes 'samples'.
 
-    PublishSamples will be called exactly once. Calling
-    SamplePublisher.PublishSamples multiple times may result in data being
-    overwritten.
+    Unless SUPPORTS_INCREMENTAL_PUBLISHING is True, PublishSamples will be
+    called exactly once. Calling SamplePublisher.PublishSamples multiple times
+    may result in data being overwritten.
 
     Args:
       samples: list of dicts to publish.
@@ -281,31 +389,64 @@ class CSVPublisher(SamplePublisher):
 
   The default field names are written first, followed by all unique metadata
   keys found in the data.
+
+  Only the first call to PublishSamples opens 'file_path' with 'mode'; later
+  calls merge their samples into the file. Rows are appended while the
+  existing header covers their metadata keys, and otherwise the file is
+  rewritten with a header covering both.
+
+  Attributes:
+    file_path: string. Destination path to write samples.
+    mode: Open mode for 'file_path'. Set to 'ab' to merge into the file.
   """
 
+  SUPPORTS_INCREMENTAL_PUBLISHING = True
+
   _DEFAULT_FIELDS = ('timestamp', 'test', 'metric', 'value', 'unit',
                      'product_name', 'official', 'owner', 'run_uri',
                      'sample_uri')
 
-  def __init__(self, path):
-    self._path = path
+  def __init__(self, file_path, mode='wb'):
+    self.file_path = file_path
+    self.mode = mode
+
+  def __repr__(self):
+    return '<{0} file_path="{1}" mode="{2}">'.format(
+        type(self).__name__, self.file_path, self.mode)
 
   def PublishSamples(self, samples):
     samples = list(samples)
     # Union of all metadata keys.
-    meta_keys = sorted(
-        set(key for sample in samples for key in sample['metadata']))
+    meta_keys = set(key for sample in samples for key in sample['metadata'])
 
-    logging.info('Writing CSV results to %s', self._path)
-    with open(self._path, 'w') as fp:
-      writer = csv.DictWriter(fp, list(self._DEFAULT_FIELDS) + meta_keys)
-      writer.writeheader()
+    logging.info('Writing CSV results to %s', self.file_path)
+    with open(self.file_path, self.mode) as fp:
+      fcntl.flock(fp, fcntl.LOCK_EX)
+      fieldnames = None
+      rows = []
+      if 'a' in self.mode:
+        with open(self.file_path, 'rb') as existing:
+          reader = csv.DictReader(existing)
+          fieldnames = reader.fieldnames
+          if fieldnames and not meta_keys.issubset(fieldnames):
+            rows = list(reader)
+            meta_keys.update(fieldnames[len(self._DEFAULT_FIELDS):])
+            fieldnames = None
+            fp.truncate(0)
+      if fieldnames:
+        writer = csv.DictWriter(fp, fieldnames)
+      else:
+        writer = csv.DictWriter(
+            fp, list(self._DEFAULT_FIELDS) + sorted(meta_keys))
+        writer.writeheader()
+        writer.writerows(rows)
 
       for sample in samples:
         d = {}
         d.update(sample)
         d.update(d.pop('metadata'))
         writer.writerow(d)
+    self.mode = 'ab'
 
 
 class PrettyPrintStreamPublisher(SamplePublisher):
@@ -465,12 +606,17 @@ class NewlineDelimitedJSONPublisher(SamplePublisher):
   If 'collapse_labels' is True, metadata is converted to a flat string with key
   'labels' via GetLabelsFromDict.
 
+  Only the first call to PublishSamples opens 'file_path' with 'mode'; later
+  calls append to the file.
+
   Attributes:
     file_path: string. Destination path to write samples.
     mode: Open mode for 'file_path'. Set to 'a' to append.
     collapse_labels: boolean. If true, collapse sample metadata.
   """
 
+  SUPPORTS_INCREMENTAL_PUBLISHING = True
+
   def __init__(self, file_path, mode='wb', collapse_labels=True):
     self.file_path = file_path
     self.mode = mode
@@ -490,6 +636,30 @@ class NewlineDelimitedJSONPublisher(SamplePublisher):
         if self.collapse_labels:
           sample['labels'] = GetLabelsFromDict(sample.pop('metadata', {}))
         fp.write(json.dumps(sample) + '\n')
+    self.mode = 'ab'
+
+
+class ResultStorePublisher(SamplePublisher):
+  """Publishes samples to an SQLite result_store.ResultStore.
+
+  Attributes:
+    db_path: string. Path of the SQLite database.
+  """
+
+  SUPPORTS_INCREMENTAL_PUBLISHING = True
+
+  def __init__(self, db_path):
+    self.db_path = db_path
+
+  def __repr__(self):
+    return '<{0} db_path="{1}">'.format(type(self).__name__, self.db_path)
+
+  def PublishSamples(self, samples):
+    logging.info('Publishing %d samples to %s', len(samples), self.db_path)
+    # Streaming publishers are called from a worker thread, and SQLite
+    # connections can't be shared between threads.
+    with result_store.ResultStore(self.db_path) as store:
+      store.AddSamples(samples)
 
 
 class BigQueryPublisher(SamplePublisher):
@@ -605,6 +775,9 @@ class ElasticsearchPublisher(SamplePublisher):
     es_index: String. Default "perfkit"
     es_type: String. Default "result"
   """
+
+  SUPPORTS_INCREMENTAL_PUBLISHING = True
+
   def __init__(self, es_uri=None, es_index=None, es_type=None):
     self.es_uri = es_uri
     self.es_index = es_index.lower()
@@ -738,6 +911,8 @@ class InfluxDBPublisher(SamplePublisher):
       create.
   """
 
+  SUPPORTS_INCREMENTAL_PUBLISHING = True
+
   def __init__(self, influx_uri=None, influx_db_name=None):
     # set to default above in flags unless changed
     self.influx_uri = influx_uri
@@ -826,6 +1001,165 @@ class InfluxDBPublisher(SamplePublisher):
       raise httplib.HTTPException
 
 
+class _StreamingPublisherWorker(object):
+  """Publishes batches of samples from a bounded queue on a daemon thread.
+
+  Attributes:
+    publisher: SamplePublisher. Must support incremental publishing.
+    batch_size: int. Maximum number of samples passed to each PublishSamples
+        call.
+  """
+
+  # Put on the queue to stop the worker thread.
+  _STOP = object()
+
+  def __init__(self, publisher, batch_size, queue_size):
+    self.publisher = publisher
+    self.batch_size = batch_size
+    self._queue = Queue.Queue(maxsize=queue_size)
+    self._thread = threading.Thread(target=self._Run,
+                                    name='publish-%s' % type(publisher).__name__)
+    self._thread.daemon = True
+    self._thread.start()
+
+  def Put(self, sample):
+    """Queues a sample, blocking while the queue is full."""
+    self._queue.put(sample)
+
+  def Stop(self):
+    """Publishes all queued samples, then stops the worker thread."""
+    self._queue.put(self._STOP)
+    self._thread.join()
+
+  def _Run(self):
+    stopping = False
+    while not stopping:
+      batch = [self._queue.get()]
+      while len(batch) < self.batch_size:
+        try:
+          batch.append(self._queue.get_nowait())
+        except Queue.Empty:
+          break
+      if batch[-1] is self._STOP:
+        batch.pop()
+        stopping = True
+      if batch:
+        try:
+          self.publisher.PublishSamples(batch)
+        except Exception:  # pylint: disable=broad-except
+          logging.exception('Error streaming %d samples to %s.', len(batch),
+                            self.publisher)
+
+
+def _OpenStreamedFile(file_publisher):
+  """Makes a streaming JSON or CSV publisher add to its file.
+
+  Every benchmark has its own SampleCollector, each with its own publishers.
+  The first streamer in the run to use a path opens it with the publisher's
+  mode, e.g. truncating it, and every later streamer adds to it, including
+  those in benchmark processes forked after it.
+
+  Args:
+    file_publisher: NewlineDelimitedJSONPublisher or CSVPublisher.
+  """
+  path = os.path.abspath(file_publisher.file_path)
+  with _streamed_file_paths_lock:
+    if path not in _streamed_file_paths:
+      open(file_publisher.file_path, file_publisher.mode).close()
+      _streamed_file_paths.add(path)
+  file_publisher.mode = 'ab'
+
+
+class _SampleStreamer(object):
+  """Streams annotated samples to publishers as they are collected.
+
+  Every sample is first appended to a spool file, which is fsynced after each
+  batch of added samples, so that samples survive a crash of the PKB process.
+  The spool file contains one JSON sample per line with uncollapsed metadata,
+  and can be republished with RepublishJSONSamples. Samples are then queued
+  to a worker per incremental publisher. Publishers that cannot publish
+  incrementally are fed from the spool file by Flush. JSON and CSV publishers
+  add to files shared with the other streamers of the run.
+
+  Attributes:
+    spool_path: string. Path of the spool file.
+  """
+
+  def __init__(self, publishers, batch_size, queue_size):
+    self._incremental_publishers = [
+        p for p in publishers if p.SUPPORTS_INCREMENTAL_PUBLISHING]
+    self._batch_publishers = [
+        p for p in publishers if not p.SUPPORTS_INCREMENTAL_PUBLISHING]
+    self._batch_size = batch_size
+    self._queue_size = queue_size
+    self._workers = None
+    self._lock = threading.Lock()
+    # Notified when no AddSamples call is queueing samples to the workers.
+    self._queueing_done = threading.Condition(self._lock)
+    self._num_queueing = 0
+    self.spool_path = vm_util.PrependTempDir('%s-%s.json' % (
+        SPOOL_FILE_PREFIX, str(uuid.uuid4())[-8:]))
+    self._spool_file = None
+    # Offset of the first spooled sample not yet given to batch publishers.
+    self._batch_offset = 0
+    for publisher in self._incremental_publishers:
+      if isinstance(publisher, (NewlineDelimitedJSONPublisher, CSVPublisher)):
+        _OpenStreamedFile(publisher)
+    atexit.register(self.Flush)
+
+  def AddSamples(self, samples):
+    """Spools and queues annotated sample dicts for publishing."""
+    with self._lock:
+      if self._spool_file is None:
+        self._spool_file = open(self.spool_path, 'ab')
+      if self._workers is None:
+        self._workers = [
+            _StreamingPublisherWorker(p, self._batch_size, self._queue_size)
+            for p in self._incremental_publishers]
+      for sample in samples:
+        self._spool_file.write(json.dumps(sample) + '\n')
+      self._spool_file.flush()
+      os.fsync(self._spool_file.fileno())
+      workers = self._workers
+      self._num_queueing += 1
+    # Queue outside of the lock so that a full queue only blocks this thread.
+    # Flush waits for this to finish before stopping the workers.
+    try:
+      for sample in samples:
+        for worker in workers:
+          worker.Put(sample)
+    finally:
+      with self._lock:
+        self._num_queueing -= 1
+        if not self._num_queueing:
+          self._queueing_done.notify_all()
+
+  def Flush(self):
+    """Waits for queued samples to be published and runs batch publishers."""
+    with self._lock:
+      while self._num_queueing:
+        self._queueing_done.wait()
+      if self._workers:
+        for worker in self._workers:
+          worker.Stop()
+      self._workers = None
+      if not (self._batch_publishers and self._spool_file):
+        return
+      start_offset = self._batch_offset
+      self._batch_offset = end_offset = self._spool_file.tell()
+    if start_offset == end_offset:
+      return
+    # Read one line at a time rather than the whole spool at once. Samples
+    # spooled after end_offset are left for the next Flush.
+    samples = []
+    with open(self.spool_path) as fp:
+      fp.seek(start_offset)
+      while fp.tell() < end_offset:
+        samples.append(json.loads(fp.readline()))
+    for publisher in self._batch_publishers:
+      publisher.PublishSamples(samples)
+
+
 class SampleCollector(object):
   """A performance sample collector.
 
@@ -843,9 +1177,12 @@ class SampleCollector(object):
       PrettyPrintStreamPublisher, and NewlineDelimitedJSONPublisher targeting
       the run directory to the publishers list.
     run_uri: A unique tag for the run.
+    streaming: If True, samples are published as they are added rather than
+      kept in 'samples' (see --publish_streaming). Defaults to the flag value.
   """
   def __init__(self, metadata_providers=None, publishers=None,
-               publishers_from_flags=True, add_default_publishers=True):
+               publishers_from_flags=True, add_default_publishers=True,
+               streaming=None):
     self.samples = []
 
     if metadata_providers is not None:
@@ -863,6 +1200,16 @@ class SampleCollector(object):
 
     logging.debug('Using publishers: {0}'.format(self.publishers))
 
+    if streaming is None:
+      streaming = FLAGS.publish_streaming
+    self._streamer = None
+    if streaming:
+      self._streamer = _SampleStreamer(
+          self.publishers, FLAGS.publish_streaming_batch_size,
+          FLAGS.publish_streaming_queue_size)
+      logging.info('Streaming samples via spool file %s',
+                   self._streamer.spool_path)
+
   @classmethod
   def _DefaultPublishers(cls):
     """Gets a list of default publishers."""
@@ -888,6 +1235,9 @@ class SampleCollector(object):
           mode=FLAGS.json_write_mode,
           collapse_labels=FLAGS.collapse_labels))
 
+    if FLAGS.results_db_path:
+      publishers.append(ResultStorePublisher(FLAGS.results_db_path))
+
     if FLAGS.bigquery_table:
       publishers.append(BigQueryPublisher(
           FLAGS.bigquery_table,
@@ -912,37 +1262,70 @@ class SampleCollector(object):
 
     return publishers
 
+  def _GetRunMetadata(self, benchmark_spec):
+    """Merges the run metadata of all metadata providers.
+
+    Returns:
+      dict shared by the metadata of all samples of this run, or None if a
+      provider's metadata depends on the sample.
+    """
+    run_metadata = {}
+    for meta_provider in self.metadata_providers:
+      provider_metadata = meta_provider.GetRunMetadata(benchmark_spec)
+      if provider_metadata is None:
+        return None
+      run_metadata.update(provider_metadata)
+    return run_metadata
+
   def AddSamples(self, samples, benchmark, benchmark_spec):
     """Adds data samples to the publisher.
 
+    Metadata that providers add to every sample is computed once per call and
+    shared by the samples until they are published.
+
     Args:
       samples: A list of Sample objects.
       benchmark: string. The name of the benchmark.
       benchmark_spec: BenchmarkSpec. Benchmark specification.
     """
+    run_metadata = self._GetRunMetadata(benchmark_spec)
+    annotations = {
+        'test': benchmark,
+        'product_name': FLAGS.product_name,
+        'official': FLAGS.official,
+        'owner': FLAGS.owner,
+        'run_uri': benchmark_spec.uuid,
+    }
+    annotated_samples = []
     for s in samples:
       # Annotate the sample.
       sample = dict(s.asdict())
-      sample['test'] = benchmark
-
-      for meta_provider in self.metadata_providers:
-        sample['metadata'] = meta_provider.AddMetadata(
-            sample['metadata'], benchmark_spec)
-
-      sample['product_name'] = FLAGS.product_name
-      sample['official'] = FLAGS.official
-      sample['owner'] = FLAGS.owner
-      sample['run_uri'] = benchmark_spec.uuid
+      sample.update(annotations)
+      if run_metadata is None:
+        for meta_provider in self.metadata_providers:
+          sample['metadata'] = meta_provider.AddMetadata(
+              sample['metadata'], benchmark_spec)
+      else:
+        sample['metadata'] = _SharedMetadata(run_metadata, sample['metadata'])
       sample['sample_uri'] = str(uuid.uuid4())
-      self.samples.append(sample)
+      annotated_samples.append(sample)
+
+    if self._streamer:
+      self._streamer.AddSamples(_MaterializeSamples(annotated_samples))
+    else:
+      self.samples.extend(annotated_samples)
 
   def PublishSamples(self):
     """Publish samples via all registered publishers."""
+    if self._streamer:
+      self._streamer.Flush()
+      return
     if not self.samples:
       logging.warn('No samples to publish.')
       return
+    samples = _MaterializeSamples(self.samples)
     for publisher in self.publishers:
-      publisher.PublishSamples(self.samples)
+      publisher.PublishSamples(samples)
     self.samples = []
 
 
@@ -956,11 +1339,11 @@ def RepublishJSONSamples(path):
   with open(path, 'r') as file:
     samples = [json.loads(s) for s in file if s]
   for sample in samples:
-    # Chop '|' at the beginning and end of labels and split labels by '|,|'
-    fields = sample.pop('labels')[1:-1].split('|,|')
-    # Turn the fields into [[key, value], ...]
-    key_values = [field.split(':', 1) for field in fields]
-    sample['metadata'] = {k: v for k, v in key_values}
+    if 'labels' not in sample:
+      # Samples from a spool file (see --publish_streaming) keep their
+      # metadata as a dict.
+      continue
+    sample['metadata'] = result_store.ParseLabels(sample.pop('labels'))
 
   # We can't use a SampleCollector because SampleCollector.AddSamples depends on
   # having a benchmark and a benchmark_spec.
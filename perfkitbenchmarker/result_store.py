@@ -0,0 +1,346 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""An indexed SQLite store of published samples.
+
+Samples are kept in a 'samples' table with one column per top-level sample
+field, indexed on metric, test, run_uri and timestamp. Metadata is kept in a
+'metadata' table of (sample_id, key, value) rows indexed on (key, value), so
+samples can be filtered or grouped by any metadata key. Metadata values are
+stored as strings, as they are in the labels of newline-delimited JSON
+results.
+
+The store is written by publisher.ResultStorePublisher (see --results_db_path)
+and can import existing newline-delimited JSON results. Usage from the
+command line:
+
+  python -m perfkitbenchmarker.result_store results.db import results.json
+  python -m perfkitbenchmarker.result_store results.db query \
+      --metric Throughput --metadata machine_type=n1-standard-4
+  python -m perfkitbenchmarker.result_store results.db query \
+      --test iperf --group_by metric unit machine_type
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+
+# Top-level sample fields and their column types.
+_SAMPLE_COLUMNS = (
+    ('sample_uri', 'TEXT UNIQUE'),
+    ('run_uri', 'TEXT'),
+    ('test', 'TEXT'),
+    ('metric', 'TEXT'),
+    ('value', 'REAL'),
+    ('unit', 'TEXT'),
+    ('timestamp', 'REAL'),
+    ('product_name', 'TEXT'),
+    ('official', 'INTEGER'),
+    ('owner', 'TEXT'),
+)
+SAMPLE_FIELDS = tuple(name for name, _ in _SAMPLE_COLUMNS)
+AGGREGATES = ('count', 'mean', 'min', 'max', 'sum')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+  id INTEGER PRIMARY KEY,
+  {columns}
+);
+CREATE TABLE IF NOT EXISTS metadata (
+  sample_id INTEGER NOT NULL REFERENCES samples(id),
+  key TEXT NOT NULL,
+  value TEXT,
+  PRIMARY KEY (sample_id, key)
+);
+CREATE INDEX IF NOT EXISTS samples_metric ON samples (metric, timestamp);
+CREATE INDEX IF NOT EXISTS samples_test ON samples (test, metric);
+CREATE INDEX IF NOT EXISTS samples_run_uri ON samples (run_uri);
+CREATE INDEX IF NOT EXISTS samples_timestamp ON samples (timestamp);
+CREATE INDEX IF NOT EXISTS metadata_key_value ON metadata (key, value);
+""".format(columns=',\n  '.join('%s %s' % c for c in _SAMPLE_COLUMNS))
+
+# Number of rows fetched, or samples imported, per batch. The metadata of each
+# batch of fetched rows is looked up with one bind parameter per row, and
+# SQLite before 3.32 allows at most 999 bind parameters per statement.
+_BATCH_SIZE = 500
+
+
+def ParseLabels(labels):
+  """Converts labels created by publisher.GetLabelsFromDict to a dict."""
+  if not labels:
+    return {}
+  # Chop '|' at the beginning and end of labels and split labels by '|,|'.
+  fields = labels[1:-1].split('|,|')
+  return dict(field.split(':', 1) for field in fields)
+
+
+def _ToText(value):
+  """Returns a metadata value as it is stored."""
+  if isinstance(value, str):
+    return value.decode('utf-8', 'replace')
+  return unicode(value)
+
+
+def _AsList(value):
+  if value is None:
+    return None
+  if isinstance(value, (list, tuple, set)):
+    return list(value)
+  return [value]
+
+
+class ResultStore(object):
+  """An SQLite database of samples.
+
+  Connections are not shared between threads, so each thread that uses the
+  store should create its own ResultStore.
+
+  Attributes:
+    path: string. Path of the database file.
+  """
+
+  def __init__(self, path):
+    self.path = path
+    self._connection = sqlite3.connect(path)
+    self._connection.executescript(_SCHEMA)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *unused_args, **unused_kwargs):
+    self.Close()
+
+  def Close(self):
+    self._connection.close()
+
+  def AddSamples(self, samples):
+    """Adds published samples to the store.
+
+    Samples whose sample_uri is already in the store are skipped, so the same
+    results can safely be imported more than once.
+
+    Args:
+      samples: iterable of sample dicts, as passed to
+          SamplePublisher.PublishSamples. Metadata may be a 'metadata' dict or
+          collapsed into a 'labels' string.
+
+    Returns:
+      int. The number of samples added.
+    """
+    insert_sample = 'INSERT OR IGNORE INTO samples ({0}) VALUES ({1})'.format(
+        ', '.join(SAMPLE_FIELDS), ', '.join('?' * len(SAMPLE_FIELDS)))
+    added = 0
+    with self._connection:
+      cursor = self._connection.cursor()
+      for sample in samples:
+        cursor.execute(insert_sample,
+                       [sample.get(field) for field in SAMPLE_FIELDS])
+        if not cursor.rowcount:
+          continue
+        added += 1
+        if 'labels' in sample:
+          metadata = ParseLabels(sample['labels'])
+        else:
+          metadata = sample.get('metadata') or {}
+        sample_id = cursor.lastrowid
+        cursor.executemany(
+            'INSERT INTO metadata (sample_id, key, value) VALUES (?, ?, ?)',
+            [(sample_id, key, _ToText(value))
+             for key, value in metadata.iteritems()])
+    return added
+
+  def ImportJSON(self, path):
+    """Adds the samples in a newline-delimited JSON results file.
+
+    Returns:
+      int. The number of samples added.
+    """
+    added = 0
+    batch = []
+    with open(path) as fp:
+      for line in fp:
+        if line.strip():
+          batch.append(json.loads(line))
+        if len(batch) >= _BATCH_SIZE:
+          added += self.AddSamples(batch)
+          batch = []
+    return added + self.AddSamples(batch)
+
+  def _GetWhereClause(self, metric=None, test=None, run_uri=None,
+                      start_time=None, end_time=None, metadata=None):
+    """Returns the SQL condition and parameters selecting samples."""
+    conditions = []
+    params = []
+    for column, values in (('metric', metric), ('test', test),
+                           ('run_uri', run_uri)):
+      values = _AsList(values)
+      if values is not None:
+        conditions.append('samples.%s IN (%s)' %
+                          (column, ', '.join('?' * len(values))))
+        params.extend(values)
+    if start_time is not None:
+      conditions.append('samples.timestamp >= ?')
+      params.append(start_time)
+    if end_time is not None:
+      conditions.append('samples.timestamp < ?')
+      params.append(end_time)
+    for key, value in sorted((metadata or {}).iteritems()):
+      conditions.append('samples.id IN (SELECT sample_id FROM metadata '
+                        'WHERE key = ? AND value = ?)')
+      params.extend([key, _ToText(value)])
+    where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+    return where, params
+
+  def _GetMetadata(self, sample_ids):
+    """Returns a dict mapping each of sample_ids to its metadata dict."""
+    metadata = {sample_id: {} for sample_id in sample_ids}
+    rows = self._connection.execute(
+        'SELECT sample_id, key, value FROM metadata WHERE sample_id IN (%s)' %
+        ', '.join('?' * len(sample_ids)), sample_ids)
+    for sample_id, key, value in rows:
+      metadata[sample_id][key] = value
+    return metadata
+
+  def Query(self, metric=None, test=None, run_uri=None, start_time=None,
+            end_time=None, metadata=None, limit=None):
+    """Yields the samples that match all of the given filters.
+
+    Samples are read in batches, so arbitrarily many samples can be iterated
+    over without loading them all into memory.
+
+    Args:
+      metric: string or list of strings. Metric names to select.
+      test: string or list of strings. Benchmark names to select.
+      run_uri: string or list of strings. Run URIs to select.
+      start_time: float. Minimum sample timestamp.
+      end_time: float. Timestamp that samples must be earlier than.
+      metadata: dict. Metadata values that samples must have.
+      limit: int. Maximum number of samples to return.
+
+    Yields:
+      Sample dicts with the top-level sample fields and a 'metadata' dict,
+      ordered by timestamp.
+    """
+    where, params = self._GetWhereClause(metric, test, run_uri, start_time,
+                                         end_time, metadata)
+    query = 'SELECT id, {0} FROM samples{1} ORDER BY timestamp, id'.format(
+        ', '.join(SAMPLE_FIELDS), where)
+    if limit is not None:
+      query += ' LIMIT %d' % limit
+    cursor = self._connection.execute(query, params)
+    while True:
+      rows = cursor.fetchmany(_BATCH_SIZE)
+      if not rows:
+        break
+      metadata_by_id = self._GetMetadata([row[0] for row in rows])
+      for row in rows:
+        sample = dict(zip(SAMPLE_FIELDS, row[1:]))
+        sample['metadata'] = metadata_by_id[row[0]]
+        yield sample
+
+  def Aggregate(self, group_by=('test', 'metric', 'unit'), **filters):
+    """Summarizes the values of the samples that match filters.
+
+    Args:
+      group_by: sequence of strings. Sample fields or metadata keys to group
+          samples by. Samples without a metadata key are grouped under None.
+      **filters: Filters accepted by Query, other than limit.
+
+    Returns:
+      list of dicts, one per group, sorted by group. Each has a key for each
+      entry in group_by and the AGGREGATES of the group's values.
+    """
+    where, params = self._GetWhereClause(**filters)
+    group_columns = []
+    joins = []
+    join_params = []
+    for i, key in enumerate(group_by):
+      if key in SAMPLE_FIELDS:
+        group_columns.append('samples.%s' % key)
+      else:
+        joins.append(' LEFT JOIN metadata AS group_{0} ON '
+                     'group_{0}.sample_id = samples.id AND '
+                     'group_{0}.key = ?'.format(i))
+        join_params.append(key)
+        group_columns.append('group_%d.value' % i)
+    select_columns = group_columns + [
+        'COUNT(samples.value)', 'AVG(samples.value)', 'MIN(samples.value)',
+        'MAX(samples.value)', 'SUM(samples.value)']
+    query = 'SELECT {0} FROM samples{1}{2}'.format(
+        ', '.join(select_columns), ''.join(joins), where)
+    if group_columns:
+      query += ' GROUP BY {0} ORDER BY {0}'.format(', '.join(group_columns))
+    rows = self._connection.execute(query, join_params + params)
+    return [dict(zip(tuple(group_by) + AGGREGATES, row)) for row in rows]
+
+
+def _ParseMetadataFilters(metadata_args):
+  metadata = {}
+  for arg in metadata_args or []:
+    key, sep, value = arg.partition('=')
+    if not sep:
+      raise argparse.ArgumentTypeError(
+          'Metadata filters must be key=value, got %s' % arg)
+    metadata[key] = value
+  return metadata
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(
+      description='Imports and queries an SQLite store of PKB samples.')
+  parser.add_argument('db', help='Path of the SQLite database.')
+  subparsers = parser.add_subparsers(dest='command')
+
+  import_parser = subparsers.add_parser(
+      'import', help='Import newline-delimited JSON results.')
+  import_parser.add_argument('json_paths', nargs='+')
+
+  query_parser = subparsers.add_parser(
+      'query', help='Print matching samples as newline-delimited JSON, or '
+      'with --group_by, aggregates of their values as CSV.')
+  query_parser.add_argument('--metric', nargs='+')
+  query_parser.add_argument('--test', nargs='+')
+  query_parser.add_argument('--run_uri', nargs='+')
+  query_parser.add_argument('--start_time', type=float)
+  query_parser.add_argument('--end_time', type=float)
+  query_parser.add_argument('--metadata', nargs='+', metavar='KEY=VALUE')
+  query_parser.add_argument('--limit', type=int)
+  query_parser.add_argument(
+      '--group_by', nargs='+', metavar='FIELD',
+      help='Sample fields or metadata keys to aggregate values by.')
+
+  args = parser.parse_args(argv)
+  with ResultStore(args.db) as store:
+    if args.command == 'import':
+      for path in args.json_paths:
+        print >> sys.stderr, 'Imported %d samples from %s' % (
+            store.ImportJSON(path), path)
+      return
+    filters = {'metric': args.metric, 'test': args.test,
+               'run_uri': args.run_uri, 'start_time': args.start_time,
+               'end_time': args.end_time,
+               'metadata': _ParseMetadataFilters(args.metadata)}
+    if args.group_by:
+      writer = csv.writer(sys.stdout)
+      writer.writerow(args.group_by + list(AGGREGATES))
+      for row in store.Aggregate(args.group_by, **filters):
+        writer.writerow([row[key] for key in args.group_by + list(AGGREGATES)])
+    else:
+      for sample in store.Query(limit=args.limit, **filters):
+        print json.dumps(sample)
+
+
+if __name__ == '__main__':
+  main()
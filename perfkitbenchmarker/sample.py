@@ -15,7 +15,10 @@
 
 import collections
 import time
-PERCENTILES_LIST = [0.1, 1, 5, 10, 50, 90, 95, 99, 99.9]
+
+from perfkitbenchmarker import stats_util
+
+PERCENTILES_LIST = stats_util.PERCENTILES_LIST
 
 _SAMPLE_FIELDS = 'metric', 'value', 'unit', 'metadata', 'timestamp'
 
@@ -23,6 +26,8 @@ _SAMPLE_FIELDS = 'metric', 'value', 'unit', 'metadata', 'timestamp'
 def PercentileCalculator(numbers, percentiles=PERCENTILES_LIST):
   """Computes percentiles, stddev and mean on a set of numbers.
 
+  See stats_util.PercentileCalculator, which this delegates to.
+
   Args:
     numbers: A sequence of numbers to compute percentiles for.
     percentiles: If given, a list of percentiles to compute. Can be
@@ -36,32 +41,7 @@ def PercentileCalculator(numbers, percentiles=PERCENTILES_LIST):
     [0, 100].
 
   """
-
-  if not len(numbers):  # 'if not numbers' will fail if numbers is a pd.Series.
-    raise ValueError("Can't compute percentiles of empty list.")
-
-  numbers_sorted = sorted(numbers)
-  count = len(numbers_sorted)
-  total = sum(numbers_sorted)
-  result = {}
-  for percentile in percentiles:
-    if percentile < 0.0 or percentile > 100.0:
-      raise ValueError('Invalid percentile %s' % percentile)
-
-    percentile_string = 'p%s' % str(percentile)
-    index = int(count * float(percentile) / 100.0)
-    index = min(index, count - 1)  # Correction to handle 100th percentile.
-    result[percentile_string] = numbers_sorted[index]
-
-  average = total / float(count)
-  result['average'] = average
-  if count > 1:
-    total_of_squares = sum([(i - average) ** 2 for i in numbers])
-    result['stddev'] = (total_of_squares / (count - 1)) ** 0.5
-  else:
-    result['stddev'] = 0
-
-  return result
+  return stats_util.PercentileCalculator(numbers, percentiles)
 
 
 class Sample(collections.namedtuple('Sample', _SAMPLE_FIELDS)):
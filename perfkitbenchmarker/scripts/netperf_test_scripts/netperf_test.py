@@ -18,6 +18,7 @@ import json
 import logging
 import subprocess
 import sys
+import threading
 import time
 from absl import flags
 
@@ -31,6 +32,20 @@ flags.DEFINE_string('netperf_cmd', None,
 flags.DEFINE_integer('port_start', None,
                      'Starting port for netperf command and data ports')
 
+flags.DEFINE_list('command_ports', None,
+                  'The command port of each netperf process. The data port '
+                  'is the next port. Overrides num_streams and port_start.')
+
+flags.DEFINE_list('server_ips', None,
+                  'The netserver IP of each netperf process, which replaces '
+                  '{server_ip} in netperf_cmd. Must be as long as '
+                  'command_ports.')
+
+flags.DEFINE_float('start_time', None,
+                   'If set, the netperf processes start at this time in '
+                   'seconds since the epoch, so that processes on several '
+                   'machines measure the same period.')
+
 
 def Main(argv=sys.argv):
   # Parse command-line flags
@@ -41,34 +56,56 @@ def Main(argv=sys.argv):
     sys.exit(1)
 
   netperf_cmd = FLAGS.netperf_cmd
-  num_streams = FLAGS.num_streams
-  port_start = FLAGS.port_start
+  if FLAGS.command_ports:
+    command_ports = [int(port) for port in FLAGS.command_ports]
+  else:
+    assert FLAGS.num_streams >= 1
+    assert FLAGS.port_start
+    command_ports = [FLAGS.port_start + i * 2
+                     for i in range(FLAGS.num_streams)]
+  num_streams = len(command_ports)
+  server_ips = FLAGS.server_ips or [None] * num_streams
 
   assert netperf_cmd
-  assert num_streams >= 1
-  assert port_start
+  assert len(server_ips) == num_streams
 
   stdouts = [None] * num_streams
   stderrs = [None] * num_streams
   return_codes = [None] * num_streams
   processes = [None] * num_streams
+  start_times = [None] * num_streams
+  end_times = [None] * num_streams
+
+  def _Wait(i):
+    stdouts[i], stderrs[i] = processes[i].communicate()
+    return_codes[i] = processes[i].returncode
+    end_times[i] = time.time()
+
+  if FLAGS.start_time:
+    time.sleep(max(0, FLAGS.start_time - time.time()))
 
   # Start all of the netperf processes
   begin_starting_processes = time.time()
-  for i in range(num_streams):
-    command_port = port_start + i * 2
-    data_port = port_start + i * 2 + 1
-    cmd = netperf_cmd.format(command_port=command_port, data_port=data_port)
+  for i, command_port in enumerate(command_ports):
+    cmd = netperf_cmd.format(command_port=command_port,
+                             data_port=command_port + 1,
+                             server_ip=server_ips[i])
+    start_times[i] = time.time()
     processes[i] = subprocess.Popen(cmd, stdout=subprocess.PIPE,
                                     stderr=subprocess.PIPE, shell=True)
   end_starting_processes = time.time()
-  # Wait for all of the netperf processes to finish and save their return codes
-  for i, process in enumerate(processes):
-    stdouts[i], stderrs[i] = process.communicate()
-    return_codes[i] = process.returncode
+  # Wait for all of the netperf processes to finish and save their return
+  # codes and when they finished.
+  threads = [threading.Thread(target=_Wait, args=(i,))
+             for i in range(num_streams)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
   # Dump the stdouts, stderrs, and return_codes to stdout in json form
   print(json.dumps((stdouts, stderrs, return_codes,
-                    begin_starting_processes, end_starting_processes)))
+                    begin_starting_processes, end_starting_processes,
+                    start_times, end_times)))
 
 if __name__ == '__main__':
   sys.exit(Main())
@@ -0,0 +1,31 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Flags for the local object storage interface."""
+
+from absl import flags
+
+flags.DEFINE_string('local_storage_dir', '/dev/shm/pkb-local-storage',
+                    'The directory holding the buckets of the local object '
+                    'store. Each bucket is a subdirectory and each object a '
+                    'file in it. Use a tmpfs such as /dev/shm for an '
+                    'in-memory store.')
+
+flags.DEFINE_float('local_storage_latency', 0.0,
+                   'Latency in seconds added to every request made to the '
+                   'local object store.')
+
+flags.DEFINE_float('local_storage_bandwidth_mbps', None,
+                   'If set, object reads and writes against the local object '
+                   'store are slowed down to this bandwidth, in Mbps.')
@@ -0,0 +1,136 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An object storage interface backed by a local directory.
+
+Each bucket is a subdirectory of --local_storage_dir and each object a file
+in it, so pointing --local_storage_dir at a tmpfs gives an in-memory store
+that is still shared between the worker processes of the multistream
+scenarios. Requests can be slowed down with a fixed latency and a bandwidth
+cap to approximate a remote service without leaving the machine.
+"""
+
+import errno
+import logging
+import os
+import tempfile
+import time
+import urllib
+
+from absl import flags
+
+import object_storage_interface
+
+FLAGS = flags.FLAGS
+
+# Size of the chunks objects are copied in.
+_CHUNK_SIZE = 1024 * 1024
+
+
+class LocalService(object_storage_interface.ObjectStorageServiceBase):
+  def __init__(self):
+    if FLAGS.local_storage_latency < 0:
+      raise ValueError('local_storage_latency must not be negative.')
+    if (FLAGS.local_storage_bandwidth_mbps is not None and
+        FLAGS.local_storage_bandwidth_mbps <= 0):
+      raise ValueError('local_storage_bandwidth_mbps must be positive.')
+    self.storage_dir = FLAGS.local_storage_dir
+    self.latency = FLAGS.local_storage_latency
+    self.bandwidth_mbps = FLAGS.local_storage_bandwidth_mbps
+
+  def _BucketDir(self, bucket):
+    bucket_dir = os.path.join(self.storage_dir, bucket)
+    try:
+      os.makedirs(bucket_dir)
+    except OSError as e:
+      if e.errno != errno.EEXIST:
+        raise
+    return bucket_dir
+
+  def _ObjectPath(self, bucket, object_name):
+    # Object names may contain slashes, so they are quoted to keep every
+    # object a single file in the bucket directory.
+    return os.path.join(self._BucketDir(bucket),
+                        urllib.quote(object_name, safe=''))
+
+  def _Throttle(self, start_time, size=0):
+    """Sleeps until the injected latency and transfer time have elapsed.
+
+    Args:
+      start_time: the time the request started.
+      size: the number of bytes transferred by the request.
+    """
+    duration = self.latency
+    if self.bandwidth_mbps:
+      duration += size * 8 / (self.bandwidth_mbps * 1e6)
+    remaining = start_time + duration - time.time()
+    if remaining > 0:
+      time.sleep(remaining)
+
+  def ListObjects(self, bucket, prefix):
+    start_time = time.time()
+    names = [urllib.unquote(name)
+             for name in os.listdir(self._BucketDir(bucket))
+             if not name.startswith('.')]
+    self._Throttle(start_time)
+    return [name for name in names if name.startswith(prefix)]
+
+  def DeleteObjects(self, bucket, objects_to_delete, objects_deleted=None):
+    for object_name in objects_to_delete:
+      start_time = time.time()
+      try:
+        os.remove(self._ObjectPath(bucket, object_name))
+        if objects_deleted is not None:
+          objects_deleted.append(object_name)
+      except:
+        logging.exception('Caught exception while deleting object %s.',
+                          object_name)
+      self._Throttle(start_time)
+
+  def WriteObjectFromBuffer(self, bucket, object, stream, size):
+    stream.seek(0)
+    start_time = time.time()
+    path = self._ObjectPath(bucket, object)
+    # Write to a hidden temporary file and rename it into place, so readers
+    # never see a partially written object.
+    fd, temp_path = tempfile.mkstemp(prefix='.', dir=os.path.dirname(path))
+    try:
+      with os.fdopen(fd, 'wb') as fp:
+        remaining = size
+        while remaining > 0:
+          chunk = stream.read(min(remaining, _CHUNK_SIZE))
+          if not chunk:
+            break
+          fp.write(chunk)
+          remaining -= len(chunk)
+      os.rename(temp_path, path)
+    except:
+      os.remove(temp_path)
+      raise
+    self._Throttle(start_time, size)
+    latency = time.time() - start_time
+    return start_time, latency
+
+  def ReadObject(self, bucket, object):
+    start_time = time.time()
+    size = 0
+    with open(self._ObjectPath(bucket, object), 'rb') as fp:
+      while True:
+        chunk = fp.read(_CHUNK_SIZE)
+        if not chunk:
+          break
+        size += len(chunk)
+    self._Throttle(start_time, size)
+    latency = time.time() - start_time
+    return start_time, latency
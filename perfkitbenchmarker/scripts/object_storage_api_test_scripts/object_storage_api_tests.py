@@ -22,6 +22,7 @@
    run this script.
 """
 
+from array import array
 import cStringIO
 import json
 import logging
@@ -32,18 +33,20 @@ from threading import Thread
 import string
 import random
 import time
+import zlib
 
 import yaml
 
 from absl import flags
 
 import azure_flags  # noqa
+import local_flags  # noqa
 import s3_flags  # noqa
 
 FLAGS = flags.FLAGS
 
 flags.DEFINE_enum(
-    'storage_provider', 'GCS', ['GCS', 'S3', 'AZURE'],
+    'storage_provider', 'GCS', ['GCS', 'S3', 'AZURE', 'LOCAL'],
     'The target storage provider to test.')
 
 flags.DEFINE_string('bucket', None,
@@ -80,6 +83,11 @@ flags.DEFINE_string('object_sizes', "{1024: 100.0}", 'The size of the objects '
 flags.DEFINE_integer('num_streams', 10, 'The number of streams to use. Only '
                      'applies to the MultiStreamThroughput scenario.',
                      lower_bound=1)
+flags.DEFINE_integer('streams_per_process', 1, 'The number of streams to run '
+                     'as threads of each worker process. num_streams / '
+                     'streams_per_process processes are started, so values '
+                     'above 1 let one VM run many more streams than it could '
+                     'run processes.', lower_bound=1)
 flags.DEFINE_integer('stream_num_start', 1, 'The number of the first thread in '
                      'this process.')
 flags.DEFINE_string('objects_written_file', None, 'The path where the '
@@ -93,6 +101,22 @@ flags.DEFINE_float('start_time', None, 'The time (as a POSIX timestamp) '
                    'to start the operation. Only applies to the '
                    'MultiStreamRead and MultiStreamWrite scenarios.')
 
+flags.DEFINE_float('request_rate', None, 'If set, each stream of the '
+                   'MultiStreamRead and MultiStreamWrite scenarios paces its '
+                   'requests at this many requests per second, instead of '
+                   'sending the next request when the previous one '
+                   'completes. A stream still has at most one request in '
+                   'flight, so a request that falls due while the previous '
+                   'one is running is sent when it completes. Latency is '
+                   'measured from the time each request was scheduled to be '
+                   'sent.', lower_bound=0.001)
+
+flags.DEFINE_enum('arrival_distribution', 'constant', ['constant', 'poisson'],
+                  'How requests are spaced when --request_rate is set. '
+                  'constant: exactly 1 / request_rate seconds apart. '
+                  'poisson: exponentially distributed gaps with mean '
+                  '1 / request_rate seconds.')
+
 flags.DEFINE_string('object_storage_class', None, 'The storage class to use '
                     'for uploads. Currently only applicable to AWS. For other '
                     'providers, storage class is determined by the bucket, '
@@ -109,6 +133,14 @@ flags.DEFINE_enum('object_naming_scheme', 'sequential_by_stream',
                   'approximately_sequential: object names from all '
                   'streams will roughly increase together.')
 
+flags.DEFINE_string('worker_output_file', None, 'If set, the MultiStreamRead '
+                    'and MultiStreamWrite scenarios write their results to '
+                    'this file in a binary columnar format instead of '
+                    'writing JSON to stdout. See WriteWorkerOutput.')
+
+flags.DEFINE_boolean('compress_worker_output', False, 'Whether to compress '
+                     'the columns written to --worker_output_file with zlib.')
+
 STORAGE_TO_SCHEMA_DICT = {'GCS': 'gs', 'S3': 's3', 'AZURE': 'azure'}
 
 # If more than 5% of our upload or download operations fail for an iteration,
@@ -162,6 +194,9 @@ BYTES_PER_KILOBYTE = 1024
 # every THREAD_STATUS_LOG_INTERVAL seconds.
 THREAD_STATUS_LOG_INTERVAL = 10
 
+# The columns of the binary worker output, in the order they are written.
+WORKER_OUTPUT_COLUMNS = ('start_times', 'latencies', 'sizes')
+
 
 # When a storage provider fails more than a threshold number of requests, we
 # stop the benchmarking tests and raise a low availability error back to the
@@ -305,6 +340,77 @@ class PrefixTimestampSuffixIterator(ObjectNameIterator):
     return '%s_%f_%s' % (self.prefix, time.time(), self.suffix)
 
 
+class ArrivalTimeIterator(object):
+  """Generate the times at which a rate-paced stream sends its requests.
+
+  Args:
+    start_time: a POSIX timestamp. The time of the first request.
+    rate: the mean number of requests per second.
+    distribution: 'constant' or 'poisson'. See the arrival_distribution flag.
+  """
+
+  def __init__(self, start_time, rate, distribution):
+    self.next_time = start_time
+    self.rate = rate
+    self.distribution = distribution
+    # Seeded from os.urandom, so forked workers get different arrivals.
+    self.random = random.Random()
+
+  def __iter__(self):
+    return self
+
+  def next(self):
+    arrival_time = self.next_time
+    if self.distribution == 'poisson':
+      self.next_time += self.random.expovariate(self.rate)
+    else:
+      self.next_time += 1.0 / self.rate
+    return arrival_time
+
+
+def _GetArrivalTimes(start_time):
+  """Returns an ArrivalTimeIterator if --request_rate is set, else None."""
+  if FLAGS.request_rate is None:
+    return None
+  return ArrivalTimeIterator(
+      start_time if start_time is not None else time.time(),
+      FLAGS.request_rate, FLAGS.arrival_distribution)
+
+
+def WaitForArrival(arrival_time):
+  """Sleep until a rate-paced request is due.
+
+  Unlike SleepUntilTime, being late is expected when the service can't keep
+  up with the request rate, so it isn't logged.
+
+  Args:
+    arrival_time: float. The time the request is due, as a POSIX timestamp.
+  """
+  sleep_time = arrival_time - time.time()
+  if sleep_time > 0.0:
+    time.sleep(sleep_time)
+
+
+def FromArrivalTime(arrival_time, start_time, latency):
+  """Re-bases an operation's timing on the time it should have started.
+
+  Measuring rate-paced latency from the scheduled time, rather than from when
+  a late request actually started, avoids coordinated omission: time spent
+  waiting behind a slow request counts against the waiting request.
+
+  Args:
+    arrival_time: float or None. The scheduled start time of the operation.
+    start_time: float. The actual start time of the operation.
+    latency: float. The actual duration of the operation.
+
+  Returns:
+    A tuple of (start_time, latency).
+  """
+  if arrival_time is None:
+    return start_time, latency
+  return arrival_time, start_time + latency - arrival_time
+
+
 # ### Utilities for benchmarking ###
 
 def CleanupBucket(service):
@@ -573,15 +679,31 @@ def SingleStreamThroughputBenchmark(service):
     service.DeleteObjects(FLAGS.bucket, objects_written)
 
 
+def RunWorkerThreads(worker, per_thread_args):
+  """Run several streams of a worker function as threads of this process.
+
+  Args:
+    worker: either WriteWorker or ReadWorker. The worker function to call.
+    per_thread_args: a list of argument tuples, one per stream.
+  """
+  threads = [Thread(target=worker, args=args) for args in per_thread_args]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+
+
 def RunWorkerProcesses(worker, worker_args, per_process_args=None):
   """Run a worker function in many processes, then gather and return the results
 
+  Each process runs FLAGS.streams_per_process streams as threads.
+
   Args:
     worker: either WriteWorker or ReadWorker. The worker function to call.
     worker_args: a tuple. The arguments to pass to the worker function. The
       result queue and stream number will be appended as the last two arguments.
     per_process_args: if given, an array with length equal to the
-      number of processes. Process number i will be passed
+      number of streams. Stream number i will be passed
       per_process_args[i] after its regular arguments and before the
       result queue and stream number.
 
@@ -591,19 +713,23 @@ def RunWorkerProcesses(worker, worker_args, per_process_args=None):
 
   result_queue = mp.Queue()
   num_streams = FLAGS.num_streams
+  streams_per_process = FLAGS.streams_per_process
 
-  logging.info('Creating %s processes', FLAGS.num_streams)
   if per_process_args is None:
-    processes = [mp.Process(target=worker,
-                            args=worker_args + (result_queue, i))
-                 for i in xrange(num_streams)]
+    stream_args = [worker_args + (result_queue, i)
+                   for i in xrange(num_streams)]
+  else:
+    stream_args = [worker_args + (per_process_args[i],) + (result_queue, i)
+                   for i in xrange(num_streams)]
+  if streams_per_process == 1:
+    processes = [mp.Process(target=worker, args=args) for args in stream_args]
   else:
-    processes = [mp.Process(target=worker,
-                            args=worker_args +
-                            (per_process_args[i],) +
-                            (result_queue, i))
-                 for i in xrange(num_streams)]
-  logging.info('Processes created. Starting processes.')
+    processes = [mp.Process(target=RunWorkerThreads,
+                            args=(worker,
+                                  stream_args[i:i + streams_per_process]))
+                 for i in xrange(0, num_streams, streams_per_process)]
+  logging.info('Created %s processes for %s streams. Starting processes.',
+               len(processes), num_streams)
   for process in processes:
     process.start()
   logging.info('Processes started.')
@@ -614,6 +740,59 @@ def RunWorkerProcesses(worker, worker_args, per_process_args=None):
   return results
 
 
+def WriteWorkerOutput(streams, path, compress=False):
+  """Writes the records of the multistream benchmarks as binary columns.
+
+  The file starts with a line of JSON describing its contents, e.g.
+
+  {"streams": [{"stream_num": 0, "count": 1000}, ...],
+   "columns": ["start_times", "latencies", "sizes"],
+   "dtype": "<f8", "compression": null}
+
+  padded with spaces to a multiple of 8 bytes. It is followed by each column
+  in turn, holding the values of all streams in the order of "streams" as
+  little-endian float64s. Sizes are exact as floats up to 2^53 bytes. If
+  compress is set, everything after the header is a single zlib stream.
+
+  Args:
+    streams: a list of dicts with keys stream_num, start_times, latencies and
+      sizes, as returned by the workers.
+    path: the path of the file to write.
+    compress: whether to compress the columns.
+  """
+  header = json.dumps({
+      'streams': [{'stream_num': stream['stream_num'],
+                   'count': len(stream['start_times'])}
+                  for stream in streams],
+      'columns': WORKER_OUTPUT_COLUMNS,
+      'dtype': '<f8',
+      'compression': 'zlib' if compress else None})
+  header += ' ' * (-(len(header) + 1) % 8) + '\n'
+  body = []
+  for column in WORKER_OUTPUT_COLUMNS:
+    values = array('d')
+    for stream in streams:
+      values.extend(float(value) for value in stream[column])
+    if sys.byteorder == 'big':
+      values.byteswap()
+    body.append(values.tostring())
+  body = ''.join(body)
+  if compress:
+    body = zlib.compress(body)
+  with open(path, 'wb') as out:
+    out.write(header)
+    out.write(body)
+
+
+def _OutputStreams(streams):
+  """Sends the records of the multistream benchmarks to the controller."""
+  if FLAGS.worker_output_file:
+    WriteWorkerOutput(streams, FLAGS.worker_output_file,
+                      FLAGS.compress_worker_output)
+  else:
+    json.dump(streams, sys.stdout, indent=0)
+
+
 def MultiStreamWrites(service):
   """Run multi-stream write benchmark.
 
@@ -642,7 +821,8 @@ def MultiStreamWrites(service):
    ...]
 
   Both kinds of output are written as JSON, for easy serialization and
-  deserialization.
+  deserialization. If --worker_output_file is set, the timing records are
+  written to that file by WriteWorkerOutput instead.
 
   """
 
@@ -694,7 +874,7 @@ def MultiStreamWrites(service):
         'Wrote %s objects out of %s requested (%s requred)' %
         (num_writes, num_writes_requested, min_writes_required))
 
-  json.dump(streams, sys.stdout, indent=0)
+  _OutputStreams(streams)
 
 
 def MultiStreamReads(service):
@@ -717,6 +897,8 @@ def MultiStreamReads(service):
     "latency": latency_1, "size": size_1, "stream_num": stream_num_1},
    ...]
 
+  or, if --worker_output_file is set, to that file in the format written by
+  WriteWorkerOutput.
   """
 
   # Read the object records that the MultiStreamWriter left for us.
@@ -751,7 +933,7 @@ def MultiStreamReads(service):
         'Read %s objects out of %s requested (%s requred)' %
         (num_reads, num_reads_requested, min_reads_required))
 
-  json.dump(streams, sys.stdout, indent=0)
+  _OutputStreams(streams)
 
 
 def SleepUntilTime(when):
@@ -805,15 +987,21 @@ def WriteWorker(service, payload,
 
   if start_time is not None:
     SleepUntilTime(start_time)
+  arrival_times = _GetArrivalTimes(start_time)
+  arrival_time = None
 
   for i in xrange(num_objects):
     object_name = name_iterator.next()
     object_size = size_iterator.next()
+    if arrival_times is not None:
+      arrival_time = arrival_times.next()
+      WaitForArrival(arrival_time)
 
     try:
-      start_time, latency = service.WriteObjectFromBuffer(
-          FLAGS.bucket, object_name,
-          payload_handle, object_size)
+      start_time, latency = FromArrivalTime(
+          arrival_time, *service.WriteObjectFromBuffer(
+              FLAGS.bucket, object_name,
+              payload_handle, object_size))
 
       object_names.append(object_name)
       start_times.append(start_time)
@@ -841,10 +1029,16 @@ def ReadWorker(service, start_time, object_records,
 
   if start_time is not None:
     SleepUntilTime(start_time)
+  arrival_times = _GetArrivalTimes(start_time)
+  arrival_time = None
 
   for name, size in object_records:
+    if arrival_times is not None:
+      arrival_time = arrival_times.next()
+      WaitForArrival(arrival_time)
     try:
-      start_time, latency = service.ReadObject(FLAGS.bucket, name)
+      start_time, latency = FromArrivalTime(
+          arrival_time, *service.ReadObject(FLAGS.bucket, name))
 
       start_times.append(start_time)
       latencies.append(latency)
@@ -1080,6 +1274,9 @@ def Main(argv=sys.argv):
   elif FLAGS.storage_provider == 'S3':
     import s3
     service = s3.S3Service()
+  elif FLAGS.storage_provider == 'LOCAL':
+    import local_service
+    service = local_service.LocalService()
   else:
     raise ValueError('Invalid storage provider %s' % FLAGS.storage_provider)
 
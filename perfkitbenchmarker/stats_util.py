@@ -0,0 +1,257 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Vectorized summary statistics for large collections of measurements.
+
+All percentiles use the same definition as the original
+sample.PercentileCalculator: the p-th percentile of n values is the value at
+index int(n * p / 100) of the sorted values, clamped to the last value.
+"""
+
+import math
+
+import numpy as np
+
+PERCENTILES_LIST = [0.1, 1, 5, 10, 50, 90, 95, 99, 99.9]
+
+
+def _ValidatePercentiles(percentiles):
+  """Returns 'percentiles' as a float array.
+
+  Raises:
+    ValueError, if a percentile is not a number or is outside of [0, 100].
+  """
+  try:
+    percentile_array = np.asarray(percentiles, dtype=np.float64)
+  except (TypeError, ValueError):
+    raise ValueError('Invalid percentiles %s' % (percentiles,))
+  for percentile in percentile_array:
+    if not 0.0 <= percentile <= 100.0:
+      raise ValueError('Invalid percentile %s' % percentile)
+  return percentile_array
+
+
+def _PercentileKey(percentile):
+  """Returns the result key for 'percentile', e.g. 'p99.9' or 'p50'."""
+  return 'p%s' % str(percentile)
+
+
+def _AsArray(numbers):
+  """Returns 'numbers' as a 1-D numeric numpy array without copying arrays."""
+  values = np.asarray(numbers)
+  if values.dtype == np.object_ or values.dtype.kind not in 'biuf':
+    values = values.astype(np.float64)
+  return values.ravel()
+
+
+def _RankIndices(count, percentile_array):
+  """Returns the index into sorted data of each percentile."""
+  indices = (count * percentile_array / 100.0).astype(np.int64)
+  return np.minimum(indices, count - 1)
+
+
+def SelectPercentiles(numbers, percentiles=PERCENTILES_LIST):
+  """Computes several percentiles with a single partial sort.
+
+  Uses numpy's introselect with every requested rank at once, which is
+  O(n log k) for k percentiles rather than the O(n log n) of a full sort.
+
+  Args:
+    numbers: A sequence or numpy array of numbers.
+    percentiles: A list of percentiles in [0, 100].
+
+  Returns:
+    A list of values, one per entry in 'percentiles'.
+
+  Raises:
+    ValueError, if numbers is empty or if a percentile is invalid.
+  """
+  values = _AsArray(numbers)
+  if not values.size:
+    raise ValueError("Can't compute percentiles of empty list.")
+  percentile_array = _ValidatePercentiles(percentiles)
+  indices = _RankIndices(values.size, percentile_array)
+  partitioned = np.partition(values, np.unique(indices))
+  return [partitioned[i].item() for i in indices]
+
+
+def PercentileCalculator(numbers, percentiles=PERCENTILES_LIST):
+  """Computes percentiles, stddev and mean on a set of numbers.
+
+  Args:
+    numbers: A sequence or numpy array of numbers to compute percentiles for.
+    percentiles: If given, a list of percentiles to compute. Can be
+      floats, ints or longs.
+
+  Returns:
+    A dictionary of percentiles, keyed like 'p99', plus 'average' and
+    'stddev' (the sample standard deviation).
+
+  Raises:
+    ValueError, if numbers is empty or if a percentile is outside of
+    [0, 100].
+  """
+  values = _AsArray(numbers)
+  result = dict(zip((_PercentileKey(p) for p in percentiles),
+                    SelectPercentiles(values, percentiles)))
+  result['average'] = float(np.mean(values, dtype=np.float64))
+  if values.size > 1:
+    result['stddev'] = float(np.std(values, dtype=np.float64, ddof=1))
+  else:
+    result['stddev'] = 0
+  return result
+
+
+def WeightedPercentiles(numbers, weights, percentiles=PERCENTILES_LIST):
+  """Computes percentiles of numbers that each occur 'weight' times.
+
+  This is equivalent to PercentileCalculator on the expanded data, e.g.
+  histogram bucket values weighted by bucket counts, without materializing it.
+
+  Args:
+    numbers: A sequence or numpy array of numbers.
+    weights: A sequence or numpy array of non-negative weights, the same
+      length as 'numbers'.
+    percentiles: A list of percentiles in [0, 100].
+
+  Returns:
+    A dictionary of percentiles, keyed like 'p99'.
+
+  Raises:
+    ValueError, if there is no positive weight, if 'numbers' and 'weights'
+    differ in length, or if a percentile is invalid.
+  """
+  values = _AsArray(numbers)
+  weight_array = np.asarray(weights, dtype=np.float64).ravel()
+  if values.size != weight_array.size:
+    raise ValueError('numbers and weights must have the same length.')
+  if np.any(weight_array < 0):
+    raise ValueError('weights must be non-negative.')
+  percentile_array = _ValidatePercentiles(percentiles)
+  order = np.argsort(values, kind='mergesort')
+  cumulative_weights = np.cumsum(weight_array[order])
+  if not cumulative_weights.size or cumulative_weights[-1] <= 0:
+    raise ValueError("Can't compute percentiles without positive weights.")
+  total = cumulative_weights[-1]
+  # The value at rank r (0-based) is the first value whose cumulative weight
+  # exceeds r.
+  ranks = np.minimum(np.floor(total * percentile_array / 100.0), total - 1)
+  positions = np.searchsorted(cumulative_weights, ranks, side='right')
+  selected = values[order][positions]
+  return {_PercentileKey(p): v.item()
+          for p, v in zip(percentiles, selected)}
+
+
+class QuantileSketch(object):
+  """A mergeable, fixed-accuracy sketch of a distribution of positive values.
+
+  Values are counted in logarithmically sized buckets, so that any percentile
+  reported by the sketch is within 'relative_accuracy' of the exact value,
+  while memory is proportional to the number of distinct buckets (a few
+  thousand for latencies spanning nanoseconds to hours at 1% accuracy) rather
+  than to the number of values. Sketches built from separate chunks of data,
+  worker processes or VMs can be combined with Merge.
+
+  Attributes:
+    relative_accuracy: float. The maximum relative error of percentiles.
+    count: int. The number of values added.
+  """
+
+  def __init__(self, relative_accuracy=0.01):
+    if not 0 < relative_accuracy < 1:
+      raise ValueError('relative_accuracy must be in (0, 1).')
+    self.relative_accuracy = relative_accuracy
+    self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    self._log_gamma = math.log(self._gamma)
+    self._buckets = {}
+    self._zero_count = 0
+    self.count = 0
+    self._mean = 0.0
+    self._m2 = 0.0
+    self._min = float('inf')
+    self._max = float('-inf')
+
+  def _CheckCompatible(self, other):
+    if other.relative_accuracy != self.relative_accuracy:
+      raise ValueError('Cannot merge sketches with different accuracies.')
+
+  def _MergeMoments(self, count, mean, m2):
+    """Combines running moments using Chan et al.'s parallel algorithm."""
+    total = self.count + count
+    delta = mean - self._mean
+    self._mean += delta * count / total
+    self._m2 += m2 + delta * delta * self.count * count / total
+    self.count = total
+
+  def Add(self, numbers):
+    """Adds a sequence or numpy array of non-negative numbers."""
+    values = np.asarray(numbers, dtype=np.float64).ravel()
+    if not values.size:
+      return
+    if np.any(values < 0):
+      raise ValueError('QuantileSketch only supports non-negative values.')
+    positive = values[values > 0]
+    self._zero_count += values.size - positive.size
+    if positive.size:
+      keys = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+      unique_keys, counts = np.unique(keys, return_counts=True)
+      for key, bucket_count in zip(unique_keys.tolist(), counts.tolist()):
+        self._buckets[key] = self._buckets.get(key, 0) + bucket_count
+    mean = float(values.mean())
+    self._MergeMoments(values.size, mean,
+                       float(np.square(values - mean).sum()))
+    self._min = min(self._min, float(values.min()))
+    self._max = max(self._max, float(values.max()))
+
+  def Merge(self, other):
+    """Adds all values counted by another QuantileSketch to this one."""
+    self._CheckCompatible(other)
+    if not other.count:
+      return
+    for key, bucket_count in other._buckets.iteritems():
+      self._buckets[key] = self._buckets.get(key, 0) + bucket_count
+    self._zero_count += other._zero_count
+    self._MergeMoments(other.count, other._mean, other._m2)
+    self._min = min(self._min, other._min)
+    self._max = max(self._max, other._max)
+
+  def GetPercentiles(self, percentiles=PERCENTILES_LIST):
+    """Returns approximate percentiles in the format of PercentileCalculator.
+
+    Raises:
+      ValueError, if the sketch is empty or if a percentile is invalid.
+    """
+    if not self.count:
+      raise ValueError("Can't compute percentiles of empty list.")
+    percentile_array = _ValidatePercentiles(percentiles)
+    keys = np.array(sorted(self._buckets), dtype=np.int64)
+    counts = np.array([self._buckets[k] for k in keys.tolist()],
+                      dtype=np.int64)
+    cumulative_counts = self._zero_count + np.cumsum(counts)
+    ranks = _RankIndices(self.count, percentile_array)
+    result = {}
+    for percentile, rank in zip(percentiles, ranks):
+      if rank < self._zero_count:
+        value = 0.0
+      else:
+        key = keys[np.searchsorted(cumulative_counts, rank, side='right')]
+        # The bucket midpoint (in relative terms) of (gamma^(k-1), gamma^k].
+        value = 2 * self._gamma ** key / (self._gamma + 1)
+      result[_PercentileKey(percentile)] = min(max(value, self._min),
+                                               self._max)
+    result['average'] = self._mean
+    if self.count > 1:
+      result['stddev'] = math.sqrt(self._m2 / (self.count - 1))
+    else:
+      result['stddev'] = 0
+    return result
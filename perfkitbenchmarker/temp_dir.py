@@ -27,6 +27,7 @@ from perfkitbenchmarker import version
 
 
 _PERFKITBENCHMARKER = 'perfkitbenchmarker'
+_PACKAGE_CACHE = 'package_cache'
 _RUNS = 'runs'
 _VERSIONS = 'versions'
 
@@ -55,6 +56,11 @@ def GetSshConnectionsDir():
   return os.path.join(GetRunDirPath(), 'ssh')
 
 
+def GetPackageCacheDirPath():
+  """Gets path to the directory of package builds shared between runs."""
+  return os.path.join(FLAGS.temp_dir, _PACKAGE_CACHE)
+
+
 def GetVersionDirPath(version=version.VERSION):
   """Gets path to the directory containing files specific to a PKB version."""
   return os.path.join(FLAGS.temp_dir, _VERSIONS, version)
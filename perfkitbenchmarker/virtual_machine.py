@@ -708,6 +708,17 @@ class BaseOsMixin(object):
     """
     raise NotImplementedError()
 
+  def CloseRemoteConnections(self):
+    """Closes any persistent connections held open to the VM.
+
+    This will be called once before the VM is deleted.
+    """
+    pass
+
+  def GetRemoteConnectionSamples(self):
+    """Returns a list of samples describing connections made to the VM."""
+    return []
+
   @abc.abstractmethod
   def WaitForBootCompletion(self):
     """Waits until VM is has booted.
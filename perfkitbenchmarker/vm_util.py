@@ -14,12 +14,16 @@
 
 """Set of utility functions for working with virtual machines."""
 
+import collections
 import contextlib
+import hashlib
 import logging
 import os
 import platform
+import posixpath
 import random
 import re
+import select
 import string
 import subprocess
 import tempfile
@@ -32,6 +36,7 @@ from perfkitbenchmarker import background_tasks
 from perfkitbenchmarker import data
 from perfkitbenchmarker import errors
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import sample
 from perfkitbenchmarker import temp_dir
 
 FLAGS = flags.FLAGS
@@ -62,6 +67,12 @@ OUTPUT_STDOUT = 0
 OUTPUT_STDERR = 1
 OUTPUT_EXIT_CODE = 2
 
+# Bytes read from a command's pipe at a time and the maximum number of seconds
+# IssueCommands waits for output before checking for exited or timed out
+# commands.
+_COMMAND_READ_SIZE = 65536
+_COMMAND_POLL_INTERVAL = 0.1
+
 _SIMULATE_MAINTENANCE_SEMAPHORE = threading.Semaphore(0)
 
 flags.DEFINE_integer('default_timeout', TIMEOUT, 'The default timeout for '
@@ -87,6 +98,19 @@ flags.DEFINE_integer('simulate_maintenance_delay', 0,
 flags.DEFINE_boolean('ssh_reuse_connections', True,
                      'Whether to reuse SSH connections rather than '
                      'reestablishing a connection for each remote command.')
+flags.DEFINE_string('ssh_control_persist', '10m',
+                    'Value for ssh -o ControlPersist. Controls how long an '
+                    'idle master connection is kept open when '
+                    '--ssh_reuse_connections is set. Master connections are '
+                    'closed when the VM is deleted.')
+flags.DEFINE_integer('max_concurrent_commands', 200,
+                     'The maximum number of commands that IssueCommands runs '
+                     'at once. Commands beyond this limit are started as '
+                     'earlier ones exit.')
+flags.DEFINE_integer('distribute_file_seeds', 2,
+                     'The number of VMs that DistributeFile copies a file to '
+                     'from the machine running PKB. The other VMs receive the '
+                     'file from VMs that already have it.', lower_bound=1)
 flags.DEFINE_integer('ssh_server_alive_interval', 30,
                      'Value for ssh -o ServerAliveInterval. Use with '
                      '--ssh_server_alive_count_max to configure how long to '
@@ -185,8 +209,19 @@ def GetCertPath():
   return PrependTempDir(CERT_FILE)
 
 
-def GetSshOptions(ssh_key_filename, connect_timeout=5):
-  """Return common set of SSH and SCP options."""
+def GetSshOptions(ssh_key_filename, connect_timeout=5, control_path=None):
+  """Return common set of SSH and SCP options.
+
+  Args:
+    ssh_key_filename: string. Path to the private key used to authenticate.
+    connect_timeout: int. Value for ssh -o ConnectTimeout.
+    control_path: string. Path of the ControlMaster socket to use when
+        --ssh_reuse_connections is set. Defaults to a socket in the run's SSH
+        connections directory named after the connection's hash.
+
+  Returns:
+    A list of command line options.
+  """
   options = [
       '-2',
       '-o', 'UserKnownHostsFile=/dev/null',
@@ -203,11 +238,12 @@ def GetSshOptions(ssh_key_filename, connect_timeout=5):
   if FLAGS.use_ipv6:
     options.append('-6')
   if FLAGS.ssh_reuse_connections:
-    control_path = os.path.join(temp_dir.GetSshConnectionsDir(), '%C')
+    control_path = control_path or os.path.join(
+        temp_dir.GetSshConnectionsDir(), '%C')
     options.extend([
         '-o', 'ControlPath="%s"' % control_path,
         '-o', 'ControlMaster=auto',
-        '-o', 'ControlPersist=10m'
+        '-o', 'ControlPersist=%s' % FLAGS.ssh_control_persist
     ])
   options.extend(FLAGS.ssh_options)
 
@@ -368,6 +404,184 @@ def IssueCommand(cmd, force_info_log=False, suppress_warning=False,
   return stdout, stderr, process.returncode
 
 
+class _ConcurrentCommand(object):
+  """A command started by IssueCommands and the output it has produced.
+
+  Attributes:
+    full_cmd: string. The command, for logging.
+    timeout: int. Seconds the command may run for, or None.
+    start_time: float. Time at which the command was started.
+    process: subprocess.Popen. The running command.
+    deadline: float. Time at which the command is killed, or None.
+    output: dict mapping each of the stdout and stderr file descriptors to the
+        list of chunks read from it so far.
+  """
+
+  def __init__(self, cmd, env, timeout, cwd):
+    self.full_cmd = ' '.join(cmd)
+    self.timeout = timeout
+    self.start_time = time.time()
+    self.deadline = None if timeout is None else self.start_time + timeout
+    self.process = subprocess.Popen(cmd, env=env, stdin=subprocess.PIPE,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, cwd=cwd,
+                                    close_fds=True)
+    # Nothing is ever written to stdin; closing it lets commands that read it
+    # see EOF rather than block.
+    self.process.stdin.close()
+    self.stdout_fd = self.process.stdout.fileno()
+    self.stderr_fd = self.process.stderr.fileno()
+    self.output = {self.stdout_fd: [], self.stderr_fd: []}
+
+  def Read(self, fd):
+    """Reads available output from fd. Returns False at end of file."""
+    data = os.read(fd, _COMMAND_READ_SIZE)
+    self.output[fd].append(data)
+    return bool(data)
+
+  def Drain(self):
+    """Reads whatever output is buffered in the pipes without blocking.
+
+    Commands may leave a background process (e.g. an ssh ControlMaster) that
+    holds the pipes open after the command itself exits, so a command is
+    finished when its process exits rather than when its pipes close.
+    """
+    poller = select.poll()
+    open_fds = set(self.output)
+    for fd in open_fds:
+      poller.register(fd, select.POLLIN)
+    while open_fds:
+      events = poller.poll(0)
+      if not events:
+        break
+      for fd, _ in events:
+        if not self.Read(fd):
+          poller.unregister(fd)
+          open_fds.discard(fd)
+
+  def Kill(self):
+    try:
+      self.process.kill()
+    except OSError:
+      pass  # The process already exited.
+
+  def Close(self):
+    self.process.stdout.close()
+    self.process.stderr.close()
+
+  def GetResult(self, force_info_log, suppress_warning):
+    """Logs the command's result like IssueCommand and returns it."""
+    stdout = ''.join(self.output[self.stdout_fd]).decode('ascii', 'ignore')
+    stderr = ''.join(self.output[self.stderr_fd]).decode('ascii', 'ignore')
+    retcode = self.process.returncode
+    debug_text = ('Ran: {%s}  ReturnCode:%s\nSTDOUT: %s\nSTDERR: %s' %
+                  (self.full_cmd, retcode, stdout, stderr))
+    if force_info_log or (retcode and not suppress_warning):
+      logging.info(debug_text)
+    else:
+      logging.debug(debug_text)
+    return stdout, stderr, retcode
+
+
+def IssueCommands(cmds, force_info_log=False, suppress_warning=False,
+                  env=None, timeout=DEFAULT_TIMEOUT, cwd=None,
+                  max_concurrency=None, return_times=False):
+  """Runs several commands concurrently and waits for all of them to finish.
+
+  Unlike running IssueCommand in RunThreaded, this uses no threads, timers or
+  temporary files: the calling thread starts up to max_concurrency commands,
+  multiplexes their output into memory with poll() and kills those that run
+  past the timeout. This makes it practical to run a command on hundreds of
+  VMs at once. Platforms without poll() fall back to RunThreaded.
+
+  Args:
+    cmds: A list of commands, each a list of strings such as is given to the
+        subprocess.Popen() constructor.
+    force_info_log: As in IssueCommand.
+    suppress_warning: As in IssueCommand.
+    env: As in IssueCommand.
+    timeout: Timeout for each command in seconds, measured from when that
+        command starts. Commands that time out are killed and have a negative
+        return code. Set timeout to None to let the commands run indefinitely.
+    cwd: As in IssueCommand.
+    max_concurrency: The maximum number of commands to run at once. Defaults
+        to --max_concurrent_commands.
+    return_times: If True, also return the wall time of each command.
+
+  Returns:
+    A list of (stdout, stderr, retcode) tuples in the same order as cmds, or
+    of (stdout, stderr, retcode, seconds) tuples if return_times is True.
+  """
+  max_concurrency = max_concurrency or FLAGS.max_concurrent_commands
+  if RunningOnWindows() or not hasattr(select, 'poll'):
+    def _IssueCommand(cmd):
+      start_time = time.time()
+      result = IssueCommand(cmd, force_info_log=force_info_log,
+                            suppress_warning=suppress_warning, env=env,
+                            timeout=timeout, cwd=cwd)
+      if return_times:
+        result += (time.time() - start_time,)
+      return result
+    return background_tasks.RunThreaded(_IssueCommand, list(cmds),
+                                        max_concurrent_threads=max_concurrency)
+
+  if env:
+    logging.debug('Environment variables: %s', env)
+
+  pending = collections.deque(enumerate(cmds))
+  results = [None] * len(pending)
+  running = {}
+  fd_to_command = {}
+  poller = select.poll()
+
+  def _Unregister(fd):
+    poller.unregister(fd)
+    del fd_to_command[fd]
+
+  try:
+    while pending or running:
+      while pending and len(running) < max_concurrency:
+        index, cmd = pending.popleft()
+        logging.info('Running: %s', ' '.join(cmd))
+        command = _ConcurrentCommand(cmd, env, timeout, cwd)
+        running[index] = command
+        for fd in command.output:
+          fd_to_command[fd] = command
+          poller.register(fd, select.POLLIN)
+
+      for fd, _ in poller.poll(_COMMAND_POLL_INTERVAL * 1000):
+        if not fd_to_command[fd].Read(fd):
+          _Unregister(fd)
+
+      now = time.time()
+      for index, command in running.items():
+        if command.process.poll() is None:
+          if command.deadline is not None and now > command.deadline:
+            logging.error('IssueCommands timed out after %d seconds. '
+                          'Killing command "%s".', command.timeout,
+                          command.full_cmd)
+            command.Kill()
+            # Only kill the command once.
+            command.deadline = None
+          continue
+        for fd in command.output:
+          if fd in fd_to_command:
+            _Unregister(fd)
+        command.Drain()
+        command.Close()
+        del running[index]
+        results[index] = command.GetResult(force_info_log, suppress_warning)
+        if return_times:
+          results[index] += (now - command.start_time,)
+  finally:
+    for command in running.itervalues():
+      command.Kill()
+      command.process.wait()
+      command.Close()
+
+  return results
+
+
 def IssueBackgroundCommand(cmd, stdout_path, stderr_path, env=None):
   """Run the provided command once in the background.
 
@@ -599,3 +813,89 @@ def CopyFileBetweenVms(filename, src_vm, src_path, dest_vm, dest_path):
         temp_path, os.path.join(src_path, filename), copy_to=False)
     dest_vm.RemoteCopy(
         temp_path, os.path.join(dest_path, filename), copy_to=True)
+
+
+def _GetLocalMd5sum(path):
+  """Returns the md5sum hash of a local file."""
+  md5 = hashlib.md5()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(1024 * 1024), ''):
+      md5.update(chunk)
+  return md5.hexdigest()
+
+
+def DistributeFile(vms, local_path, remote_path=None, num_seeds=None):
+  """Copies a local file to many VMs, using VMs that have it as sources.
+
+  The machine running PKB copies the file to num_seeds VMs. After that, in
+  each round every VM that has the file copies it directly to one VM that
+  doesn't, so the number of copies doubles every round while the PKB host
+  uploads the file only num_seeds times. Each copy is verified with
+  GetMd5sum, and a VM whose copy from a peer is corrupt receives the file from
+  the PKB host instead.
+
+  Args:
+    vms: list of VirtualMachines to copy the file to.
+    local_path: string. Path of the file on the local machine.
+    remote_path: string. Path of the file on the VMs. Defaults to the file's
+        name in the home directory.
+    num_seeds: int. Number of VMs to copy the file to from the local machine.
+        Defaults to --distribute_file_seeds.
+
+  Returns:
+    list of sample.Sample. The time taken to distribute the file and the
+    aggregate throughput, i.e. the bytes delivered to all VMs per second.
+
+  Raises:
+    errors.VmUtil.ThreadException: If any copy failed, including with an
+        errors.VmUtil.FileDistributionError because the file copied from the
+        local machine to a VM does not match the local file.
+  """
+  num_seeds = num_seeds or FLAGS.distribute_file_seeds
+  remote_path = remote_path or os.path.basename(local_path)
+  remote_dir, filename = posixpath.split(remote_path)
+  expected_md5sum = _GetLocalMd5sum(local_path)
+  file_bytes = os.path.getsize(local_path)
+
+  def _HasFile(vm):
+    return vm.GetMd5sum(remote_dir, filename) == expected_md5sum
+
+  def _CopyFromHost(vm):
+    vm.PushFile(local_path, remote_path)
+    if not _HasFile(vm):
+      raise errors.VmUtil.FileDistributionError(
+          'Checksum of %s on %s does not match %s.' % (remote_path, vm.name,
+                                                       local_path))
+
+  def _CopyFromPeer(source_vm, vm):
+    source_vm.MoveFile(vm, remote_path, remote_path)
+    if not _HasFile(vm):
+      logging.warning('Checksum of %s copied from %s to %s does not match. '
+                      'Copying it from the local machine instead.',
+                      remote_path, source_vm.name, vm.name)
+      _CopyFromHost(vm)
+
+  start_time = time.time()
+  holders = list(vms[:num_seeds])
+  pending = list(vms[num_seeds:])
+  RunThreaded(_CopyFromHost, holders)
+  rounds = 0
+  while pending:
+    pairs = zip(holders, pending)
+    pending = pending[len(pairs):]
+    RunThreaded(_CopyFromPeer, [(pair, {}) for pair in pairs])
+    holders.extend(vm for _, vm in pairs)
+    rounds += 1
+  elapsed = time.time() - start_time
+
+  logging.info('Distributed %s (%d bytes) to %d VMs in %.1f seconds.',
+               local_path, file_bytes, len(vms), elapsed)
+  metadata = {'file_bytes': file_bytes,
+              'num_vms': len(vms),
+              'num_seeds': min(num_seeds, len(vms)),
+              'peer_copy_rounds': rounds}
+  return [
+      sample.Sample('File Distribution Time', elapsed, 'seconds', metadata),
+      sample.Sample('File Distribution Throughput',
+                    file_bytes * len(vms) / 1e6 / elapsed if elapsed else 0,
+                    'MB/s', metadata)]
@@ -11,24 +11,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Contains benchmark imports and a list of benchmarks.
+"""Contains a dictionary of benchmark names and modules.
 
 All modules within this package are considered benchmarks, and are loaded
-dynamically. Add non-benchmark code to other packages.
+dynamically when they are first looked up in VALID_BENCHMARKS. Benchmarks are
+found through perfkitbenchmarker/module_index.py, so run
+tools/generate_module_index.py after adding one. Add non-benchmark code to
+other packages.
 """
 
 from perfkitbenchmarker import import_util
+from perfkitbenchmarker import module_index
 
-
-def _LoadBenchmarks():
-  return list(import_util.LoadModulesForPath(__path__, __name__))
-
-
-BENCHMARKS = _LoadBenchmarks()
-
-VALID_BENCHMARKS = {}
-for module in BENCHMARKS:
-  if module.BENCHMARK_NAME in VALID_BENCHMARKS:
-    raise ValueError('There are multiple benchmarks with BENCHMARK_NAME "%s"' %
-                     (module.BENCHMARK_NAME))
-  VALID_BENCHMARKS[module.BENCHMARK_NAME] = module
+VALID_BENCHMARKS = import_util.LazyModuleDict(module_index.WINDOWS_BENCHMARKS)
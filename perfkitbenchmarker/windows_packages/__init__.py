@@ -14,7 +14,7 @@
 """Contains package imports and a dictionary of package names and modules.
 
 All modules within this package are considered packages, and are loaded
-dynamically. Add non-package code to other packages.
+dynamically when first used. Add non-package code to other packages.
 
 Packages should, at a minimum, define an install function (Install(vm)).
 If the package manually places files in locations other than the VM's temp
@@ -24,14 +24,15 @@ directory, then it also needs to define an uninstall function (Uninstall(vm)).
 from perfkitbenchmarker import import_util
 
 
-def _LoadPackages():
-  """Imports all package modules and returns a dictionary of packages.
+def _GetPackages():
+  """Returns a dictionary of packages, which are imported when first used.
 
-  This imports all package modules in this directory and then creates a
-  mapping from module names to the modules themselves and returns it.
+  This creates a mapping from the names of all package modules in this
+  directory to the modules themselves, without importing any of them yet.
   """
-  return {module.__name__.split('.')[-1]: module for module in
-          import_util.LoadModulesForPath(__path__, __name__)}
+  return import_util.LazyModuleDict({
+      module_name.split('.')[-1]: module_name for module_name in
+      import_util.GetModuleNamesForPath(__path__, __name__)})
 
 
-PACKAGES = _LoadPackages()
+PACKAGES = _GetPackages()
@@ -22,10 +22,16 @@ import signal
 import threading
 import unittest
 
+import mock
+
 from perfkitbenchmarker import background_tasks
+from perfkitbenchmarker import context
 from perfkitbenchmarker import errors
+from perfkitbenchmarker import flags
 from tests import pkb_common_test_case
 
+FLAGS = flags.FLAGS
+
 
 def _ReturnArgs(a, b=None):
   return b, a
@@ -44,6 +50,10 @@ def _AppendLength(int_list):
   int_list.append(len(int_list))
 
 
+def _GetThreadIdent():
+  return threading.current_thread().ident
+
+
 def _WaitAndAppendInt(int_list, int_to_append, event=None, timeout=None):
   if event:
     event.wait(timeout)
@@ -126,6 +136,61 @@ class RunParallelThreadsTestCase(pkb_common_test_case.PkbCommonTestCase):
       background_tasks.RunParallelThreads(calls, max_concurrency=2)
     self.assertEqual(int_list, [1])
 
+  def testThreadsReused(self):
+    calls = [(_GetThreadIdent, (), {})] * 4
+    first_idents = background_tasks.RunParallelThreads(calls, max_concurrency=4)
+    second_idents = background_tasks.RunParallelThreads(calls,
+                                                        max_concurrency=4)
+    self.assertEqual(len(set(first_idents)), 4)
+    self.assertEqual(set(first_idents), set(second_idents))
+
+  def testNestedCalls(self):
+    inner_calls = [(_ReturnArgs, (i,), {}) for i in range(3)]
+    calls = [(background_tasks.RunParallelThreads, (inner_calls, 3), {})] * 2
+    result = background_tasks.RunParallelThreads(calls, max_concurrency=2)
+    self.assertEqual(result, [[(None, 0), (None, 1), (None, 2)]] * 2)
+
+  def testPriorities(self):
+    int_list = []
+    calls = [(_WaitAndAppendInt, (int_list, i), {}) for i in range(4)]
+    result = background_tasks.RunParallelThreads(
+        calls, max_concurrency=1, priorities=[0, 2, 1, 2])
+    self.assertEqual(int_list, [1, 3, 2, 0])
+    self.assertEqual(result, [None] * 4)
+
+  def testInvalidPriorities(self):
+    with self.assertRaises(ValueError):
+      background_tasks.RunParallelThreads([(_ReturnArgs, (1,), {})], 1,
+                                          priorities=[1, 2])
+
+  def testStopOnFailure(self):
+    int_list = []
+    calls = [(_AppendLength, (int_list,), {}), (_RaiseValueError, (), {}),
+             (_AppendLength, (int_list,), {})]
+    with self.assertRaises(errors.VmUtil.ThreadException):
+      background_tasks.RunParallelThreads(calls, max_concurrency=1,
+                                          stop_on_failure=True)
+    self.assertEqual(int_list, [0])
+
+  def testTimingSamples(self):
+    FLAGS.background_task_samples = True
+    spec = mock.Mock(background_task_samples=[])
+    context.SetThreadBenchmarkSpec(spec)
+    self.addCleanup(context.SetThreadBenchmarkSpec, None)
+    calls = [(_ReturnArgs, ('a',), {}), (_RaiseValueError, (), {})]
+    with self.assertRaises(errors.VmUtil.ThreadException):
+      background_tasks.RunParallelThreads(calls, max_concurrency=1)
+    samples = spec.background_task_samples
+    self.assertEqual([s.metric for s in samples],
+                     ['Background Task Queue Time',
+                      'Background Task Wall Time'] * 2)
+    self.assertEqual(samples[0].metadata['task'], '_ReturnArgs(a)')
+    self.assertTrue(samples[0].metadata['succeeded'])
+    self.assertFalse(samples[2].metadata['succeeded'])
+    self.assertLessEqual(samples[0].value, samples[2].value)
+    for s in samples:
+      self.assertGreaterEqual(s.value, 0)
+
 
 class RunThreadedTestCase(pkb_common_test_case.PkbCommonTestCase):
 
@@ -175,6 +240,12 @@ class RunParallelProcessesTestCase(pkb_common_test_case.PkbCommonTestCase):
       background_tasks.RunParallelProcesses(calls, max_concurrency=1)
     self.assertEqual(counter.value, 2)
 
+  def testPriorities(self):
+    calls = [(_ReturnArgs, ('a',), {'b': i}) for i in range(3)]
+    result = background_tasks.RunParallelProcesses(calls, max_concurrency=1,
+                                                   priorities=[1, 2, 3])
+    self.assertEqual(result, [(i, 'a') for i in range(3)])
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -14,6 +14,9 @@
 
 """Tests for perfkitbenchmarker.benchmark_sets."""
 
+import os
+import subprocess
+import sys
 import unittest
 from mock import patch
 
@@ -21,6 +24,7 @@ from perfkitbenchmarker import benchmark_sets
 from perfkitbenchmarker import configs
 from perfkitbenchmarker import flags
 from perfkitbenchmarker import linux_benchmarks
+from perfkitbenchmarker import module_index
 # This import to ensure required FLAGS are defined.
 from perfkitbenchmarker import pkb  # NOQA
 
@@ -141,7 +145,7 @@ class BenchmarkSetsTestCase(unittest.TestCase):
   def setUp(self):
     # create set of valid benchmark names from the benchmark directory
     self.valid_benchmark_names = set()
-    for benchmark_module in linux_benchmarks.BENCHMARKS:
+    for benchmark_module in linux_benchmarks.VALID_BENCHMARKS.values():
       self.valid_benchmark_names.add(benchmark_module.BENCHMARK_NAME)
 
     self.valid_benchmark_set_names = set()
@@ -358,5 +362,62 @@ class BenchmarkSetsTestCase(unittest.TestCase):
         benchmark_sets.GetBenchmarksFromFlags()
 
 
+class GetModulesForArgsTestCase(unittest.TestCase):
+
+  def testSelectedBenchmarks(self):
+    self.assertEqual(
+        benchmark_sets.GetModulesForArgs(['pkb.py', '--benchmarks=ping,iperf']),
+        {module_index.LINUX_BENCHMARKS['ping'],
+         module_index.LINUX_BENCHMARKS['iperf']})
+
+  def testBenchmarkSet(self):
+    module_names = benchmark_sets.GetModulesForArgs(
+        ['pkb.py', '--benchmarks', 'standard_set'])
+    self.assertIn(module_index.LINUX_BENCHMARKS['fio'], module_names)
+    self.assertEqual(module_names,
+                     benchmark_sets.GetModulesForArgs(['pkb.py']))
+
+  def testFlagModules(self):
+    module_names = benchmark_sets.GetModulesForArgs(
+        ['pkb.py', '--benchmarks=ping', '--fio_target_mode=against_device',
+         '--noycsb_histogram'])
+    self.assertEqual(module_names, {
+        module_index.LINUX_BENCHMARKS['ping'],
+        module_index.FLAG_MODULES['fio_target_mode'],
+        module_index.FLAG_MODULES['ycsb_histogram']})
+
+  def testHelpMatch(self):
+    module_names = benchmark_sets.GetModulesForArgs(
+        ['pkb.py', '--benchmarks=iperf', '--helpmatch=benchmarks.ping'])
+    self.assertEqual(module_names, {module_index.LINUX_BENCHMARKS['iperf'],
+                                    module_index.LINUX_BENCHMARKS['ping']})
+
+  def testImportAll(self):
+    for args in (['--help'], ['--benchmark_config_file', 'config.yml'],
+                 ['--helpmatch=(']):
+      self.assertIsNone(benchmark_sets.GetModulesForArgs(['pkb.py'] + args))
+
+  def testImportsOnlySelectedBenchmark(self):
+    # A fresh interpreter is needed to see which modules get imported.
+    code = '\n'.join([
+        'import sys',
+        'from perfkitbenchmarker import benchmark_sets, pkb',
+        'benchmark_sets.ImportModulesForArgs(["pkb.py", "--benchmarks=ping"])',
+        'print "\\n".join(name for name, module in sys.modules.items()',
+        '                if module and "_benchmarks." in name)'])
+    output = subprocess.check_output(
+        [sys.executable, '-c', code],
+        cwd=os.path.join(os.path.dirname(__file__), os.pardir))
+    self.assertEqual(set(output.split()), {
+        'perfkitbenchmarker.linux_benchmarks.cluster_boot_benchmark',
+        module_index.LINUX_BENCHMARKS['ping']})
+
+  def testModuleIndexIsUpToDate(self):
+    tools_dir = os.path.join(os.path.dirname(__file__), os.pardir, 'tools')
+    self.assertEqual(subprocess.call(
+        [sys.executable, os.path.join(tools_dir, 'generate_module_index.py'),
+         '--check']), 0)
+
+
 if __name__ == '__main__':
   unittest.main()
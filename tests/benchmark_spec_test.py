@@ -123,8 +123,7 @@ class _BenchmarkSpecTestCase(pkb_common_test_case.PkbCommonTestCase):
   def _CreateBenchmarkSpecFromConfigDict(self, config_dict, benchmark_name):
     config_spec = benchmark_config_spec.BenchmarkConfigSpec(
         benchmark_name, flag_values=FLAGS, **config_dict)
-    benchmark_module = next((b for b in linux_benchmarks.BENCHMARKS
-                             if b.BENCHMARK_NAME == benchmark_name))
+    benchmark_module = linux_benchmarks.VALID_BENCHMARKS[benchmark_name]
     return benchmark_spec.BenchmarkSpec(benchmark_module, config_spec, UID)
 
 
@@ -73,8 +73,8 @@ a:
 class ConfigsTestCase(unittest.TestCase):
 
   def testLoadAllDefaultConfigs(self):
-    all_benchmarks = (linux_benchmarks.BENCHMARKS +
-                      windows_benchmarks.BENCHMARKS)
+    all_benchmarks = (linux_benchmarks.VALID_BENCHMARKS.values() +
+                      windows_benchmarks.VALID_BENCHMARKS.values())
     for benchmark_module in all_benchmarks:
       self.assertIsInstance(benchmark_module.GetConfig({}), dict)
 
@@ -0,0 +1,155 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for perfkitbenchmarker.hdr_histogram."""
+
+import unittest
+
+import numpy as np
+
+from perfkitbenchmarker import hdr_histogram
+
+# Written by the reference implementation, the hdrhistogram Python package
+# (version 0.10.8), for (1, 3600 * 10^6, 3) with the values and counts of
+# _REFERENCE_VALUE_COUNTS.
+_REFERENCE_ENCODING = ('HISTFAAAAC54nJNpmSzMwMDAxwABzFCaEURcm7yEwf4DRICT6TkLy'
+                       '2YOkcVMXPvz2ACsyAhA')
+_REFERENCE_VALUE_COUNTS = [(5, 1), (314, 2), (853, 10), (1000, 5),
+                           (123456, 3)]
+
+
+def _ReferenceHistogram():
+  histogram = hdr_histogram.HdrHistogram(1, 3600 * 10 ** 6, 3)
+  values, counts = zip(*_REFERENCE_VALUE_COUNTS)
+  histogram.RecordValues(values, counts)
+  return histogram
+
+
+class HdrHistogramTestCase(unittest.TestCase):
+
+  def testExactBelowSubBucketCount(self):
+    histogram = hdr_histogram.HdrHistogram()
+    histogram.RecordValues(np.arange(2048))
+    values, counts = histogram.GetValueCounts()
+    self.assertEqual(values.tolist(), range(2048))
+    self.assertEqual(counts.tolist(), [1] * 2048)
+
+  def testPrecision(self):
+    numbers = np.random.lognormal(10, 3, size=10000)
+    histogram = hdr_histogram.HdrHistogram()
+    histogram.RecordValues(numbers)
+    values, counts = histogram.GetValueCounts()
+    self.assertEqual(counts.sum(), numbers.size)
+    for number in numbers.astype(np.int64)[:100]:
+      lowest = values[np.searchsorted(values, number, side='right') - 1]
+      self.assertLessEqual(number - lowest, number * 0.001)
+
+  def testGrowsBeyondHighestTrackableValue(self):
+    histogram = hdr_histogram.HdrHistogram(1, 2, 3)
+    histogram.RecordValues([10 ** 12])
+    self.assertEqual(histogram.highest_trackable_value, 10 ** 12)
+    self.assertEqual(histogram.total_count, 1)
+
+  def testInvalidValues(self):
+    with self.assertRaises(ValueError):
+      hdr_histogram.HdrHistogram().RecordValues([-1])
+    with self.assertRaises(ValueError):
+      hdr_histogram.HdrHistogram().RecordValues([1], [-1])
+    with self.assertRaises(ValueError):
+      hdr_histogram.HdrHistogram(significant_figures=6)
+
+  def testGetPercentiles(self):
+    histogram = hdr_histogram.HdrHistogram()
+    histogram.RecordValues([1, 2, 5], [5, 10, 5])
+    stats = histogram.GetPercentiles([0, 20, 30, 74, 80, 100])
+    self.assertEqual(stats['p0'], 1)
+    self.assertEqual(stats['p20'], 1)
+    self.assertEqual(stats['p30'], 2)
+    self.assertEqual(stats['p74'], 2)
+    self.assertEqual(stats['p80'], 5)
+    self.assertEqual(stats['p100'], 5)
+    self.assertEqual(stats['average'], 2.5)
+    self.assertAlmostEqual(stats['stddev'], np.std([1] * 5 + [2] * 10 +
+                                                   [5] * 5, ddof=1))
+
+  def testGetPercentilesEmpty(self):
+    with self.assertRaises(ValueError):
+      hdr_histogram.HdrHistogram().GetPercentiles()
+
+  def testMerge(self):
+    numbers = np.random.exponential(10000, size=10000)
+    whole = hdr_histogram.HdrHistogram()
+    whole.RecordValues(numbers)
+    merged = hdr_histogram.HdrHistogram(1, 2, 3)
+    for chunk in np.array_split(numbers, 7):
+      part = hdr_histogram.HdrHistogram()
+      part.RecordValues(chunk)
+      merged.Merge(part)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+
+  def testMergeDifferentLayouts(self):
+    merged = hdr_histogram.HdrHistogram(significant_figures=2)
+    merged.Merge(_ReferenceHistogram())
+    self.assertEqual(merged.total_count, 21)
+    self.assertEqual(merged.GetPercentiles([50])['p50'], 852)
+
+  def testEncodeMatchesReference(self):
+    self.assertEqual(_ReferenceHistogram().Encode(), _REFERENCE_ENCODING)
+
+  def testDecodeReference(self):
+    histogram = hdr_histogram.HdrHistogram.Decode(_REFERENCE_ENCODING)
+    self.assertEqual(histogram.highest_trackable_value, 3600 * 10 ** 6)
+    values, counts = histogram.GetValueCounts()
+    self.assertEqual(zip(values.tolist(), counts.tolist()),
+                     _REFERENCE_VALUE_COUNTS)
+
+  def testEncodeDecodeRoundTrip(self):
+    histogram = hdr_histogram.HdrHistogram()
+    histogram.RecordValues(np.random.lognormal(8, 2, size=1000))
+    histogram.RecordValues([0, 2 ** 40])
+    decoded = hdr_histogram.HdrHistogram.Decode(histogram.Encode())
+    np.testing.assert_array_equal(
+        decoded.counts[:histogram.counts.size], histogram.counts)
+
+  def testDecodeInvalid(self):
+    with self.assertRaises(ValueError):
+      hdr_histogram.HdrHistogram.Decode('HISTFAAAA')
+    with self.assertRaises(ValueError):
+      hdr_histogram.HdrHistogram.Decode('not a histogram')
+
+  def testGetPercentileDistribution(self):
+    distribution = _ReferenceHistogram().GetPercentileDistribution()
+    self.assertEqual(distribution[:3], [(5, 0.0, 1), (314, 10.0, 3),
+                                        (853, 20.0, 13)])
+    self.assertEqual([level for _, level, _ in distribution[6:10]],
+                     [55.0, 60.0, 65.0, 70.0])
+    self.assertEqual(distribution[-2:], [(123519, 87.5, 21),
+                                         (123519, 100.0, 21)])
+
+  def testGetPercentileDistributionEmpty(self):
+    self.assertEqual(hdr_histogram.HdrHistogram().GetPercentileDistribution(),
+                     [])
+
+  def testDecodeLogLine(self):
+    self.assertIsNone(hdr_histogram.DecodeLogLine('#[StartTime: 1523565997]'))
+    self.assertIsNone(hdr_histogram.DecodeLogLine(
+        '"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed'
+        '_Histogram"'))
+    for line in ('0.127,1.007,123.519,' + _REFERENCE_ENCODING,
+                 'Tag=READ,0.127,1.007,123.519,' + _REFERENCE_ENCODING):
+      histogram = hdr_histogram.DecodeLogLine(line + '\n')
+      self.assertEqual(histogram.total_count, 21)
+
+
+if __name__ == '__main__':
+  unittest.main()
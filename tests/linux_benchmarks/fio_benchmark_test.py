@@ -14,6 +14,9 @@
 
 """Tests for fio_benchmark."""
 
+import json
+import shutil
+import tempfile
 import unittest
 
 import mock
@@ -156,6 +159,8 @@ blocksize = 8k
             mock.patch(fio_benchmark.__name__ + '.fio.ParseResults'), \
             mock.patch(fio_benchmark.__name__ + '.FLAGS') as fio_FLAGS:
       fio_FLAGS.fio_target_mode = mode
+      fio_FLAGS.fio_hist_log = False
+      fio_FLAGS.fio_steady_state = False
       benchmark_spec = mock.MagicMock()
       benchmark_spec.vms = [mock.MagicMock()]
       benchmark_spec.vms[0].RobustRemoteCommand = (
@@ -205,5 +210,141 @@ blocksize = 8k
                           expect_format_disk=False)
 
 
+def _StatusReport(job_name, runtime_ms, total_ios):
+  """Returns a fio JSON report of a read job with a 4k block size."""
+  read = {'runtime': runtime_ms, 'total_ios': total_ios,
+          'iops': total_ios * 1000.0 / runtime_ms,
+          'bw': total_ios * 4000.0 / runtime_ms,
+          'clat': {'mean': 100.0}}
+  return json.dumps({'jobs': [{'jobname': job_name, 'read': read}]})
+
+
+class TestRunJobsUntilSteady(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(TestRunJobsUntilSteady, self).setUp()
+    FLAGS.fio_status_interval = 10
+    FLAGS.fio_steady_state_rounds = 3
+    FLAGS.fio_steady_state_max_range = 0.2
+    FLAGS.fio_steady_state_max_slope = 0.1
+    FLAGS.fio_steady_state_ramp_time = 0
+    FLAGS.fio_burst_threshold = 0.5
+    sleep_patch = mock.patch(fio_benchmark.__name__ + '.time.sleep')
+    sleep_patch.start()
+    self.addCleanup(sleep_patch.stop)
+
+  def testRunJobsUntilSteady(self):
+    job_file = '[global]\nbs=4k\n[burst]\nrw=randread\n[flat]\nrw=read\n'
+    # Each poll returns the output written since the previous one, split
+    # across reports where fio is still writing them.
+    burst_reports = [_StatusReport('burst', 10000 * (i + 1), ios) for i, ios in
+                     enumerate([30000, 60000, 70000, 80000, 90000])]
+    burst_output = ''.join(burst_reports)
+    flat_report = _StatusReport('flat', 10000, 50000)
+    polls = [
+        # burst: the second report is cut short.
+        (True, burst_output[:len(burst_reports[0]) + 10]),
+        (True, burst_output[len(burst_reports[0]) + 10:]),
+        # fio writes its final report after pkill.
+        (False, burst_reports[-1]),
+        (False, flat_report),
+    ]
+    commands = []
+
+    def RemoteCommand(command, **kwargs):
+      del kwargs
+      commands.append(command)
+      if command.startswith('pgrep'):
+        self.running, self.output = polls.pop(0)
+        return ('123\n' if self.running else ''), ''
+      if command.startswith('tail'):
+        return self.output, ''
+      return '', ''
+
+    vm = mock.Mock(RemoteCommand=mock.Mock(side_effect=RemoteCommand))
+    fio_json_result, samples = fio_benchmark._RunJobsUntilSteady(
+        vm, 'sudo fio job.fio', job_file)
+
+    self.assertEqual([], polls)
+    self.assertEqual(['burst', 'flat'],
+                     [job['jobname'] for job in fio_json_result['jobs']])
+    self.assertEqual(90000, fio_json_result['jobs'][0]['read']['total_ios'])
+    self.assertEqual(1, sum('pkill' in command for command in commands))
+    self.assertIn('--section=burst', commands[0])
+    self.assertIn('--status-interval=10', commands[0])
+    self.assertEqual(
+        [('burst:time_to_steady_state', 20.0),
+         ('burst:burst_credit_exhaustion', 20.0),
+         ('flat:time_to_steady_state', 10.0)],
+        [(s.metric, s.value) for s in samples])
+    self.assertEqual('burst', samples[0].metadata['fio_job'])
+    self.assertFalse(samples[2].metadata['steady_state_reached'])
+
+
+class TestClientServer(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(TestClientServer, self).setUp()
+    temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    temp_dir_patch = mock.patch(vm_util.__name__ + '.GetTempDir',
+                                return_value=temp_dir)
+    temp_dir_patch.start()
+    self.addCleanup(temp_dir_patch.stop)
+    FLAGS.fio_target_mode = fio_benchmark.AGAINST_FILE_WITHOUT_FILL_MODE
+    FLAGS.fio_jobfile = None
+    FLAGS.fio_generate_scenarios = ['random_read']
+    FLAGS.fio_working_set_size = 1
+
+  def testAddGlobalParameter(self):
+    self.assertEqual(
+        '[global]\ndirectory=/scratch\nbs=4k\n[job]\n',
+        fio_benchmark._AddGlobalParameter('[global]\nbs=4k\n[job]\n',
+                                          'directory=/scratch'))
+    self.assertEqual(
+        '[global]\ndirectory=/scratch\n[job]\n',
+        fio_benchmark._AddGlobalParameter('[job]\n', 'directory=/scratch'))
+
+  def testRunClientServer(self):
+    vms = []
+    for index in range(2):
+      vm = mock.MagicMock(internal_ip='10.0.0.%d' % index)
+      vm.name = 'vm%d' % index
+      vm.scratch_disks = [mock.MagicMock(mount_point='/scratch')]
+      vms.append(vm)
+    job_name = 'random_read-io-depth-1-num-jobs-1'
+    stats = {'io_bytes': 400, 'iops': 100, 'bw': 400, 'runtime': 1000,
+             'bw_min': 0, 'bw_max': 0, 'bw_dev': 0, 'bw_agg': 0,
+             'bw_mean': 0,
+             'clat': {'min': 0, 'max': 0, 'mean': 10, 'stddev': 0,
+                      'percentile': {'%f' % p: 10 for p in (
+                          1, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 99,
+                          99.5, 99.9, 99.95, 99.99)},
+                      'bins': {'10': 100}}}
+    idle = {'io_bytes': 0}
+    client_stats = [{'jobname': job_name, 'hostname': vm.internal_ip,
+                     'read': stats, 'write': idle, 'trim': idle}
+                    for vm in vms]
+    vms[0].RobustRemoteCommand.return_value = (
+        json.dumps({'client_stats': client_stats}), '')
+
+    samples = fio_benchmark._RunClientServer(vms, 'sudo fio', '/tmp/fio.job',
+                                             '')
+
+    command = vms[0].RobustRemoteCommand.call_args[0][0]
+    self.assertEqual('sudo fio --output-format=json+ '
+                     '--client=10.0.0.0 /tmp/fio.job.0 '
+                     '--client=10.0.0.1 /tmp/fio.job.1', command)
+    self.assertEqual(2, vms[0].PushFile.call_count)
+    self.assertFalse(vms[1].PushFile.called)
+    with open(vms[0].PushFile.call_args_list[1][0][0]) as job_file:
+      job_file_string = job_file.read()
+    self.assertIn('directory=/scratch', job_file_string)
+    self.assertIn('filename=fio-temp-file-vm1', job_file_string)
+    iops = [s for s in samples if s.metric == job_name + ':read:iops']
+    self.assertEqual([100, 100, 200], [s.value for s in iops])
+    self.assertEqual(2, iops[-1].metadata['fio_clients'])
+
+
 if __name__ == '__main__':
   unittest.main()
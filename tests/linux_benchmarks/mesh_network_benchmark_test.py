@@ -0,0 +1,118 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for mesh_network_benchmark."""
+
+import itertools
+import json
+import re
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from perfkitbenchmarker import benchmark_spec
+from perfkitbenchmarker import flags
+from perfkitbenchmarker import vm_util
+from perfkitbenchmarker.linux_benchmarks import mesh_network_benchmark
+from tests import pkb_common_test_case
+
+FLAGS = flags.FLAGS
+
+
+def _MockVm(index):
+  """Returns a VM whose netperf result to VM j is 10 * index + j."""
+  vm = mock.MagicMock()
+  vm.name = 'vm%d' % index
+  vm.internal_ip = '10.0.0.%d' % index
+
+  def _RemoteCommand(cmd):
+    server = int(re.search(r'-H 10\.0\.0\.(\d+)', cmd).group(1))
+    return ('87380  16384  16384    10.00    %d.00   \n' %
+            (10 * index + server), '')
+
+  vm.RemoteCommand.side_effect = _RemoteCommand
+  return vm
+
+
+class GetRoundRobinRoundsTestCase(unittest.TestCase):
+
+  def _CheckRounds(self, num_vms, expected_num_rounds):
+    rounds = mesh_network_benchmark.GetRoundRobinRounds(num_vms)
+    self.assertEqual(len(rounds), expected_num_rounds)
+    for pairs in rounds:
+      vms = [vm for pair in pairs for vm in pair]
+      self.assertEqual(len(vms), len(set(vms)))
+    met = sorted(tuple(sorted(pair)) for pairs in rounds for pair in pairs)
+    self.assertEqual(met, list(itertools.combinations(range(num_vms), 2)))
+
+  def testEvenNumberOfVms(self):
+    self._CheckRounds(6, 5)
+
+  def testOddNumberOfVms(self):
+    self._CheckRounds(5, 5)
+
+  def testManyVms(self):
+    self._CheckRounds(100, 99)
+
+  def testTwoVms(self):
+    self.assertEqual(mesh_network_benchmark.GetRoundRobinRounds(2),
+                     [[(0, 1)]])
+
+
+class MeshNetworkRoundRobinTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(MeshNetworkRoundRobinTestCase, self).setUp()
+    FLAGS.mesh_network_schedule = mesh_network_benchmark.ROUND_ROBIN_SCHEDULE
+    FLAGS.num_connections = 1
+    FLAGS.duration_in_seconds = None
+    temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    p = mock.patch.object(vm_util, 'GetTempDir', return_value=temp_dir)
+    p.start()
+    self.addCleanup(p.stop)
+    self.temp_dir = temp_dir
+
+  def testRunRoundRobin(self):
+    vms = [_MockVm(i) for i in range(3)]
+
+    matrix = mesh_network_benchmark.RunRoundRobin(vms, 'TCP_STREAM')
+
+    self.assertEqual(matrix.tolist()[0][1:], [1., 2.])
+    self.assertEqual(matrix.tolist()[2][:2], [20., 21.])
+    for vm in vms:
+      self.assertEqual(vm.RemoteCommand.call_count, 2)
+
+  def testRunReportsMatrix(self):
+    spec = mock.MagicMock(spec=benchmark_spec.BenchmarkSpec)
+    spec.vms = [_MockVm(i) for i in range(2)]
+
+    results = mesh_network_benchmark.Run(spec)
+
+    values = {s.metric: s for s in results}
+    self.assertEqual(values['TCP_STREAM_Total_Throughput'].value, 11.0)
+    self.assertEqual(values['TCP_STREAM_Throughput_Pair_max'].value, 10.0)
+    self.assertEqual(
+        json.loads(values['TCP_STREAM_Throughput_Matrix'].metadata['matrix']),
+        [[None, 1.0], [10.0, None]])
+    # 1000 / 1 and 1000 / 10 transactions per second.
+    self.assertEqual(values['TCP_RR_Average_Latency'].value, 550.0)
+    with open(self.temp_dir + '/mesh_network_TCP_STREAM_matrix.csv') as fp:
+      self.assertEqual(fp.read().splitlines(),
+                       [',vm0,vm1', 'vm0,,1.0', 'vm1,10.0,'])
+
+
+if __name__ == '__main__':
+  unittest.main()
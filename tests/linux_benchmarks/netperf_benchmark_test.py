@@ -21,8 +21,10 @@ import mock
 
 from perfkitbenchmarker import benchmark_spec
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import sample
 from perfkitbenchmarker import vm_util
 from perfkitbenchmarker.linux_benchmarks import netperf_benchmark
+from tests import pkb_common_test_case
 
 FLAGS = flags.FLAGS
 FLAGS.mark_as_parsed()
@@ -72,10 +74,18 @@ class NetperfBenchmarkTestCase(unittest.TestCase):
     self.assertEqual(stats['p100'], 5)
     self.assertLessEqual(abs(stats['stddev'] - 1.538), 0.001)
 
+  def testHistogramStatsCalculatorFractionalMicroseconds(self):
+    histogram = {5.3: 10, 5.7: 10, 42.4: 10, 42.9: 5}
+    stats = netperf_benchmark._HistogramStatsCalculator(histogram)
+    self.assertEqual(stats['p50'], 5.7)
+    self.assertEqual(stats['p90'], 42.9)
+    self.assertEqual(stats['p99'], 42.9)
+
   def testExternalAndInternal(self):
     self._ConfigureIpTypes()
     vm_spec = mock.MagicMock(spec=benchmark_spec.BenchmarkSpec)
     vm_spec.vms = [mock.MagicMock(), mock.MagicMock()]
+    vm_spec.vm_groups = {'vm_1': vm_spec.vms[:1], 'vm_2': vm_spec.vms[1:]}
     vm_spec.vms[0].RobustRemoteCommand.side_effect = [
         (i, '') for i in self.expected_stdout]
 
@@ -142,5 +152,115 @@ class NetperfBenchmarkTestCase(unittest.TestCase):
       self.assertDictContainsSubset(meta, result[i][3])
 
 
+class NetperfMultiVmTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(NetperfMultiVmTestCase, self).setUp()
+    path = os.path.join(os.path.dirname(__file__),
+                        '..', 'data',
+                        'netperf_results.json')
+    with open(path) as fp:
+      self.stdouts = ['\n'.join(i) for i in json.load(fp)]
+
+    p = mock.patch(vm_util.__name__ + '.ShouldRunOnExternalIpAddress',
+                   return_value=False)
+    p.start()
+    self.addCleanup(p.stop)
+
+    p = mock.patch(vm_util.__name__ + '.ShouldRunOnInternalIpAddress',
+                   return_value=True)
+    p.start()
+    self.addCleanup(p.stop)
+
+    FLAGS.netperf_num_streams = [3]
+    FLAGS.netperf_benchmarks = ['TCP_STREAM']
+    FLAGS.netperf_enable_histograms = False
+    self.spec = mock.MagicMock(spec=benchmark_spec.BenchmarkSpec)
+    self.spec.vms = [mock.MagicMock() for _ in range(4)]
+    for i, vm in enumerate(self.spec.vms):
+      vm.image = 'ubuntu-1604'
+      vm.internal_ip = '10.0.0.%d' % i
+    self.spec.vm_groups = {'vm_1': self.spec.vms[:2],
+                           'vm_2': self.spec.vms[2:]}
+
+  def testAssignStreams(self):
+    self.assertEqual(
+        netperf_benchmark._AssignStreams(5, 2, 3),
+        [[(20000, 0), (20004, 2), (20008, 1)], [(20002, 1), (20006, 0)]])
+
+  def testJainFairnessIndex(self):
+    self.assertEqual(netperf_benchmark._JainFairnessIndex([5, 5, 5, 5]), 1)
+    self.assertEqual(netperf_benchmark._JainFairnessIndex([8, 0, 0, 0]), 0.25)
+    self.assertAlmostEqual(netperf_benchmark._JainFairnessIndex([1, 2, 3]),
+                           36 / 42.)
+
+  def testMergeHistograms(self):
+    latencies, counts = netperf_benchmark._MergeHistograms(
+        [{1.5: 2, 30: 1}, {}, {30: 4, 0.1: 7}])
+    self.assertEqual(latencies.tolist(), [0.1, 1.5, 30])
+    self.assertEqual(counts.tolist(), [7, 2, 5])
+
+  def testRunMergesFractionalLatencyHistograms(self):
+    histograms = [{5.3: 10, 42.4: 10}, {5.7: 10, 42.9: 5}]
+    parsed_output = [
+        (sample.Sample('TCP_RR_Transaction_Rate', 1000.0,
+                       netperf_benchmark.TRANSACTIONS_PER_SECOND), [],
+         histogram) for histogram in histograms]
+    self.spec.vms[0].RobustRemoteCommand.return_value = (json.dumps((
+        ['', ''], ['', ''], [0, 0], 0, 0)), '')
+
+    with mock.patch.object(netperf_benchmark, 'ParseNetperfOutput',
+                           side_effect=parsed_output):
+      result = netperf_benchmark.RunNetperfStreams(
+          self.spec.vms[:1], 'TCP_RR', ['10.0.0.2'], 2)
+
+    values = {s.metric: s.value for s in result}
+    self.assertEqual(values['TCP_RR_Latency_p50'], 5.7)
+    self.assertEqual(values['TCP_RR_Latency_p90'], 42.9)
+    self.assertEqual(values['TCP_RR_Latency_p99'], 42.9)
+
+  def testPrepareStartsNetserversForAssignedPorts(self):
+    netperf_benchmark.Prepare(self.spec)
+
+    server_cmds = [vm.RemoteCommand.call_args[0][0]
+                   for vm in self.spec.vms[2:]]
+    self.assertIn('seq 20000 4 20005', server_cmds[0])
+    self.assertIn('seq 20002 4 20005', server_cmds[1])
+    for vm in self.spec.vms[:2]:
+      vm.PushFile.assert_called_once_with(mock.ANY,
+                                          netperf_benchmark.REMOTE_SCRIPT)
+
+  def testRunAggregatesStreamsFromAllClients(self):
+    tcp_stream_stdout = self.stdouts[4]  # 1187.94 Mbits/sec
+    other_stdout = self.stdouts[5]  # 1973.37 Mbits/sec
+    self.spec.vms[0].RobustRemoteCommand.return_value = (json.dumps((
+        [tcp_stream_stdout, other_stdout], ['', ''], [0, 0], 0, 0,
+        [100.0, 100.5], [160.0, 161.0])), '')
+    self.spec.vms[1].RobustRemoteCommand.return_value = (json.dumps((
+        [tcp_stream_stdout], [''], [0], 0, 0, [100.2], [160.5])), '')
+
+    with mock.patch('time.time', return_value=90.0):
+      result = netperf_benchmark.Run(self.spec)
+
+    client_cmds = [vm.RobustRemoteCommand.call_args[0][0]
+                   for vm in self.spec.vms[:2]]
+    self.assertIn('-H {server_ip}', client_cmds[0])
+    self.assertIn('--command_ports=20000,20004 --server_ips=10.0.0.2,10.0.0.2 '
+                  '--start_time=100.000', client_cmds[0])
+    self.assertIn('--command_ports=20002 --server_ips=10.0.0.3 '
+                  '--start_time=100.000', client_cmds[1])
+    values = {s.metric: s.value for s in result}
+    self.assertAlmostEqual(values['TCP_STREAM_Throughput_total'], 4349.25)
+    self.assertAlmostEqual(values['TCP_STREAM_Throughput_min'], 1187.94)
+    self.assertAlmostEqual(values['TCP_STREAM_Jain_Fairness_Index'],
+                           0.939, places=3)
+    metadata = result[0].metadata
+    self.assertEqual(metadata['netperf_num_client_vms'], 2)
+    self.assertEqual(metadata['netperf_num_server_vms'], 2)
+    self.assertAlmostEqual(metadata['stream_start_skew_sec'], 0.5)
+    self.assertAlmostEqual(metadata['stream_end_skew_sec'], 1.0)
+    self.assertAlmostEqual(metadata['stream_overlap_sec'], 59.5)
+
+
 if __name__ == '__main__':
   unittest.main()
@@ -15,11 +15,20 @@
 """Tests for object storage service benchmark."""
 
 import datetime
+import json
+import os
+import shutil
+import tempfile
 import time
 import unittest
+import zlib
+
 import mock
+import numpy as np
 
 from perfkitbenchmarker import flags
+from perfkitbenchmarker import local_object_storage
+from perfkitbenchmarker import vm_util
 from perfkitbenchmarker.linux_benchmarks import object_storage_service_benchmark
 from tests import pkb_common_test_case
 
@@ -47,9 +56,12 @@ class TestBuildCommands(pkb_common_test_case.PkbCommonTestCase):
       with mock.patch(object_storage_service_benchmark.__name__ +
                       '._ProcessMultiStreamResults'):
         with mock.patch(object_storage_service_benchmark.__name__ +
-                        '.LoadWorkerOutput', return_value=(None, None, None)):
-          object_storage_service_benchmark.MultiStreamRWBenchmark(
-              [], {}, [vm], command_builder, service, 'bucket')
+                        '.LoadWorkerOutputFiles',
+                        return_value=(None, None, None)):
+          with mock.patch(vm_util.__name__ + '.GetTempDir',
+                          return_value='tmp'):
+            object_storage_service_benchmark.MultiStreamRWBenchmark(
+                [], {}, [vm], command_builder, service, 'bucket')
 
     self.assertEqual(
         command_builder.BuildCommand.call_args_list[0],
@@ -61,6 +73,7 @@ class TestBuildCommands(pkb_common_test_case.PkbCommonTestCase):
                    '--object_sizes="{1000: 100.0}"',
                    '--object_naming_scheme=sequential_by_stream',
                    '--scenario=MultiStreamWrite',
+                   '--worker_output_file=/tmp/pkb/pkb-worker-output',
                    '--stream_num_start=0']))
 
     self.assertEqual(
@@ -71,7 +84,76 @@ class TestBuildCommands(pkb_common_test_case.PkbCommonTestCase):
                    '--start_time=16.1',
                    '--objects_written_file=/tmp/pkb/pkb-objects-written',
                    '--scenario=MultiStreamRead',
+                   '--worker_output_file=/tmp/pkb/pkb-worker-output',
                    '--stream_num_start=0']))
+    vm.PullFile.assert_called_with('tmp/pkb-worker-output-download-0',
+                                   '/tmp/pkb/pkb-worker-output')
+
+  def testBuildCommandsOpenLoop(self):
+    FLAGS.object_storage_request_rate = 50.0
+    FLAGS.object_storage_arrival_distribution = 'poisson'
+    vm = mock.MagicMock()
+    vm.RobustRemoteCommand = mock.MagicMock(return_value=('', ''))
+    command_builder = mock.MagicMock()
+
+    with mock.patch(object_storage_service_benchmark.__name__ +
+                    '._ProcessMultiStreamResults'):
+      with mock.patch(object_storage_service_benchmark.__name__ +
+                      '.LoadWorkerOutputFiles',
+                      return_value=(None, None, None)):
+        with mock.patch(vm_util.__name__ + '.GetTempDir', return_value='tmp'):
+          object_storage_service_benchmark.MultiStreamWriteBenchmark(
+              [], {}, [vm], command_builder, mock.MagicMock(), 'bucket')
+
+    args = command_builder.BuildCommand.call_args[0][0]
+    self.assertIn('--request_rate=50.0', args)
+    self.assertIn('--arrival_distribution=poisson', args)
+
+
+def _WriteWorkerOutputFile(path, streams, compress=False):
+  """Writes a file in the format of the API test script's WriteWorkerOutput."""
+  header = json.dumps({
+      'streams': [{'stream_num': i, 'count': len(stream[0])}
+                  for i, stream in enumerate(streams)],
+      'columns': ['start_times', 'latencies', 'sizes'],
+      'dtype': '<f8',
+      'compression': 'zlib' if compress else None})
+  header += ' ' * (-(len(header) + 1) % 8) + '\n'
+  body = np.concatenate([np.concatenate([np.asarray(stream[i], '<f8')
+                                         for stream in streams])
+                         for i in range(3)]).tostring()
+  with open(path, 'wb') as out:
+    out.write(header)
+    out.write(zlib.compress(body) if compress else body)
+
+
+class TestLoadWorkerOutputFiles(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.temp_dir)
+
+  def _Load(self, compress):
+    paths = [os.path.join(self.temp_dir, name) for name in ('vm0', 'vm1')]
+    _WriteWorkerOutputFile(paths[0], [([1.0, 2.0], [0.5, 0.25], [100, 200]),
+                                      ([1.5], [0.75], [300])], compress)
+    _WriteWorkerOutputFile(paths[1], [([], [], [])], compress)
+    return object_storage_service_benchmark.LoadWorkerOutputFiles(paths)
+
+  def _CheckLoaded(self, loaded):
+    start_times, latencies, sizes = loaded
+    self.assertEqual([a.tolist() for a in start_times],
+                     [[1.0, 2.0], [1.5], []])
+    self.assertEqual([a.tolist() for a in latencies],
+                     [[0.5, 0.25], [0.75], []])
+    self.assertEqual([a.tolist() for a in sizes], [[100, 200], [300], []])
+    self.assertEqual(sizes[0].dtype, np.int64)
+
+  def testUncompressed(self):
+    self._CheckLoaded(self._Load(compress=False))
+
+  def testCompressed(self):
+    self._CheckLoaded(self._Load(compress=True))
 
 
 class TestDistributionToBackendFormat(pkb_common_test_case.PkbCommonTestCase):
@@ -133,5 +215,121 @@ class TestColdObjectsWrittenFiles(pkb_common_test_case.PkbCommonTestCase):
       self.assertLessEqual(age, 73)
 
 
+class TestProcessMultiStreamResults(pkb_common_test_case.PkbCommonTestCase):
+
+  def _Process(self):
+    FLAGS.object_storage_streams_per_vm = 1
+    FLAGS.num_vms = 1
+    # The service falls behind, so every request is late and the latencies
+    # measured from when each was due overlap.
+    start_times = [np.array([100.0, 101.0, 102.0])]
+    latencies = [np.array([1.5, 2.0, 2.5])]
+    sizes = [np.array([1000, 1000, 1000])]
+    results = []
+    object_storage_service_benchmark._ProcessMultiStreamResults(
+        start_times, latencies, sizes, 'upload', [1000], results)
+    return {s.metric: s.value for s in results}
+
+  def testClosedLoop(self):
+    values = self._Process()
+    self.assertIn('Multi-stream upload net throughput', values)
+    self.assertIn('Multi-stream upload total gap time', values)
+
+  def testRatePacedSkipsSamplesFromLatencySums(self):
+    FLAGS.object_storage_request_rate = 1.0
+    values = self._Process()
+    self.assertNotIn('Multi-stream upload net throughput', values)
+    self.assertNotIn('Multi-stream upload total gap time', values)
+    self.assertNotIn('Multi-stream upload gap time proportion', values)
+    self.assertEqual(values['Multi-stream upload offered QPS'], 1.0)
+    self.assertAlmostEqual(
+        values['Multi-stream upload net throughput (simplified)'],
+        3000 / 4.5 * 8)
+
+
+class TestTimeline(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(TestTimeline, self).setUp()
+    # Two streams. Operations complete at 1.5, 2.5, 3.5 and 1.0, 1.25, 4.0
+    # seconds after the run starts at 100.
+    self.start_times = [np.array([100.0, 101.5, 102.5]),
+                        np.array([100.0, 101.0, 103.0])]
+    self.latencies = [np.array([1.5, 1.0, 1.0]),
+                      np.array([1.0, 0.25, 1.0])]
+    self.sizes = [np.array([100, 100, 100]), np.array([200, 200, 200])]
+
+  def testComputeTimeline(self):
+    window_starts, durations, counts, total_sizes, latency_percentiles = (
+        object_storage_service_benchmark._ComputeTimeline(
+            self.start_times, self.latencies, self.sizes, 2.0))
+
+    self.assertEqual(window_starts.tolist(), [100.0, 102.0])
+    self.assertEqual(durations.tolist(), [2.0, 2.0])
+    self.assertEqual(counts.tolist(), [3, 3])
+    self.assertEqual(total_sizes.tolist(), [500, 400])
+    self.assertEqual(latency_percentiles[50].tolist(), [1.0, 1.0])
+    np.testing.assert_allclose(latency_percentiles[90], [1.4, 1.0])
+
+  def testEmptyWindow(self):
+    window_starts, durations, counts, _, latency_percentiles = (
+        object_storage_service_benchmark._ComputeTimeline(
+            [np.array([100.0, 103.0])], [np.array([0.5, 0.5])],
+            [np.array([1, 1])], 1.0))
+
+    self.assertEqual(window_starts.tolist(), [100.0, 101.0, 102.0, 103.0])
+    self.assertEqual(durations.tolist(), [1.0, 1.0, 1.0, 0.5])
+    self.assertEqual(counts.tolist(), [1, 0, 0, 1])
+    self.assertTrue(np.isnan(latency_percentiles[99][1]))
+
+  def testAppendTimelineSamples(self):
+    results = []
+
+    object_storage_service_benchmark._AppendTimelineSamples(
+        results, self.start_times, self.latencies, self.sizes, 'upload', 2.0,
+        {'num_streams': 2})
+
+    self.assertEqual(len(results), 10)
+    throughput = [s for s in results
+                  if s.metric == 'Multi-stream upload timeline throughput']
+    self.assertEqual([s.value for s in throughput], [2000.0, 1600.0])
+    self.assertEqual([s.timestamp for s in throughput], [100.0, 102.0])
+    self.assertEqual(throughput[1].metadata,
+                     {'num_streams': 2, 'timeline_interval': 2.0,
+                      'timeline_window': 1, 'timeline_window_start_sec': 2.0})
+
+
+class TestLocalStorageService(pkb_common_test_case.PkbCommonTestCase):
+
+  def testDiskBackend(self):
+    FLAGS.object_storage_local_backend = local_object_storage.DISK_BACKEND
+    FLAGS.object_storage_local_latency = 0.01
+    FLAGS.object_storage_local_bandwidth_mbps = 100.0
+    service = local_object_storage.LocalStorageService()
+    vms = [mock.MagicMock(), mock.MagicMock()]
+    for vm in vms:
+      service.PrepareVM(vm)
+
+    service.MakeBucket('bucket')
+
+    for vm in vms:
+      vm.RemoteCommand.assert_called_with(
+          'mkdir -p /tmp/pkb/local-storage/bucket')
+    self.assertEqual(service.APIScriptArgs(),
+                     ['--local_storage_dir=/tmp/pkb/local-storage',
+                      '--local_storage_latency=0.01',
+                      '--local_storage_bandwidth_mbps=100.0'])
+
+  def testCommandBuilder(self):
+    service = local_object_storage.LocalStorageService()
+    builder = object_storage_service_benchmark.APIScriptCommandBuilder(
+        'script.py', 'LOCAL', service)
+
+    command = builder.BuildCommand([])
+
+    self.assertIn('--storage_provider=LOCAL', command)
+    self.assertIn('--local_storage_dir=/dev/shm/pkb-local-storage', command)
+
+
 if __name__ == '__main__':
   unittest.main()
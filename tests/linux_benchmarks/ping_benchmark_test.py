@@ -20,10 +20,25 @@ import mock
 from perfkitbenchmarker import benchmark_spec
 from perfkitbenchmarker import flags
 from perfkitbenchmarker.linux_benchmarks import ping_benchmark
+from tests import pkb_common_test_case
 
+FLAGS = flags.FLAGS
 flags.FLAGS.mark_as_parsed()
 
 
+def _PingOutput(rtts):
+  """Returns ping -D output with one reply every 0.5 seconds."""
+  lines = ['PING 10.0.0.3 (10.0.0.3) 56(84) bytes of data.']
+  for i, rtt in enumerate(rtts):
+    lines.append('[%.6f] 64 bytes from 10.0.0.3: icmp_seq=%d ttl=64 '
+                 'time=%s ms' % (1539871872 + i * 0.5, i + 1, rtt))
+  lines += ['', '--- 10.0.0.3 ping statistics ---',
+            '%d packets transmitted, %d received, 0%% packet loss, time 9000ms'
+            % (len(rtts), len(rtts)),
+            'rtt min/avg/max/mdev = 0.100/0.550/1.000/0.287 ms']
+  return '\n'.join(lines)
+
+
 class TestGenerateJobFileString(unittest.TestCase):
 
   def testRunCountTest(self):
@@ -44,5 +59,69 @@ class TestGenerateJobFileString(unittest.TestCase):
     self.assertEquals(vm_spec.vms[1].RemoteCommand.call_count, 1)
     self.assertEquals(len(samples), 8)
 
+
+class PingHistogramTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(PingHistogramTestCase, self).setUp()
+    FLAGS.ping_histogram = True
+    FLAGS.ping_window_sec = 5
+    FLAGS.ping_count = 20
+    FLAGS.ping_interval = 0.01
+
+  def testParseRoundTripTimes(self):
+    timestamps, rtts = ping_benchmark.ParseRoundTripTimes(
+        _PingOutput([0.28, 12, 0.3]))
+    self.assertEqual(rtts.tolist(), [0.28, 12, 0.3])
+    self.assertEqual(timestamps.tolist(),
+                     [1539871872, 1539871872.5, 1539871873])
+
+  def testRunHistogram(self):
+    vm_spec = mock.MagicMock(spec=benchmark_spec.BenchmarkSpec)
+    vm_spec.vms = [mock.MagicMock(), mock.MagicMock()]
+    # Ten replies in each 5 second window, alternating in the first window.
+    rtts = [0.1, 0.3] * 5 + [1.0] * 10
+    for vm in vm_spec.vms:
+      vm.RemoteCommand.return_value = (_PingOutput(rtts), '')
+
+    samples = ping_benchmark.Run(vm_spec)
+
+    vm_spec.vms[0].RemoteCommand.assert_called_once_with(
+        'sudo ping -c 20 -i 0.01 -D %s' % vm_spec.vms[1].internal_ip,
+        should_log=False)
+    values = [(s.metric, round(s.value, 4)) for s in samples[:len(samples) / 2]]
+    self.assertEqual(values[4:], [
+        ('Latency p50', 0.65),
+        ('Latency p90', 1.0),
+        ('Latency p99', 1.0),
+        ('Latency p99.9', 1.0),
+        ('Latency p99.99', 1.0),
+        ('Jitter', 0.1316),
+        ('Windowed Latency p99', 0.3),
+        ('Windowed Jitter', 0.2),
+        ('Windowed Latency p99', 1.0),
+        ('Windowed Jitter', 0.0)])
+    self.assertEqual(samples[11].metadata['window_start_sec'], 0)
+    self.assertEqual(samples[13].metadata['window_start_sec'], 5)
+    self.assertEqual(samples[13].metadata['window_count'], 10)
+
+  def testRunAllPairs(self):
+    FLAGS.ping_all_pairs = True
+    vm_spec = mock.MagicMock(spec=benchmark_spec.BenchmarkSpec)
+    vm_spec.vms = [mock.MagicMock() for _ in range(3)]
+    for i, vm in enumerate(vm_spec.vms):
+      vm.name = 'vm%d' % i
+      vm.RemoteCommand.return_value = (_PingOutput([0.1, 0.2]), '')
+
+    ping_benchmark.Prepare(vm_spec)
+    samples = ping_benchmark.Run(vm_spec)
+
+    for vm in vm_spec.vms:
+      self.assertEqual(vm.RemoteCommand.call_count, 2)
+    self.assertEqual(
+        len(set((s.metadata['sending_vm'], s.metadata['receiving_vm'])
+                for s in samples)), 6)
+
+
 if __name__ == '__main__':
   unittest.main()
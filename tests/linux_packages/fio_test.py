@@ -13,8 +13,11 @@
 # limitations under the License.
 """Tests for perfkitbenchmarker.packages.fio."""
 
+import collections
 import json
 import os
+import shutil
+import tempfile
 import unittest
 
 import mock
@@ -480,6 +483,206 @@ class FioTestCase(unittest.TestCase, test_util.SamplesTestMixin):
         _ReadFileToString(os.path.join(hist_dir, 'expected_write.json')))
     self.assertEqual(expected_write_hist, actual_write_hist)
 
+  def testComputeHistogramBinVals(self):
+    hist_dir = os.path.join(self.data_dir, 'hist')
+    expected_bin_vals = [float(f) for f in _ReadFileToString(
+        os.path.join(hist_dir, 'bin_vals')).split()]
+    bin_vals = fio.ComputeHistogramBinVals(os.path.join(
+        hist_dir, 'pkb_fio_avg_1506559526.49_clat_hist.1.log'))
+    self.assertEqual(expected_bin_vals, bin_vals)
+
+  def testComputeHistogramBinValsCoarse(self):
+    temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    coarse_log = os.path.join(temp_dir, 'coarse.log')
+    with open(coarse_log, 'w') as f:
+      f.write('1000, 0, 4096, ' + ', '.join(['0'] * 608) + '\n')
+    bin_vals = fio.ComputeHistogramBinVals(coarse_log)
+    self.assertEqual(608, len(bin_vals))
+    self.assertEqual([1.0, 3.0], bin_vals[:2])
+    with open(coarse_log, 'w') as f:
+      f.write('1000, 0, 4096, 0, 0, 0\n')
+    self.assertEqual([], fio.ComputeHistogramBinVals(coarse_log))
+
+  def testLoadHistogramLogIgnoresTruncatedLine(self):
+    temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    hist_log = os.path.join(temp_dir, 'hist.log')
+    with open(hist_log, 'w') as f:
+      f.write('1000, 0, 4096, 1, 20\n2001, 1, 4096, 3, 4\n3000, 1, 40')
+    self.assertEqual([[1000, 0, 4096, 1, 20], [2001, 1, 4096, 3, 4]],
+                     fio._LoadHistogramLog(hist_log).tolist())
+
+  def testParseHistogramWindows(self):
+    hist_dir = os.path.join(self.data_dir, 'hist')
+    job_file = _ReadFileToString(
+        os.path.join(hist_dir, 'pkb-7fb0c9d8-0_fio.job'))
+    fio_json_result = json.loads(_ReadFileToString(
+        os.path.join(hist_dir, 'pkb-7fb0c9d8-0_fio.json')))
+    single_bin_vals = [float(f) for f in _ReadFileToString(
+        os.path.join(hist_dir, 'bin_vals')).split()]
+
+    def OpenTestFile(filename):
+      return open(os.path.join(hist_dir, os.path.basename(filename)))
+
+    with mock.patch(fio.__name__ + '.open',
+                    new=mock.MagicMock(side_effect=OpenTestFile),
+                    create=True):
+      results = fio.ParseResults(job_file, fio_json_result, None,
+                                 'pkb_fio_avg_1506559526.49',
+                                 [single_bin_vals] * 4, hist_window_sec=5)
+
+    read_metric = ('rand_16k_read_100%-io-depth-1-num-jobs-2:16384:read:'
+                   'windowed_latency:p99')
+    read_samples = [r for r in results if r.metric == read_metric]
+    self.assertEqual([0, 5, 10], [r.metadata['window_start_sec']
+                                  for r in read_samples])
+    self.assertEqual([1184.0, 1744.0, 1936.0],
+                     [r.value for r in read_samples])
+    self.assertEqual('usec', read_samples[0].unit)
+    # The windows partition the whole histogram.
+    expected_read_hist = json.loads(
+        _ReadFileToString(os.path.join(hist_dir, 'expected_read.json')))
+    self.assertEqual(sum(expected_read_hist.values()),
+                     sum(r.metadata['window_count'] for r in read_samples))
+
+
+def _StatusReport(job_name, runtime_ms, total_ios, clat_mean,
+                  block_size_kb=4):
+  """Returns a fio JSON report with the cumulative progress of a read job."""
+  read = {'runtime': runtime_ms, 'total_ios': total_ios,
+          'iops': total_ios * 1000.0 / runtime_ms,
+          'bw': total_ios * block_size_kb * 1000.0 / runtime_ms,
+          'clat': {'mean': clat_mean}}
+  return {'jobs': [{'jobname': job_name, 'read': read,
+                    'write': {'runtime': 0}, 'trim': {'runtime': 0}}]}
+
+
+def _Intervals(iops_list, interval=10):
+  return [{'time': interval * (i + 1), 'iops': iops, 'bw': iops * 4.0,
+           'lat': 1e6 / iops} for i, iops in enumerate(iops_list)]
+
+
+class FioSteadyStateTestCase(unittest.TestCase):
+
+  def testParseStatusOutput(self):
+    first = json.dumps(_StatusReport('job', 1000, 100, 10))
+    second = json.dumps(_StatusReport('job', 2000, 250, 10))
+    output = (first + '\n' + second + '\nfio: terminating on signal 2\n' +
+              first[:20])
+    reports, unparsed = fio.ParseStatusOutput(output)
+    self.assertEqual([100, 250],
+                     [r['jobs'][0]['read']['total_ios'] for r in reports])
+    self.assertEqual(first[:20], unparsed)
+    reports, unparsed = fio.ParseStatusOutput(unparsed + first[20:])
+    self.assertEqual(1, len(reports))
+    self.assertEqual('', unparsed)
+
+  def testComputeIntervalStats(self):
+    reports = [_StatusReport('job', 1000, 100, 10),
+               _StatusReport('job', 1000, 100, 10),
+               _StatusReport('job', 3000, 500, 20),
+               _StatusReport('job', 4000, 500, 20),
+               _StatusReport('other', 5000, 900, 20)]
+    intervals = fio.ComputeIntervalStats(reports, 'job')
+    self.assertEqual([1.0, 3.0], [i['time'] for i in intervals])
+    self.assertAlmostEqual(100.0, intervals[0]['iops'])
+    self.assertAlmostEqual(200.0, intervals[1]['iops'])
+    self.assertAlmostEqual(800.0, intervals[1]['bw'])
+    # (20 * 500 - 10 * 100) / 400
+    self.assertAlmostEqual(22.5, intervals[1]['lat'])
+
+  def testFindSteadyState(self):
+    intervals = _Intervals([100, 200, 400, 1000, 1010, 990, 1000, 1005])
+    self.assertEqual(5, fio.FindSteadyState(intervals, 3, 0.2, 0.1))
+    self.assertIsNone(fio.FindSteadyState(intervals, 6, 0.2, 0.1))
+    self.assertEqual(7, fio.FindSteadyState(intervals, 3, 0.2, 0.1,
+                                            ramp_time=60))
+
+  def testFindSteadyStateSlope(self):
+    intervals = _Intervals([1000, 1040, 1080, 1120, 1160])
+    self.assertIsNone(fio.FindSteadyState(intervals, 5, 0.2, 0.1))
+    self.assertEqual(4, fio.FindSteadyState(intervals, 5, 0.2, 0.2))
+
+  def testBuildSteadyStateSamples(self):
+    intervals = _Intervals([3000, 3000, 3000, 1000, 1000, 1000, 1000])
+    samples = fio.BuildSteadyStateSamples('job', intervals, 6, 3, 0.5,
+                                          {'fio_job': 'job'})
+    self.assertEqual(
+        ['job:time_to_steady_state', 'job:burst_credit_exhaustion'],
+        [s.metric for s in samples])
+    self.assertEqual([40, 30], [s.value for s in samples])
+    self.assertEqual(1000, samples[0].metadata['steady_state_iops'])
+    self.assertTrue(samples[0].metadata['steady_state_reached'])
+    self.assertEqual(3000, samples[1].metadata['burst_iops'])
+
+  def testBuildSteadyStateSamplesNotSteady(self):
+    samples = fio.BuildSteadyStateSamples('job', _Intervals([1, 2, 3]), None,
+                                          3, 0.5)
+    self.assertEqual(1, len(samples))
+    self.assertEqual(30, samples[0].value)
+    self.assertFalse(samples[0].metadata['steady_state_reached'])
+
+
+def _ClientStats(hostname, job_name, iops, bins, clat_mean=100.0):
+  """Returns the json+ statistics of a fio server running a read job."""
+  read = {'io_bytes': iops * 4, 'iops': iops, 'bw': iops * 4, 'runtime': 1000,
+          'bw_min': 0, 'bw_max': 0, 'bw_dev': 0, 'bw_agg': 0, 'bw_mean': 0,
+          'clat': {'min': 0, 'max': 0, 'mean': clat_mean, 'stddev': 0,
+                   'percentile': collections.defaultdict(int)}}
+  if bins is not None:
+    read['clat']['bins'] = bins
+  idle = {'io_bytes': 0}
+  return {'jobname': job_name, 'hostname': hostname, 'read': read,
+          'write': idle, 'trim': idle}
+
+
+class FioClientServerTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self.job_file = '[global]\nbs=4k\n[job]\nrw=randread\n'
+    self.job_files = collections.OrderedDict(
+        [('10.0.0.1', self.job_file), ('10.0.0.2', self.job_file)])
+
+  def testParseClientServerResults(self):
+    # Older fio keys bins by index, newer fio by latency.
+    index_bins = {'FIO_IO_U_PLAT_BITS': 6, 'FIO_IO_U_PLAT_VAL': 64,
+                  'FIO_IO_U_PLAT_NR': 1216, '100': 300, '200': 100}
+    value_bins = {'100': 100, '400': 500}
+    result = {'client_stats': [
+        _ClientStats('10.0.0.1', 'job', 400, index_bins),
+        _ClientStats('10.0.0.2', 'job', 600, value_bins),
+        _ClientStats(None, 'All clients', 1000, None)]}
+    samples = fio.ParseClientServerResults(self.job_files, result)
+
+    client_iops = [(s.metadata['fio_client'], s.value) for s in samples
+                   if s.metric == 'job:read:iops' and
+                   'fio_client' in s.metadata]
+    self.assertEqual([('10.0.0.1', 400), ('10.0.0.2', 600)], client_iops)
+    aggregates = {s.metric: s for s in samples
+                  if 'fio_client' not in s.metadata}
+    self.assertEqual(1000, aggregates['job:read:iops'].value)
+    self.assertEqual(4000, aggregates['job:read:bandwidth'].value)
+    self.assertEqual(2, aggregates['job:read:iops'].metadata['fio_clients'])
+    # Index 100 is 100.5 usec and index 200 is 292 usec.
+    self.assertEqual(100, aggregates['job:read:latency:min'].value)
+    self.assertEqual(100.5, aggregates['job:read:latency:p30'].value)
+    self.assertEqual(292, aggregates['job:read:latency:p40'].value)
+    self.assertEqual(400, aggregates['job:read:latency:p50'].value)
+    self.assertEqual(
+        {'100.0': 100, '100.5': 300, '292.0': 100, '400.0': 500},
+        json.loads(aggregates['job:read:latency'].metadata['histogram']))
+
+  def testParseClientServerResultsWithoutBins(self):
+    result = {'client_stats': [
+        _ClientStats('10.0.0.1', 'job', 100, None, clat_mean=100.0),
+        _ClientStats('10.0.0.2', 'job', 300, None, clat_mean=200.0)]}
+    samples = fio.ParseClientServerResults(self.job_files, result)
+    aggregates = {s.metric: s for s in samples
+                  if 'fio_client' not in s.metadata}
+    self.assertEqual(175, aggregates['job:read:latency'].value)
+    self.assertNotIn('job:read:latency:p50', aggregates)
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -15,10 +15,19 @@
 
 import copy
 import os
+import shutil
+import tempfile
 import unittest
 
+import mock
 
+from perfkitbenchmarker import errors
+from perfkitbenchmarker import flags
+from perfkitbenchmarker import hdr_histogram
 from perfkitbenchmarker.linux_packages import ycsb
+from tests import pkb_common_test_case
+
+FLAGS = flags.FLAGS
 
 
 class SimpleResultParserTestCase(unittest.TestCase):
@@ -85,6 +94,63 @@ class SimpleResultParserTestCase(unittest.TestCase):
         self.results['groups']['overall'])
 
 
+class ParseResultLinesTestCase(unittest.TestCase):
+
+  def testMatchesParseResults(self):
+    path = os.path.join(os.path.dirname(__file__), '..', 'data',
+                        'ycsb-test-run-2.dat')
+    with open(path) as fp:
+      expected = ycsb.ParseResults(fp.read(), 'histogram')
+    with open(path) as fp:
+      self.assertEqual(expected, ycsb.ParseResultLines(fp, 'histogram'))
+
+  def testRunCommandStreamsOutputFiles(self):
+    temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    outputs = {'.stderr': 'YCSB Client 0.14.0\nCommand line: -db x -load\n',
+               '.stdout': '[OVERALL], RunTime(ms), 80\n'
+                          '[INSERT], Operations, 10\n'}
+
+    def PullFile(local_dir, remote_path):
+      suffix = os.path.splitext(remote_path)[1]
+      with open(os.path.join(local_dir, os.path.basename(remote_path)),
+                'w') as fp:
+        fp.write(outputs[suffix])
+
+    vm = mock.Mock()
+    vm.PullFile.side_effect = PullFile
+    executor = ycsb.YCSBExecutor.__new__(ycsb.YCSBExecutor)
+    executor.measurement_type = 'histogram'
+    with mock.patch.object(ycsb.vm_util, 'GetTempDir', return_value=temp_dir):
+      result = executor._RunCommandAndParseResults(vm, 'bin/ycsb load')
+
+    command = vm.RobustRemoteCommand.call_args[0][0]
+    self.assertRegexpMatches(
+        command, r'^bin/ycsb load > (\S+)\.stdout 2> \1\.stderr$')
+    self.assertEqual('Command line: -db x -load', result['command_line'])
+    self.assertEqual({'Operations': 10},
+                     result['groups']['insert']['statistics'])
+
+  def testRunCommandFailureIncludesOutput(self):
+    vm = mock.Mock()
+    vm.RobustRemoteCommand.side_effect = (
+        errors.VirtualMachine.RemoteCommandError('exit status 1'))
+    vm.RemoteCommand.return_value = (
+        '==> ycsb.stderr <==\nError inserting, not retrying any more.\n', '')
+    executor = ycsb.YCSBExecutor.__new__(ycsb.YCSBExecutor)
+    executor.measurement_type = 'histogram'
+    with self.assertRaises(errors.VirtualMachine.RemoteCommandError) as cm:
+      executor._RunCommandAndParseResults(vm, 'bin/ycsb load')
+
+    self.assertIn('exit status 1', str(cm.exception))
+    self.assertIn('Error inserting, not retrying any more.', str(cm.exception))
+    tail_command = vm.RemoteCommand.call_args[0][0]
+    self.assertRegexpMatches(
+        tail_command, r'^tail -n 100 (\S+)\.stdout \1\.stderr; '
+        r'rm -f \1\.stdout \1\.stderr$')
+    vm.PullFile.assert_not_called()
+
+
 class DetailedResultParserTestCase(unittest.TestCase):
 
   def setUp(self):
@@ -234,6 +300,33 @@ class CombineResultsTestCase(unittest.TestCase):
     self.assertEqual(r, combined)
 
 
+  def _TimeseriesResult(self, series):
+    return {'client': '', 'command_line': '',
+            'groups': {'read': {'group': 'read', 'statistics': {},
+                                'timeseries': series}}}
+
+  def testCombineHistograms(self):
+    results = []
+    for histogram in ([(0, 5), (3, 1)], [(1, 2), (0, 1)], [(3, 4)]):
+      results.append({'client': '', 'command_line': '',
+                      'groups': {'read': {'group': 'read', 'statistics': {},
+                                          'histogram': histogram}}})
+    combined = ycsb._CombineResults(results, 'histogram', {})
+    self.assertEqual([(0, 6), (1, 2), (3, 5)],
+                     combined['groups']['read']['histogram'])
+    self.assertEqual([(1, 2), (0, 1)],
+                     results[1]['groups']['read']['histogram'])
+
+  def testCombineTimeseries(self):
+    results = [self._TimeseriesResult([(0, 1.0), (500, 2.0), (1000, 1.0)]),
+               self._TimeseriesResult([(0, 2.0), (500, 2.0)]),
+               self._TimeseriesResult([(500, 2.0), (0, 4.0)])]
+    combined = ycsb._CombineResults(results, 'timeseries', {})
+    # The combined latency is the harmonic mean of the individual latencies.
+    self.assertEqual([(0, 3 / 1.75), (500, 2.0)],
+                     combined['groups']['read']['timeseries'])
+
+
 class HdrLogsParserTestCase(unittest.TestCase):
 
   def testParseHdrLogFile(self):
@@ -255,6 +348,205 @@ class HdrLogsParserTestCase(unittest.TestCase):
                 (20.0, 0.949, 50396), (30.0, 1.033, 49759)]
     self.assertEqual(actual, expected)
 
+  def testParseHdrHistogram(self):
+    histogram = hdr_histogram.HdrHistogram()
+    histogram.RecordValues([314, 853, 949, 1033], [2, 8, 5, 5])
+    actual = ycsb.ParseHdrHistogram(histogram)
+    expected = [(0.0, 0.314, 2), (20.0, 0.853, 8),
+                (55.0, 0.949, 5), (77.5, 1.033, 5)]
+    self.assertEqual(actual, expected)
+
+  def testCombineHdrHistogramLogFiles(self):
+    read = hdr_histogram.HdrHistogram()
+    read.RecordValues([314, 853], [2, 3])
+    update = hdr_histogram.HdrHistogram()
+    update.RecordValues([949])
+    vms = [mock.Mock(), mock.Mock()]
+    for vm in vms:
+      vm.RemoteCommand.side_effect = [
+          ('Tag=READ,0.1,1.0,0.9,%s\n' % read.Encode(), ''),
+          ('0.1,1.0,0.9,%s\n' % update.Encode(), '')]
+    executor = ycsb.YCSBExecutor.__new__(ycsb.YCSBExecutor)
+
+    combined = executor.CombineHdrHistogramLogFiles('/hdr/0', vms)
+
+    for vm in vms:
+      vm.RemoteCommand.assert_has_calls([mock.call('tail -1 /hdr/0READ.hdr'),
+                                         mock.call('tail -1 /hdr/0UPDATE.hdr')])
+    self.assertEqual(sorted(combined), ['read', 'update'])
+    values, counts = combined['read'].GetValueCounts()
+    self.assertEqual(values.tolist(), [314, 853])
+    self.assertEqual(counts.tolist(), [4, 6])
+    self.assertEqual(combined['update'].total_count, 2)
+
+
+class TargetSearchTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(TargetSearchTestCase, self).setUp()
+    FLAGS.ycsb_target_search_slo_ms = 10
+    FLAGS.ycsb_threads_per_client = ['8']
+    self.targets = []
+
+  def _RunWorkload(self, vms, parameters, workload_meta):
+    """Simulates a database that sustains 3500 ops/sec at 1 ms latency."""
+    target = parameters['target']
+    self.targets.append(target)
+    latency = 1 if target <= 3500 else 50
+    combined = {'groups': {
+        'overall': {'statistics': {'Throughput(ops/sec)': min(target, 3500)},
+                    'histogram': []},
+        'read': {'statistics': {}, 'histogram': [(0, 50), (latency, 50)]}}}
+    return [], combined
+
+  def _RunTargetSearch(self, vms):
+    executor = ycsb.YCSBExecutor.__new__(ycsb.YCSBExecutor)
+    executor._PrepareWorkload = mock.Mock(return_value=({}, {}))
+    executor._RunWorkload = mock.Mock(side_effect=self._RunWorkload)
+    return executor.RunTargetSearch(vms, ['workloada'])
+
+  def testSearchFindsMaxSustainableThroughput(self):
+    samples = self._RunTargetSearch([mock.Mock()])
+
+    self.assertEqual([1000, 2000, 4000, 3000, 3500, 3750, 3625], self.targets)
+    curve = [(s.metadata['target'], s.value) for s in samples
+             if s.metric == 'Target search latency']
+    self.assertEqual([(1000, 1), (2000, 1), (4000, 50), (3000, 1), (3500, 1),
+                      (3750, 50), (3625, 50)], curve)
+    max_sample = samples[-1]
+    self.assertEqual('Max sustainable throughput', max_sample.metric)
+    self.assertEqual(3500, max_sample.value)
+    self.assertEqual(3500, max_sample.metadata['target_per_client_vm'])
+    self.assertEqual(7, max_sample.metadata['search_runs'])
+
+  def testTargetIsPerClientVm(self):
+    FLAGS.ycsb_target_search_max_runs = 2
+    self._RunTargetSearch([mock.Mock(), mock.Mock()])
+    self.assertEqual([2000, 4000], self.targets)
+
+  def testNoTargetMeetsSlo(self):
+    FLAGS.ycsb_target_search_slo_ms = 0.5
+    samples = self._RunTargetSearch([mock.Mock()])
+    self.assertEqual([1000, 500, 250, 125, 62, 31, 15, 7, 3, 1], self.targets)
+    self.assertEqual(0, samples[-1].value)
+
+  def testNextSearchTarget(self):
+    self.assertEqual(200, ycsb._NextSearchTarget(100, None))
+    self.assertEqual(50, ycsb._NextSearchTarget(None, 100))
+    self.assertEqual(150, ycsb._NextSearchTarget(100, 200))
+    self.assertIsNone(ycsb._NextSearchTarget(100, 101))
+    self.assertIsNone(ycsb._NextSearchTarget(None, 1))
+
+  def testTimeseriesNotSupported(self):
+    FLAGS.ycsb_measurement_type = ycsb.TIMESERIES
+    FLAGS.ycsb_workload_files = []
+    with self.assertRaises(errors.Config.InvalidValue):
+      ycsb.CheckPrerequisites()
+
+
+class ShardedLoadTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(ShardedLoadTestCase, self).setUp()
+    self.temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.temp_dir)
+    patcher = mock.patch.object(ycsb.vm_util, 'GetTempDir',
+                                return_value=self.temp_dir)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    self.workload_file = os.path.join(os.path.dirname(__file__), '..', 'data',
+                                      'ycsb_workloada')
+    self.loads = []
+    self.vms = [mock.Mock(), mock.Mock()]
+    self.executor = ycsb.YCSBExecutor.__new__(ycsb.YCSBExecutor)
+    self.executor.perclientparam = None
+    self.executor.measurement_type = ycsb.HISTOGRAM
+    self.executor._Load = mock.Mock(side_effect=self._Load)
+
+  def _Load(self, vm, insertstart, insertcount, **kwargs):
+    self.loads.append((self.vms.index(vm), insertstart, insertcount))
+    return {'client': '', 'command_line': '-load', 'groups': {
+        'overall': {'group': 'overall', 'histogram': [],
+                    'statistics': {'RunTime(ms)': 10,
+                                   'Throughput(ops/sec)': 100.0}},
+        'insert': {'group': 'insert', 'histogram': [(0, insertcount)],
+                   'statistics': {'Operations': insertcount}}}}
+
+  def testOneShardPerVmByDefault(self):
+    samples = self.executor._LoadThreaded(self.vms, self.workload_file)
+    self.assertItemsEqual([(0, 0, 500), (1, 500, 500)], self.loads)
+    self.assertNotIn('Load shard throughput', [s.metric for s in samples])
+    throughput = [s for s in samples if s.metric == 'overall Throughput'][0]
+    self.assertEqual(200, throughput.value)
+
+  def testOneShardPerProcessByDefault(self):
+    FLAGS.ycsb_load_processes_per_vm = 2
+    samples = self.executor._LoadThreaded(self.vms, self.workload_file)
+    self.assertEqual([(0, 250), (250, 250), (500, 250), (750, 250)],
+                     sorted(load[1:] for load in self.loads))
+    self.assertEqual([0, 0, 1, 1], sorted(load[0] for load in self.loads))
+    self.assertEqual(2 * 2 * 32, samples[0].metadata['clients'])
+    self.assertEqual(2 * 32, samples[0].metadata['threads_per_client_vm'])
+
+  def testFewerShardsThanProcesses(self):
+    FLAGS.ycsb_load_shards = 3
+    FLAGS.ycsb_load_processes_per_vm = 4
+    samples = self.executor._LoadThreaded(self.vms, self.workload_file)
+    self.assertEqual(3, len(self.loads))
+    self.assertEqual(3 * 32, samples[0].metadata['clients'])
+    self.assertEqual(2 * 32, samples[0].metadata['threads_per_client_vm'])
+
+  def testShardsAreScheduledAcrossProcesses(self):
+    FLAGS.ycsb_load_shards = 10
+    FLAGS.ycsb_load_processes_per_vm = 2
+    samples = self.executor._LoadThreaded(self.vms, self.workload_file)
+    self.assertEqual([(start, 100) for start in range(0, 1000, 100)],
+                     sorted(load[1:] for load in self.loads))
+    shard_samples = [s for s in samples if s.metric == 'Load shard throughput']
+    self.assertItemsEqual(range(10),
+                          [s.metadata['shard'] for s in shard_samples])
+    self.assertEqual(2 * 2 * 32, samples[0].metadata['clients'])
+    self.assertFalse(os.path.exists(
+        os.path.join(self.temp_dir, ycsb._LOAD_CHECKPOINT_FILE)))
+
+  def testResumesFromCheckpoint(self):
+    FLAGS.ycsb_load_shards = 10
+    checkpoint_path = os.path.join(self.temp_dir, ycsb._LOAD_CHECKPOINT_FILE)
+    key = {'workload_name': 'ycsb_workloada', 'recordcount': 1000,
+           'shards': 10}
+    for shard in range(7):
+      ycsb._AppendLoadCheckpoint(checkpoint_path, dict(key, shard=shard))
+    ycsb._AppendLoadCheckpoint(checkpoint_path,
+                               dict(key, shards=20, shard=8))
+    with open(checkpoint_path, 'a') as fp:
+      fp.write('{"shard": 9, "work')
+
+    samples = self.executor._LoadThreaded(self.vms, self.workload_file)
+
+    self.assertEqual([700, 800, 900],
+                     sorted(load[1] for load in self.loads))
+    self.assertEqual(7, samples[0].metadata['resumed_shards'])
+
+  def testLoadFailureKeepsCheckpoint(self):
+    FLAGS.ycsb_load_shards = 4
+    FLAGS.ycsb_load_processes_per_vm = 1
+    vms = [mock.Mock()]
+    self.vms = vms
+    loads = self.executor._Load.side_effect
+
+    def FailOnShard(vm, insertstart, insertcount, **kwargs):
+      if insertstart == 500:
+        raise errors.VirtualMachine.RemoteCommandError('load failed')
+      return loads(vm, insertstart, insertcount, **kwargs)
+    self.executor._Load.side_effect = FailOnShard
+
+    with self.assertRaises(errors.VmUtil.ThreadException):
+      self.executor._LoadThreaded(vms, self.workload_file)
+    checkpoint_path = os.path.join(self.temp_dir, ycsb._LOAD_CHECKPOINT_FILE)
+    self.assertEqual(
+        {0, 1},
+        ycsb._ReadLoadCheckpoint(checkpoint_path, {'shards': 4}))
+
 
 if __name__ == '__main__':
   unittest.main()
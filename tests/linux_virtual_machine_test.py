@@ -18,6 +18,7 @@ import unittest
 
 import mock
 
+from perfkitbenchmarker import errors
 from perfkitbenchmarker import flags
 from perfkitbenchmarker import linux_virtual_machine
 from perfkitbenchmarker import virtual_machine
@@ -187,5 +188,170 @@ class LogDmesgTestCase(pkb_common_test_case.PkbCommonTestCase):
     remote_command.assert_called_once_with('hostname && dmesg', should_log=True)
 
 
+def _CreateSshVm():
+  vm = LinuxVMResource(None)
+  vm.name = 'pkb-vm0'
+  vm.user_name = 'perfkit'
+  vm.ip_address = '1.2.3.4'
+  vm.ssh_port = 22
+  vm.ssh_private_key = 'key'
+  vm._ssh_stats_lock = linux_virtual_machine.threading.Lock()
+  vm.ssh_connections_opened = 0
+  vm.ssh_connections_reused = 0
+  vm.ssh_first_command_time = 0.0
+  return vm
+
+
+class SshConnectionReuseTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(SshConnectionReuseTestCase, self).setUp()
+    FLAGS.ssh_reuse_connections = True
+    self.vm = _CreateSshVm()
+    patcher = mock.patch.object(linux_virtual_machine.os.path, 'exists')
+    self.path_exists = patcher.start()
+    self.addCleanup(patcher.stop)
+    patcher = mock.patch.object(linux_virtual_machine.vm_util, 'IssueCommand',
+                                return_value=('', '', 0))
+    self.issue_command = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def testControlPathIsPassedToSsh(self):
+    self.path_exists.return_value = True
+    self.vm.RemoteHostCommand('hostname')
+    ssh_cmd = self.issue_command.call_args[0][0]
+    self.assertIn('ControlPath="%s"' % self.vm.ssh_control_path, ssh_cmd)
+
+  def testConnectionOpenedThenReused(self):
+    # The master socket does not exist before the first command, but does
+    # afterwards.
+    self.path_exists.side_effect = [False, True, True, True]
+    self.vm.RemoteHostCommand('hostname')
+    self.vm.RemoteCopy('local_file', 'remote_file')
+    self.assertEqual(self.vm.ssh_connections_opened, 1)
+    self.assertEqual(self.vm.ssh_connections_reused, 1)
+    samples = {s.metric: s.value for s in self.vm.GetRemoteConnectionSamples()}
+    self.assertEqual(samples['SSH Connections Opened'], 1)
+    self.assertEqual(samples['SSH Connections Reused'], 1)
+    self.assertIn('SSH First Command Time', samples)
+
+  def testNoSamplesWithoutConnectionReuse(self):
+    FLAGS.ssh_reuse_connections = False
+    self.vm.RemoteHostCommand('hostname')
+    self.path_exists.assert_not_called()
+    self.assertEqual(self.vm.GetRemoteConnectionSamples(), [])
+
+  def testCloseRemoteConnections(self):
+    self.path_exists.return_value = True
+    self.vm.CloseRemoteConnections()
+    exit_cmd = self.issue_command.call_args[0][0]
+    self.assertEqual(exit_cmd[:3], ['ssh', '-O', 'exit'])
+
+  def testCloseRemoteConnectionsWithoutMaster(self):
+    self.path_exists.return_value = False
+    self.vm.CloseRemoteConnections()
+    self.issue_command.assert_not_called()
+
+
+class _PodVm(LinuxVMResource):
+  """A VM that, like a Kubernetes pod, runs commands without SSH."""
+
+  def __init__(self, spec):
+    super(_PodVm, self).__init__(spec)
+    self.copies = []
+
+  def RemoteHostCommandWithReturnCode(self, command, should_log=False,
+                                      retries=None, ignore_failure=False,
+                                      login_shell=False,
+                                      suppress_warning=False, timeout=None):
+    if command == 'false':
+      return '', '', 1
+    return 'kubectl: ' + command, '', 0
+
+  def RemoteHostCopy(self, file_path, remote_path='', copy_to=True):
+    self.copies.append((file_path, remote_path, copy_to))
+
+
+class RemoteHostCommandsTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(RemoteHostCommandsTestCase, self).setUp()
+    FLAGS.ssh_reuse_connections = True
+    self.vm = _CreateSshVm()
+    patcher = mock.patch.object(linux_virtual_machine.os.path, 'exists',
+                                return_value=True)
+    self.path_exists = patcher.start()
+    self.addCleanup(patcher.stop)
+    patcher = mock.patch.object(linux_virtual_machine.vm_util,
+                                'IssueCommands')
+    self.issue_commands = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def testResultsInOrder(self):
+    self.issue_commands.return_value = [('a', '', 0, 0.5), ('b', '', 0, 0.5)]
+    results = linux_virtual_machine.RemoteHostCommands(
+        [(self.vm, 'echo a'), (self.vm, 'echo b')])
+    self.assertEqual(results, [('a', '', 0), ('b', '', 0)])
+    ssh_cmds = self.issue_commands.call_args[0][0]
+    self.assertEqual([cmd[-1] for cmd in ssh_cmds], ['echo a', 'echo b'])
+    self.assertEqual(self.vm.ssh_connections_reused, 2)
+
+  def testOnlySshFailuresAreRetried(self):
+    self.issue_commands.side_effect = [
+        [('', '', 255, 0.5), ('b', '', 0, 0.5), ('', '', 255, 0.5)],
+        [('a', '', 0, 0.5), ('c', '', 0, 0.5)]]
+    results = linux_virtual_machine.RemoteHostCommands(
+        [(self.vm, 'echo a'), (self.vm, 'echo b'), (self.vm, 'echo c')])
+    self.assertEqual(results, [('a', '', 0), ('b', '', 0), ('c', '', 0)])
+    retried_cmds = self.issue_commands.call_args[0][0]
+    self.assertEqual([cmd[-1] for cmd in retried_cmds], ['echo a', 'echo c'])
+
+  def testFirstCommandTimeIsRecorded(self):
+    self.path_exists.side_effect = [False, True]
+    self.issue_commands.return_value = [('a', '', 0, 0.5)]
+    linux_virtual_machine.RemoteHostCommands([(self.vm, 'echo a')])
+    self.assertEqual(self.vm.ssh_connections_opened, 1)
+    self.assertEqual(self.vm.ssh_first_command_time, 0.5)
+
+  def testFailure(self):
+    self.issue_commands.return_value = [('', 'oops', 1, 0.5)]
+    with self.assertRaises(errors.VirtualMachine.RemoteCommandError):
+      linux_virtual_machine.RemoteHostCommands([(self.vm, 'false')])
+    results = linux_virtual_machine.RemoteHostCommands(
+        [(self.vm, 'false')], ignore_failure=True)
+    self.assertEqual(results, [('', 'oops', 1)])
+
+  def testCopies(self):
+    self.issue_commands.return_value = [('', '', 0, 0.5), ('', '', 0, 0.5)]
+    linux_virtual_machine.RemoteHostCopies(
+        [(self.vm, 'file1', 'remote1'), (self.vm, 'file2', 'remote2')])
+    scp_cmds = self.issue_commands.call_args[0][0]
+    self.assertEqual([cmd[-2:] for cmd in scp_cmds],
+                     [['file1', 'perfkit@1.2.3.4:remote1'],
+                      ['file2', 'perfkit@1.2.3.4:remote2']])
+
+  def testVmThatOverridesCommandsIsNotSshed(self):
+    self.issue_commands.return_value = [('a', '', 0, 0.5)]
+    pod = _PodVm(None)
+    results = linux_virtual_machine.RemoteHostCommands(
+        [(self.vm, 'echo a'), (pod, 'echo b')])
+    self.assertEqual(results, [('a', '', 0), ('kubectl: echo b', '', 0)])
+    ssh_cmds = self.issue_commands.call_args[0][0]
+    self.assertEqual([cmd[-1] for cmd in ssh_cmds], ['echo a'])
+
+  def testVmThatOverridesCommandsFails(self):
+    pod = _PodVm(None)
+    with self.assertRaises(errors.VirtualMachine.RemoteCommandError):
+      linux_virtual_machine.RemoteHostCommands([(pod, 'false')])
+    self.issue_commands.assert_not_called()
+
+  def testVmThatOverridesCopiesIsNotScped(self):
+    pod = _PodVm(None)
+    linux_virtual_machine.RemoteHostCopies([(pod, 'file1', 'remote1')],
+                                           copy_to=False)
+    self.assertEqual(pod.copies, [('file1', 'remote1', False)])
+    self.issue_commands.assert_not_called()
+
+
 if __name__ == '__main__':
   unittest.main()
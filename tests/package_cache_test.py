@@ -0,0 +1,110 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for perfkitbenchmarker.package_cache."""
+
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from perfkitbenchmarker import context
+from perfkitbenchmarker import flags
+from perfkitbenchmarker import package_cache
+from tests import pkb_common_test_case
+
+FLAGS = flags.FLAGS
+
+_PATHS = ['/opt/pkb/tool']
+
+
+def _Build(vm):
+  vm.RemoteCommand('make tool')
+
+
+def _CreateVm(name):
+  vm = mock.Mock(OS_TYPE='ubuntu1604')
+  vm.name = name
+
+  def _PullFile(local_path, remote_path):
+    with open(local_path, 'w') as f:
+      f.write(remote_path)
+  vm.PullFile.side_effect = _PullFile
+  return vm
+
+
+class InstallFromCacheTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(InstallFromCacheTestCase, self).setUp()
+    self.cache_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.cache_dir)
+    FLAGS.package_cache = True
+    FLAGS.package_cache_dir = self.cache_dir
+    FLAGS.package_cache_rebuild = False
+    patcher = mock.patch.object(package_cache, '_built_keys', set())
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    self.spec = mock.Mock(package_cache_samples=[])
+    context.SetThreadBenchmarkSpec(self.spec)
+    self.addCleanup(context.SetThreadBenchmarkSpec, None)
+
+  def testDisabled(self):
+    FLAGS.package_cache = False
+    vm = _CreateVm('vm0')
+    package_cache.InstallFromCache(vm, 'tool', _PATHS, _Build)
+    vm.RemoteCommand.assert_called_once_with('make tool')
+    vm.PullFile.assert_not_called()
+    self.assertEqual(self.spec.package_cache_samples, [])
+
+  def testBuildOnceThenRestore(self):
+    vm0, vm1 = _CreateVm('vm0'), _CreateVm('vm1')
+    package_cache.InstallFromCache(vm0, 'tool', _PATHS, _Build)
+    package_cache.InstallFromCache(vm1, 'tool', _PATHS, _Build)
+    self.assertIn(mock.call('make tool'), vm0.RemoteCommand.mock_calls)
+    self.assertTrue(vm0.PullFile.called)
+    self.assertNotIn(mock.call('make tool'), vm1.RemoteCommand.mock_calls)
+    self.assertTrue(vm1.PushFile.called)
+    self.assertRegexpMatches(vm1.RemoteCommand.call_args[0][0],
+                             r'^tar -xzf tool-\w+\.tar\.gz -C /')
+    self.assertEqual(
+        [s.metadata['package_cache_hit']
+         for s in self.spec.package_cache_samples], [False, True])
+
+  def testRebuildOncePerRun(self):
+    package_cache.InstallFromCache(_CreateVm('vm0'), 'tool', _PATHS, _Build)
+    package_cache._built_keys.clear()
+    FLAGS.package_cache_rebuild = True
+    vm1, vm2 = _CreateVm('vm1'), _CreateVm('vm2')
+    package_cache.InstallFromCache(vm1, 'tool', _PATHS, _Build)
+    package_cache.InstallFromCache(vm2, 'tool', _PATHS, _Build)
+    self.assertIn(mock.call('make tool'), vm1.RemoteCommand.mock_calls)
+    self.assertNotIn(mock.call('make tool'), vm2.RemoteCommand.mock_calls)
+
+  def testKeyDependsOnOsTypeAndKeyParts(self):
+    vm = _CreateVm('vm0')
+    key = package_cache.GetCacheKey(vm, 'tool', _Build)
+    self.assertNotEqual(key, package_cache.GetCacheKey(vm, 'tool', _Build,
+                                                       key_parts=[1]))
+    vm.OS_TYPE = 'centos7'
+    self.assertNotEqual(key, package_cache.GetCacheKey(vm, 'tool', _Build))
+
+  def testRelativePath(self):
+    with self.assertRaises(ValueError):
+      package_cache.InstallFromCache(_CreateVm('vm0'), 'tool', ['tool'],
+                                     _Build)
+
+
+if __name__ == '__main__':
+  unittest.main()
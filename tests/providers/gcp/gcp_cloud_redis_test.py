@@ -16,6 +16,8 @@ import unittest
 import mock
 
 from perfkitbenchmarker import flags
+# Defines --redis_region.
+from perfkitbenchmarker.linux_benchmarks import cloud_redis_ycsb_benchmark  # noqa
 from perfkitbenchmarker.providers.gcp import gcp_cloud_redis
 from perfkitbenchmarker.providers.gcp import util
 from tests import pkb_common_test_case
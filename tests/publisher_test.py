@@ -17,8 +17,11 @@ import collections
 import csv
 import io
 import json
+import os
 import re
+import shutil
 import tempfile
+import threading
 import uuid
 import unittest
 
@@ -28,6 +31,7 @@ from perfkitbenchmarker import flags
 from perfkitbenchmarker import pkb  # pylint: disable=unused-import
 from perfkitbenchmarker import publisher
 from perfkitbenchmarker import sample
+from perfkitbenchmarker import version
 from perfkitbenchmarker import vm_util
 from perfkitbenchmarker.providers.gcp import util
 
@@ -108,6 +112,12 @@ class NewlineDelimitedJSONPublisherTestCase(unittest.TestCase):
                           {u'test': u'testb', u'labels': u'|key2:val2|'}],
                          result)
 
+  def testLaterCallsAppend(self):
+    self.instance.PublishSamples([{'test': 'testa', 'metadata': {}}])
+    self.instance.PublishSamples([{'test': 'testb', 'metadata': {}}])
+    result = [json.loads(i)['test'] for i in self.fp]
+    self.assertListEqual([u'testa', u'testb'], result)
+
 
 class BigQueryPublisherTestCase(unittest.TestCase):
 
@@ -240,6 +250,165 @@ class SampleCollectorTestCase(unittest.TestCase):
         },
         self.instance.samples[0])
 
+  def testRunMetadataIsComputedOnce(self):
+    provider = mock.Mock(spec=publisher.MetadataProvider)
+    provider.GetRunMetadata.return_value = {'foo': 'baz', 'zone': 'z'}
+    instance = publisher.SampleCollector(
+        metadata_providers=[provider], publishers=[],
+        publishers_from_flags=False, add_default_publishers=False,
+        streaming=False)
+    samples = [sample.Sample('widgets', i, 'oz', {'foo': 'bar', 'i': i})
+               for i in range(100)]
+    instance.AddSamples(samples, self.benchmark, self.benchmark_spec)
+    provider.GetRunMetadata.assert_called_once_with(self.benchmark_spec)
+    self.assertFalse(provider.AddMetadata.called)
+    self.assertEqual(dict(instance.samples[5]['metadata']),
+                     {'foo': 'baz', 'zone': 'z', 'i': 5})
+
+  def testSampleDependentProvider(self):
+    provider = mock.Mock(spec=publisher.MetadataProvider)
+    provider.GetRunMetadata.return_value = None
+    provider.AddMetadata.side_effect = lambda metadata, _: dict(
+        metadata, double=2 * metadata['i'])
+    instance = publisher.SampleCollector(
+        metadata_providers=[publisher.DefaultMetadataProvider(), provider],
+        publishers=[], publishers_from_flags=False,
+        add_default_publishers=False, streaming=False)
+    instance.AddSamples([sample.Sample('widgets', 1, 'oz', {'i': 3})],
+                        self.benchmark, self.benchmark_spec)
+    self.assertEqual(instance.samples[0]['metadata']['double'], 6)
+
+  def testPublishedMetadataIsDict(self):
+    mock_publisher = mock.Mock()
+    instance = publisher.SampleCollector(
+        publishers=[mock_publisher], publishers_from_flags=False,
+        add_default_publishers=False, streaming=False)
+    instance.AddSamples([self.sample], self.benchmark, self.benchmark_spec)
+    instance.PublishSamples()
+    published, = mock_publisher.PublishSamples.call_args[0][0]
+    self.assertIs(type(published['metadata']), dict)
+    self.assertEqual(published['metadata']['foo'], 'bar')
+    self.assertEqual(published['metadata']['perfkitbenchmarker_version'],
+                     version.VERSION)
+
+
+class StreamingSampleCollectorTestCase(unittest.TestCase):
+
+  def setUp(self):
+    temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    self.temp_dir = temp_dir
+    p = mock.patch.object(publisher.vm_util, 'PrependTempDir',
+                          side_effect=lambda name: os.path.join(temp_dir, name))
+    p.start()
+    self.addCleanup(p.stop)
+    self.incremental_publisher = mock.Mock(SUPPORTS_INCREMENTAL_PUBLISHING=True)
+    self.batch_publisher = mock.Mock(SUPPORTS_INCREMENTAL_PUBLISHING=False)
+    self.instance = publisher.SampleCollector(
+        publishers=[self.incremental_publisher, self.batch_publisher],
+        publishers_from_flags=False, add_default_publishers=False,
+        streaming=True)
+    self.benchmark_spec = mock.MagicMock(uuid='uuid')
+
+  def _PublishedMetrics(self, publisher_mock):
+    return [s['metric'] for call in publisher_mock.PublishSamples.call_args_list
+            for s in call[0][0]]
+
+  def testSamplesAreNotRetained(self):
+    self.instance.AddSamples([sample.Sample('widgets', 1, 'oz')], 'test',
+                             self.benchmark_spec)
+    self.assertEqual([], self.instance.samples)
+    self.instance.PublishSamples()
+
+  def testPublishSamples(self):
+    self.instance.AddSamples([sample.Sample('widgets', 1, 'oz'),
+                              sample.Sample('gadgets', 2, 'oz')], 'test',
+                             self.benchmark_spec)
+    self.instance.PublishSamples()
+    self.instance.AddSamples([sample.Sample('gizmos', 3, 'oz')], 'test',
+                             self.benchmark_spec)
+    self.instance.PublishSamples()
+    self.assertEqual(['widgets', 'gadgets', 'gizmos'],
+                     self._PublishedMetrics(self.incremental_publisher))
+    # Batch publishers only see samples added since the previous publish.
+    self.assertEqual(2, self.batch_publisher.PublishSamples.call_count)
+    self.assertEqual(['widgets', 'gadgets', 'gizmos'],
+                     self._PublishedMetrics(self.batch_publisher))
+
+  def testFlushWaitsForSamplesBeingQueued(self):
+    queueing = threading.Event()
+    proceed = threading.Event()
+    put = publisher._StreamingPublisherWorker.Put
+
+    def SlowPut(worker, sample):
+      queueing.set()
+      proceed.wait()
+      put(worker, sample)
+
+    with mock.patch.object(publisher._StreamingPublisherWorker, 'Put',
+                           SlowPut):
+      adder = threading.Thread(target=self.instance.AddSamples, args=(
+          [sample.Sample('widgets', 1, 'oz')], 'test', self.benchmark_spec))
+      adder.start()
+      queueing.wait()
+      flusher = threading.Thread(target=self.instance.PublishSamples)
+      flusher.start()
+      flusher.join(0.1)
+      flushed_early = not flusher.is_alive()
+      proceed.set()
+      adder.join()
+      flusher.join()
+    self.assertFalse(flushed_early)
+    self.assertEqual(['widgets'],
+                     self._PublishedMetrics(self.incremental_publisher))
+
+  def testCollectorsAppendToSharedJSONFile(self):
+    json_path = os.path.join(self.temp_dir, 'results.json')
+    with open(json_path, 'w') as fp:
+      fp.write('stale\n')
+    for metric in 'widgets', 'gadgets':
+      collector = publisher.SampleCollector(
+          publishers=[publisher.NewlineDelimitedJSONPublisher(json_path)],
+          publishers_from_flags=False, add_default_publishers=False,
+          streaming=True)
+      collector.AddSamples([sample.Sample(metric, 1, 'oz')], 'test',
+                           self.benchmark_spec)
+      collector.PublishSamples()
+    with open(json_path) as fp:
+      self.assertEqual(['widgets', 'gadgets'],
+                       [json.loads(line)['metric'] for line in fp])
+
+  def testCollectorsMergeIntoSharedCSVFile(self):
+    csv_path = os.path.join(self.temp_dir, 'results.csv')
+    with open(csv_path, 'w') as fp:
+      fp.write('stale\n')
+    for metric, metadata in ('widgets', {'a': '1'}), ('gadgets', {'b': '2'}):
+      collector = publisher.SampleCollector(
+          publishers=[publisher.CSVPublisher(csv_path)],
+          publishers_from_flags=False, add_default_publishers=False,
+          streaming=True)
+      collector.AddSamples([sample.Sample(metric, 1, 'oz', metadata)], 'test',
+                           self.benchmark_spec)
+      collector.PublishSamples()
+    with open(csv_path) as fp:
+      reader = csv.DictReader(fp)
+      rows = list(reader)
+    self.assertIn('a', reader.fieldnames)
+    self.assertIn('b', reader.fieldnames)
+    self.assertEqual([('widgets', '1', ''), ('gadgets', '', '2')],
+                     [(row['metric'], row['a'], row['b']) for row in rows])
+
+  def testSpoolFileCanBeRepublished(self):
+    self.instance.AddSamples([sample.Sample('widgets', 1, 'oz', {'a': 'b'})],
+                             'test', self.benchmark_spec)
+    self.instance.PublishSamples()
+    with mock.patch.object(publisher.SampleCollector, '_PublishersFromFlags',
+                           return_value=[self.batch_publisher]):
+      publisher.RepublishJSONSamples(self.instance._streamer.spool_path)
+    republished = self.batch_publisher.PublishSamples.call_args[0][0]
+    self.assertEqual('widgets', republished[0]['metric'])
+    self.assertEqual('b', republished[0]['metadata']['a'])
+
 
 class DefaultMetadataProviderTestCase(unittest.TestCase):
 
@@ -388,6 +557,23 @@ class CSVPublisherTestCase(unittest.TestCase):
     self.assertEqual(['key1', 'key3'], reader.fieldnames[-2:])
     self.assertEqual(3, len(rows))
 
+  def testLaterCallsMergeIntoFile(self):
+    instance = publisher.CSVPublisher(self.tf.name)
+    instance.PublishSamples([{'test': 'testa', 'metric': '1', 'value': 1.0,
+                              'unit': 'MB', 'metadata': {'key1': 'value1'}}])
+    instance.PublishSamples([{'test': 'testa', 'metric': '2', 'value': 2.0,
+                              'unit': 'MB', 'metadata': {'key1': 'value2'}}])
+    instance.PublishSamples([{'test': 'testb', 'metric': '3', 'value': 3.0,
+                              'unit': 'MB', 'metadata': {'key0': 'value3'}}])
+    self.tf.seek(0)
+    reader = csv.DictReader(self.tf)
+    rows = list(reader)
+    self.assertEqual(['key0', 'key1'], reader.fieldnames[-2:])
+    self.assertEqual([('1', '', 'value1'), ('2', '', 'value2'),
+                      ('3', 'value3', '')],
+                     [(row['metric'], row['key0'], row['key1'])
+                      for row in rows])
+
 
 class InfluxDBPublisherTestCase(unittest.TestCase):
   def setUp(self):
@@ -0,0 +1,140 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for perfkitbenchmarker.result_store."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from perfkitbenchmarker import publisher
+from perfkitbenchmarker import result_store
+
+
+def _Sample(sample_uri, metric, value, timestamp, metadata, test='iperf',
+            run_uri='run1'):
+  return {'sample_uri': sample_uri, 'run_uri': run_uri, 'test': test,
+          'metric': metric, 'value': value, 'unit': 'Mbits/sec',
+          'timestamp': timestamp, 'product_name': 'PerfKitBenchmarker',
+          'official': False, 'owner': 'owner', 'metadata': metadata}
+
+
+class ResultStoreTestCase(unittest.TestCase):
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.temp_dir)
+    self.db_path = os.path.join(self.temp_dir, 'results.db')
+    self.store = result_store.ResultStore(self.db_path)
+    self.addCleanup(self.store.Close)
+    self.store.AddSamples([
+        _Sample('a', 'Throughput', 10.0, 1, {'machine_type': 'small'}),
+        _Sample('b', 'Throughput', 20.0, 2, {'machine_type': 'large'}),
+        _Sample('c', 'Throughput', 30.0, 3, {'machine_type': 'large'}),
+        _Sample('d', 'Latency', 5.0, 4, {}, test='ping', run_uri='run2')])
+
+  def testQueryAll(self):
+    samples = list(self.store.Query())
+    self.assertEqual([s['sample_uri'] for s in samples], ['a', 'b', 'c', 'd'])
+    self.assertEqual(samples[0]['metadata'], {'machine_type': 'small'})
+    self.assertEqual(samples[0]['value'], 10.0)
+    self.assertEqual(samples[3]['metadata'], {})
+
+  def testQueryMoreThanOneBatch(self):
+    num_samples = 2 * result_store._BATCH_SIZE + 1
+    self.store.AddSamples([
+        _Sample('batch%d' % i, 'Batched', float(i), 10 + i, {'index': i})
+        for i in range(num_samples)])
+    samples = list(self.store.Query(metric='Batched'))
+    self.assertEqual(len(samples), num_samples)
+    self.assertEqual(samples[-1]['metadata'], {'index': str(num_samples - 1)})
+
+  def testQueryFilters(self):
+    self.assertEqual(
+        [s['sample_uri'] for s in self.store.Query(metric='Throughput',
+                                                   start_time=2)],
+        ['b', 'c'])
+    self.assertEqual(
+        [s['sample_uri'] for s in self.store.Query(run_uri=['run2'])], ['d'])
+    self.assertEqual(
+        [s['sample_uri']
+         for s in self.store.Query(metadata={'machine_type': 'large'},
+                                   end_time=3)],
+        ['b'])
+    self.assertEqual(len(list(self.store.Query(limit=3))), 3)
+
+  def testAddSamplesIsIdempotent(self):
+    added = self.store.AddSamples([
+        _Sample('a', 'Throughput', 10.0, 1, {}),
+        _Sample('e', 'Throughput', 40.0, 5, {'machine_type': 'small'})])
+    self.assertEqual(added, 1)
+    self.assertEqual(len(list(self.store.Query())), 5)
+
+  def testAddSamplesWithLabels(self):
+    sample = _Sample('e', 'Throughput', 40.0, 5, None)
+    del sample['metadata']
+    sample['labels'] = publisher.GetLabelsFromDict(
+        {'machine_type': 'small', 'zone': 'us-east1-b'})
+    self.store.AddSamples([sample])
+    result, = self.store.Query(metadata={'zone': 'us-east1-b'})
+    self.assertEqual(result['metadata'],
+                     {'machine_type': 'small', 'zone': 'us-east1-b'})
+
+  def testAggregateByMetadata(self):
+    rows = self.store.Aggregate(group_by=('metric', 'machine_type'),
+                                test='iperf')
+    self.assertEqual(rows, [
+        {'metric': 'Throughput', 'machine_type': 'large', 'count': 2,
+         'mean': 25.0, 'min': 20.0, 'max': 30.0, 'sum': 50.0},
+        {'metric': 'Throughput', 'machine_type': 'small', 'count': 1,
+         'mean': 10.0, 'min': 10.0, 'max': 10.0, 'sum': 10.0}])
+
+  def testAggregateMissingMetadataKey(self):
+    rows = self.store.Aggregate(group_by=('machine_type',))
+    self.assertEqual([(row['machine_type'], row['count']) for row in rows],
+                     [(None, 1), ('large', 2), ('small', 1)])
+
+  def testImportJSON(self):
+    json_path = os.path.join(self.temp_dir, 'results.json')
+    json_publisher = publisher.NewlineDelimitedJSONPublisher(json_path)
+    json_publisher.PublishSamples([
+        _Sample('d', 'Latency', 5.0, 4, {}),
+        _Sample('e', 'Latency', 6.0, 5, {'ip_type': 'internal'})])
+    self.assertEqual(self.store.ImportJSON(json_path), 1)
+    result, = self.store.Query(metadata={'ip_type': 'internal'})
+    self.assertEqual(result['sample_uri'], 'e')
+
+  def testPublisher(self):
+    result_store_publisher = publisher.ResultStorePublisher(self.db_path)
+    result_store_publisher.PublishSamples(
+        [_Sample('e', 'Latency', 6.0, 5, {'ip_type': 'internal'})])
+    self.assertEqual(
+        [s['sample_uri'] for s in self.store.Query(metric='Latency')],
+        ['d', 'e'])
+
+
+class ParseLabelsTestCase(unittest.TestCase):
+
+  def testRoundTrip(self):
+    metadata = {'a': '1', 'b': 'x:y', 'c': ''}
+    self.assertEqual(
+        result_store.ParseLabels(publisher.GetLabelsFromDict(metadata)),
+        metadata)
+
+  def testEmpty(self):
+    self.assertEqual(result_store.ParseLabels(''), {})
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -14,13 +14,21 @@
 
 """Tests for the object_storage_service benchmark worker process."""
 
+import cStringIO
 import itertools
+import json
+import os
 import random
+import shutil
+import struct
+import tempfile
 import time
 import unittest
+import zlib
 
 import mock
 
+from perfkitbenchmarker.scripts.object_storage_api_test_scripts import local_service
 from perfkitbenchmarker.scripts.object_storage_api_test_scripts import object_storage_api_tests
 
 
@@ -88,5 +96,161 @@ class TestPrefixTimestampSuffixIterator(unittest.TestCase):
                               'foo_2.000000_bar'])
 
 
+class TestArrivalTimeIterator(unittest.TestCase):
+
+  def testConstant(self):
+    arrivals = object_storage_api_tests.ArrivalTimeIterator(
+        100.0, 4.0, 'constant')
+    self.assertEqual(list(itertools.islice(arrivals, 4)),
+                     [100.0, 100.25, 100.5, 100.75])
+
+  def testPoisson(self):
+    arrivals = object_storage_api_tests.ArrivalTimeIterator(
+        0.0, 100.0, 'poisson')
+    times = list(itertools.islice(arrivals, 10001))
+    self.assertEqual(times[0], 0.0)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    self.assertTrue(all(gap >= 0 for gap in gaps))
+    self.assertAlmostEqual(times[-1] / 10000, 0.01, places=3)
+
+
+class TestOpenLoopReadWorker(unittest.TestCase):
+
+  def testLatencyFromArrivalTime(self):
+    service = mock.MagicMock()
+    # The service falls further behind the 10 requests per second schedule
+    # with every request.
+    service.ReadObject.side_effect = [(1000.0 + 0.5 * i, 0.2)
+                                      for i in range(3)]
+    result_queue = mock.MagicMock()
+    with mock.patch.object(object_storage_api_tests, 'FLAGS') as flags:
+      flags.request_rate = 10.0
+      flags.arrival_distribution = 'constant'
+      flags.stream_num_start = 0
+      with mock.patch.object(object_storage_api_tests, 'WaitForArrival'):
+        object_storage_api_tests.ReadWorker(
+            service, 1000.0, [('a', 1), ('b', 2), ('c', 3)], result_queue, 0)
+
+    result = result_queue.put.call_args[0][0]
+    self.assertEqual([round(t, 6) for t in result['start_times']],
+                     [1000.0, 1000.1, 1000.2])
+    self.assertEqual([round(l, 6) for l in result['latencies']],
+                     [0.2, 0.6, 1.0])
+
+
+def _EchoWorker(value, result_queue, worker_num):
+  result_queue.put({'stream_num': worker_num, 'value': value,
+                    'pid': os.getpid()})
+
+
+class TestRunWorkerProcesses(unittest.TestCase):
+
+  def _Run(self, streams_per_process):
+    with mock.patch.object(object_storage_api_tests, 'FLAGS') as flags:
+      flags.num_streams = 5
+      flags.streams_per_process = streams_per_process
+      results = object_storage_api_tests.RunWorkerProcesses(
+          _EchoWorker, (), per_process_args=list('abcde'))
+    return sorted(results, key=lambda result: result['stream_num'])
+
+  def testOneStreamPerProcess(self):
+    results = self._Run(1)
+    self.assertEqual([result['value'] for result in results], list('abcde'))
+    self.assertEqual(len(set(result['pid'] for result in results)), 5)
+
+  def testThreadsInProcesses(self):
+    results = self._Run(2)
+    self.assertEqual([(result['stream_num'], result['value'])
+                      for result in results], list(enumerate('abcde')))
+    pids = [result['pid'] for result in results]
+    self.assertEqual(len(set(pids)), 3)
+    self.assertEqual(pids[0], pids[1])
+    self.assertEqual(pids[2], pids[3])
+
+
+class TestWriteWorkerOutput(unittest.TestCase):
+
+  def setUp(self):
+    temp_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    self.path = os.path.join(temp_dir, 'worker-output')
+    self.streams = [
+        {'stream_num': 3, 'start_times': [1.0, 2.5], 'latencies': [0.5, 0.25],
+         'sizes': [100, 200]},
+        {'stream_num': 4, 'start_times': [3.0], 'latencies': [0.125],
+         'sizes': [2 ** 40]}]
+
+  def _Read(self):
+    with open(self.path, 'rb') as worker_file:
+      header_line = worker_file.readline()
+      return header_line, json.loads(header_line), worker_file.read()
+
+  def testUncompressed(self):
+    object_storage_api_tests.WriteWorkerOutput(self.streams, self.path)
+
+    header_line, header, body = self._Read()
+    self.assertEqual(len(header_line) % 8, 0)
+    self.assertEqual(header['streams'], [{'stream_num': 3, 'count': 2},
+                                         {'stream_num': 4, 'count': 1}])
+    self.assertEqual(header['columns'],
+                     ['start_times', 'latencies', 'sizes'])
+    self.assertIsNone(header['compression'])
+    self.assertEqual(struct.unpack('<9d', body),
+                     (1.0, 2.5, 3.0, 0.5, 0.25, 0.125, 100, 200, 2 ** 40))
+
+  def testCompressed(self):
+    object_storage_api_tests.WriteWorkerOutput(self.streams, self.path,
+                                               compress=True)
+
+    _, header, body = self._Read()
+    self.assertEqual(header['compression'], 'zlib')
+    self.assertEqual(struct.unpack('<9d', zlib.decompress(body))[-1], 2 ** 40)
+
+
+class TestLocalService(unittest.TestCase):
+
+  def _Service(self, latency=0.0, bandwidth_mbps=None):
+    with mock.patch.object(local_service, 'FLAGS') as flags:
+      flags.local_storage_dir = self.storage_dir
+      flags.local_storage_latency = latency
+      flags.local_storage_bandwidth_mbps = bandwidth_mbps
+      return local_service.LocalService()
+
+  def setUp(self):
+    self.storage_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self.storage_dir)
+
+  def testWriteReadListDelete(self):
+    service = self._Service()
+    stream = cStringIO.StringIO('x' * 100)
+
+    service.WriteObjectFromBuffer('bucket', 'dir/obj1', stream, 10)
+    service.WriteObjectFromBuffer('bucket', 'obj2', stream, 100)
+    service.ReadObject('bucket', 'dir/obj1')
+
+    self.assertEqual(
+        os.path.getsize(os.path.join(self.storage_dir, 'bucket', 'dir%2Fobj1')),
+        10)
+    self.assertEqual(service.ListObjects('bucket', 'dir/'), ['dir/obj1'])
+    deleted = []
+    service.DeleteObjects('bucket', ['obj2', 'missing'], deleted)
+    self.assertEqual(deleted, ['obj2'])
+    self.assertEqual(service.ListObjects('bucket', ''), ['dir/obj1'])
+
+  def testInjectedLatencyAndBandwidth(self):
+    # 0.05 seconds of latency plus 0.05 seconds to send 50 KB at 8 Mbps.
+    service = self._Service(latency=0.05, bandwidth_mbps=8)
+
+    _, latency = service.WriteObjectFromBuffer(
+        'bucket', 'obj', cStringIO.StringIO('x' * 50000), 50000)
+
+    self.assertGreaterEqual(latency, 0.1)
+    self.assertGreaterEqual(service.ReadObject('bucket', 'obj')[1], 0.1)
+
+  def testInvalidFlags(self):
+    with self.assertRaises(ValueError):
+      self._Service(bandwidth_mbps=0)
+
+
 if __name__ == '__main__':
   unittest.main()
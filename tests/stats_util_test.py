@@ -0,0 +1,120 @@
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for perfkitbenchmarker.stats_util."""
+
+import random
+import unittest
+
+import numpy as np
+
+from perfkitbenchmarker import stats_util
+
+
+def _SortedPercentile(numbers, percentile):
+  """The reference percentile definition used throughout PKB."""
+  numbers_sorted = sorted(numbers)
+  index = min(int(len(numbers) * percentile / 100.0), len(numbers) - 1)
+  return numbers_sorted[index]
+
+
+class PercentileCalculatorTestCase(unittest.TestCase):
+
+  def testMatchesSortedDefinition(self):
+    numbers = [random.random() for _ in range(10001)]
+    result = stats_util.PercentileCalculator(numbers)
+    for percentile in stats_util.PERCENTILES_LIST:
+      self.assertEqual(result['p%s' % percentile],
+                       _SortedPercentile(numbers, percentile))
+    self.assertAlmostEqual(result['average'], np.mean(numbers))
+    self.assertAlmostEqual(result['stddev'], np.std(numbers, ddof=1))
+
+  def testAcceptsNumpyArrays(self):
+    result = stats_util.PercentileCalculator(np.arange(1001), [50, 100])
+    self.assertEqual(result['p50'], 500)
+    self.assertEqual(result['p100'], 1000)
+
+  def testSingleValue(self):
+    result = stats_util.PercentileCalculator([3], [50])
+    self.assertEqual(result, {'p50': 3, 'average': 3, 'stddev': 0})
+
+  def testNoNumbers(self):
+    with self.assertRaises(ValueError):
+      stats_util.SelectPercentiles([], [50])
+
+
+class WeightedPercentilesTestCase(unittest.TestCase):
+
+  def testMatchesExpandedData(self):
+    values = [5, 1, 3, 2]
+    weights = [1, 10, 0, 4]
+    expanded = [v for v, w in zip(values, weights) for _ in range(w)]
+    result = stats_util.WeightedPercentiles(values, weights, [0, 50, 90, 100])
+    for percentile in (0, 50, 90, 100):
+      self.assertEqual(result['p%s' % percentile],
+                       _SortedPercentile(expanded, percentile))
+
+  def testMismatchedLengths(self):
+    with self.assertRaises(ValueError):
+      stats_util.WeightedPercentiles([1, 2], [1])
+
+  def testNoWeight(self):
+    with self.assertRaises(ValueError):
+      stats_util.WeightedPercentiles([1, 2], [0, 0])
+
+
+class QuantileSketchTestCase(unittest.TestCase):
+
+  def testPercentilesWithinRelativeAccuracy(self):
+    numbers = np.random.lognormal(size=100000)
+    sketch = stats_util.QuantileSketch(relative_accuracy=0.01)
+    sketch.Add(numbers)
+    result = sketch.GetPercentiles()
+    for percentile in stats_util.PERCENTILES_LIST:
+      exact = _SortedPercentile(numbers.tolist(), percentile)
+      self.assertLessEqual(abs(result['p%s' % percentile] - exact),
+                           0.01 * exact)
+    self.assertAlmostEqual(result['average'], numbers.mean())
+    self.assertAlmostEqual(result['stddev'], numbers.std(ddof=1))
+
+  def testMergeEqualsSingleSketch(self):
+    numbers = np.random.exponential(size=10000)
+    numbers[:10] = 0
+    whole = stats_util.QuantileSketch()
+    whole.Add(numbers)
+    merged = stats_util.QuantileSketch()
+    for chunk in np.array_split(numbers, 7):
+      part = stats_util.QuantileSketch()
+      part.Add(chunk)
+      merged.Merge(part)
+    self.assertEqual(merged.count, whole.count)
+    whole_result = whole.GetPercentiles()
+    merged_result = merged.GetPercentiles()
+    for key, value in whole_result.iteritems():
+      self.assertAlmostEqual(merged_result[key], value)
+
+  def testMergeIncompatible(self):
+    with self.assertRaises(ValueError):
+      stats_util.QuantileSketch(0.01).Merge(stats_util.QuantileSketch(0.05))
+
+  def testNegativeValues(self):
+    with self.assertRaises(ValueError):
+      stats_util.QuantileSketch().Add([-1])
+
+  def testEmpty(self):
+    with self.assertRaises(ValueError):
+      stats_util.QuantileSketch().GetPercentiles()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -14,15 +14,18 @@
 
 """Tests for perfkitbenchmarker.vm_util."""
 
+import hashlib
 import os
 import psutil
 import subprocess
+import tempfile
 import threading
 import time
 import unittest
 
 import mock
 
+from perfkitbenchmarker import errors
 from perfkitbenchmarker import flags
 from perfkitbenchmarker import vm_util
 from tests import pkb_common_test_case
@@ -148,5 +151,103 @@ class IssueCommandTestCase(pkb_common_test_case.PkbCommonTestCase):
     self.assertFalse(HaveSleepSubprocess())
 
 
+class IssueCommandsTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def testResultsInOrder(self):
+    cmds = [['sh', '-c', 'echo out%d; echo err%d >&2; exit %d' % (i, i, i)]
+            for i in range(5)]
+    results = vm_util.IssueCommands(cmds, max_concurrency=2)
+    self.assertEqual(results, [('out%d\n' % i, 'err%d\n' % i, i)
+                               for i in range(5)])
+
+  def testCommandsRunConcurrently(self):
+    start_time = time.time()
+    results = vm_util.IssueCommands([['sleep', '1s']] * 4, max_concurrency=4)
+    self.assertEqual([retcode for _, _, retcode in results], [0] * 4)
+    self.assertLess(time.time() - start_time, 3)
+
+  def testReturnTimes(self):
+    results = vm_util.IssueCommands([['sleep', '0.5s'], ['true']],
+                                    return_times=True)
+    self.assertEqual([result[:3] for result in results],
+                     [('', '', 0), ('', '', 0)])
+    self.assertGreaterEqual(results[0][3], 0.5)
+    self.assertLess(results[1][3], results[0][3])
+
+  def testTimeoutReached(self):
+    results = vm_util.IssueCommands([['sleep', '5s'], ['sleep', '0s']],
+                                    timeout=1)
+    self.assertEqual([retcode for _, _, retcode in results], [-9, 0])
+    self.assertFalse(HaveSleepSubprocess())
+
+  def testBackgroundProcessHoldingOutputOpen(self):
+    # Like an ssh ControlMaster, the backgrounded sleep inherits stdout.
+    start_time = time.time()
+    results = vm_util.IssueCommands([['sh', '-c', 'sleep 5 & echo done']])
+    self.assertEqual(results, [('done\n', '', 0)])
+    self.assertLess(time.time() - start_time, 4)
+
+
+class _FakeVm(object):
+  """A VM whose files are kept in memory."""
+
+  def __init__(self, name, corrupt_peer_copies=False):
+    self.name = name
+    self.files = {}
+    self.pushes = 0
+    self.corrupt_peer_copies = corrupt_peer_copies
+
+  def PushFile(self, source_path, remote_path):
+    self.pushes += 1
+    with open(source_path) as f:
+      self.files[remote_path] = f.read()
+
+  def MoveFile(self, target, source_path, remote_path):
+    contents = self.files[source_path]
+    if target.corrupt_peer_copies:
+      contents = contents[:-1]
+    target.files[remote_path] = contents
+
+  def GetMd5sum(self, path, filename):
+    return hashlib.md5(self.files[os.path.join(path, filename)]).hexdigest()
+
+
+class DistributeFileTestCase(pkb_common_test_case.PkbCommonTestCase):
+
+  def setUp(self):
+    super(DistributeFileTestCase, self).setUp()
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+      f.write('data' * 1000)
+    self.local_path = f.name
+    self.addCleanup(os.remove, self.local_path)
+
+  def testAllVmsReceiveFile(self):
+    vms = [_FakeVm('vm%d' % i) for i in range(11)]
+    samples = vm_util.DistributeFile(vms, self.local_path, 'dir/data',
+                                     num_seeds=2)
+    for vm in vms:
+      self.assertEqual(vm.files['dir/data'], 'data' * 1000)
+    self.assertEqual(sum(vm.pushes for vm in vms), 2)
+    metadata = samples[0].metadata
+    # 2 seeds -> 4 -> 8 -> 11 VMs.
+    self.assertEqual(metadata['peer_copy_rounds'], 3)
+    self.assertEqual(metadata['num_vms'], 11)
+    self.assertEqual([s.metric for s in samples],
+                     ['File Distribution Time',
+                      'File Distribution Throughput'])
+
+  def testCorruptPeerCopyIsReplaced(self):
+    vms = [_FakeVm('vm0'), _FakeVm('vm1', corrupt_peer_copies=True)]
+    vm_util.DistributeFile(vms, self.local_path, 'data', num_seeds=1)
+    self.assertEqual(vms[1].files['data'], 'data' * 1000)
+    self.assertEqual(vms[1].pushes, 1)
+
+  def testCorruptCopyFromHost(self):
+    vm = _FakeVm('vm0')
+    with mock.patch.object(vm, 'GetMd5sum', return_value='bad'):
+      with self.assertRaises(errors.VmUtil.ThreadException):
+        vm_util.DistributeFile([vm], self.local_path)
+
+
 if __name__ == '__main__':
   unittest.main()
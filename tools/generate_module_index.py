@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generates perfkitbenchmarker/module_index.py.
+
+The index lets PKB find benchmarks by name, and the modules defining
+command-line flags, without importing every benchmark and package module at
+startup. Run this after adding or renaming a benchmark or a benchmark or
+package flag (testModuleIndexIsUpToDate in tests/benchmark_sets_test.py fails
+until you do):
+
+  python tools/generate_module_index.py
+
+With --check, exits with a non-zero status if the index is out of date
+instead of writing it.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from perfkitbenchmarker import flags  # noqa
+from perfkitbenchmarker import import_util  # noqa
+from perfkitbenchmarker import pkb  # noqa
+from perfkitbenchmarker import linux_benchmarks  # noqa
+from perfkitbenchmarker import linux_packages  # noqa
+from perfkitbenchmarker import windows_benchmarks  # noqa
+from perfkitbenchmarker import windows_packages  # noqa
+
+FLAGS = flags.FLAGS
+
+INDEX_PATH = os.path.join(os.path.dirname(__file__), os.pardir,
+                          'perfkitbenchmarker', 'module_index.py')
+
+HEADER = '''\
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""An index of benchmark and package modules.
+
+Generated by tools/generate_module_index.py. Do not edit.
+"""
+'''
+
+
+def _GetBenchmarkIndex(package):
+  """Imports all benchmarks in 'package' and maps their names to modules."""
+  index = {}
+  for module in import_util.LoadModulesForPath(package.__path__,
+                                               package.__name__):
+    if module.BENCHMARK_NAME in index:
+      raise ValueError('There are multiple benchmarks with BENCHMARK_NAME '
+                       '"%s"' % module.BENCHMARK_NAME)
+    index[module.BENCHMARK_NAME] = module.__name__
+  return index
+
+
+def _FormatDict(name, values):
+  lines = ['%s = {' % name]
+  for key, value in sorted(values.iteritems()):
+    lines.append('    %r:\n        %r,' % (key, value))
+  lines.append('}')
+  return '\n'.join(lines)
+
+
+def GenerateIndex():
+  """Returns the contents of module_index.py.
+
+  Must be called before any benchmark or package module has been imported,
+  since flags already defined at that point are treated as always available.
+  """
+  core_flags = set(FLAGS)
+  linux_index = _GetBenchmarkIndex(linux_benchmarks)
+  windows_index = _GetBenchmarkIndex(windows_benchmarks)
+  for package in (linux_packages, windows_packages):
+    for _ in import_util.LoadModulesForPath(package.__path__,
+                                            package.__name__):
+      pass
+  flag_modules = {}
+  for module_name, module_flags in FLAGS.flags_by_module_dict().iteritems():
+    for flag in module_flags:
+      if flag.name not in core_flags:
+        flag_modules[flag.name] = module_name
+  return '\n\n'.join((HEADER,
+                      _FormatDict('LINUX_BENCHMARKS', linux_index),
+                      _FormatDict('WINDOWS_BENCHMARKS', windows_index),
+                      _FormatDict('FLAG_MODULES', flag_modules))) + '\n'
+
+
+def main(argv):
+  contents = GenerateIndex()
+  if '--check' in argv[1:]:
+    with open(INDEX_PATH) as index_file:
+      if index_file.read() != contents:
+        print >> sys.stderr, ('perfkitbenchmarker/module_index.py is out of '
+                              'date. Run tools/generate_module_index.py.')
+        return 1
+    return 0
+  with open(INDEX_PATH, 'w') as index_file:
+    index_file.write(contents)
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main(sys.argv))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures how long pkb.py takes to start up and parse its flags.
+
+Each command line is run several times in a new interpreter and the median
+wall time is reported. '--version' makes PKB exit right after parsing flags.
+'--flagfile=/dev/null' makes PKB import every benchmark and package, for
+comparison.
+
+Usage (from the repository root):
+
+  python tools/pkb_startup_benchmark.py [--runs N] ['pkb args' ...]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PKB_PATH = os.path.join(os.path.dirname(__file__), os.pardir, 'pkb.py')
+
+DEFAULT_ARGS = (
+    '--version',
+    '--benchmarks=ping --version',
+    '--benchmarks=fio --fio_target_mode=against_file_with_fill --version',
+    '--helpmatch=ping',
+    '--benchmarks=ping --version --flagfile=/dev/null',
+)
+
+
+def _TimeCommand(args, runs):
+  """Returns the median wall time of running pkb.py with 'args'."""
+  times = []
+  with open(os.devnull, 'w') as devnull:
+    for _ in xrange(runs):
+      start = time.time()
+      subprocess.check_call([sys.executable, PKB_PATH] + args.split(),
+                            stdout=devnull, stderr=devnull)
+      times.append(time.time() - start)
+  return sorted(times)[len(times) // 2]
+
+
+def main(argv):
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--runs', type=int, default=5,
+                      help='Number of times to run each command.')
+  parser.add_argument('args', nargs='*', default=DEFAULT_ARGS,
+                      help='pkb.py arguments, as one string per command.')
+  args = parser.parse_args(argv[1:])
+  print '%10s  %s' % ('median (s)', 'pkb.py arguments')
+  for pkb_args in args.args:
+    print '%10.3f  %s' % (_TimeCommand(pkb_args, args.runs), pkb_args)
+
+
+if __name__ == '__main__':
+  main(sys.argv)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+# Copyright 2018 PerfKitBenchmarker Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro-benchmarks perfkitbenchmarker.stats_util against the sort-based
+percentile calculation it replaced.
+
+Usage (from the repository root):
+
+  python tools/stats_util_benchmark.py [size ...]
+
+Sizes default to 10^6 and 10^7 values. 10^8 values need roughly 2.5 GB of
+memory for the vectorized path alone; the sort-based reference is skipped
+above 10^7 values because it takes minutes and many GB of memory for the
+Python list.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from perfkitbenchmarker import stats_util  # noqa
+
+DEFAULT_SIZES = (10 ** 6, 10 ** 7)
+MAX_REFERENCE_SIZE = 10 ** 7
+SKETCH_CHUNK_SIZE = 10 ** 6
+
+
+def SortedPercentileCalculator(numbers, percentiles):
+  """The previous sample.PercentileCalculator implementation."""
+  numbers_sorted = sorted(numbers)
+  count = len(numbers_sorted)
+  total = sum(numbers_sorted)
+  result = {}
+  for percentile in percentiles:
+    index = min(int(count * float(percentile) / 100.0), count - 1)
+    result['p%s' % str(percentile)] = numbers_sorted[index]
+  average = total / float(count)
+  result['average'] = average
+  total_of_squares = sum([(i - average) ** 2 for i in numbers])
+  result['stddev'] = (total_of_squares / (count - 1)) ** 0.5
+  return result
+
+
+def _Time(func, *args):
+  start = time.time()
+  result = func(*args)
+  return time.time() - start, result
+
+
+def _Sketch(values):
+  sketch = stats_util.QuantileSketch()
+  for start in xrange(0, values.size, SKETCH_CHUNK_SIZE):
+    sketch.Add(values[start:start + SKETCH_CHUNK_SIZE])
+  return sketch.GetPercentiles()
+
+
+def main(argv):
+  sizes = [int(float(arg)) for arg in argv[1:]] or DEFAULT_SIZES
+  percentiles = stats_util.PERCENTILES_LIST
+  print '%12s %14s %14s %14s %10s' % ('values', 'sorted (s)', 'numpy (s)',
+                                      'sketch (s)', 'speedup')
+  for size in sizes:
+    values = np.random.lognormal(size=size)
+    numpy_time, numpy_result = _Time(stats_util.PercentileCalculator, values,
+                                     percentiles)
+    sketch_time, _ = _Time(_Sketch, values)
+    if size <= MAX_REFERENCE_SIZE:
+      reference_time, reference_result = _Time(
+          SortedPercentileCalculator, values.tolist(), percentiles)
+      for percentile in percentiles:
+        key = 'p%s' % percentile
+        assert numpy_result[key] == reference_result[key], key
+      print '%12d %14.3f %14.3f %14.3f %9.1fx' % (
+          size, reference_time, numpy_time, sketch_time,
+          reference_time / numpy_time)
+    else:
+      print '%12d %14s %14.3f %14.3f %10s' % (size, '-', numpy_time,
+                                              sketch_time, '-')
+
+
+if __name__ == '__main__':
+  main(sys.argv)